@@ -1,7 +1,134 @@
-from techfix.gui import TechFixApp
+from __future__ import annotations
 
+import argparse
+from typing import Optional, Sequence
+
+from techfix import db
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="techfix", description="TechFix desktop accounting app")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser(
+        "rebuild-rollups",
+        help="Backfill the per-period and daily balance tables from the journal",
+    )
+    commands.add_parser(
+        "rebuild-search",
+        help="Rebuild the full-text search index for journal entries, accounts, customers and vendors",
+    )
+    export_all_cmd = commands.add_parser(
+        "export-all",
+        help="Write the Export All workbook (journal, ledger, trial balances, worksheet, financial statements)",
+    )
+    export_all_cmd.add_argument("output", help="Path of the .xlsx file to write")
+    export_all_cmd.add_argument("--period", type=int, default=None, help="Period id (default: every period)")
+    export_all_cmd.add_argument("--workers", type=int, default=4, help="Sheets built concurrently")
+    export_all_cmd.add_argument("--from", dest="date_from", default=None,
+                                help="Statement start date, YYYY-MM-DD (default: the period's start)")
+    export_all_cmd.add_argument("--to", dest="date_to", default=None,
+                                help="Statement end date, YYYY-MM-DD (default: the period's end)")
+    columnar_cmd = commands.add_parser(
+        "export-journal",
+        help="Write typed journal lines to Parquet or Arrow IPC (needs pyarrow)",
+    )
+    columnar_cmd.add_argument("output", help="Dataset directory (partitioned) or file (--single-file)")
+    columnar_cmd.add_argument("--format", choices=("parquet", "arrow"), default=None,
+                              help="Default: from the extension, else parquet")
+    columnar_cmd.add_argument("--period", type=int, default=None, help="Period id (default: every period)")
+    columnar_cmd.add_argument("--single-file", action="store_true",
+                              help="One file with a period_id column instead of one partition per period")
+    columnar_cmd.add_argument("--compression", default=None, help="e.g. snappy, zstd, lz4")
+    scheduler_cmd = commands.add_parser(
+        "backup-scheduler",
+        help="Take deduplicated snapshots on a schedule and prune them grandfather-father-son",
+    )
+    scheduler_cmd.add_argument("--schedule", default=None,
+                               help="Interval (30m, 6h, 1d), @hourly/@daily/@weekly or a cron expression "
+                                    "(default: the app's setting)")
+    scheduler_cmd.add_argument("--daily", type=int, default=None, help="Daily snapshots to keep")
+    scheduler_cmd.add_argument("--weekly", type=int, default=None, help="Weekly snapshots to keep")
+    scheduler_cmd.add_argument("--monthly", type=int, default=None, help="Monthly snapshots to keep")
+    scheduler_cmd.add_argument("--once", action="store_true",
+                               help="Run once now (for cron/Task Scheduler) instead of staying in the foreground")
+    scheduler_cmd.add_argument("--force", action="store_true", help="With --once: snapshot even if nothing changed")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild-rollups":
+        db.init_db(reset=False)
+        for table, count in db.rebuild_balance_rollups().items():
+            print(f"{table}: {count} rows")
+        return
+
+    if args.command == "rebuild-search":
+        db.init_db(reset=False)
+        print(f"search_index: {db.rebuild_search_index()} rows")
+        return
+
+    if args.command == "export-all":
+        import sys
+        import time
+
+        from techfix import export_all
+
+        db.init_db(reset=False)
+
+        def progress(stage: str, rows: int, finished: bool) -> None:
+            if finished:
+                print(f"{stage}: {rows:,} rows", file=sys.stderr)
+
+        started = time.perf_counter()
+        export_all.write_all_workbook(
+            args.output, period_id=args.period, start_date=args.date_from, end_date=args.date_to,
+            progress=progress, max_workers=args.workers,
+        )
+        print(f"{args.output} ({time.perf_counter() - started:.1f}s)")
+        return
+
+    if args.command == "export-journal":
+        import time
+
+        from techfix import columnar
+
+        if not columnar.PYARROW_AVAILABLE:
+            parser.error("export-journal needs pyarrow: pip install pyarrow")
+        db.init_db(reset=False)
+        started = time.perf_counter()
+        result = columnar.export_journal_lines(
+            args.output,
+            fmt=args.format,
+            period_id=args.period,
+            partition_by_period=not args.single_file,
+            compression=args.compression,
+        )
+        print(f"{result['rows']} lines in {len(result['files'])} file(s) ({time.perf_counter() - started:.1f}s)")
+        return
+
+    if args.command == "backup-scheduler":
+        from techfix import backup_scheduler
+
+        db.init_db(reset=False)
+        config = backup_scheduler.load_config()
+        for key in ("schedule", "daily", "weekly", "monthly"):
+            if getattr(args, key) is not None:
+                config[key] = getattr(args, key)
+        try:
+            scheduler = backup_scheduler.BackupScheduler.from_config(config)
+        except backup_scheduler.ScheduleError as e:
+            parser.error(str(e))
+        if args.once:
+            print(scheduler.run_once(force=args.force))
+            return
+        print(f"Backing up {scheduler.schedule}; next run {scheduler.next_run().astimezone():%Y-%m-%d %H:%M}")
+        scheduler.start()
+        try:
+            scheduler.wait()
+        except KeyboardInterrupt:
+            scheduler.stop()
+        return
+
+    from techfix.gui import TechFixApp
 
-def main() -> None:
     app = TechFixApp()
     app.attributes('-fullscreen', True)
     app.mainloop()
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, date as _date
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import copy
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone, date as _date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from pathlib import Path
 import sqlite3
 
-from . import db
+from . import cashflow, db, report_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _iso_date(value: str) -> str:
+    """Canonical YYYY-MM-DD form of a date accepted by ``_check_posting_period``."""
+    return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
 
 
 @dataclass
@@ -19,6 +29,46 @@ class JournalLine:
         return (self.account_id, float(self.debit), float(self.credit))
 
 
+@dataclass(frozen=True)
+class PostingEvent:
+    """
+    What changed when an entry was recorded, deleted or changed status.
+
+    ``kind`` is ``"posted"`` for a newly recorded entry (``status`` tells a
+    draft from a posted one), ``"deleted"`` (``status`` is the status it had)
+    or ``"status_changed"`` (from ``previous_status`` to ``status``).
+    ``lines`` are the entry's ``(account_id, debit, credit)`` tuples.
+    """
+
+    kind: str
+    entry_id: int
+    date: str
+    period_id: Optional[int]
+    status: str
+    lines: Tuple[Tuple[int, float, float], ...] = ()
+    previous_status: Optional[str] = None
+    description: str = ""
+    document_ref: Optional[str] = None
+    external_ref: Optional[str] = None
+    is_adjusting: bool = False
+    is_closing: bool = False
+    is_reversing: bool = False
+    reverse_on: Optional[str] = None
+
+    @property
+    def account_ids(self) -> set:
+        return {line[0] for line in self.lines}
+
+    def weight(self, status: str = "posted") -> int:
+        """+1, -1 or 0: how this event changes totals taken over entries with ``status``."""
+        before = self.previous_status if self.kind == "status_changed" else None
+        if self.kind == "deleted":
+            before, after = self.status, None
+        else:
+            after = self.status
+        return int(after == status) - int(before == status)
+
+
 class AccountingEngine:
     def __init__(self, conn: Optional[sqlite3.Connection] = None, *, current_user: Optional[str] = None) -> None:
         self._owned = conn is not None
@@ -44,6 +94,8 @@ class AccountingEngine:
         self.current_period = db.get_current_period(conn=self.conn)
         if not self.current_period:
             self.current_period = db.ensure_default_period(conn=self.conn)
+        self._listeners: List[Callable[[PostingEvent], None]] = []
+        self._held_events: Optional[List[PostingEvent]] = None
         self._initialize_cycle_status()
 
     def set_company_context(self, company_code: str) -> None:
@@ -61,35 +113,186 @@ class AccountingEngine:
         if not self._owned:
             self.conn.close()
 
-    # Transaction Entry & Journalization
-    def record_entry(
+    def with_connection(self, conn: sqlite3.Connection) -> "AccountingEngine":
+        """
+        A shallow copy of this engine that runs its queries on ``conn``, e.g. a
+        worker thread's read connection. The copy does not own ``conn``.
+        """
+        engine = copy.copy(self)
+        engine.conn = conn
+        engine._owned = True
+        return engine
+
+    # Posting events
+    def subscribe(self, listener: Callable[[PostingEvent], None]) -> None:
+        """Call ``listener(event)`` after every entry this engine records, deletes or re-statuses."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[PostingEvent], None]) -> None:
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def _emit(self, event: PostingEvent) -> None:
+        if self._held_events is not None:
+            self._held_events.append(event)
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Posting event listener failed for entry %s", event.entry_id)
+
+    @contextmanager
+    def _holding_events(self) -> Iterator[None]:
+        """Hold back events emitted in the block; deliver them if it succeeds, drop them if it fails."""
+        if self._held_events is not None:
+            yield
+            return
+        self._held_events = []
+        try:
+            yield
+            held = self._held_events
+        finally:
+            self._held_events = None
+        for event in held:
+            self._emit(event)
+
+    def _entry_event(self, kind: str, entry_id: int) -> Optional[PostingEvent]:
+        """Build an event from the stored entry (None if it does not exist)."""
+        entry = self.conn.execute(
+            """
+            SELECT id, date, period_id, status, description, document_ref, external_ref,
+                   is_adjusting, is_closing, is_reversing
+            FROM journal_entries WHERE id = ?
+            """,
+            (entry_id,),
+        ).fetchone()
+        if not entry:
+            return None
+        lines = self.conn.execute(
+            "SELECT account_id, debit, credit FROM journal_lines WHERE entry_id = ? ORDER BY id",
+            (entry_id,),
+        ).fetchall()
+        return PostingEvent(
+            kind=kind,
+            entry_id=int(entry["id"]),
+            date=entry["date"],
+            period_id=entry["period_id"],
+            status=entry["status"] or "posted",
+            lines=tuple((int(ln["account_id"]), float(ln["debit"] or 0), float(ln["credit"] or 0)) for ln in lines),
+            description=entry["description"] or "",
+            document_ref=entry["document_ref"],
+            external_ref=entry["external_ref"],
+            is_adjusting=bool(entry["is_adjusting"]),
+            is_closing=bool(entry["is_closing"]),
+            is_reversing=bool(entry["is_reversing"]),
+        )
+
+    def delete_entry(self, entry_id: int) -> bool:
+        """Delete a journal entry with its lines. Returns False if there was no such entry."""
+        with db.unit_of_work(self.conn):
+            event = self._entry_event("deleted", entry_id)
+            if event is None:
+                return False
+            self.conn.execute("DELETE FROM journal_entries WHERE id = ?", (entry_id,))
+        self._emit(event)
+        return True
+
+    def set_entry_status(self, entry_id: int, status: str) -> None:
+        """Move an entry between ``draft`` and ``posted``."""
+        if status not in ("draft", "posted"):
+            raise ValueError(f"Unknown entry status '{status}'.")
+        with db.unit_of_work(self.conn):
+            event = self._entry_event("status_changed", entry_id)
+            if event is None:
+                raise ValueError(f"Journal entry #{entry_id} not found.")
+            if event.status == status:
+                return
+            if status == "posted":
+                self._check_posting_period(event.date, event.period_id)
+            posted = status == "posted"
+            self.conn.execute(
+                "UPDATE journal_entries SET status = ?, posted_at = ?, posted_by = ? WHERE id = ?",
+                (
+                    status,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds") if posted else None,
+                    self.current_user_name if posted else None,
+                    entry_id,
+                ),
+            )
+            self._update_cycle_status_after_entry(
+                is_adjusting=event.is_adjusting,
+                is_closing=event.is_closing,
+                status=status,
+            )
+        self._emit(replace(event, status=status, previous_status=event.status))
+
+    def apply_events_to_trial_balance(
         self,
-        date: str,
-        description: str,
-        lines: Iterable[JournalLine],
+        rows: Iterable,
+        events: Iterable[PostingEvent],
         *,
-        is_adjusting: bool = False,
-        is_closing: bool = False,
-        is_reversing: bool = False,
-        document_ref: Optional[str] = None,
-        external_ref: Optional[str] = None,
-        memo: Optional[str] = None,
-        source_type: Optional[str] = None,
-        status: str = "posted",
-        created_by: str = "system",
-        posted_by: Optional[str] = None,
         period_id: Optional[int] = None,
-        attachments: Optional[Sequence[Tuple[str, str]]] = None,
-        schedule_reverse_on: Optional[str] = None,
+        up_to_date: Optional[str] = None,
+        include_temporary: bool = True,
+    ) -> List[Dict[str, object]]:
+        """
+        Bring ``db.compute_trial_balance`` rows (same ``period_id``,
+        ``up_to_date`` and ``include_temporary``) up to date with ``events``
+        without recomputing them. Returns new row dicts in account code order.
+        """
+        by_id: Dict[int, Dict[str, object]] = {int(r["account_id"]): dict(r) for r in rows}
+        changes: Dict[int, float] = {}
+        for event in events:
+            weight = event.weight("posted")
+            if not weight or (period_id is not None and event.period_id != period_id):
+                continue
+            if up_to_date and event.date > up_to_date:
+                continue
+            for account_id, debit, credit in event.lines:
+                changes[account_id] = changes.get(account_id, 0.0) + weight * (debit - credit)
+        missing = [a for a in changes if a not in by_id]
+        if missing:
+            marks = ",".join("?" * len(missing))
+            for acc in self.conn.execute(
+                f"""
+                SELECT id, code, name, type, normal_side, is_permanent
+                FROM accounts WHERE id IN ({marks}) AND is_active = 1
+                """,
+                missing,
+            ):
+                if include_temporary or acc["is_permanent"]:
+                    by_id[int(acc["id"])] = {
+                        "account_id": int(acc["id"]),
+                        "code": acc["code"],
+                        "name": acc["name"],
+                        "type": acc["type"],
+                        "normal_side": acc["normal_side"],
+                        "net_debit": 0.0,
+                        "net_credit": 0.0,
+                    }
+        for account_id, change in changes.items():
+            row = by_id.get(account_id)
+            if row is None:
+                continue
+            net = round(float(row["net_debit"] or 0) - float(row["net_credit"] or 0) + change, 2)
+            row["net_debit"], row["net_credit"] = (net, 0.0) if net > 0 else (0.0, round(-net, 2))
+        return sorted(by_id.values(), key=lambda r: str(r["code"] or ""))
+
+    # Transaction Entry & Journalization
+    def _check_posting_period(
+        self,
+        date: str,
+        period_id: Optional[int],
+        period_rows: Optional[Dict[int, Optional[sqlite3.Row]]] = None,
     ) -> int:
-        # Validate that entry has at least one line
-        line_list = list(lines)
-        if not line_list:
-            raise ValueError("Journal entry must have at least one line (debit or credit).")
-        
-        line_tuples = [ln.as_tuple() for ln in line_list]
+        """
+        Ensure an active, open period and a date within its bounds (if defined).
+        ``period_rows`` caches period lookups across a batch. Returns the period id.
+        """
         period = period_id or self.current_period_id
-        # Core validation: ensure an active, open period and a date within bounds (if defined)
         if not period:
             raise RuntimeError("No active accounting period selected.")
         try:
@@ -97,7 +300,12 @@ class AccountingEngine:
         except Exception:
             raise ValueError("Entry date must be in ISO format YYYY-MM-DD.")
 
-        period_row = db.get_accounting_period_by_id(int(period), conn=self.conn)
+        if period_rows is not None and int(period) in period_rows:
+            period_row = period_rows[int(period)]
+        else:
+            period_row = db.get_accounting_period_by_id(int(period), conn=self.conn)
+            if period_rows is not None:
+                period_rows[int(period)] = period_row
         if period_row:
             if int(period_row["is_closed"] or 0) == 1:
                 raise RuntimeError("Cannot post entries to a closed accounting period.")
@@ -118,48 +326,197 @@ class AccountingEngine:
                         raise RuntimeError("Entry date is after the period end date.")
                 except Exception:
                     pass
-        # Resolve user / company context, but remain backward compatible
-        created_username = created_by or self.current_user_name or "system"
-        created_user = None
-        company = getattr(self, "current_company", None)
-        try:
-            created_user = db.get_user_by_username(created_username, conn=self.conn)
-        except Exception:
-            created_user = None
+        return int(period)
 
-        entry_id = db.insert_journal_entry(
-            date,
-            description,
-            line_tuples,
-            is_adjusting=1 if is_adjusting else 0,
-            is_closing=1 if is_closing else 0,
-            is_reversing=1 if is_reversing else 0,
-            document_ref=document_ref,
-            external_ref=external_ref,
-            memo=memo,
-            source_type=source_type,
-            status=status,
-            created_by=created_username,
-            posted_by=posted_by,
-            period_id=period,
-            company_id=int(company["id"]) if company else None,
-            created_by_user_id=int(created_user["id"]) if created_user else None,
-            posted_by_user_id=None,
-            conn=self.conn,
-        )
-        if attachments:
-            for label, path in attachments:
-                if path:
-                    db.add_source_document(entry_id, path, label=label, conn=self.conn)
-        if schedule_reverse_on:
-            db.schedule_reversing_entry(entry_id, schedule_reverse_on, conn=self.conn)
-        self._update_cycle_status_after_entry(
-            is_adjusting=is_adjusting,
-            is_closing=is_closing,
-            status=status,
+    def record_entry(
+        self,
+        date: str,
+        description: str,
+        lines: Iterable[JournalLine],
+        *,
+        is_adjusting: bool = False,
+        is_closing: bool = False,
+        is_reversing: bool = False,
+        document_ref: Optional[str] = None,
+        external_ref: Optional[str] = None,
+        memo: Optional[str] = None,
+        source_type: Optional[str] = None,
+        status: str = "posted",
+        created_by: str = "system",
+        posted_by: Optional[str] = None,
+        period_id: Optional[int] = None,
+        attachments: Optional[Sequence[Tuple[str, str]]] = None,
+        schedule_reverse_on: Optional[str] = None,
+    ) -> int:
+        # Validate that entry has at least one line
+        line_list = list(lines)
+        if not line_list:
+            raise ValueError("Journal entry must have at least one line (debit or credit).")
+        
+        line_tuples = [ln.as_tuple() for ln in line_list]
+        # One unit of work: every read and write below commits (or rolls back) together.
+        with db.unit_of_work(self.conn):
+            period = self._check_posting_period(date, period_id)
+            # Resolve user / company context, but remain backward compatible
+            created_username = created_by or self.current_user_name or "system"
+            created_user = None
+            company = getattr(self, "current_company", None)
+            try:
+                created_user = db.get_user_by_username(created_username, conn=self.conn)
+            except Exception:
+                created_user = None
+
+            entry_id = db.insert_journal_entry(
+                date,
+                description,
+                line_tuples,
+                is_adjusting=1 if is_adjusting else 0,
+                is_closing=1 if is_closing else 0,
+                is_reversing=1 if is_reversing else 0,
+                document_ref=document_ref,
+                external_ref=external_ref,
+                memo=memo,
+                source_type=source_type,
+                status=status,
+                created_by=created_username,
+                posted_by=posted_by,
+                period_id=period,
+                company_id=int(company["id"]) if company else None,
+                created_by_user_id=int(created_user["id"]) if created_user else None,
+                posted_by_user_id=None,
+                conn=self.conn,
+            )
+            if attachments:
+                for label, path in attachments:
+                    if path:
+                        db.add_source_document(entry_id, path, label=label, conn=self.conn)
+            if schedule_reverse_on:
+                db.schedule_reversing_entry(entry_id, schedule_reverse_on, conn=self.conn)
+            self._update_cycle_status_after_entry(
+                is_adjusting=is_adjusting,
+                is_closing=is_closing,
+                status=status,
+            )
+        self._emit(
+            PostingEvent(
+                kind="posted",
+                entry_id=int(entry_id),
+                date=_iso_date(date),
+                period_id=period,
+                status=status,
+                lines=tuple(line_tuples),
+                description=description,
+                document_ref=document_ref,
+                external_ref=external_ref,
+                is_adjusting=bool(is_adjusting),
+                is_closing=bool(is_closing),
+                is_reversing=bool(is_reversing),
+                reverse_on=schedule_reverse_on,
+            )
         )
         return entry_id
 
+    def record_entries_bulk(
+        self,
+        entries: Iterable[Dict[str, object]],
+        *,
+        all_or_nothing: bool = True,
+    ) -> Tuple[List[Optional[int]], List[Tuple[int, str]]]:
+        """
+        Record many journal entries in one transaction.
+
+        Each entry is a dict of :meth:`record_entry` arguments (``date``,
+        ``description``, ``lines`` as JournalLine objects or tuples, and the
+        optional keywords). The batch is validated up front; with
+        ``all_or_nothing`` any invalid entry raises ValueError and nothing is
+        written, otherwise invalid entries are skipped and reported.
+
+        Returns ``(ids, errors)`` as :func:`db.insert_journal_entries_bulk`.
+        """
+        entries = list(entries)
+        company = getattr(self, "current_company", None)
+        company_id = int(company["id"]) if company else None
+        period_rows: Dict[int, Optional[sqlite3.Row]] = {}
+        user_ids: Dict[str, Optional[int]] = {}
+
+        errors: List[Tuple[int, str]] = []
+        batch: List[Dict[str, object]] = []
+        positions: List[int] = []
+        for index, entry in enumerate(entries):
+            try:
+                line_tuples = [
+                    ln.as_tuple() if isinstance(ln, JournalLine) else tuple(ln)
+                    for ln in entry.get("lines") or ()
+                ]
+                if not line_tuples:
+                    raise ValueError("Journal entry must have at least one line (debit or credit).")
+                period = self._check_posting_period(str(entry.get("date") or ""), entry.get("period_id"), period_rows)
+            except (RuntimeError, ValueError, TypeError) as exc:
+                errors.append((index, str(exc)))
+                continue
+            created_username = entry.get("created_by", "system") or self.current_user_name or "system"
+            if created_username not in user_ids:
+                try:
+                    user = db.get_user_by_username(created_username, conn=self.conn)
+                except Exception:
+                    user = None
+                user_ids[created_username] = int(user["id"]) if user else None
+            batch.append(
+                {
+                    **entry,
+                    "lines": line_tuples,
+                    "period_id": period,
+                    "created_by": created_username,
+                    "company_id": company_id,
+                    "created_by_user_id": user_ids[created_username],
+                    "posted_by_user_id": None,
+                }
+            )
+            positions.append(index)
+
+        if errors and all_or_nothing:
+            detail = "; ".join(f"#{i}: {msg}" for i, msg in errors[:5])
+            more = f" (+{len(errors) - 5} more)" if len(errors) > 5 else ""
+            raise ValueError(f"{len(errors)} of {len(entries)} entries rejected: {detail}{more}")
+
+        with db.unit_of_work(self.conn):
+            batch_ids, batch_errors = db.insert_journal_entries_bulk(
+                batch, all_or_nothing=all_or_nothing, conn=self.conn
+            )
+            ids: List[Optional[int]] = [None] * len(entries)
+            for pos, entry_id in zip(positions, batch_ids):
+                ids[pos] = entry_id
+            errors.extend((positions[i], msg) for i, msg in batch_errors)
+            errors.sort()
+
+            recorded = [(batch[i], entry_id) for i, entry_id in enumerate(batch_ids) if entry_id is not None]
+            posted = [e for e, _ in recorded if (e.get("status") or "posted") == "posted"]
+            if posted:
+                self._update_cycle_status_after_entry(
+                    is_adjusting=any(e.get("is_adjusting") for e in posted),
+                    is_closing=any(e.get("is_closing") for e in posted),
+                    status="posted",
+                )
+        for entry, entry_id in recorded:
+            self._emit(
+                PostingEvent(
+                    kind="posted",
+                    entry_id=int(entry_id),
+                    date=_iso_date(str(entry["date"])),
+                    period_id=entry["period_id"],
+                    status=str(entry.get("status") or "posted"),
+                    lines=tuple(entry["lines"]),
+                    description=str(entry.get("description") or ""),
+                    document_ref=entry.get("document_ref"),
+                    external_ref=entry.get("external_ref"),
+                    is_adjusting=bool(entry.get("is_adjusting")),
+                    is_closing=bool(entry.get("is_closing")),
+                    is_reversing=bool(entry.get("is_reversing")),
+                    reverse_on=entry.get("schedule_reverse_on"),
+                )
+            )
+        return ids, errors
+
     # --- High-level AR/AP helpers ---------------------------------------------------
 
     def create_customer(
@@ -374,24 +731,17 @@ class AccountingEngine:
         # Close Revenues (handle both normal and unexpected balances)
         # Exclude closing entries and reversing entries to prevent double-counting
         # Only include posted entries for accurate calculation
-        cur = self.conn.execute(
-            """
-            SELECT a.id, a.name, ROUND(COALESCE(SUM(jl.credit) - SUM(jl.debit),0),2) AS balance
-            FROM accounts a
-            LEFT JOIN journal_lines jl ON jl.account_id = a.id
-            LEFT JOIN journal_entries je ON je.id = jl.entry_id
-            WHERE a.type = 'Revenue' 
-              AND a.is_active=1 
-              AND je.period_id = ?
-              AND (je.status = 'posted' OR je.status IS NULL)
-              AND (je.is_closing = 0 OR je.is_closing IS NULL)
-              AND (je.is_reversing = 0 OR je.is_reversing IS NULL)
-            GROUP BY a.id, a.code, a.name
-            HAVING ABS(balance) > 0.005
-            """,
-            (self.current_period_id,),
-        )
-        revenue_balances = cur.fetchall()
+        revenue_balances = [
+            {"id": r["id"], "name": r["name"], "balance": round(float(r["credit_total"]) - float(r["debit_total"]), 2)}
+            for r in db.get_period_account_totals(
+                self.current_period_id,
+                account_types=("Revenue",),
+                exclude_closing=True,
+                exclude_reversing=True,
+                conn=self.conn,
+            )
+        ]
+        revenue_balances = [r for r in revenue_balances if abs(r["balance"]) > 0.005]
         for r in revenue_balances:
             balance = float(r["balance"])
             if balance >= 0:
@@ -427,24 +777,17 @@ class AccountingEngine:
         # Close Expenses (handle both debit and unexpected credit balances)
         # Exclude closing entries and reversing entries to prevent double-counting
         # Only include posted entries for accurate calculation
-        cur = self.conn.execute(
-            """
-            SELECT a.id, a.name, ROUND(COALESCE(SUM(jl.debit) - SUM(jl.credit),0),2) AS balance
-            FROM accounts a
-            LEFT JOIN journal_lines jl ON jl.account_id = a.id
-            LEFT JOIN journal_entries je ON je.id = jl.entry_id
-            WHERE a.type = 'Expense' 
-              AND a.is_active=1 
-              AND je.period_id = ?
-              AND (je.status = 'posted' OR je.status IS NULL)
-              AND (je.is_closing = 0 OR je.is_closing IS NULL)
-              AND (je.is_reversing = 0 OR je.is_reversing IS NULL)
-            GROUP BY a.id, a.code, a.name
-            HAVING ABS(balance) > 0.005
-            """,
-            (self.current_period_id,),
-        )
-        expense_balances = cur.fetchall()
+        expense_balances = [
+            {"id": r["id"], "name": r["name"], "balance": round(float(r["debit_total"]) - float(r["credit_total"]), 2)}
+            for r in db.get_period_account_totals(
+                self.current_period_id,
+                account_types=("Expense",),
+                exclude_closing=True,
+                exclude_reversing=True,
+                conn=self.conn,
+            )
+        ]
+        expense_balances = [e for e in expense_balances if abs(e["balance"]) > 0.005]
         for e in expense_balances:
             balance = float(e["balance"])
             if balance > 0:
@@ -482,19 +825,15 @@ class AccountingEngine:
         # Only include posted entries for accurate calculation
         drawings = db.get_account_by_name("Owner's Drawings", self.conn)
         if drawings:
-            cur = self.conn.execute(
-                """
-                SELECT ROUND(COALESCE(SUM(debit) - SUM(credit),0),2) AS balance
-                FROM journal_lines jl
-                JOIN journal_entries je ON je.id = jl.entry_id
-                WHERE jl.account_id = ? 
-                  AND je.period_id = ?
-                  AND (je.status = 'posted' OR je.status IS NULL)
-                  AND (je.is_closing = 0 OR je.is_closing IS NULL)
-                """,
-                (drawings["id"], self.current_period_id),
-            )
-            bal = float(cur.fetchone()["balance"])
+            totals = [
+                r for r in db.get_period_account_totals(
+                    self.current_period_id,
+                    exclude_closing=True,
+                    conn=self.conn,
+                )
+                if r["id"] == drawings["id"]
+            ]
+            bal = round(sum(float(r["debit_total"]) - float(r["credit_total"]) for r in totals), 2)
             if bal > 0.005:
                 entry_ids.append(
                     self.record_entry(
@@ -722,6 +1061,10 @@ class AccountingEngine:
 
     # --- Financial reporting helpers -------------------------------------------------
 
+    def _cached_report(self, kind: str, period_id: Optional[int], compute: Callable[[], Dict[str, object]], **params) -> Dict[str, object]:
+        """``compute()`` through the shared report cache, keyed by kind, period and ``params``."""
+        return report_cache.get_report_cache().get_or_compute(kind, params, compute, period_id=period_id, conn=self.conn)
+
     def generate_trial_balance_report(
         self,
         as_of: str,
@@ -731,7 +1074,17 @@ class AccountingEngine:
         """
         Build a structured trial balance report as of a date.
         Returns rows plus total debits / credits and the difference.
+        Cached until the current period's entries change.
         """
+        return self._cached_report(
+            "trial_balance_report",
+            self.current_period_id,
+            lambda: self._build_trial_balance_report(as_of, include_temporary),
+            as_of=as_of,
+            include_temporary=include_temporary,
+        )
+
+    def _build_trial_balance_report(self, as_of: str, include_temporary: bool) -> Dict[str, object]:
         rows = db.compute_trial_balance(
             up_to_date=as_of,
             include_temporary=include_temporary,
@@ -765,7 +1118,15 @@ class AccountingEngine:
         # If period_id is explicitly None, don't filter by period (allows cross-period reporting)
         # Otherwise, use current_period_id as default
         filter_period_id = period_id if period_id is not None else self.current_period_id
-        
+        return self._cached_report(
+            "income_statement",
+            filter_period_id,
+            lambda: self._build_income_statement(start_date, end_date, filter_period_id),
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    def _build_income_statement(self, start_date: str, end_date: str, filter_period_id: Optional[int]) -> Dict[str, object]:
         rows = db.compute_trial_balance(
             from_date=start_date,
             up_to_date=end_date,
@@ -834,7 +1195,13 @@ class AccountingEngine:
     def generate_balance_sheet(self, as_of: str) -> Dict[str, object]:
         """
         Simple balance sheet as of a date using permanent accounts only.
+        Cached until the current period's entries change.
         """
+        return self._cached_report(
+            "balance_sheet", self.current_period_id, lambda: self._build_balance_sheet(as_of), as_of=as_of
+        )
+
+    def _build_balance_sheet(self, as_of: str) -> Dict[str, object]:
         rows = db.compute_trial_balance(
             up_to_date=as_of,
             include_temporary=False,
@@ -981,81 +1348,28 @@ class AccountingEngine:
 
         Returns a dict containing items and totals per section.
         """
-        # Find cash account id
-        cash_acc = db.get_account_by_name("Cash", conn=self.conn)
-        if not cash_acc:
-            return {"error": "Cash account not found"}
-        cash_id = int(cash_acc["id"])
-
-        clause = " AND je.period_id = ?" if self.current_period_id else ""
-        params = [start_date, end_date] + ([int(self.current_period_id)] if self.current_period_id else [])
-        sql = (
-            """
-            SELECT je.id AS entry_id, je.date AS date
-            FROM journal_entries je
-            WHERE date(je.date) BETWEEN date(?) AND date(?)
-              AND (je.status = 'posted' OR je.status IS NULL)
-            """
-            + clause
-            + """
-            ORDER BY je.date, je.id
-            """
+        period_id = self.current_period_id
+        return self._cached_report(
+            "cash_flow",
+            period_id,
+            lambda: cashflow.direct_cash_flow(start_date, end_date, period_id=period_id, conn=self.conn),
+            start_date=start_date,
+            end_date=end_date,
         )
-        cur = self.conn.execute(sql, params)
-        entries = [r["entry_id"] for r in cur.fetchall()]
-
-        sections = {"Operating": [], "Investing": [], "Financing": []}
-        totals = {"Operating": 0.0, "Investing": 0.0, "Financing": 0.0}
-
-        for eid in entries:
-            lines = list(self.conn.execute(
-                "SELECT account_id, debit, credit FROM journal_lines WHERE entry_id=?",
-                (eid,)
-            ).fetchall())
-            cash_lines = [l for l in lines if int(l["account_id"]) == cash_id and (l["debit"] or l["credit"])]
-            if not cash_lines:
-                continue
-            non_cash_lines = [l for l in lines if int(l["account_id"]) != cash_id and (l["debit"] or l["credit"])]
-            for cl in cash_lines:
-                amt = float(cl["debit"] or 0) - float(cl["credit"] or 0)
-                klass = "Operating"  # Default classification
-                
-                if non_cash_lines:
-                    # Analyze all non-cash accounts to determine classification
-                    # Use weighted classification based on transaction amounts
-                    account_type_amounts = {}
-                    for line in non_cash_lines:
-                        other_id = int(line["account_id"])
-                        acct = self.conn.execute("SELECT type FROM accounts WHERE id=?", (other_id,)).fetchone()
-                        if acct:
-                            acct_type = acct["type"]
-                            line_amt = abs(float(line["debit"] or 0) - float(line["credit"] or 0))
-                            if acct_type not in account_type_amounts:
-                                account_type_amounts[acct_type] = 0.0
-                            account_type_amounts[acct_type] += line_amt
-                    
-                    # Classify based on dominant account type by amount
-                    if account_type_amounts:
-                        # Priority: Investing > Financing > Operating
-                        investing_total = account_type_amounts.get("Asset", 0) + account_type_amounts.get("Contra Asset", 0)
-                        financing_total = account_type_amounts.get("Liability", 0) + account_type_amounts.get("Equity", 0)
-                        operating_total = account_type_amounts.get("Revenue", 0) + account_type_amounts.get("Expense", 0)
-                        
-                        if investing_total > financing_total and investing_total > operating_total:
-                            klass = "Investing"
-                        elif financing_total > operating_total:
-                            klass = "Financing"
-                        # else: Operating (default)
-                
-                sections[klass].append({
-                    "entry_id": eid,
-                    "date": self.conn.execute("SELECT date FROM journal_entries WHERE id=?", (eid,)).fetchone()["date"],
-                    "amount": round(amt, 2),
-                })
-                totals[klass] = round(totals[klass] + amt, 2)
 
-        net = round(sum(totals.values()), 2)
-        return {"sections": sections, "totals": totals, "net_change_in_cash": net, "start": start_date, "end": end_date}
+    def generate_cash_flow_indirect(self, start_date: str, end_date: str) -> Dict[str, object]:
+        """
+        Indirect-method cash flow between start_date and end_date (inclusive):
+        net income adjusted by the change in each non-cash balance.
+        """
+        period_id = self.current_period_id
+        return self._cached_report(
+            "cash_flow_indirect",
+            period_id,
+            lambda: cashflow.indirect_cash_flow(start_date, end_date, period_id=period_id, conn=self.conn),
+            start_date=start_date,
+            end_date=end_date,
+        )
 
     def list_adjustment_requests(self) -> List[sqlite3.Row]:
         if not self.current_period_id:
@@ -1350,26 +1664,24 @@ class AccountingEngine:
                 # In dry run, just track that we would fix it
                 fixed_entries[entry_id] = None
             else:
-                # Delete old entry (this will cascade delete journal_lines due to foreign key)
+                # Replace the entry in one unit of work; its deleted and posted
+                # events reach subscribers only once the replacement commits.
                 try:
-                    self.conn.execute("DELETE FROM journal_entries WHERE id = ?", (entry_id,))
-                    
-                    # Recreate entry with corrected lines
-                    new_entry_id = self.record_entry(
-                        date=entry_meta['date'],
-                        description=entry_meta['description'],
-                        lines=new_lines,
-                        is_adjusting=bool(entry_meta['is_adjusting']),
-                        is_closing=bool(entry_meta['is_closing']),
-                        is_reversing=bool(entry_meta['is_reversing']),
-                        document_ref=entry_meta['document_ref'],
-                        external_ref=entry_meta['external_ref'],
-                        memo=entry_meta['memo'],
-                        source_type=entry_meta['source_type'],
-                        status=entry_meta['status'] or 'posted',
-                    )
-                    
-                    self.conn.commit()
+                    with self._holding_events(), db.unit_of_work(self.conn):
+                        self.delete_entry(entry_id)
+                        new_entry_id = self.record_entry(
+                            date=entry_meta['date'],
+                            description=entry_meta['description'],
+                            lines=new_lines,
+                            is_adjusting=bool(entry_meta['is_adjusting']),
+                            is_closing=bool(entry_meta['is_closing']),
+                            is_reversing=bool(entry_meta['is_reversing']),
+                            document_ref=entry_meta['document_ref'],
+                            external_ref=entry_meta['external_ref'],
+                            memo=entry_meta['memo'],
+                            source_type=entry_meta['source_type'],
+                            status=entry_meta['status'] or 'posted',
+                        )
                     fixed_entries[entry_id] = new_entry_id
                     fixed_count += 1
                 except Exception as e:
@@ -1377,7 +1689,6 @@ class AccountingEngine:
                         "entry_id": entry_id,
                         "error": str(e)
                     })
-                    self.conn.rollback()
         
         return {
             "fixed_count": fixed_count,
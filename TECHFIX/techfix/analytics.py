@@ -5,8 +5,12 @@ Provides data analytics, metrics, and dashboard functionality.
 from __future__ import annotations
 
 import sqlite3
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from typing import Optional, List, Dict, Any, Sequence
 import logging
 
 from . import db
@@ -14,215 +18,345 @@ from . import db
 logger = logging.getLogger(__name__)
 
 
+# Dashboard metrics, keyed by (database, period, ledger token, ledger version).
+# Entries are never invalidated explicitly: any ledger write bumps the version,
+# so a stale entry simply stops matching and ages out.
+_METRICS_CACHE: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_METRICS_CACHE_SIZE = 16
+_METRICS_CACHE_LOCK = threading.Lock()
+
+_METRIC_DEFAULTS: Dict[str, Any] = {
+    'total_revenue': 0.0,
+    'total_expenses': 0.0,
+    'net_income': 0.0,
+    'total_assets': 0.0,
+    'total_liabilities': 0.0,
+    'total_equity': 0.0,
+    'transaction_count': 0,
+}
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000.0, 3)
+
+
+def clear_metrics_cache() -> None:
+    """Drop every cached dashboard snapshot."""
+    with _METRICS_CACHE_LOCK:
+        _METRICS_CACHE.clear()
+
+
 def get_financial_metrics(
     period_id: Optional[int] = None,
     *,
+    use_cache: bool = True,
     conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, Any]:
-    """Get key financial metrics."""
+    """
+    Get key financial metrics.
+
+    All balance metrics come from one grouped read of account_period_balances
+    and the transaction count from one indexed count. Results are cached per
+    period and ledger version, so repeat calls only cost the version lookup
+    until the ledger changes. ``metrics['timings']`` holds the milliseconds
+    spent on each step (``balances``, ``transaction_count``, ``total``) and
+    whether the snapshot came from the cache. A connection with uncommitted
+    writes bypasses the cache.
+    """
     owned = conn is not None
     if not conn:
         conn = db.get_connection()
     
-    metrics = {}
+    started = time.perf_counter()
+    metrics: Dict[str, Any] = {}
+    timings: Dict[str, Any] = {'cached': False}
+    key = None
     
     try:
+        if use_cache and not conn.in_transaction:
+            try:
+                token, version = db.get_ledger_version(conn)
+                key = (str(db.DB_PATH), period_id or None, token, version)
+            except sqlite3.OperationalError:
+                key = None  # database predates the ledger version table
+            if key is not None:
+                with _METRICS_CACHE_LOCK:
+                    hit = _METRICS_CACHE.get(key)
+                    if hit is not None:
+                        _METRICS_CACHE.move_to_end(key)
+                if hit is not None:
+                    metrics = dict(hit)
+                    metrics['timings'] = {'cached': True, 'total': _elapsed_ms(started)}
+                    return metrics
+        
         if period_id:
-            # Include transactions in the specified period OR transactions with no period assigned (NULL)
-            period_filter = "AND (je.period_id = ? OR je.period_id IS NULL)"
+            # Include transactions in the specified period OR transactions with no period assigned (0 in the rollup)
+            period_filter = "AND b.period_id IN (?, 0)"
+            # Two index ranges added up: an OR here would collect every
+            # matching rowid into a temporary set first.
+            count_sql = """
+                SELECT (SELECT COUNT(*) FROM journal_entries WHERE period_id = ? AND status IN ('posted', 'draft'))
+                     + (SELECT COUNT(*) FROM journal_entries WHERE period_id IS NULL AND status IN ('posted', 'draft'))
+                     AS count
+            """
             params = [period_id]
         else:
             period_filter = ""
+            count_sql = "SELECT COUNT(*) AS count FROM journal_entries WHERE status IN ('posted', 'draft')"
             params = []
         
-        # Total revenue (handles both Revenue and Contra Revenue accounts)
-        # Revenue accounts: credit increases revenue, so use (credit - debit)
-        # Contra Revenue accounts: debit reduces revenue, so subtract (debit - credit)
-        # This matches the logic in accounting.py generate_income_statement()
-        # Include both 'posted' and 'draft' status transactions
+        # Revenue and expenses include 'posted' and 'draft' entries; the balance
+        # sheet totals only 'posted' ones. Contra revenue reduces revenue (this
+        # matches generate_income_statement()).
+        step = time.perf_counter()
         cur = conn.execute(
             f"""
-            SELECT 
-                COALESCE(SUM(CASE WHEN a.type = 'Revenue' THEN jl.credit - jl.debit ELSE 0 END), 0) -
-                COALESCE(SUM(CASE WHEN a.type = 'Contra Revenue' THEN jl.debit - jl.credit ELSE 0 END), 0) as total
-            FROM journal_lines jl
-            JOIN journal_entries je ON jl.entry_id = je.id
-            JOIN accounts a ON jl.account_id = a.id
-            WHERE a.type IN ('Revenue', 'Contra Revenue')
-              AND je.status IN ('posted', 'draft')
+            SELECT
+                TOTAL(CASE WHEN b.status IN ('posted', 'draft') THEN
+                    CASE a.type
+                        WHEN 'Revenue' THEN b.credit_total - b.debit_total
+                        WHEN 'Contra Revenue' THEN b.credit_total - b.debit_total
+                    END
+                END) AS total_revenue,
+                TOTAL(CASE WHEN b.status IN ('posted', 'draft') AND a.type = 'Expense'
+                    THEN b.debit_total - b.credit_total END) AS total_expenses,
+                TOTAL(CASE WHEN b.status = 'posted' THEN
+                    CASE a.type
+                        WHEN 'Asset' THEN b.debit_total - b.credit_total
+                        WHEN 'Contra Asset' THEN b.credit_total - b.debit_total
+                    END
+                END) AS total_assets,
+                TOTAL(CASE WHEN b.status = 'posted' AND a.type = 'Liability'
+                    THEN b.credit_total - b.debit_total END) AS total_liabilities,
+                TOTAL(CASE WHEN b.status = 'posted' AND a.type = 'Equity'
+                    THEN b.credit_total - b.debit_total END) AS total_equity
+            FROM account_period_balances b
+            JOIN accounts a ON a.id = b.account_id
+            WHERE a.type IN ('Revenue', 'Contra Revenue', 'Expense', 'Asset', 'Contra Asset', 'Liability', 'Equity')
               {period_filter}
             """,
             params
         )
         row = cur.fetchone()
-        metrics['total_revenue'] = float(row['total']) if row else 0.0
-        
-        # Total expenses
-        # Include both 'posted' and 'draft' status transactions
-        cur = conn.execute(
-            f"""
-            SELECT COALESCE(SUM(jl.debit - jl.credit), 0) as total
-            FROM journal_lines jl
-            JOIN journal_entries je ON jl.entry_id = je.id
-            JOIN accounts a ON jl.account_id = a.id
-            WHERE a.type = 'Expense'
-              AND je.status IN ('posted', 'draft')
-              {period_filter}
-            """,
-            params
-        )
-        row = cur.fetchone()
-        metrics['total_expenses'] = float(row['total']) if row else 0.0
-        
-        # Net income
+        for name in ('total_revenue', 'total_expenses', 'total_assets', 'total_liabilities', 'total_equity'):
+            metrics[name] = float(row[name]) if row else 0.0
         metrics['net_income'] = metrics['total_revenue'] - metrics['total_expenses']
+        timings['balances'] = _elapsed_ms(step)
         
-        # Total assets
-        cur = conn.execute(
-            f"""
-            SELECT COALESCE(SUM(
-                CASE 
-                    WHEN a.type = 'Asset' THEN jl.debit - jl.credit
-                    WHEN a.type = 'Contra Asset' THEN jl.credit - jl.debit
-                    ELSE 0
-                END
-            ), 0) as total
-            FROM journal_lines jl
-            JOIN journal_entries je ON jl.entry_id = je.id
-            JOIN accounts a ON jl.account_id = a.id
-            WHERE a.type IN ('Asset', 'Contra Asset')
-              AND je.status = 'posted'
-              {period_filter}
-            """,
-            params
-        )
-        row = cur.fetchone()
-        metrics['total_assets'] = float(row['total']) if row else 0.0
-        
-        # Total liabilities
-        cur = conn.execute(
-            f"""
-            SELECT COALESCE(SUM(jl.credit - jl.debit), 0) as total
-            FROM journal_lines jl
-            JOIN journal_entries je ON jl.entry_id = je.id
-            JOIN accounts a ON jl.account_id = a.id
-            WHERE a.type = 'Liability'
-              AND je.status = 'posted'
-              {period_filter}
-            """,
-            params
-        )
-        row = cur.fetchone()
-        metrics['total_liabilities'] = float(row['total']) if row else 0.0
-        
-        # Total equity
-        cur = conn.execute(
-            f"""
-            SELECT COALESCE(SUM(jl.credit - jl.debit), 0) as total
-            FROM journal_lines jl
-            JOIN journal_entries je ON jl.entry_id = je.id
-            JOIN accounts a ON jl.account_id = a.id
-            WHERE a.type = 'Equity'
-              AND je.status = 'posted'
-              {period_filter}
-            """,
-            params
-        )
-        row = cur.fetchone()
-        metrics['total_equity'] = float(row['total']) if row else 0.0
-        
-        # Transaction count
-        if period_id:
-            # Include transactions in the specified period OR transactions with no period assigned (NULL)
-            count_filter = "AND (period_id = ? OR period_id IS NULL)"
-            count_params = [period_id]
-        else:
-            count_filter = ""
-            count_params = []
-        
-        cur = conn.execute(
-            f"""
-            SELECT COUNT(*) as count
-            FROM journal_entries
-            WHERE status IN ('posted', 'draft')
-              {count_filter}
-            """,
-            count_params
-        )
-        row = cur.fetchone()
+        step = time.perf_counter()
+        row = conn.execute(count_sql, params).fetchone()
         metrics['transaction_count'] = int(row['count']) if row else 0
+        timings['transaction_count'] = _elapsed_ms(step)
+        
+        if key is not None:
+            with _METRICS_CACHE_LOCK:
+                _METRICS_CACHE[key] = dict(metrics)
+                _METRICS_CACHE.move_to_end(key)
+                while len(_METRICS_CACHE) > _METRICS_CACHE_SIZE:
+                    _METRICS_CACHE.popitem(last=False)
         
     except Exception as e:
         logger.error(f"Error calculating metrics: {e}", exc_info=True)
-        # Return default values on error
-        if not metrics:
-            metrics = {
-                'total_revenue': 0.0,
-                'total_expenses': 0.0,
-                'net_income': 0.0,
-                'total_assets': 0.0,
-                'total_liabilities': 0.0,
-                'total_equity': 0.0,
-                'transaction_count': 0
-            }
     finally:
         if not owned:
             conn.close()
     
-    # Ensure all metrics are present
-    if 'transaction_count' not in metrics:
-        metrics['transaction_count'] = 0
-    if 'net_income' not in metrics:
-        metrics['net_income'] = metrics.get('total_revenue', 0.0) - metrics.get('total_expenses', 0.0)
+    # Ensure all metrics are present (defaults on error)
+    for name, default in _METRIC_DEFAULTS.items():
+        metrics.setdefault(name, default)
     
+    timings['total'] = _elapsed_ms(started)
+    metrics['timings'] = timings
+    logger.debug("Financial metrics for period %s computed in %s", period_id, timings)
     return metrics
 
 
-def get_revenue_trend(
-    days: int = 30,
+# --- Time series -------------------------------------------------------------
+
+GRANULARITIES = ("day", "week", "month", "quarter")
+SERIES = ("revenue", "expense", "net_income", "cash")
+
+# First day of the bucket a rollup day falls in (weeks start on Monday).
+_BUCKET_SQL = {
+    "day": "d.day",
+    "week": "date(d.day, '-' || ((CAST(strftime('%w', d.day) AS INTEGER) + 6) % 7) || ' days')",
+    "month": "strftime('%Y-%m-01', d.day)",
+    "quarter": "printf('%s-%02d-01', strftime('%Y', d.day), (CAST(strftime('%m', d.day) AS INTEGER) - 1) / 3 * 3 + 1)",
+}
+
+
+def _as_date(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _bucket_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "quarter":
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day
+
+
+def _next_bucket(start: date, granularity: str) -> date:
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity in ("month", "quarter"):
+        month = start.month - 1 + (3 if granularity == "quarter" else 1)
+        return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+    return start + timedelta(days=1)
+
+
+def bucket_starts(start_date: Any, end_date: Any, granularity: str = "day") -> List[str]:
+    """First day (ISO) of every bucket overlapping start_date..end_date."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    current, end = _bucket_start(_as_date(start_date), granularity), _as_date(end_date)
+    starts = []
+    while current <= end:
+        starts.append(current.isoformat())
+        current = _next_bucket(current, granularity)
+    return starts
+
+
+def pick_granularity(start_date: Any, end_date: Any, max_points: int = 60) -> str:
+    """Finest granularity that keeps the range within ``max_points`` buckets."""
+    days = (_as_date(end_date) - _as_date(start_date)).days + 1
+    for granularity, span in (("day", 1), ("week", 7), ("month", 30.4), ("quarter", 91.3)):
+        if days / span <= max_points:
+            return granularity
+    return "quarter"
+
+
+def cumulative(values: Sequence[float], start: float = 0.0) -> List[float]:
+    """Running total of ``values`` on top of ``start``."""
+    return [round(v, 2) for v in accumulate(values, initial=start)][1:]
+
+
+def rolling_sum(values: Sequence[float], window: int) -> List[float]:
+    """Trailing ``window``-bucket sums, from one prefix-sum pass."""
+    window = max(1, int(window))
+    prefix = list(accumulate(values, initial=0.0))
+    return [round(prefix[i] - prefix[max(0, i - window)], 2) for i in range(1, len(prefix))]
+
+
+def rolling_mean(values: Sequence[float], window: int) -> List[float]:
+    """Trailing ``window``-bucket means; the first buckets average what they have."""
+    window = max(1, int(window))
+    sums = rolling_sum(values, window)
+    return [round(s / min(i + 1, window), 2) for i, s in enumerate(sums)]
+
+
+def get_time_series(
+    start_date: Optional[Any] = None,
+    end_date: Optional[Any] = None,
     *,
+    granularity: str = "day",
+    period_id: Optional[int] = None,
+    statuses: Sequence[str] = ("posted", "draft"),
+    exclude_closing: bool = True,
+    cash_account_id: Optional[int] = None,
     conn: Optional[sqlite3.Connection] = None
-) -> List[Dict[str, Any]]:
-    """Get revenue trend over time."""
+) -> Dict[str, Any]:
+    """
+    Revenue, expense, net income and cash series between start_date and
+    end_date (default: the last 30 days), one value per day, week, month or
+    quarter.
+
+    Served from the daily balance rollups in one grouped query, so the cost
+    follows the number of active account-days rather than the number of
+    entries. Buckets without activity are filled with zeros. The result is
+    columnar: ``buckets`` holds each bucket's first day and every series a
+    list aligned with it. ``cash`` is the net change per bucket and
+    ``cash_balance`` the running balance including everything before
+    start_date. Closing entries are left out by default so period-end closes
+    do not show up as revenue or expense swings.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    end = _as_date(end_date) if end_date else datetime.now().date()
+    start = _as_date(start_date) if start_date else end - timedelta(days=29)
+    buckets = bucket_starts(start, end, granularity) if start <= end else []
+    result: Dict[str, Any] = {"granularity": granularity, "start": start.isoformat(), "end": end.isoformat(), "buckets": buckets}
+    for name in SERIES + ("cash_balance",):
+        result[name] = [0.0] * len(buckets)
+    result["opening_cash"] = 0.0
+    if not buckets:
+        return result
+
     owned = conn is not None
     if not conn:
         conn = db.get_connection()
-    
-    trend = []
-    
     try:
-        start_date = (datetime.now() - timedelta(days=days)).date().isoformat()
-        
+        if cash_account_id is None:
+            cash = db.get_account_by_name("Cash", conn=conn)
+            cash_account_id = int(cash["id"]) if cash else None
+        filters = f"d.status IN ({', '.join('?' * len(statuses))})"
+        params: List[Any] = list(statuses)
+        if exclude_closing:
+            filters += " AND d.is_closing = 0"
+        if period_id:
+            filters += " AND d.period_id IN (?, 0)"
+            params.append(period_id)
+
         cur = conn.execute(
-            """
-            SELECT 
-                date(je.date) as day,
-                COALESCE(SUM(CASE WHEN a.type = 'Revenue' THEN jl.credit - jl.debit ELSE 0 END), 0) -
-                COALESCE(SUM(CASE WHEN a.type = 'Contra Revenue' THEN jl.debit - jl.credit ELSE 0 END), 0) as revenue
-            FROM journal_lines jl
-            JOIN journal_entries je ON jl.entry_id = je.id
-            JOIN accounts a ON jl.account_id = a.id
-            WHERE a.type IN ('Revenue', 'Contra Revenue')
-              AND je.status IN ('posted', 'draft')
-              AND date(je.date) >= date(?)
-            GROUP BY date(je.date)
-            ORDER BY date(je.date)
+            f"""
+            SELECT
+                {_BUCKET_SQL[granularity]} AS bucket,
+                TOTAL(CASE WHEN a.type IN ('Revenue', 'Contra Revenue') THEN d.credit_total - d.debit_total END) AS revenue,
+                TOTAL(CASE WHEN a.type = 'Expense' THEN d.debit_total - d.credit_total END) AS expense,
+                TOTAL(CASE WHEN d.account_id = ? THEN d.debit_total - d.credit_total END) AS cash
+            FROM account_daily_balances d
+            JOIN accounts a ON a.id = d.account_id
+            WHERE d.day BETWEEN ? AND ? AND {filters}
+            GROUP BY bucket
             """,
-            (start_date,)
+            [cash_account_id, start.isoformat(), end.isoformat()] + params
         )
-        
-        for row in cur.fetchall():
-            trend.append({
-                'date': row['day'],
-                'revenue': float(row['revenue'])
-            })
+        index = {b: i for i, b in enumerate(buckets)}
+        for row in cur:
+            i = index.get(row["bucket"])
+            if i is None:
+                continue
+            result["revenue"][i] = round(float(row["revenue"]), 2)
+            result["expense"][i] = round(float(row["expense"]), 2)
+            result["cash"][i] = round(float(row["cash"]), 2)
+
+        if cash_account_id is not None:
+            # Latest running totals of each cash bucket before the range.
+            row = conn.execute(
+                f"""
+                SELECT TOTAL(net) AS opening FROM (
+                    SELECT d.cum_debit - d.cum_credit AS net, MAX(d.day)
+                    FROM account_daily_balances d
+                    WHERE d.account_id = ? AND d.day < ? AND {filters}
+                    GROUP BY d.period_id, d.status, d.is_adjusting, d.is_closing, d.is_reversing
+                )
+                """,
+                [cash_account_id, start.isoformat()] + params
+            ).fetchone()
+            result["opening_cash"] = round(float(row["opening"]), 2)
     except Exception as e:
-        logger.error(f"Error getting revenue trend: {e}", exc_info=True)
+        logger.error(f"Error building time series: {e}", exc_info=True)
     finally:
         if not owned:
             conn.close()
-    
-    return trend
+
+    result["net_income"] = [round(r - x, 2) for r, x in zip(result["revenue"], result["expense"])]
+    result["cash_balance"] = cumulative(result["cash"], result["opening_cash"])
+    return result
+
+
+def get_revenue_trend(
+    days: int = 30,
+    *,
+    conn: Optional[sqlite3.Connection] = None
+) -> List[Dict[str, Any]]:
+    """Get daily revenue for the last ``days`` days, days with revenue only (see get_time_series)."""
+    today = datetime.now().date()
+    series = get_time_series(today - timedelta(days=days), today, conn=conn)
+    return [{'date': d, 'revenue': r} for d, r in zip(series['buckets'], series['revenue']) if r]
 
 
 def get_expense_breakdown(
@@ -4,25 +4,159 @@ Handles database backup, restore, and data export/import.
 """
 from __future__ import annotations
 
+import base64
+import gzip
 import sqlite3
 import shutil
 import json
+import time
 import zipfile
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any, Tuple
 import logging
 
 from . import db
+from .tasks import TaskCancelled
 
 logger = logging.getLogger(__name__)
 
 BACKUP_DIR = db.DB_DIR / "backups"
 BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 
+#: Pages copied per backup step, and the pause after each step that lets writers in.
+BACKUP_STEP_PAGES = 1024
+BACKUP_STEP_SLEEP = 0.005
+#: Restarts (the source changed under the copy) before copying in one step instead.
+BACKUP_MAX_RESTARTS = 3
 
-def create_backup(description: Optional[str] = None) -> Optional[Path]:
-    """Create a backup of the database."""
+#: ``progress(pages_done, pages_total)`` after every backup step.
+BackupProgress = Callable[[int, int], None]
+
+
+class BackupError(Exception):
+    """A backup copy failed verification."""
+
+
+class _SourceBusy(Exception):
+    pass
+
+
+def _copy_pages(
+    src: sqlite3.Connection,
+    dst: sqlite3.Connection,
+    pages: int,
+    step_sleep: float,
+    progress: Optional[BackupProgress],
+    check: Optional[Callable[[], None]],
+) -> None:
+    last_remaining: List[int] = []
+    restarts = 0
+
+    def on_step(status: int, remaining: int, total: int) -> None:
+        nonlocal restarts
+        if check is not None:
+            check()  # raising here aborts the copy
+        if progress is not None:
+            progress(total - remaining, total)
+        if last_remaining and remaining > last_remaining[0]:
+            restarts += 1
+            if pages > 0 and restarts > BACKUP_MAX_RESTARTS:
+                raise _SourceBusy()
+        last_remaining[:] = [remaining]
+        if remaining and step_sleep:
+            time.sleep(step_sleep)
+
+    src.backup(dst, pages=pages, progress=on_step)
+
+
+def verify_database_file(path: Path) -> None:
+    """Raise ``BackupError`` unless ``PRAGMA quick_check`` passes on ``path``."""
+    conn = sqlite3.connect(str(path))
+    try:
+        result = [row[0] for row in conn.execute("PRAGMA quick_check").fetchall()]
+    except sqlite3.DatabaseError as e:
+        raise BackupError(f"{path.name} is not a readable database: {e}") from e
+    finally:
+        conn.close()
+    if result != ["ok"]:
+        raise BackupError(f"{path.name} failed quick_check: {'; '.join(result[:5])}")
+
+
+def online_backup(
+    dest_path: Path,
+    *,
+    step_pages: int = BACKUP_STEP_PAGES,
+    step_sleep: float = BACKUP_STEP_SLEEP,
+    progress: Optional[BackupProgress] = None,
+    check: Optional[Callable[[], None]] = None,
+) -> Path:
+    """
+    Copy the live database to ``dest_path`` while the app keeps writing.
+
+    Pages are copied ``step_pages`` at a time through SQLite's backup API,
+    pausing ``step_sleep`` seconds between steps; each step only holds a
+    read lock, so writers carry on. A write from another connection makes
+    SQLite restart the copy; after ``BACKUP_MAX_RESTARTS`` of those the rest
+    is taken in one step, a single consistent read that WAL writers do not
+    wait for. The copy is written beside ``dest_path``, switched to a
+    self-contained rollback journal, checked with ``PRAGMA quick_check`` and
+    only then renamed into place. ``check`` runs after every step and may
+    raise to cancel; nothing is left behind then.
+    """
+    dest_path = Path(dest_path)
+    part = dest_path.with_name(dest_path.name + ".part")
+    src = db.get_connection()
+    try:
+        dst = sqlite3.connect(str(part))
+        try:
+            try:
+                _copy_pages(src, dst, step_pages, step_sleep, progress, check)
+            except _SourceBusy:
+                logger.info("Backup source kept changing; copying the rest in one step")
+                _copy_pages(src, dst, -1, 0, progress, check)
+            dst.execute("PRAGMA journal_mode=DELETE").fetchall()
+        finally:
+            dst.close()
+        verify_database_file(part)
+        part.replace(dest_path)
+    except BaseException:
+        for leftover in (part, part.with_name(part.name + "-journal"), part.with_name(part.name + "-wal")):
+            try:
+                leftover.unlink()
+            except OSError:
+                pass
+        raise
+    finally:
+        src.close()
+    return dest_path
+
+
+def _restore_database_file(source: Path) -> None:
+    """
+    Copy ``source`` over the live database through SQLite's backup API.
+
+    Copying the file directly would race the write-ahead log and any
+    pooled connections still holding the old pages.
+    """
+    src = sqlite3.connect(str(source))
+    try:
+        conn = db.get_connection()
+        try:
+            src.backup(conn)
+        finally:
+            conn.close()
+    finally:
+        src.close()
+
+
+def create_backup(
+    description: Optional[str] = None,
+    *,
+    progress: Optional[BackupProgress] = None,
+    check: Optional[Callable[[], None]] = None,
+) -> Optional[Path]:
+    """Create a backup of the database (an online copy; see ``online_backup``)."""
     try:
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         backup_name = f"techfix_backup_{timestamp}"
@@ -32,21 +166,34 @@ def create_backup(description: Optional[str] = None) -> Optional[Path]:
         
         backup_path = BACKUP_DIR / f"{backup_name}.db"
         
-        # Copy database file
         if db.DB_PATH.exists():
-            shutil.copy2(db.DB_PATH, backup_path)
+            online_backup(backup_path, progress=progress, check=check)
             logger.info(f"Backup created: {backup_path}")
             return backup_path
         else:
             logger.error("Database file not found")
             return None
+    except TaskCancelled:
+        raise
     except Exception as e:
         logger.error(f"Backup creation failed: {e}", exc_info=True)
         return None
 
 
-def create_full_backup(description: Optional[str] = None) -> Optional[Path]:
-    """Create a full backup including database and settings."""
+def create_full_backup(
+    description: Optional[str] = None,
+    *,
+    progress: Optional[BackupProgress] = None,
+    check: Optional[Callable[[], None]] = None,
+) -> Optional[Path]:
+    """Create a full backup including database and settings.
+
+    The database goes in as a verified online copy, deflated at the fastest
+    level: most of the size saving at a fraction of the default level's cost.
+    The zip is built under a ``.part`` name and renamed once complete, so a
+    failed or cancelled backup leaves nothing in ``BACKUP_DIR``; a
+    ``TaskCancelled`` raised by ``check`` propagates.
+    """
     try:
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         backup_name = f"techfix_full_backup_{timestamp}"
@@ -55,35 +202,55 @@ def create_full_backup(description: Optional[str] = None) -> Optional[Path]:
             backup_name = f"{backup_name}_{safe_desc}"
         
         backup_zip = BACKUP_DIR / f"{backup_name}.zip"
+        snapshot = BACKUP_DIR / f"{backup_name}.db"
+        part = backup_zip.with_name(backup_zip.name + ".part")
         
-        with zipfile.ZipFile(backup_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Add database
+        try:
+            # Take the database first, so a cancelled or failed copy never leaves a zip
             if db.DB_PATH.exists():
-                zipf.write(db.DB_PATH, db.DB_PATH.name)
-            
-            # Add settings
-            settings_path = db.DB_DIR / "settings.json"
-            if settings_path.exists():
-                zipf.write(settings_path, "settings.json")
+                online_backup(snapshot, progress=progress, check=check)
             
-            # Add metadata
-            metadata = {
-                'timestamp': timestamp,
-                'description': description,
-                'version': db.SCHEMA_VERSION,
-            }
-            zipf.writestr('metadata.json', json.dumps(metadata, indent=2))
+            with zipfile.ZipFile(part, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+                # Add database
+                if snapshot.exists():
+                    zipf.write(snapshot, db.DB_PATH.name)
+                
+                # Add settings
+                settings_path = db.DB_DIR / "settings.json"
+                if settings_path.exists():
+                    zipf.write(settings_path, "settings.json")
+                
+                # Add metadata
+                metadata = {
+                    'timestamp': timestamp,
+                    'description': description,
+                    'version': db.SCHEMA_VERSION,
+                }
+                zipf.writestr('metadata.json', json.dumps(metadata, indent=2))
+            part.replace(backup_zip)
+        except BaseException:
+            part.unlink(missing_ok=True)
+            raise
+        finally:
+            snapshot.unlink(missing_ok=True)
         
         logger.info(f"Full backup created: {backup_zip}")
         return backup_zip
+    except TaskCancelled:
+        raise
     except Exception as e:
         logger.error(f"Full backup creation failed: {e}", exc_info=True)
         return None
 
 
 def restore_backup(backup_path: Path, verify: bool = True) -> bool:
-    """Restore database from backup."""
+    """Restore database from backup (a ``.db`` copy or a backup-store snapshot)."""
+    from . import backup_store
+    
     try:
+        if backup_store.is_snapshot(backup_path):
+            return backup_store.restore_snapshot(backup_path, verify=verify)
+        
         if not backup_path.exists():
             logger.error(f"Backup file not found: {backup_path}")
             return False
@@ -91,10 +258,8 @@ def restore_backup(backup_path: Path, verify: bool = True) -> bool:
         # Verify backup
         if verify:
             try:
-                test_conn = sqlite3.connect(str(backup_path))
-                test_conn.execute("SELECT 1")
-                test_conn.close()
-            except Exception as e:
+                verify_database_file(backup_path)
+            except BackupError as e:
                 logger.error(f"Backup verification failed: {e}")
                 return False
         
@@ -103,11 +268,8 @@ def restore_backup(backup_path: Path, verify: bool = True) -> bool:
         if not current_backup:
             logger.warning("Could not create pre-restore backup")
         
-        # Close any open connections
-        # Note: In production, you'd want to ensure all connections are closed
-        
         # Restore database
-        shutil.copy2(backup_path, db.DB_PATH)
+        _restore_database_file(backup_path)
         
         logger.info(f"Database restored from: {backup_path}")
         return True
@@ -139,7 +301,7 @@ def restore_full_backup(backup_zip: Path) -> bool:
             # Restore database
             db_file = extract_dir / db.DB_PATH.name
             if db_file.exists():
-                shutil.copy2(db_file, db.DB_PATH)
+                _restore_database_file(db_file)
             
             # Restore settings
             settings_file = extract_dir / "settings.json"
@@ -159,6 +321,8 @@ def restore_full_backup(backup_zip: Path) -> bool:
 
 def list_backups() -> List[Dict[str, Any]]:
     """List all available backups."""
+    from . import backup_store
+    
     backups = []
     
     try:
@@ -190,6 +354,9 @@ def list_backups() -> List[Dict[str, Any]]:
             except Exception:
                 pass
         
+        # Snapshots in the deduplicating store
+        backups.extend(backup_store.list_snapshots())
+        
         # Sort by creation time (newest first)
         backups.sort(key=lambda x: x['created'], reverse=True)
     except Exception as e:
@@ -199,8 +366,12 @@ def list_backups() -> List[Dict[str, Any]]:
 
 
 def delete_backup(backup_path: Path) -> bool:
-    """Delete a backup file."""
+    """Delete a backup file, or a snapshot together with chunks nothing else uses."""
+    from . import backup_store
+    
     try:
+        if backup_store.is_snapshot(backup_path):
+            return backup_store.delete_snapshot(backup_path)
         if backup_path.exists() and backup_path.parent == BACKUP_DIR:
             backup_path.unlink()
             logger.info(f"Backup deleted: {backup_path}")
@@ -213,26 +384,125 @@ def delete_backup(backup_path: Path) -> bool:
         return False
 
 
-def export_data_to_json(output_path: Path, tables: Optional[List[str]] = None) -> bool:
-    """Export database data to JSON file."""
+#: First line of an NDJSON export.
+NDJSON_FORMAT = "techfix-ndjson"
+NDJSON_VERSION = 1
+NDJSON_BATCH_SIZE = 1000
+
+#: Tables rebuilt from the others (rollups, search index, change counters)
+#: or private to one database; exports leave them out and imports rebuild them.
+DERIVED_TABLES = frozenset({
+    "account_period_balances",
+    "account_daily_balances",
+    "balance_rollup_suspend",
+    "ledger_version",
+    "ledger_period_versions",
+    "schema_versions",
+})
+
+#: ``progress(table, rows_done_in_table)`` every batch.
+TableProgress = Callable[[str, int], None]
+
+
+def _open_text(path: Path, mode: str, compress: Optional[bool] = None):
+    if compress is None:
+        compress = path.suffix.lower() == ".gz"
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="\n")
+    return open(path, mode, encoding="utf-8", newline="\n")
+
+
+def _data_tables(conn: sqlite3.Connection) -> List[str]:
+    """Exportable tables, parents before the tables whose foreign keys point at them."""
+    rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' ORDER BY name").fetchall()
+    virtual = [name for name, sql in rows if (sql or "").upper().startswith("CREATE VIRTUAL TABLE")]
+    tables = [
+        name for name, _ in rows
+        if not name.startswith("sqlite_")
+        and name not in DERIVED_TABLES
+        and name not in virtual
+        and not any(name.startswith(f"{v}_") for v in virtual)  # FTS shadow tables
+    ]
+    parents = {
+        t: {fk[2] for fk in conn.execute(f'PRAGMA foreign_key_list("{t}")').fetchall()} & set(tables) - {t}
+        for t in tables
+    }
+    ordered: List[str] = []
+    done: set = set()
+    while len(ordered) < len(tables):
+        ready = [t for t in tables if t not in done and parents[t] <= done]
+        if not ready:
+            # A foreign-key cycle: the rest goes in name order; imports defer the checks anyway.
+            ready = [t for t in tables if t not in done]
+        for t in ready:
+            ordered.append(t)
+            done.add(t)
+    return ordered
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return {"$blob": base64.b64encode(value).decode("ascii")}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if type(value) is dict and "$blob" in value:
+        return base64.b64decode(value["$blob"])
+    return value
+
+
+def export_data_to_json(
+    output_path: Path,
+    tables: Optional[List[str]] = None,
+    *,
+    batch_size: int = NDJSON_BATCH_SIZE,
+    progress: Optional[TableProgress] = None,
+) -> bool:
+    """
+    Export database data as NDJSON, gzip-compressed when the path ends in ``.gz``.
+
+    A header line is followed, per table, by ``{"table", "columns"}`` and one
+    JSON array per row. Tables are walked with ``fetchmany`` and written in
+    foreign-key order, so memory stays flat whatever the database size.
+    Derived tables (``DERIVED_TABLES``, the search index) are left out.
+    """
     try:
         conn = db.get_connection()
-        data = {}
+        output_path = Path(output_path)
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
         
         try:
-            if tables is None:
-                # Export all tables
-                cur = conn.execute(
-                    "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
-                )
-                tables = [row[0] for row in cur.fetchall()]
+            export_tables = _data_tables(conn)
+            if tables is not None:
+                export_tables = [t for t in export_tables if t in tables]
             
-            for table in tables:
-                cur = conn.execute(f"SELECT * FROM {table}")
-                rows = cur.fetchall()
-                data[table] = [dict(row) for row in rows]
-            
-            output_path.write_text(json.dumps(data, indent=2, default=str), encoding='utf-8')
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with _open_text(output_path, "w") as out:
+                out.write(encode({
+                    "format": NDJSON_FORMAT,
+                    "version": NDJSON_VERSION,
+                    "schema_version": db.SCHEMA_VERSION,
+                    "exported": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                }) + "\n")
+                for table in export_tables:
+                    cur = conn.cursor()
+                    cur.row_factory = None  # plain tuples
+                    cur.execute(f'SELECT * FROM "{table}"')
+                    out.write(encode({"table": table, "columns": [d[0] for d in cur.description]}) + "\n")
+                    count = 0
+                    while True:
+                        rows = cur.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            try:
+                                out.write(encode(row) + "\n")
+                            except TypeError:  # a BLOB
+                                out.write(encode([_encode_value(v) for v in row]) + "\n")
+                        count += len(rows)
+                        if progress is not None:
+                            progress(table, count)
             logger.info(f"Data exported to: {output_path}")
             return True
         finally:
@@ -242,44 +512,141 @@ def export_data_to_json(output_path: Path, tables: Optional[List[str]] = None) -
         return False
 
 
-def import_data_from_json(input_path: Path, tables: Optional[List[str]] = None) -> bool:
-    """Import data from JSON file."""
+def _iter_ndjson_rows(lines, first_line: str):
+    """Yield ``(table, columns, row)`` from an NDJSON export, one line at a time."""
+    table = None
+    columns: List[str] = []
+    header = json.loads(first_line)
+    if header.get("format") != NDJSON_FORMAT or header.get("version") != NDJSON_VERSION:
+        raise ValueError(f"Not a {NDJSON_FORMAT} v{NDJSON_VERSION} file")
+    for line in lines:
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if isinstance(item, dict):
+            table, columns = item["table"], item["columns"]
+        elif table is None:
+            raise ValueError("Row before any table header")
+        else:
+            yield table, columns, item
+
+
+def _iter_legacy_rows(data: Dict[str, List[Dict[str, Any]]]):
+    # Dumps written before the NDJSON format: one object of row dicts per table.
+    for table, rows in data.items():
+        for row in rows:
+            yield table, list(row.keys()), list(row.values())
+
+
+def _upsert_statement(conn: sqlite3.Connection, table: str, columns: List[str]) -> Tuple[str, str, List[int]]:
+    """
+    One prepared upsert per table and column layout: ``(sql, table, kept
+    column indexes)``. A row whose primary key exists is updated in place,
+    and only if it differs. REPLACE would delete it first and cascade to its
+    children. The conflict target is the primary key, so a clash on another
+    UNIQUE column (an account code under a different id) fails the import
+    instead of rewriting the existing row under its old id.
+    """
+    info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    existing = {r[1] for r in info}
+    primary = [r[1] for r in sorted(info, key=lambda r: r[5]) if r[5]]
+    keep = [i for i, c in enumerate(columns) if c in existing]
+    names = [f'"{columns[i]}"' for i in keep]
+    updates = [f'"{columns[i]}"' for i in keep if columns[i] not in primary]
+    sql = f'INSERT INTO "{table}" ({", ".join(names)}) VALUES ({", ".join("?" for _ in keep)})'
+    if not primary:
+        return sql, table, keep
+    target = ", ".join(f'"{c}"' for c in primary)
+    sql += f" ON CONFLICT ({target}) "
+    if updates:
+        sql += (
+            "DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in updates)
+            + f' WHERE ({", ".join(updates)}) IS NOT ({", ".join(f"excluded.{c}" for c in updates)})'
+        )
+    else:
+        sql += "DO NOTHING"
+    return sql, table, keep
+
+
+def import_data_from_json(
+    input_path: Path,
+    tables: Optional[List[str]] = None,
+    *,
+    batch_size: int = NDJSON_BATCH_SIZE,
+    progress: Optional[TableProgress] = None,
+) -> bool:
+    """
+    Import data from an NDJSON export (or an older whole-file JSON dump).
+
+    NDJSON is read line by line. Each table gets one prepared upsert, run
+    with ``executemany`` in batches; rows already present unchanged are
+    skipped. Everything
+    happens in one transaction with foreign-key checks deferred to the
+    commit. Columns the current schema lacks are dropped. The per-row
+    rollup, search and version triggers are suspended; the derived tables
+    are rebuilt once at the end.
+    """
     try:
-        data = json.loads(input_path.read_text(encoding='utf-8'))
+        input_path = Path(input_path)
         conn = db.get_connection()
         
         try:
-            conn.execute("BEGIN TRANSACTION")
-            
-            if tables is None:
-                tables = list(data.keys())
-            
-            for table in tables:
-                if table not in data:
-                    continue
+            with _open_text(input_path, "r") as f:
+                first_line = f.readline()
+                try:
+                    head = json.loads(first_line)
+                    is_ndjson = isinstance(head, dict) and head.get("format") == NDJSON_FORMAT
+                except ValueError:
+                    is_ndjson = False
+                if is_ndjson:
+                    rows = _iter_ndjson_rows(f, first_line)
+                else:
+                    f.seek(0)
+                    rows = _iter_legacy_rows(json.load(f))
+                
+                known = set(_data_tables(conn))
+                statements: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+                counts: Dict[str, int] = {}
+                batch: List[List[Any]] = []
+                batch_key = None
                 
-                # Clear existing data (optional - you might want to merge instead)
-                # conn.execute(f"DELETE FROM {table}")
+                def flush() -> None:
+                    if batch:
+                        sql, table, _ = statements[batch_key]
+                        conn.executemany(sql, batch)
+                        counts[table] = counts.get(table, 0) + len(batch)
+                        batch.clear()
+                        if progress is not None:
+                            progress(table, counts[table])
                 
-                # Insert data
-                for row in data[table]:
-                    columns = ', '.join(row.keys())
-                    placeholders = ', '.join(['?' for _ in row])
-                    values = list(row.values())
-                    conn.execute(
-                        f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})",
-                        values
-                    )
+                with db.unit_of_work(conn):
+                    conn.execute("PRAGMA defer_foreign_keys = ON")
+                    conn.execute("INSERT INTO balance_rollup_suspend(flag) VALUES (1)")
+                    for table, columns, row in rows:
+                        if table not in known or (tables is not None and table not in tables):
+                            continue
+                        key = (table, tuple(columns))
+                        if key not in statements:
+                            statements[key] = _upsert_statement(conn, table, columns)
+                        if key != batch_key:
+                            flush()
+                            batch_key = key
+                        keep = statements[key][2]
+                        batch.append([_decode_value(row[i]) for i in keep])
+                        if len(batch) >= batch_size:
+                            flush()
+                    flush()
+                    conn.execute("DELETE FROM balance_rollup_suspend")
+                    if counts:
+                        db.rebuild_balance_rollups(conn=conn)
+                        if db.has_search_index(conn):
+                            db.rebuild_search_index(conn=conn)
+                        db.invalidate_ledger_versions(conn)
             
-            conn.commit()
-            logger.info(f"Data imported from: {input_path}")
+            logger.info(f"Data imported from: {input_path} ({sum(counts.values())} rows)")
             return True
-        except Exception as e:
-            conn.rollback()
-            raise
         finally:
             conn.close()
     except Exception as e:
         logger.error(f"Import failed: {e}", exc_info=True)
         return False
-
@@ -0,0 +1,389 @@
+"""
+Backup Scheduler Module
+Background snapshots into the backup store on an interval or cron schedule,
+taken only when the data changed, pruned grandfather-father-son, throttled
+and paused while the user is working.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Set, Union
+
+from . import backup, backup_store, db
+from .tasks import TaskCancelled
+
+logger = logging.getLogger(__name__)
+
+#: Description that marks a snapshot as scheduled; retention only prunes these.
+SCHEDULED_DESCRIPTION = "scheduled"
+STATE_PATH = backup.BACKUP_DIR / "scheduler_state.json"
+SETTINGS_KEY = "backup_schedule"
+
+DEFAULT_SCHEDULE = "@daily"
+#: Pages per copy step for scheduled backups: short read locks, small bursts.
+THROTTLE_STEP_PAGES = 256
+#: Share of wall time a scheduled backup may spend working; it sleeps the rest.
+THROTTLE_DUTY = 0.25
+#: A backup waits while the user was active this recently.
+IDLE_SECONDS = 10.0
+_POLL_SECONDS = 30.0
+
+_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class ScheduleError(ValueError):
+    """A schedule specification could not be parsed."""
+
+
+class SchedulerStopped(TaskCancelled):
+    """Raised inside a running backup when the scheduler is stopped."""
+
+
+class IntervalSchedule:
+    """Every ``seconds`` seconds after the previous run."""
+
+    def __init__(self, seconds: int) -> None:
+        if seconds <= 0:
+            raise ScheduleError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + timedelta(seconds=self.seconds)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds}s"
+
+
+class CronSchedule:
+    """
+    Five-field cron expression (minute hour day-of-month month day-of-week),
+    evaluated in local time. Fields take ``*``, numbers, ``a-b`` ranges,
+    ``/step`` and comma lists; day-of-week 0 and 7 are Sunday. As in cron,
+    when both day fields are restricted a day matching either one runs.
+    """
+
+    _BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ScheduleError(f"Cron expression needs 5 fields, got {len(fields)}: {expression!r}")
+        self.expression = expression
+        parsed = [self._field(text, lo, hi) for text, (lo, hi) in zip(fields, self._BOUNDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _field(text: str, lo: int, hi: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in text.split(","):
+            body, _, step_text = part.partition("/")
+            try:
+                step = int(step_text) if step_text else 1
+                if body == "*":
+                    start, end = lo, hi
+                elif "-" in body:
+                    start, end = (int(v) for v in body.split("-", 1))
+                else:
+                    start = int(body)
+                    end = hi if step_text else start
+            except ValueError:
+                raise ScheduleError(f"Bad cron field {text!r}") from None
+            if step <= 0 or not lo <= start <= end <= hi:
+                raise ScheduleError(f"Cron field {text!r} is outside {lo}-{hi}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, day: datetime) -> bool:
+        by_day = day.day in self.days
+        by_weekday = (day.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return by_day and by_weekday
+        return by_day or by_weekday
+
+    def next_after(self, moment: datetime) -> datetime:
+        local = moment.astimezone().replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = local.replace(hour=0, minute=0)
+        for _ in range(366 * 5):
+            if day.month in self.months and self._day_matches(day):
+                for hour in sorted(h for h in self.hours if day.date() > local.date() or h >= local.hour):
+                    for minute in sorted(self.minutes):
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= local:
+                            return candidate
+            day = (day + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ScheduleError(f"Cron expression never fires: {self.expression!r}")
+
+    def __str__(self) -> str:
+        return self.expression
+
+
+Schedule = Union[IntervalSchedule, CronSchedule]
+
+
+def parse_schedule(spec: str) -> Schedule:
+    """``30m``/``6h``/``1d`` (optionally ``every 6h``), ``@daily``-style aliases or a cron expression."""
+    text = spec.strip().lower()
+    text = _ALIASES.get(text, text)
+    match = re.fullmatch(r"(?:every\s+)?(\d+)\s*([smhd])", text)
+    if match:
+        return IntervalSchedule(int(match.group(1)) * _UNITS[match.group(2)])
+    return CronSchedule(text)
+
+
+@dataclass
+class RetentionPolicy:
+    """Grandfather-father-son: keep the newest backup of each of the last N days, M weeks, K months."""
+
+    daily: int = 7
+    weekly: int = 4
+    monthly: int = 12
+
+    def keep(self, created: Sequence[datetime]) -> Set[int]:
+        """Indexes of ``created`` to keep; the newest is always kept."""
+        order = sorted(range(len(created)), key=lambda i: created[i], reverse=True)
+        kept: Set[int] = set(order[:1])
+        buckets = (
+            (self.daily, lambda d: d.date()),
+            (self.weekly, lambda d: tuple(d.isocalendar())[:2]),
+            (self.monthly, lambda d: (d.year, d.month)),
+        )
+        for count, bucket in buckets:
+            seen: Set[Any] = set()
+            for i in order:
+                key = bucket(created[i].astimezone())
+                if key in seen:
+                    continue
+                if len(seen) >= count:
+                    break
+                seen.add(key)
+                kept.add(i)
+        return kept
+
+
+def load_config() -> Dict[str, Any]:
+    """Schedule settings from ``settings.json``, with defaults filled in."""
+    config = {"enabled": True, "schedule": DEFAULT_SCHEDULE, "daily": 7, "weekly": 4, "monthly": 12}
+    settings_path = db.DB_DIR / "settings.json"
+    try:
+        if settings_path.exists():
+            config.update(json.loads(settings_path.read_text(encoding="utf-8")).get(SETTINGS_KEY) or {})
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable backup schedule settings: {e}")
+    return config
+
+
+def save_config(config: Dict[str, Any]) -> None:
+    """Store schedule settings in ``settings.json``."""
+    settings_path = db.DB_DIR / "settings.json"
+    data = json.loads(settings_path.read_text(encoding="utf-8")) if settings_path.exists() else {}
+    data[SETTINGS_KEY] = config
+    settings_path.parent.mkdir(parents=True, exist_ok=True)
+    settings_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def _fingerprint(conn: sqlite3.Connection) -> str:
+    # The ledger counters survive restarts, unlike PRAGMA data_version.
+    row = conn.execute("SELECT token, version, accounts_version FROM ledger_version WHERE id = 1").fetchone()
+    return ":".join(str(v) for v in (row or ()))
+
+
+class BackupScheduler:
+    """
+    Take scheduled snapshots on a daemon thread.
+
+    A run is skipped when neither the ledger counters nor (while this
+    scheduler runs) any table written by another connection have changed
+    since the last scheduled snapshot; settings alone do not count, the
+    window geometry is saved there on every close. Copies use small steps and
+    sleep to stay under ``duty`` of wall time, and wait while ``touch()``
+    was called in the last ``idle_seconds`` or ``busy()`` is true. Every
+    run is written to ``audit_log`` and followed by retention pruning.
+    """
+
+    def __init__(
+        self,
+        schedule: Union[str, Schedule] = DEFAULT_SCHEDULE,
+        *,
+        retention: Optional[RetentionPolicy] = None,
+        step_pages: int = THROTTLE_STEP_PAGES,
+        duty: float = THROTTLE_DUTY,
+        idle_seconds: float = IDLE_SECONDS,
+        busy: Optional[Callable[[], bool]] = None,
+        state_path: Optional[Path] = None,
+    ) -> None:
+        self.schedule = parse_schedule(schedule) if isinstance(schedule, str) else schedule
+        self.retention = retention or RetentionPolicy()
+        self.step_pages = step_pages
+        self.duty = min(max(duty, 0.01), 1.0)
+        self.idle_seconds = idle_seconds
+        self._busy = busy
+        self.state_path = state_path or STATE_PATH
+        self._last_activity = float("-inf")
+        self._data_version: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._work_started = 0.0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> "BackupScheduler":
+        config = config or load_config()
+        retention = RetentionPolicy(int(config["daily"]), int(config["weekly"]), int(config["monthly"]))
+        return cls(config["schedule"], retention=retention, **kwargs)
+
+    # -- activity ---------------------------------------------------------
+
+    def touch(self) -> None:
+        """Record user activity; backups pause until the user has been idle a while."""
+        self._last_activity = time.monotonic()
+
+    def is_busy(self) -> bool:
+        if time.monotonic() - self._last_activity < self.idle_seconds:
+            return True
+        return bool(self._busy and self._busy())
+
+    def _check(self) -> None:
+        # Called after every copy step and every chunk: stop, pause, throttle.
+        worked = time.monotonic() - self._work_started
+        if self.duty < 1.0 and worked > 0:
+            self._stop.wait(worked * (1.0 - self.duty) / self.duty)
+        while self.is_busy() and not self._stop.is_set():
+            self._stop.wait(0.5)
+        if self._stop.is_set():
+            raise SchedulerStopped()
+        self._work_started = time.monotonic()
+
+    # -- state ------------------------------------------------------------
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+
+    def next_run(self) -> datetime:
+        """When the next run is due; overdue runs (the app was closed) are due now."""
+        last = self._load_state().get("last_run")
+        if not last:
+            return datetime.now(timezone.utc)
+        return self.schedule.next_after(datetime.fromisoformat(last))
+
+    # -- runs -------------------------------------------------------------
+
+    def run_once(self, *, force: bool = False, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        """
+        Take a scheduled snapshot if the data changed (always with ``force``),
+        prune by the retention policy and log the run. Returns what happened:
+        ``status`` is ``created``, ``unchanged``, ``stopped`` or ``failed``.
+        """
+        owned = conn is not None
+        if not conn:
+            conn = db.get_connection()
+        try:
+            state = self._load_state()
+            fingerprint = _fingerprint(conn)
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            changed = (
+                force
+                or fingerprint != state.get("fingerprint")
+                or (self._data_version is not None and data_version != self._data_version)
+            )
+            result: Dict[str, Any] = {"status": "unchanged", "schedule": str(self.schedule)}
+            if changed:
+                started = time.monotonic()
+                self._work_started = started
+                try:
+                    path = backup_store.create_snapshot(
+                        SCHEDULED_DESCRIPTION, step_pages=self.step_pages, check=self._check,
+                    )
+                except SchedulerStopped:
+                    path = None
+                result["seconds"] = round(time.monotonic() - started, 2)
+                if path is not None:
+                    result.update(status="created", snapshot=path.name,
+                                  stored=backup_store.read_manifest(path)["stored"])
+                    state["fingerprint"] = fingerprint
+                    self._data_version = data_version
+                else:
+                    result["status"] = "stopped" if self._stop.is_set() else "failed"
+            if result["status"] != "stopped":
+                result["pruned"] = self.prune()
+                state["last_run"] = datetime.now(timezone.utc).isoformat()
+                self._save_state(state)
+            # Logged on this connection, so the entry does not count as a change.
+            db.log_audit(action="scheduled_backup", details=json.dumps(result), user="backup-scheduler", conn=conn)
+            return result
+        finally:
+            if not owned:
+                conn.close()
+
+    def prune(self) -> int:
+        """Delete scheduled snapshots the retention policy drops; returns how many."""
+        snapshots = [s for s in backup_store.list_snapshots() if s.get("description") == SCHEDULED_DESCRIPTION]
+        kept = self.retention.keep([s["created"] for s in snapshots])
+        dropped = [s for i, s in enumerate(snapshots) if i not in kept]
+        for snapshot in dropped:
+            backup_store.delete_snapshot(snapshot["path"], collect=False)
+        if dropped:
+            backup_store.collect_garbage()
+        return len(dropped)
+
+    # -- thread -----------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="techfix-backup-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the thread; a backup in progress is abandoned and leaves nothing behind."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait(self) -> None:
+        """Block until the scheduler thread ends (``stop()`` from elsewhere, or Ctrl-C)."""
+        while self._thread is not None and self._thread.is_alive():
+            self._thread.join(1.0)
+
+    def _loop(self) -> None:
+        conn = db.get_connection()
+        try:
+            self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            while not self._stop.is_set():
+                wait = (self.next_run() - datetime.now(timezone.utc)).total_seconds()
+                if wait > 0:
+                    self._stop.wait(min(wait, _POLL_SECONDS))
+                    continue
+                try:
+                    result = self.run_once(conn=conn)
+                    logger.info(f"Scheduled backup: {result}")
+                except Exception as e:
+                    logger.error(f"Scheduled backup failed: {e}", exc_info=True)
+                    self._stop.wait(_POLL_SECONDS)
+        finally:
+            conn.close()
@@ -0,0 +1,280 @@
+"""
+Backup Store Module
+Deduplicated snapshots: files are cut into fixed-size chunks stored once
+under their SHA-256, and each snapshot is a manifest listing its chunks.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import backup, db
+from .tasks import TaskCancelled
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = backup.BACKUP_DIR / "store"
+CHUNK_DIR = STORE_DIR / "chunks"
+MANIFEST_DIR = STORE_DIR / "snapshots"
+MANIFEST_VERSION = 1
+
+#: Chunk size. Every SQLite page size divides it, so chunks hold whole pages
+#: and a snapshot costs roughly the 64 KiB regions that changed.
+CHUNK_SIZE = 64 * 1024
+
+# Held while a snapshot adds chunks and while garbage is collected, so a
+# collection never removes a chunk that a manifest being written relies on.
+_STORE_LOCK = threading.Lock()
+
+
+def is_snapshot(path: Path) -> bool:
+    """True when ``path`` is a snapshot manifest of this store."""
+    path = Path(path)
+    return path.suffix == ".json" and path.parent == MANIFEST_DIR
+
+
+def _chunk_path(digest: str) -> Path:
+    return CHUNK_DIR / digest[:2] / digest
+
+
+def _put_chunk(data: bytes) -> Tuple[str, int]:
+    """Store ``data`` unless an identical chunk exists; return its digest and the bytes written."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = _chunk_path(digest)
+    if path.exists():
+        return digest, 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    packed = zlib.compress(data, 1)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(packed)
+    os.replace(tmp, path)
+    return digest, len(packed)
+
+
+def _get_chunk(digest: str) -> bytes:
+    try:
+        data = zlib.decompress(_chunk_path(digest).read_bytes())
+    except (OSError, zlib.error) as e:
+        raise backup.BackupError(f"Chunk {digest} is missing or unreadable: {e}") from e
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise backup.BackupError(f"Chunk {digest} is corrupt")
+    return data
+
+
+def _store_file(path: Path, chunk_size: int, check: Optional[Callable[[], None]]) -> Dict[str, Any]:
+    chunks: List[str] = []
+    size = stored = 0
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            if check is not None:
+                check()
+            digest, written = _put_chunk(data)
+            chunks.append(digest)
+            size += len(data)
+            stored += written
+    return {"size": size, "stored": stored, "chunks": chunks}
+
+
+def read_manifest(path: Path) -> Dict[str, Any]:
+    """Load a snapshot manifest."""
+    manifest = json.loads(Path(path).read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise backup.BackupError(f"{Path(path).name}: unsupported manifest version {manifest.get('version')!r}")
+    return manifest
+
+
+def create_snapshot(
+    description: Optional[str] = None,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    step_pages: int = backup.BACKUP_STEP_PAGES,
+    progress: Optional[backup.BackupProgress] = None,
+    check: Optional[Callable[[], None]] = None,
+) -> Optional[Path]:
+    """
+    Snapshot the database and settings into the store.
+
+    The database is taken with ``backup.online_backup`` and then chunked;
+    only chunks the store does not hold yet are written, so a snapshot
+    after a day of posting costs about the pages that changed. The
+    manifest is written last, so an interrupted snapshot leaves at most
+    unreferenced chunks for ``collect_garbage``. A ``TaskCancelled`` raised
+    by ``check`` propagates.
+    """
+    try:
+        if not db.DB_PATH.exists():
+            logger.error("Database file not found")
+            return None
+        now = datetime.now(timezone.utc)
+        name = f"techfix_snapshot_{now.strftime('%Y%m%d_%H%M%S')}"
+        if description:
+            safe_desc = "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in description[:50])
+            name = f"{name}_{safe_desc}"
+        MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+        manifest_path = MANIFEST_DIR / f"{name}.json"
+        n = 1
+        while manifest_path.exists():
+            n += 1
+            manifest_path = MANIFEST_DIR / f"{name}_{n}.json"
+
+        with tempfile.TemporaryDirectory(dir=STORE_DIR) as tmp:
+            copy = backup.online_backup(
+                Path(tmp) / db.DB_PATH.name, step_pages=step_pages, progress=progress, check=check,
+            )
+            sources = {db.DB_PATH.name: copy}
+            settings_path = db.DB_DIR / "settings.json"
+            if settings_path.exists():
+                sources["settings.json"] = settings_path
+            with _STORE_LOCK:
+                files = {fname: _store_file(path, chunk_size, check) for fname, path in sources.items()}
+                manifest = {
+                    "version": MANIFEST_VERSION,
+                    "created": now.isoformat(),
+                    "description": description,
+                    "schema_version": db.SCHEMA_VERSION,
+                    "chunk_size": chunk_size,
+                    "size": sum(f["size"] for f in files.values()),
+                    "stored": sum(f.pop("stored") for f in files.values()),
+                    "files": files,
+                }
+                tmp_manifest = manifest_path.with_name(manifest_path.name + ".tmp")
+                tmp_manifest.write_text(json.dumps(manifest), encoding="utf-8")
+                os.replace(tmp_manifest, manifest_path)
+
+        logger.info(f"Snapshot created: {manifest_path} ({manifest['stored']} new bytes)")
+        return manifest_path
+    except TaskCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Snapshot creation failed: {e}", exc_info=True)
+        return None
+
+
+def extract_snapshot(manifest_path: Path, dest_dir: Path) -> Dict[str, Path]:
+    """Stream a snapshot's files into ``dest_dir``, verifying every chunk; return them by name."""
+    manifest = read_manifest(manifest_path)
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    written: Dict[str, Path] = {}
+    for fname, entry in manifest["files"].items():
+        target = dest_dir / Path(fname).name
+        with open(target, "wb") as out:
+            for digest in entry["chunks"]:
+                out.write(_get_chunk(digest))
+        if target.stat().st_size != entry["size"]:
+            raise backup.BackupError(f"{fname}: restored {target.stat().st_size} bytes, expected {entry['size']}")
+        written[fname] = target
+    return written
+
+
+def restore_snapshot(manifest_path: Path, verify: bool = True) -> bool:
+    """Restore the database and settings of a snapshot over the live ones."""
+    try:
+        if not Path(manifest_path).exists():
+            logger.error(f"Snapshot not found: {manifest_path}")
+            return False
+        STORE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=STORE_DIR) as tmp:
+            files = extract_snapshot(manifest_path, Path(tmp))
+            db_file = files.get(db.DB_PATH.name)
+            if db_file is None:
+                logger.error(f"Snapshot {manifest_path} holds no database")
+                return False
+            if verify:
+                try:
+                    backup.verify_database_file(db_file)
+                except backup.BackupError as e:
+                    logger.error(f"Snapshot verification failed: {e}")
+                    return False
+
+            if not create_snapshot("pre_restore"):
+                logger.warning("Could not create pre-restore snapshot")
+            backup._restore_database_file(db_file)
+            if "settings.json" in files:
+                shutil.copy2(files["settings.json"], db.DB_DIR / "settings.json")
+        logger.info(f"Snapshot restored from: {manifest_path}")
+        return True
+    except Exception as e:
+        logger.error(f"Snapshot restore failed: {e}", exc_info=True)
+        return False
+
+
+def list_snapshots() -> List[Dict[str, Any]]:
+    """Snapshots in the store, in the shape of ``backup.list_backups`` entries."""
+    snapshots = []
+    for path in MANIFEST_DIR.glob("techfix_snapshot_*.json"):
+        try:
+            manifest = read_manifest(path)
+            snapshots.append({
+                'path': path,
+                'name': path.name,
+                'type': 'snapshot',
+                'size': manifest['size'],
+                'stored': manifest['stored'],
+                'description': manifest.get('description'),
+                'created': datetime.fromisoformat(manifest['created']),
+            })
+        except Exception as e:
+            logger.warning(f"Skipping unreadable snapshot {path.name}: {e}")
+    return snapshots
+
+
+def delete_snapshot(manifest_path: Path, *, collect: bool = True) -> bool:
+    """Remove a snapshot's manifest and (unless ``collect`` is false) chunks no other snapshot uses."""
+    try:
+        manifest_path = Path(manifest_path)
+        if not is_snapshot(manifest_path) or not manifest_path.exists():
+            logger.error(f"Invalid snapshot path: {manifest_path}")
+            return False
+        with _STORE_LOCK:
+            manifest_path.unlink()
+        if collect:
+            collect_garbage()
+        logger.info(f"Snapshot deleted: {manifest_path}")
+        return True
+    except Exception as e:
+        logger.error(f"Error deleting snapshot: {e}", exc_info=True)
+        return False
+
+
+def collect_garbage() -> Dict[str, int]:
+    """
+    Delete chunks no manifest references, plus leftovers of interrupted writes.
+
+    Refuses to run (``BackupError``) when a manifest cannot be read, since
+    its chunks would otherwise be lost. Returns the chunks and bytes freed.
+    """
+    removed = freed = 0
+    with _STORE_LOCK:
+        live = set()
+        for path in MANIFEST_DIR.glob("*.json"):
+            try:
+                manifest = read_manifest(path)
+            except Exception as e:
+                raise backup.BackupError(f"Not collecting garbage: {path.name} is unreadable ({e})") from e
+            for entry in manifest["files"].values():
+                live.update(entry["chunks"])
+        for path in MANIFEST_DIR.glob("*.json.tmp"):
+            path.unlink()
+        if CHUNK_DIR.exists():
+            for path in CHUNK_DIR.glob("*/*"):
+                if path.name in live:
+                    continue
+                freed += path.stat().st_size
+                path.unlink()
+                removed += 1
+    if removed:
+        logger.info(f"Backup store: removed {removed} unreferenced chunks ({freed} bytes)")
+    return {"chunks": removed, "bytes": freed}
@@ -0,0 +1,226 @@
+"""
+Cash Flow Module
+Set-based direct and indirect cash flow statements.
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from . import db
+
+SECTIONS = ("Operating", "Investing", "Financing")
+
+# Account type -> section of the cash an entry moves (direct method).
+_DIRECT_GROUPS = {
+    "Asset": "Investing",
+    "Contra Asset": "Investing",
+    "Liability": "Financing",
+    "Equity": "Financing",
+    "Revenue": "Operating",
+    "Expense": "Operating",
+}
+
+# Indirect method: sections a balance change is reported in, by account code.
+# Working capital (receivables, supplies, input tax, payables, tax payables) is
+# operating; non-current assets (codes 150-199, plus the seeded 104 Office
+# Equipment) are investing; long-term liabilities (codes 250-299) and equity
+# are financing. Contra assets (accumulated depreciation) are non-cash charges
+# added back to net income; revenue, contra revenue and expense make up net
+# income itself.
+_FIXED_ASSET_CODES = {"104"}
+_FIXED_ASSET_RANGE = range(150, 200)
+_BORROWING_RANGE = range(250, 300)
+
+
+def _code_in(code: Optional[str], codes: range) -> bool:
+    try:
+        return int((code or "").strip()) in codes
+    except ValueError:
+        return False
+
+
+def _indirect_section(acct_type: str, code: Optional[str]) -> str:
+    """Section of a non-cash, non-income account's balance change (indirect method)."""
+    if acct_type == "Asset":
+        if (code or "").strip() in _FIXED_ASSET_CODES or _code_in(code, _FIXED_ASSET_RANGE):
+            return "Investing"
+        return "Operating"
+    if acct_type == "Liability":
+        return "Financing" if _code_in(code, _BORROWING_RANGE) else "Operating"
+    if acct_type == "Equity":
+        return "Financing"
+    return "Operating"
+
+
+def _cash_account_id(conn: sqlite3.Connection, cash_account_id: Optional[int]) -> Optional[int]:
+    if cash_account_id is not None:
+        return int(cash_account_id)
+    row = db.get_account_by_name("Cash", conn=conn)
+    return int(row["id"]) if row else None
+
+
+def _classify(type_amounts: Dict[str, float]) -> str:
+    """Section for one entry from the amounts on its non-cash lines, by account type."""
+    groups = {"Operating": 0.0, "Investing": 0.0, "Financing": 0.0}
+    for acct_type, amount in type_amounts.items():
+        section = _DIRECT_GROUPS.get(acct_type)
+        if section:
+            groups[section] += amount
+    investing, financing, operating = groups["Investing"], groups["Financing"], groups["Operating"]
+    if investing > financing and investing > operating:
+        return "Investing"
+    if financing > operating:
+        return "Financing"
+    return "Operating"
+
+
+def direct_cash_flow(
+    start_date: str,
+    end_date: str,
+    *,
+    period_id: Optional[int] = None,
+    cash_account_id: Optional[int] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Dict[str, Any]:
+    """
+    Cash movements between start_date and end_date (inclusive), by section.
+
+    Each posted entry that touches Cash is classified by the account types of
+    its other lines, weighted by amount. The entries and all their lines come
+    from one query (driven by the cash account's lines) and the account types
+    from a preloaded map, so the statement costs three queries in total.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = db.get_connection()
+    try:
+        cash_id = _cash_account_id(conn, cash_account_id)
+        if cash_id is None:
+            return {"error": "Cash account not found"}
+        types = {int(r["id"]): r["type"] for r in conn.execute("SELECT id, type FROM accounts")}
+
+        clause = " AND je.period_id = ?" if period_id else ""
+        params: List[Any] = [cash_id, start_date, end_date, start_date, end_date]
+        if period_id:
+            params.append(int(period_id))
+        rows = conn.execute(
+            f"""
+            SELECT je.id AS entry_id, je.date AS date, jl.account_id, jl.debit, jl.credit
+            FROM journal_entries je
+            JOIN journal_lines jl ON jl.entry_id = je.id
+            WHERE je.id IN (
+                    SELECT c.entry_id FROM journal_lines c
+                    WHERE c.account_id = ? AND c.entry_date BETWEEN date(?) AND date(?)
+                  )
+              AND je.date BETWEEN date(?) AND date(?)
+              AND je.status = 'posted'{clause}
+            ORDER BY je.date, je.id, jl.id
+            """,
+            params,
+        )
+
+        sections: Dict[str, List[Dict[str, Any]]] = {s: [] for s in SECTIONS}
+        totals = {s: 0.0 for s in SECTIONS}
+
+        def flush(entry_id, entry_date, cash_amounts, type_amounts):
+            klass = _classify(type_amounts)
+            for amt in cash_amounts:
+                sections[klass].append({"entry_id": entry_id, "date": entry_date, "amount": round(amt, 2)})
+                totals[klass] = round(totals[klass] + amt, 2)
+
+        current = None
+        cash_amounts: List[float] = []
+        type_amounts: Dict[str, float] = {}
+        for r in rows:
+            entry_id = int(r["entry_id"])
+            if current is None or entry_id != current[0]:
+                if current is not None:
+                    flush(current[0], current[1], cash_amounts, type_amounts)
+                current = (entry_id, r["date"])
+                cash_amounts, type_amounts = [], {}
+            amount = float(r["debit"] or 0) - float(r["credit"] or 0)
+            account_id = int(r["account_id"])
+            if account_id == cash_id:
+                cash_amounts.append(amount)
+            elif account_id in types:
+                acct_type = types[account_id]
+                type_amounts[acct_type] = type_amounts.get(acct_type, 0.0) + abs(amount)
+        if current is not None:
+            flush(current[0], current[1], cash_amounts, type_amounts)
+
+        net = round(sum(totals.values()), 2)
+        return {"sections": sections, "totals": totals, "net_change_in_cash": net, "start": start_date, "end": end_date}
+    finally:
+        if not owned:
+            conn.close()
+
+
+def indirect_cash_flow(
+    start_date: str,
+    end_date: str,
+    *,
+    period_id: Optional[int] = None,
+    cash_account_id: Optional[int] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Dict[str, Any]:
+    """
+    Indirect-method statement: net income adjusted by the change in every
+    non-cash balance over the range.
+
+    Built from one trial balance over the range (served from the balance
+    rollups), so its cost does not depend on the number of entries. Closing
+    entries are left out: they never move cash and would fold net income into
+    equity.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = db.get_connection()
+    try:
+        cash_id = _cash_account_id(conn, cash_account_id)
+        if cash_id is None:
+            return {"error": "Cash account not found"}
+        rows = db.compute_trial_balance(
+            from_date=start_date,
+            up_to_date=end_date,
+            include_temporary=True,
+            period_id=period_id,
+            exclude_closing=True,
+            conn=conn,
+        )
+
+        sections: Dict[str, List[Dict[str, Any]]] = {s: [] for s in SECTIONS}
+        net_income = 0.0
+        cash_change = 0.0
+        for r in rows:
+            # Debit-positive change in the account's balance over the range.
+            change = float(r["net_debit"] or 0) - float(r["net_credit"] or 0)
+            if abs(change) < 0.005:
+                continue
+            if int(r["account_id"]) == cash_id:
+                cash_change += change
+                continue
+            acct_type = r["type"]
+            if acct_type in ("Revenue", "Contra Revenue", "Expense"):
+                net_income -= change
+                continue
+            # A debit increase in a non-cash balance used cash; a credit increase provided it.
+            section = _indirect_section(acct_type, r["code"])
+            sections[section].append({"code": r["code"], "name": r["name"], "amount": round(-change, 2)})
+
+        net_income = round(net_income, 2)
+        totals = {s: round(sum(it["amount"] for it in sections[s]), 2) for s in SECTIONS}
+        totals["Operating"] = round(totals["Operating"] + net_income, 2)
+        net = round(sum(totals.values()), 2)
+        return {
+            "net_income": net_income,
+            "sections": sections,
+            "totals": totals,
+            "net_change_in_cash": net,
+            "cash_account_change": round(cash_change, 2),
+            "start": start_date,
+            "end": end_date,
+        }
+    finally:
+        if not owned:
+            conn.close()
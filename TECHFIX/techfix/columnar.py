@@ -0,0 +1,268 @@
+"""
+Columnar Export Module
+Journal lines with their entry and account attributes as typed Parquet or
+Arrow IPC, streamed from the cursor in record batches. Needs pyarrow.
+"""
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from . import db
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+DEFAULT_BATCH_SIZE = 65536
+
+#: Partition directory for entries without a period (pyarrow's hive null marker).
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# (column, SQL expression, arrow type name); booleans come out of SQLite as 0/1.
+# Account attributes have no expression: the lines carry only account_id and
+# the attributes are taken from one small accounts table in Arrow, so SQLite
+# does not materialise the same strings again on every line.
+_COLUMNS: List[Tuple[str, Optional[str], str]] = [
+    ("line_id", "jl.id", "int64"),
+    ("entry_id", "je.id", "int64"),
+    ("date", "je.date", "date32"),
+    ("period_id", "je.period_id", "int64"),
+    ("status", "je.status", "string"),
+    ("is_adjusting", "je.is_adjusting", "bool_"),
+    ("is_closing", "je.is_closing", "bool_"),
+    ("is_reversing", "je.is_reversing", "bool_"),
+    ("description", "je.description", "string"),
+    ("document_ref", "je.document_ref", "string"),
+    ("external_ref", "je.external_ref", "string"),
+    ("source_type", "je.source_type", "string"),
+    ("currency_code", "je.currency_code", "string"),
+    ("fx_rate", "je.fx_rate", "float64"),
+    ("account_id", "jl.account_id", "int64"),
+    ("account_code", None, "string"),
+    ("account_name", None, "string"),
+    ("account_type", None, "string"),
+    ("normal_side", None, "string"),
+    ("debit", "jl.debit", "float64"),
+    ("credit", "jl.credit", "float64"),
+]
+_ACCOUNT_ATTRIBUTES = {"account_code": "code", "account_name": "name", "account_type": "type", "normal_side": "normal_side"}
+_FETCHED = [(name, expr) for name, expr, _ in _COLUMNS if expr]
+
+_LINES_SQL = (
+    "SELECT " + ", ".join(f"{expr} AS {name}" for name, expr in _FETCHED) + " "
+    "FROM journal_entries je "
+    "JOIN journal_lines jl ON jl.entry_id = je.id "
+    "WHERE je.period_id IS ? "
+    "ORDER BY je.date, je.id, jl.id"
+)
+
+
+def _require_pyarrow() -> None:
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow export. Install with: pip install pyarrow")
+
+
+def format_for_path(path: Path) -> str:
+    """``parquet`` or ``arrow`` from the file extension (Parquet when unknown)."""
+    suffix = Path(path).suffix.lower()
+    return "arrow" if suffix in (".arrow", ".ipc", ".feather") else "parquet"
+
+
+def journal_schema(*, with_period: bool = True) -> "pa.Schema":
+    """Arrow schema of exported journal lines; partitioned files leave ``period_id`` to the path."""
+    _require_pyarrow()
+    return pa.schema([
+        pa.field(name, getattr(pa, type_name)())
+        for name, _, type_name in _COLUMNS
+        if with_period or name != "period_id"
+    ])
+
+
+def _dates(values: List[Any]) -> "pa.Array":
+    # Dates are stored canonically as YYYY-MM-DD; anything else becomes null.
+    try:
+        return pa.array(values, pa.string()).cast(pa.date32())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(date.fromisoformat(str(value)[:10]))
+            except (TypeError, ValueError):
+                parsed.append(None)
+        return pa.array(parsed, pa.date32())
+
+
+def _accounts_table(conn: sqlite3.Connection) -> "pa.Table":
+    rows = conn.execute("SELECT id, code, name, type, normal_side FROM accounts ORDER BY id").fetchall()
+    ids, code, name, typ, side = (list(c) for c in zip(*rows)) if rows else ([], [], [], [], [])
+    return pa.table({
+        "id": pa.array(ids, pa.int64()),
+        "code": pa.array(code, pa.string()),
+        "name": pa.array(name, pa.string()),
+        "type": pa.array(typ, pa.string()),
+        "normal_side": pa.array(side, pa.string()),
+    })
+
+
+def _record_batch(rows: List[tuple], schema: "pa.Schema", accounts: "pa.Table") -> "pa.RecordBatch":
+    fetched = dict(zip([name for name, _ in _FETCHED], zip(*rows)))
+    account_index = None
+    arrays = []
+    for field in schema:
+        if field.name in _ACCOUNT_ATTRIBUTES:
+            if account_index is None:
+                account_ids = pa.array(fetched["account_id"], pa.int64())
+                account_index = pc.index_in(account_ids, value_set=accounts["id"])
+            arrays.append(accounts[_ACCOUNT_ATTRIBUTES[field.name]].take(account_index).combine_chunks())
+            continue
+        values = list(fetched[field.name])
+        if field.type == pa.date32():
+            arrays.append(_dates(values))
+        elif field.type == pa.bool_():
+            arrays.append(pa.array(values, pa.int8()).cast(pa.bool_()))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_record_batches(
+    period_id: Optional[int],
+    *,
+    schema: Optional["pa.Schema"] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator["pa.RecordBatch"]:
+    """Record batches of one period's journal lines (``None``: lines without a period)."""
+    _require_pyarrow()
+    schema = schema or journal_schema()
+    owned = conn is not None
+    if not conn:
+        conn = db.get_connection()
+    try:
+        accounts = _accounts_table(conn)
+        cur = conn.cursor()
+        cur.row_factory = None  # plain tuples; sqlite3.Row costs more per value
+        cur.execute(_LINES_SQL, (period_id,))
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield _record_batch(rows, schema, accounts)
+    finally:
+        if not owned:
+            conn.close()
+
+
+class _Writer:
+    """One Parquet or Arrow IPC file, written batch by batch."""
+
+    def __init__(self, path: Path, schema: "pa.Schema", fmt: str, compression: Optional[str]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(str(path), schema, compression=compression or "snappy")
+            self.write = lambda batch: self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression) if compression else None
+            self._writer = pa.ipc.new_file(str(path), schema, options=options)
+            self.write = self._writer.write_batch
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def _partition_dir(root: Path, period_id: Optional[int]) -> Path:
+    return root / f"period_id={NULL_PARTITION if period_id is None else period_id}"
+
+
+def _clear_partitions(root: Path, ext: str) -> None:
+    # Drop the part files of an earlier export so no stale period survives.
+    for part in root.glob(f"period_id=*/part-*{ext}"):
+        part.unlink()
+        try:
+            part.parent.rmdir()
+        except OSError:
+            pass
+
+
+def export_journal_lines(
+    output_path: Path,
+    *,
+    fmt: Optional[str] = None,
+    period_id: Optional[int] = None,
+    partition_by_period: bool = True,
+    compression: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Dict[str, Any]:
+    """
+    Write journal lines joined with entry and account attributes, typed.
+
+    With ``partition_by_period`` (the default) ``output_path`` is a dataset
+    directory holding one ``period_id=<id>/part-0.<ext>`` file per period,
+    readable with ``pandas.read_parquet(output_path)`` or
+    ``pyarrow.dataset``; otherwise it is a single file with a ``period_id``
+    column. ``fmt`` is ``parquet`` or ``arrow`` (IPC file), by default taken
+    from the extension. ``period_id`` limits the export to one period.
+    Returns the row count and the files written.
+    """
+    _require_pyarrow()
+    output_path = Path(output_path)
+    fmt = fmt or format_for_path(output_path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown columnar format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+    ext = FORMATS[fmt]
+    schema = journal_schema(with_period=not partition_by_period)
+
+    owned = conn is not None
+    if not conn:
+        conn = db.get_connection()
+    try:
+        if period_id is not None:
+            periods: List[Optional[int]] = [period_id]
+        else:
+            periods = [r[0] for r in conn.execute(
+                "SELECT DISTINCT period_id FROM journal_entries ORDER BY period_id"
+            ).fetchall()]
+        if partition_by_period:
+            if output_path.is_file():
+                raise FileExistsError(f"{output_path} is a file; a partitioned export writes a directory")
+            _clear_partitions(output_path, ext)
+
+        rows = 0
+        files: List[str] = []
+        writer: Optional[_Writer] = None
+        try:
+            for pid in periods:
+                if partition_by_period or writer is None:
+                    path = _partition_dir(output_path, pid) / f"part-0{ext}" if partition_by_period else output_path
+                    writer = _Writer(path, schema, fmt, compression)
+                    files.append(str(path))
+                for batch in iter_record_batches(pid, schema=schema, batch_size=batch_size, conn=conn):
+                    writer.write(batch)
+                    rows += batch.num_rows
+                    if progress is not None:
+                        progress(rows)
+                if partition_by_period:
+                    writer.close()
+                    writer = None
+            if writer is None and not files:
+                # No lines at all: still leave a valid, empty file behind.
+                path = output_path if not partition_by_period else _partition_dir(output_path, period_id) / f"part-0{ext}"
+                writer = _Writer(path, schema, fmt, compression)
+                files.append(str(path))
+        finally:
+            if writer is not None:
+                writer.close()
+        return {"rows": rows, "files": files}
+    finally:
+        if not owned:
+            conn.close()
@@ -1,9 +1,13 @@
 import os
 import sqlite3
+import threading
+import time
+import weakref
 from datetime import datetime, date, timezone
 from pathlib import Path
-from typing import Iterable, Optional, Tuple, Any, Dict, List
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Any, Dict, List
 import json
+from contextlib import contextmanager
 
 
 DB_DIR = Path(os.environ.get("TECHFIX_DATA_DIR", "."))
@@ -25,22 +29,296 @@ ACCOUNTING_CYCLE_STEPS: List[str] = [
 SCHEMA_VERSION: int = 1
 
 
+# --- Connection pool ---
+
+#: Tuning profile applied once to every connection the pool opens.
+CONNECTION_PRAGMAS: Tuple[Tuple[str, Any], ...] = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("foreign_keys", "ON"),
+    ("cache_size", -16000),  # negative = KiB, ~16 MB page cache
+    ("mmap_size", 256 * 1024 * 1024),
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", 5000),
+)
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose ``close()`` hands it back to its pool."""
+
+    def close(self) -> None:
+        pool = getattr(self, "_pool", None)
+        if pool is None:
+            super().close()
+        else:
+            pool.release(self)
+
+    def _discard(self) -> None:
+        self._pool = None
+        try:
+            super().close()
+        except sqlite3.Error:
+            pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of tuned connections to :data:`DB_PATH`, reused per thread.
+
+    Every ``acquire()`` hands out a connection nobody else is using, so
+    nested helpers in one thread never share a transaction.  At most
+    ``max_open`` connections exist at once: when all are taken, ``acquire``
+    closes an idle connection kept for another thread, or else blocks until
+    one is released, raising ``sqlite3.OperationalError`` after ``timeout``
+    seconds.  Released connections are rolled back if a transaction was left
+    open and kept idle for the releasing thread, up to ``max_idle`` across
+    all threads; anything beyond that is really closed.
+    """
+
+    def __init__(self, max_idle: int = 8, max_open: int = 32, timeout: float = 30.0) -> None:
+        self.max_idle = max_idle
+        self.max_open = max_open
+        self.timeout = timeout
+        self._lock = threading.Condition(threading.Lock())
+        self._idle: Dict[int, List[PooledConnection]] = {}
+        self._open: "weakref.WeakSet[PooledConnection]" = weakref.WeakSet()
+        self._borrowed: "weakref.WeakSet[PooledConnection]" = weakref.WeakSet()
+        self._reserved = 0  # slots taken by connections being opened
+        self._created = 0
+        self._reused = 0
+        self._waits = 0
+
+    def _connect(self, path: str) -> PooledConnection:
+        conn = sqlite3.connect(path, factory=PooledConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in CONNECTION_PRAGMAS:
+            conn.execute(f"PRAGMA {name} = {value};").fetchall()
+        conn._pool = self
+        conn._pool_path = path
+        return conn
+
+    def _idle_count(self) -> int:
+        return sum(len(stack) for stack in self._idle.values())
+
+    def _evict_idle(self) -> Optional[PooledConnection]:
+        # Oldest idle connection of any thread, to free a slot for a new one.
+        for ident, stack in self._idle.items():
+            if stack:
+                conn = stack.pop(0)
+                if not stack:
+                    del self._idle[ident]
+                self._open.discard(conn)
+                return conn
+        return None
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        path = str(DB_PATH)
+        stale: List[PooledConnection] = []
+        conn: Optional[PooledConnection] = None
+        deadline = None
+        with self._lock:
+            stack = self._idle.get(threading.get_ident(), [])
+            while stack:
+                candidate = stack.pop()
+                if candidate._pool_path == path:
+                    conn = candidate
+                    self._reused += 1
+                    break
+                self._open.discard(candidate)
+                stale.append(candidate)
+            while conn is None and len(self._open) + self._reserved >= self.max_open:
+                evicted = self._evict_idle()
+                if evicted is not None:
+                    stale.append(evicted)
+                    continue
+                if deadline is None:
+                    self._waits += 1
+                    deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError(
+                        f"connection pool exhausted: {self.max_open} connections in use"
+                    )
+                self._lock.wait(remaining)
+            if conn is None:
+                self._reserved += 1
+        for old in stale:
+            old._discard()
+        if conn is None:
+            try:
+                DB_DIR.mkdir(parents=True, exist_ok=True)
+                conn = self._connect(path)
+            except BaseException:
+                with self._lock:
+                    self._reserved -= 1
+                    self._lock.notify()
+                raise
+            with self._lock:
+                self._reserved -= 1
+                self._created += 1
+                self._open.add(conn)
+        with self._lock:
+            self._borrowed.add(conn)
+        return conn
+
+    def release(self, conn: PooledConnection) -> None:
+        with self._lock:
+            if conn not in self._borrowed:
+                return  # already released
+            self._borrowed.discard(conn)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            self._forget(conn)
+            return
+        with self._lock:
+            if conn._pool_path == str(DB_PATH):
+                if self._idle_count() >= self.max_idle:
+                    self._prune_dead_threads()
+                if self._idle_count() < self.max_idle:
+                    self._idle.setdefault(threading.get_ident(), []).append(conn)
+                    # A waiter may evict it if its own thread has nothing idle.
+                    self._lock.notify()
+                    return
+        self._forget(conn)
+
+    def _prune_dead_threads(self) -> None:
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._idle if i not in alive]:
+            for conn in self._idle.pop(ident):
+                self._open.discard(conn)
+                conn._discard()
+        self._lock.notify_all()
+
+    def _forget(self, conn: PooledConnection) -> None:
+        with self._lock:
+            self._open.discard(conn)
+            self._lock.notify()
+        conn._discard()
+
+    def close_idle(self) -> int:
+        """Close every idle connection (e.g. before the database file is replaced)."""
+        with self._lock:
+            idle = [conn for stack in self._idle.values() for conn in stack]
+            self._idle.clear()
+        for conn in idle:
+            self._forget(conn)
+        return len(idle)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open": len(self._open),
+                "borrowed": len(self._borrowed),
+                "idle": self._idle_count(),
+                "max_idle": self.max_idle,
+                "max_open": self.max_open,
+                "created": self._created,
+                "reused": self._reused,
+                "waits": self._waits,
+            }
+
+
+_POOL = ConnectionPool()
+
+
 def get_connection() -> sqlite3.Connection:
-    DB_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    """Borrow a tuned connection from the shared pool; ``close()`` returns it."""
+    return _POOL.acquire()
+
+
+def connection_stats() -> Dict[str, int]:
+    """Open/borrowed/idle connection counts for the shared pool."""
+    return _POOL.stats()
+
+
+def close_idle_connections() -> int:
+    """Close the pool's idle connections; returns how many were closed."""
+    return _POOL.close_idle()
+
+
+def checkpoint_wal(*, conn: Optional[sqlite3.Connection] = None) -> None:
+    """Fold the write-ahead log back into the main database file."""
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchall()
+    finally:
+        if not owned:
+            conn.close()
+
+# --- Unit of work ---
+
+# id(conn) -> nesting depth of unit_of_work blocks open on that connection.
+_UNIT_OF_WORK_DEPTH: Dict[int, int] = {}
+
+
+def _commit(conn: sqlite3.Connection) -> None:
+    """Commit, unless ``conn`` is inside :func:`unit_of_work` (which commits once at the end)."""
+    if id(conn) not in _UNIT_OF_WORK_DEPTH:
+        conn.commit()
+
+
+@contextmanager
+def unit_of_work(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Run a block as a single ``BEGIN IMMEDIATE ... COMMIT`` on ``conn``.
+
+    Helpers in this module commit through :func:`_commit`, so everything they
+    write inside the block reaches disk in one commit; any exception rolls the
+    whole block back. Blocks nest and only the outermost one commits.
+
+    A block opened while a transaction is already running (a nested block, or
+    a caller's own transaction) runs inside it as a ``SAVEPOINT``: an
+    exception rolls back only that block's writes before it propagates, and
+    nothing is committed; the enclosing block or caller decides.
+    """
+    key = id(conn)
+    depth = _UNIT_OF_WORK_DEPTH.get(key, 0)
+    savepoint = f"unit_of_work_{depth}" if conn.in_transaction else None
+    if savepoint:
+        conn.execute(f"SAVEPOINT {savepoint}")
+    else:
+        conn.execute("BEGIN IMMEDIATE")
+    _UNIT_OF_WORK_DEPTH[key] = depth + 1
+    try:
+        yield conn
+        if savepoint:
+            conn.execute(f"RELEASE SAVEPOINT {savepoint}")
+        else:
+            conn.commit()
+    except BaseException:
+        if savepoint:
+            try:
+                conn.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                conn.execute(f"RELEASE SAVEPOINT {savepoint}")
+            except sqlite3.OperationalError:
+                pass  # the transaction is already gone; keep the original error
+        elif conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        if depth == 0:
+            _UNIT_OF_WORK_DEPTH.pop(key, None)
+        else:
+            _UNIT_OF_WORK_DEPTH[key] = depth
 
 
 def init_db(reset: bool = False) -> None:
-    if reset and DB_PATH.exists():
-        DB_PATH.unlink()
+    if reset:
+        close_idle_connections()
+        for suffix in ("", "-wal", "-shm"):
+            path = DB_PATH.with_name(DB_PATH.name + suffix)
+            if path.exists():
+                path.unlink()
     conn = get_connection()
     try:
         _create_schema(conn)
         _apply_schema_updates(conn)
-        conn.commit()
+        _commit(conn)
     finally:
         conn.close()
 
@@ -59,7 +337,7 @@ def get_or_create_default_user(conn: sqlite3.Connection) -> sqlite3.Row:
         "INSERT INTO users (username, full_name, is_active) VALUES (?,?,1)",
         ("default", "Default User"),
     )
-    conn.commit()
+    _commit(conn)
     return conn.execute("SELECT * FROM users WHERE username = ?", ("default",)).fetchone()
 
 
@@ -90,7 +368,7 @@ def set_user_preference(user_id: int, key: str, value: Any, conn: sqlite3.Connec
         """,
         (user_id, key, payload),
     )
-    conn.commit()
+    _commit(conn)
 
 
 def _create_schema(conn: sqlite3.Connection) -> None:
@@ -242,11 +520,11 @@ def _create_schema(conn: sqlite3.Connection) -> None:
             account_id INTEGER NOT NULL REFERENCES accounts(id),
             debit REAL NOT NULL DEFAULT 0,
             credit REAL NOT NULL DEFAULT 0,
+            entry_date TEXT,                      -- copy of journal_entries.date, kept by triggers
             CHECK ((debit = 0 AND credit > 0) OR (credit = 0 AND debit > 0))
         );
 
-        CREATE INDEX IF NOT EXISTS idx_journal_lines_entry ON journal_lines(entry_id);
-        CREATE INDEX IF NOT EXISTS idx_journal_lines_account ON journal_lines(account_id);
+        CREATE INDEX IF NOT EXISTS idx_journal_lines_entry_cover ON journal_lines(entry_id, account_id, debit, credit);
 
         CREATE TABLE IF NOT EXISTS accounting_periods (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -757,6 +1035,102 @@ def _apply_schema_updates(conn: sqlite3.Connection) -> None:
         """,
     )
 
+    # Journal dates are kept as canonical ISO text (YYYY-MM-DD) so date filters
+    # compare the raw column and can use the indexes below. Dates SQLite cannot
+    # parse are rejected on the way in: compared as text they would fall inside
+    # arbitrary date ranges, where date(je.date) used to exclude them.
+    has_date_trigger = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='trg_journal_entries_date_insert'"
+    ).fetchone()
+    if has_date_trigger is None:
+        conn.execute(
+            "UPDATE journal_entries SET date = date(date) WHERE date(date) IS NOT NULL AND date <> date(date)"
+        )
+    conn.executescript(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entries_date_check_insert
+        BEFORE INSERT ON journal_entries
+        WHEN date(NEW.date) IS NULL
+        BEGIN
+            SELECT RAISE(ABORT, 'journal entry date must be YYYY-MM-DD');
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entries_date_check_update
+        BEFORE UPDATE OF date ON journal_entries
+        WHEN date(NEW.date) IS NULL
+        BEGIN
+            SELECT RAISE(ABORT, 'journal entry date must be YYYY-MM-DD');
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entries_date_insert
+        AFTER INSERT ON journal_entries
+        WHEN date(NEW.date) IS NOT NULL AND NEW.date <> date(NEW.date)
+        BEGIN
+            UPDATE journal_entries SET date = date(NEW.date) WHERE id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entries_date_update
+        AFTER UPDATE OF date ON journal_entries
+        WHEN date(NEW.date) IS NOT NULL AND NEW.date <> date(NEW.date)
+        BEGIN
+            UPDATE journal_entries SET date = date(NEW.date) WHERE id = NEW.id;
+        END;
+
+        CREATE INDEX IF NOT EXISTS idx_journal_entries_period_date
+            ON journal_entries(period_id, date, id, status);
+        CREATE INDEX IF NOT EXISTS idx_journal_entries_date ON journal_entries(date, id);
+        CREATE INDEX IF NOT EXISTS idx_journal_entries_posted_date
+            ON journal_entries(date, id) WHERE status = 'posted';
+        CREATE INDEX IF NOT EXISTS idx_journal_lines_entry_cover
+            ON journal_lines(entry_id, account_id, debit, credit);
+        DROP INDEX IF EXISTS idx_journal_lines_entry;
+        DROP INDEX IF EXISTS idx_journal_lines_account;
+        """
+    )
+
+    # Lines carry their entry's date so the ledger and the account-filtered
+    # journal can walk journal_lines(account_id, entry_date, entry_id, id) in
+    # keyset order instead of sorting an account's whole history per page.
+    line_columns = {row["name"] for row in conn.execute("PRAGMA table_info(journal_lines)")}
+    if "entry_date" not in line_columns:
+        conn.execute("ALTER TABLE journal_lines ADD COLUMN entry_date TEXT")
+        conn.execute(
+            """
+            UPDATE journal_lines
+            SET entry_date = (SELECT je.date FROM journal_entries je WHERE je.id = journal_lines.entry_id)
+            """
+        )
+    conn.executescript(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_journal_lines_entry_date_insert
+        AFTER INSERT ON journal_lines
+        WHEN NEW.entry_date IS NOT (SELECT date FROM journal_entries WHERE id = NEW.entry_id)
+        BEGIN
+            UPDATE journal_lines SET entry_date = (SELECT date FROM journal_entries WHERE id = NEW.entry_id)
+            WHERE id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_journal_lines_entry_date_move
+        AFTER UPDATE OF entry_id ON journal_lines
+        BEGIN
+            UPDATE journal_lines SET entry_date = (SELECT date FROM journal_entries WHERE id = NEW.entry_id)
+            WHERE id = NEW.id;
+        END;
+
+        -- Reads the stored date rather than NEW.date so it agrees with the
+        -- canonicalising trigger whichever of the two runs first.
+        CREATE TRIGGER IF NOT EXISTS trg_journal_entries_date_lines
+        AFTER UPDATE OF date ON journal_entries
+        BEGIN
+            UPDATE journal_lines SET entry_date = (SELECT date FROM journal_entries WHERE id = NEW.id)
+            WHERE entry_id = NEW.id;
+        END;
+
+        CREATE INDEX IF NOT EXISTS idx_journal_lines_account_date
+            ON journal_lines(account_id, entry_date, entry_id, id, debit, credit);
+        """
+    )
+
     _ensure_table(
         conn,
         "schema_versions",
@@ -767,11 +1141,820 @@ def _apply_schema_updates(conn: sqlite3.Connection) -> None:
         )
         """,
     )
+    # Materialized per-account, per-period balances. Kept in sync by triggers on
+    # journal_entries / journal_lines so every write path (including raw deletes)
+    # updates it in the same transaction; backfilled once for existing databases.
+    created = _ensure_table(
+        conn,
+        "account_period_balances",
+        """
+        CREATE TABLE account_period_balances (
+            account_id INTEGER NOT NULL,
+            period_id INTEGER NOT NULL DEFAULT 0,   -- 0 = entries without a period
+            status TEXT NOT NULL,
+            is_adjusting INTEGER NOT NULL DEFAULT 0,
+            is_closing INTEGER NOT NULL DEFAULT 0,
+            is_reversing INTEGER NOT NULL DEFAULT 0,
+            debit_total REAL NOT NULL DEFAULT 0,
+            credit_total REAL NOT NULL DEFAULT 0,
+            line_count INTEGER NOT NULL DEFAULT 0,
+            min_date TEXT,
+            max_date TEXT,
+            PRIMARY KEY (account_id, period_id, status, is_adjusting, is_closing, is_reversing)
+        )
+        """,
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_account_period_balances_period ON account_period_balances(period_id, account_id)"
+    )
+    # Daily rollups with running prefix sums per bucket: an as-of balance or a
+    # date-range delta is two indexed lookups per bucket instead of a line scan.
+    created_daily = _ensure_table(
+        conn,
+        "account_daily_balances",
+        """
+        CREATE TABLE account_daily_balances (
+            account_id INTEGER NOT NULL,
+            period_id INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            is_adjusting INTEGER NOT NULL DEFAULT 0,
+            is_closing INTEGER NOT NULL DEFAULT 0,
+            is_reversing INTEGER NOT NULL DEFAULT 0,
+            day TEXT NOT NULL,
+            debit_total REAL NOT NULL DEFAULT 0,
+            credit_total REAL NOT NULL DEFAULT 0,
+            line_count INTEGER NOT NULL DEFAULT 0,
+            cum_debit REAL NOT NULL DEFAULT 0,
+            cum_credit REAL NOT NULL DEFAULT 0,
+            cum_lines INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (account_id, period_id, status, is_adjusting, is_closing, is_reversing, day)
+        )
+        """,
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_account_daily_balances_day ON account_daily_balances(day)")
+    # Holds a row only inside a bulk-posting transaction (never committed), while
+    # the lines are rolled up set-based instead of by the per-line trigger.
+    conn.execute("CREATE TABLE IF NOT EXISTS balance_rollup_suspend (flag INTEGER)")
+    _ensure_balance_triggers(conn)
+    if created:
+        rebuild_account_period_balances(conn=conn)
+    if created_daily:
+        rebuild_account_daily_balances(conn=conn)
+    _ensure_search_index(conn)
+    _ensure_ledger_version(conn)
+
     cur = conn.execute("SELECT 1 FROM schema_versions WHERE version=?", (SCHEMA_VERSION,))
     if cur.fetchone() is None:
         conn.execute("INSERT INTO schema_versions(version) VALUES (?)", (SCHEMA_VERSION,))
 
 
+# --- Materialized account balances -----------------------------------------
+
+# Bucket key shared by account_period_balances and account_daily_balances.
+# In the period table, dates SQLite cannot parse widen the bucket's date bounds
+# to the extremes so any date-filtered query avoids it; the daily table skips
+# such lines, exactly as a date filter on journal_entries would.
+_BALANCE_BUCKET_COLUMNS = "account_id, period_id, status, is_adjusting, is_closing, is_reversing"
+
+
+def _bucket_match(target: str, source: str, *, with_day: bool = False) -> str:
+    cols = [c.strip() for c in _BALANCE_BUCKET_COLUMNS.split(",")] + (["day"] if with_day else [])
+    return (
+        "(" + ", ".join(f"{target}.{c}" for c in cols) + ") = ("
+        + ", ".join(f"{source}.{c}" for c in cols) + ")"
+    )
+
+
+def _balance_bucket_values(entry: str) -> str:
+    return (
+        f"COALESCE({entry}.period_id, 0) AS period_id, COALESCE({entry}.status, 'posted') AS status, "
+        f"COALESCE({entry}.is_adjusting, 0) <> 0 AS is_adjusting, COALESCE({entry}.is_closing, 0) <> 0 AS is_closing, "
+        f"COALESCE({entry}.is_reversing, 0) <> 0 AS is_reversing"
+    )
+
+
+def _balance_delta_select(entry: str, lines_source: str) -> str:
+    """Per-account totals of one entry's lines, keyed like the balance tables."""
+    return f"""
+        SELECT l.account_id AS account_id, {_balance_bucket_values(entry)}, date({entry}.date) AS day,
+               SUM(l.debit) AS debit_total, SUM(l.credit) AS credit_total, COUNT(*) AS line_count
+        FROM {lines_source}
+        GROUP BY l.account_id
+    """
+
+
+def _balance_add_sql(delta: str) -> str:
+    """Statements adding ``delta`` to the period buckets and the daily prefix sums."""
+    prev = (
+        "COALESCE((SELECT x.{col} FROM account_daily_balances x WHERE "
+        + _bucket_match("x", "s")
+        + " AND x.day < s.day ORDER BY x.day DESC LIMIT 1), 0)"
+    )
+    return f"""
+        INSERT INTO account_period_balances(
+            {_BALANCE_BUCKET_COLUMNS}, debit_total, credit_total, line_count, min_date, max_date
+        )
+        SELECT {_BALANCE_BUCKET_COLUMNS}, debit_total, credit_total, line_count,
+               COALESCE(day, '0000-00-00'), COALESCE(day, '9999-12-31')
+        FROM ({delta}) WHERE true
+        ON CONFLICT({_BALANCE_BUCKET_COLUMNS}) DO UPDATE SET
+            debit_total = debit_total + excluded.debit_total,
+            credit_total = credit_total + excluded.credit_total,
+            line_count = line_count + excluded.line_count,
+            min_date = MIN(min_date, excluded.min_date),
+            max_date = MAX(max_date, excluded.max_date);
+        INSERT INTO account_daily_balances(
+            {_BALANCE_BUCKET_COLUMNS}, day, debit_total, credit_total, line_count,
+            cum_debit, cum_credit, cum_lines
+        )
+        SELECT s.account_id, s.period_id, s.status, s.is_adjusting, s.is_closing, s.is_reversing, s.day,
+               s.debit_total, s.credit_total, s.line_count,
+               {prev.format(col="cum_debit")}, {prev.format(col="cum_credit")}, {prev.format(col="cum_lines")}
+        FROM ({delta}) AS s WHERE s.day IS NOT NULL
+        ON CONFLICT({_BALANCE_BUCKET_COLUMNS}, day) DO UPDATE SET
+            debit_total = debit_total + excluded.debit_total,
+            credit_total = credit_total + excluded.credit_total,
+            line_count = line_count + excluded.line_count;
+        UPDATE account_daily_balances
+        SET cum_debit = account_daily_balances.cum_debit + s.debit_total,
+            cum_credit = account_daily_balances.cum_credit + s.credit_total,
+            cum_lines = account_daily_balances.cum_lines + s.line_count
+        FROM ({delta}) AS s
+        WHERE {_bucket_match("account_daily_balances", "s")} AND account_daily_balances.day >= s.day;
+    """
+
+
+def _balance_subtract_sql(delta: str) -> str:
+    """Statements removing ``delta`` from the period buckets and the daily prefix sums."""
+    return f"""
+        UPDATE account_period_balances
+        SET debit_total = account_period_balances.debit_total - s.debit_total,
+            credit_total = account_period_balances.credit_total - s.credit_total,
+            line_count = account_period_balances.line_count - s.line_count
+        FROM ({delta}) AS s
+        WHERE {_bucket_match("account_period_balances", "s")};
+        DELETE FROM account_period_balances
+        WHERE line_count <= 0 AND ({_BALANCE_BUCKET_COLUMNS}) IN (SELECT {_BALANCE_BUCKET_COLUMNS} FROM ({delta}));
+        UPDATE account_daily_balances
+        SET debit_total = account_daily_balances.debit_total
+                - CASE WHEN account_daily_balances.day = s.day THEN s.debit_total ELSE 0 END,
+            credit_total = account_daily_balances.credit_total
+                - CASE WHEN account_daily_balances.day = s.day THEN s.credit_total ELSE 0 END,
+            line_count = account_daily_balances.line_count
+                - CASE WHEN account_daily_balances.day = s.day THEN s.line_count ELSE 0 END,
+            cum_debit = account_daily_balances.cum_debit - s.debit_total,
+            cum_credit = account_daily_balances.cum_credit - s.credit_total,
+            cum_lines = account_daily_balances.cum_lines - s.line_count
+        FROM ({delta}) AS s
+        WHERE {_bucket_match("account_daily_balances", "s")} AND account_daily_balances.day >= s.day;
+        DELETE FROM account_daily_balances
+        WHERE line_count <= 0
+          AND ({_BALANCE_BUCKET_COLUMNS}, day) IN (SELECT {_BALANCE_BUCKET_COLUMNS}, day FROM ({delta}));
+    """
+
+
+_BALANCE_TRIGGERS = (
+    "trg_balances_line_insert",
+    "trg_balances_line_delete",
+    "trg_balances_line_update",
+    "trg_balances_entry_delete",
+    "trg_balances_entry_update",
+)
+
+
+def _ensure_balance_triggers(conn: sqlite3.Connection) -> None:
+    """(Re)create the triggers that maintain the materialized balance tables."""
+    new_line = _balance_delta_select(
+        "je",
+        "(SELECT NEW.account_id AS account_id, NEW.debit AS debit, NEW.credit AS credit) AS l "
+        "JOIN journal_entries je ON je.id = NEW.entry_id",
+    )
+    old_line = _balance_delta_select(
+        "je",
+        "(SELECT OLD.account_id AS account_id, OLD.debit AS debit, OLD.credit AS credit) AS l "
+        "JOIN journal_entries je ON je.id = OLD.entry_id",
+    )
+    old_entry = _balance_delta_select("OLD", "journal_lines AS l WHERE l.entry_id = OLD.id")
+    new_entry = _balance_delta_select("NEW", "journal_lines AS l WHERE l.entry_id = NEW.id")
+    for name in _BALANCE_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.executescript(
+        f"""
+        CREATE TRIGGER trg_balances_line_insert
+        AFTER INSERT ON journal_lines
+        WHEN NOT EXISTS (SELECT 1 FROM balance_rollup_suspend)
+        BEGIN
+            {_balance_add_sql(new_line)}
+        END;
+
+        CREATE TRIGGER trg_balances_line_delete
+        AFTER DELETE ON journal_lines
+        BEGIN
+            {_balance_subtract_sql(old_line)}
+        END;
+
+        CREATE TRIGGER trg_balances_line_update
+        AFTER UPDATE OF entry_id, account_id, debit, credit ON journal_lines
+        BEGIN
+            {_balance_subtract_sql(old_line)}
+            {_balance_add_sql(new_line)}
+        END;
+
+        -- Runs before the cascade removes the lines; the per-line delete trigger
+        -- then finds no header and leaves the balances alone.
+        CREATE TRIGGER trg_balances_entry_delete
+        BEFORE DELETE ON journal_entries
+        BEGIN
+            {_balance_subtract_sql(old_entry)}
+        END;
+
+        CREATE TRIGGER trg_balances_entry_update
+        AFTER UPDATE OF date, period_id, status, is_adjusting, is_closing, is_reversing ON journal_entries
+        BEGIN
+            {_balance_subtract_sql(old_entry)}
+            {_balance_add_sql(new_entry)}
+        END;
+        """
+    )
+
+def _apply_bulk_balance_deltas(conn: sqlite3.Connection, first_entry_id: int, last_entry_id: int) -> None:
+    """
+    Add the lines of entries ``first_entry_id..last_entry_id`` to the balance
+    tables in a few set-based statements. Used by bulk posting, which inserts
+    those lines while ``balance_rollup_suspend`` holds a row so the per-line
+    trigger stays out of the way.
+    """
+    conn.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS bulk_balance_delta (
+            {_BALANCE_BUCKET_COLUMNS}, day, debit_total, credit_total, line_count
+        )
+        """
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS temp.idx_bulk_balance_delta ON bulk_balance_delta({_BALANCE_BUCKET_COLUMNS}, day)"
+    )
+    conn.execute("DELETE FROM temp.bulk_balance_delta")
+    conn.execute(
+        f"""
+        INSERT INTO temp.bulk_balance_delta
+        SELECT jl.account_id, {_balance_bucket_values("je")}, date(je.date) AS day,
+               SUM(jl.debit), SUM(jl.credit), COUNT(*)
+        FROM journal_lines jl
+        JOIN journal_entries je ON je.id = jl.entry_id
+        WHERE jl.entry_id BETWEEN ? AND ?
+        GROUP BY 1, 2, 3, 4, 5, 6, 7
+        """,
+        (first_entry_id, last_entry_id),
+    )
+    conn.execute(
+        f"""
+        INSERT INTO account_period_balances(
+            {_BALANCE_BUCKET_COLUMNS}, debit_total, credit_total, line_count, min_date, max_date
+        )
+        SELECT {_BALANCE_BUCKET_COLUMNS}, SUM(debit_total), SUM(credit_total), SUM(line_count),
+               MIN(COALESCE(day, '0000-00-00')), MAX(COALESCE(day, '9999-12-31'))
+        FROM temp.bulk_balance_delta
+        GROUP BY {_BALANCE_BUCKET_COLUMNS}
+        ON CONFLICT({_BALANCE_BUCKET_COLUMNS}) DO UPDATE SET
+            debit_total = debit_total + excluded.debit_total,
+            credit_total = credit_total + excluded.credit_total,
+            line_count = line_count + excluded.line_count,
+            min_date = MIN(min_date, excluded.min_date),
+            max_date = MAX(max_date, excluded.max_date)
+        """
+    )
+    # New days start from the running totals of the previous existing day.
+    prev = (
+        "COALESCE((SELECT x.{col} FROM account_daily_balances x WHERE "
+        + _bucket_match("x", "s")
+        + " AND x.day < s.day ORDER BY x.day DESC LIMIT 1), 0)"
+    )
+    conn.execute(
+        f"""
+        INSERT INTO account_daily_balances(
+            {_BALANCE_BUCKET_COLUMNS}, day, debit_total, credit_total, line_count,
+            cum_debit, cum_credit, cum_lines
+        )
+        SELECT s.account_id, s.period_id, s.status, s.is_adjusting, s.is_closing, s.is_reversing, s.day,
+               s.debit_total, s.credit_total, s.line_count,
+               {prev.format(col="cum_debit")}, {prev.format(col="cum_credit")}, {prev.format(col="cum_lines")}
+        FROM temp.bulk_balance_delta AS s WHERE s.day IS NOT NULL
+        ON CONFLICT({_BALANCE_BUCKET_COLUMNS}, day) DO UPDATE SET
+            debit_total = debit_total + excluded.debit_total,
+            credit_total = credit_total + excluded.credit_total,
+            line_count = line_count + excluded.line_count
+        """
+    )
+    # Every daily row at or after a batch day gains the batch's totals up to
+    # and including that day: split each bucket's batch days into segments
+    # [day, next day) carrying running sums, so the update only reaches the
+    # affected buckets from their earliest batch day on, through the key.
+    conn.execute(
+        f"""
+        UPDATE account_daily_balances AS d
+        SET cum_debit = d.cum_debit + s.cum_debit,
+            cum_credit = d.cum_credit + s.cum_credit,
+            cum_lines = d.cum_lines + s.cum_lines
+        FROM (
+            SELECT {_BALANCE_BUCKET_COLUMNS}, day,
+                   LEAD(day) OVER bucket AS next_day,
+                   SUM(debit_total) OVER bucket AS cum_debit,
+                   SUM(credit_total) OVER bucket AS cum_credit,
+                   SUM(line_count) OVER bucket AS cum_lines
+            FROM temp.bulk_balance_delta
+            WHERE day IS NOT NULL
+            WINDOW bucket AS (PARTITION BY {_BALANCE_BUCKET_COLUMNS} ORDER BY day)
+        ) AS s
+        WHERE {_bucket_match("d", "s")} AND d.day >= s.day AND (s.next_day IS NULL OR d.day < s.next_day)
+        """
+    )
+    conn.execute("DELETE FROM temp.bulk_balance_delta")
+
+
+
+def rebuild_account_period_balances(*, conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Recompute account_period_balances from journal_lines.
+    Used to backfill existing databases; returns the number of buckets written.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        conn.execute("DELETE FROM account_period_balances")
+        conn.execute(
+            f"""
+            INSERT INTO account_period_balances(
+                {_BALANCE_BUCKET_COLUMNS}, debit_total, credit_total, line_count, min_date, max_date
+            )
+            SELECT jl.account_id, {_balance_bucket_values("je")},
+                   SUM(jl.debit), SUM(jl.credit), COUNT(*),
+                   MIN(COALESCE(date(je.date), '0000-00-00')), MAX(COALESCE(date(je.date), '9999-12-31'))
+            FROM journal_lines jl
+            JOIN journal_entries je ON je.id = jl.entry_id
+            GROUP BY 1, 2, 3, 4, 5, 6
+            """
+        )
+        _commit(conn)
+        row = conn.execute("SELECT COUNT(*) AS n FROM account_period_balances").fetchone()
+        return int(row["n"])
+    finally:
+        if not owned:
+            conn.close()
+
+
+def rebuild_account_daily_balances(*, conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Recompute account_daily_balances (daily totals plus running prefix sums)
+    from journal_lines. Returns the number of daily rows written.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        conn.execute("DELETE FROM account_daily_balances")
+        conn.execute(
+            f"""
+            INSERT INTO account_daily_balances(
+                {_BALANCE_BUCKET_COLUMNS}, day, debit_total, credit_total, line_count,
+                cum_debit, cum_credit, cum_lines
+            )
+            SELECT {_BALANCE_BUCKET_COLUMNS}, day, debit_total, credit_total, line_count,
+                   SUM(debit_total) OVER w, SUM(credit_total) OVER w, SUM(line_count) OVER w
+            FROM (
+                SELECT jl.account_id AS account_id, {_balance_bucket_values("je")}, date(je.date) AS day,
+                       SUM(jl.debit) AS debit_total, SUM(jl.credit) AS credit_total, COUNT(*) AS line_count
+                FROM journal_lines jl
+                JOIN journal_entries je ON je.id = jl.entry_id
+                WHERE date(je.date) IS NOT NULL
+                GROUP BY 1, 2, 3, 4, 5, 6, 7
+            )
+            WINDOW w AS (PARTITION BY {_BALANCE_BUCKET_COLUMNS} ORDER BY day)
+            """
+        )
+        _commit(conn)
+        row = conn.execute("SELECT COUNT(*) AS n FROM account_daily_balances").fetchone()
+        return int(row["n"])
+    finally:
+        if not owned:
+            conn.close()
+
+
+def rebuild_balance_rollups(*, conn: Optional[sqlite3.Connection] = None) -> Dict[str, int]:
+    """Backfill both materialized balance tables; returns row counts per table."""
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        return {
+            "account_period_balances": rebuild_account_period_balances(conn=conn),
+            "account_daily_balances": rebuild_account_daily_balances(conn=conn),
+        }
+    finally:
+        if not owned:
+            conn.close()
+
+
+# --- Full-text search index -------------------------------------------------
+
+# One FTS5 table covers journal entries, accounts, customers and vendors. Each
+# kind owns a rowid range (slot * SEARCH_KIND_SPAN + id), so a search limited to
+# one kind is a rowid range FTS5 seeks to directly. Entries also index the
+# codes and names of the accounts on their lines. Triggers keep it in sync;
+# bulk posting indexes its entries set-based instead (see
+# insert_journal_entries_bulk).
+SEARCH_KINDS = {"entry": 0, "account": 1, "customer": 2, "vendor": 3}
+SEARCH_KIND_SPAN = 1 << 40
+
+_SEARCH_TRIGGERS = (
+    "trg_search_entry_insert",
+    "trg_search_entry_update",
+    "trg_search_entry_delete",
+    "trg_search_line_insert",
+    "trg_search_line_delete",
+    "trg_search_line_update",
+    "trg_search_account_insert",
+    "trg_search_account_update",
+    "trg_search_account_delete",
+    "trg_search_customer_insert",
+    "trg_search_customer_update",
+    "trg_search_customer_delete",
+    "trg_search_vendor_insert",
+    "trg_search_vendor_update",
+    "trg_search_vendor_delete",
+)
+
+
+def search_rowid(kind: str, ref_id: Any) -> str:
+    """SQL expression for the search_index rowid of ``ref_id`` (SQL) of ``kind``."""
+    base = SEARCH_KINDS[kind] * SEARCH_KIND_SPAN
+    return f"({ref_id})" if not base else f"({ref_id}) + {base}"
+
+
+def search_rowid_range(kind: str) -> Tuple[int, int]:
+    base = SEARCH_KINDS[kind] * SEARCH_KIND_SPAN
+    return base, base + SEARCH_KIND_SPAN - 1
+
+
+def _search_entry_docs(where: str) -> str:
+    """INSERT of the index rows for the journal entries matching ``where`` (alias je)."""
+    return f"""
+        INSERT INTO search_index(rowid, kind, ref_id, title, detail, accounts)
+        SELECT {search_rowid("entry", "je.id")}, 'entry', je.id, je.description,
+               trim(COALESCE(je.document_ref, '') || ' ' || COALESCE(je.external_ref, '') || ' ' || COALESCE(je.memo, '')),
+               (SELECT group_concat(a.code || ' ' || a.name, ' ')
+                FROM (SELECT DISTINCT account_id FROM journal_lines WHERE entry_id = je.id) AS l
+                JOIN accounts a ON a.id = l.account_id)
+        FROM journal_entries je
+        WHERE {where};
+    """
+
+
+def _search_refresh_entry(entry_id: str) -> str:
+    return (
+        f"DELETE FROM search_index WHERE rowid = {search_rowid('entry', entry_id)};"
+        + _search_entry_docs(f"je.id = {entry_id}")
+    )
+
+
+def _search_party_docs(table: str, where: str) -> str:
+    kind = table[:-1]
+    return f"""
+        INSERT INTO search_index(rowid, kind, ref_id, title, detail, accounts)
+        SELECT {search_rowid(kind, "p.id")}, '{kind}', p.id, p.name,
+               trim(p.code || ' ' || COALESCE(p.contact, '') || ' ' || COALESCE(p.email, '') || ' ' || COALESCE(p.phone, '')),
+               NULL
+        FROM {table} p
+        WHERE {where};
+    """
+
+
+def _search_account_docs(where: str) -> str:
+    return f"""
+        INSERT INTO search_index(rowid, kind, ref_id, title, detail, accounts)
+        SELECT {search_rowid("account", "a.id")}, 'account', a.id, a.name, a.code || ' ' || a.type, NULL
+        FROM accounts a
+        WHERE {where};
+    """
+
+
+def _ensure_search_index(conn: sqlite3.Connection) -> None:
+    """Create the FTS5 search index and its triggers; backfills a new index."""
+    try:
+        created = _ensure_table(
+            conn,
+            "search_index",
+            """
+            CREATE VIRTUAL TABLE search_index USING fts5(
+                kind UNINDEXED, ref_id UNINDEXED, title, detail, accounts,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """,
+        )
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5: search falls back to LIKE scans.
+        return
+    if created:
+        # Title matches outrank reference/memo matches, which outrank line accounts.
+        conn.execute("INSERT INTO search_index(search_index, rank) VALUES ('rank', 'bm25(0.0, 0.0, 10.0, 4.0, 1.0)')")
+    for name in _SEARCH_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    party_triggers = []
+    for table in ("customers", "vendors"):
+        kind = table[:-1]
+        party_triggers.append(
+            f"""
+            CREATE TRIGGER trg_search_{kind}_insert AFTER INSERT ON {table}
+            BEGIN
+                {_search_party_docs(table, "p.id = NEW.id")}
+            END;
+
+            CREATE TRIGGER trg_search_{kind}_update AFTER UPDATE OF id, name, code, contact, email, phone ON {table}
+            BEGIN
+                DELETE FROM search_index WHERE rowid = {search_rowid(kind, "OLD.id")};
+                {_search_party_docs(table, "p.id = NEW.id")}
+            END;
+
+            CREATE TRIGGER trg_search_{kind}_delete AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM search_index WHERE rowid = {search_rowid(kind, "OLD.id")};
+            END;
+            """
+        )
+    renamed = "(OLD.name IS NOT NEW.name OR OLD.code IS NOT NEW.code)"
+    conn.executescript(
+        f"""
+        CREATE TRIGGER trg_search_entry_insert AFTER INSERT ON journal_entries
+        WHEN NOT EXISTS (SELECT 1 FROM balance_rollup_suspend)
+        BEGIN
+            {_search_entry_docs("je.id = NEW.id")}
+        END;
+
+        CREATE TRIGGER trg_search_entry_update
+        AFTER UPDATE OF id, description, document_ref, external_ref, memo ON journal_entries
+        BEGIN
+            DELETE FROM search_index WHERE rowid = {search_rowid("entry", "OLD.id")};
+            {_search_refresh_entry("NEW.id")}
+        END;
+
+        CREATE TRIGGER trg_search_entry_delete AFTER DELETE ON journal_entries
+        BEGIN
+            DELETE FROM search_index WHERE rowid = {search_rowid("entry", "OLD.id")};
+        END;
+
+        -- Line triggers only fire when the entry's set of accounts changes; the
+        -- refresh inserts nothing once the entry itself is gone (cascades).
+        CREATE TRIGGER trg_search_line_insert AFTER INSERT ON journal_lines
+        WHEN NOT EXISTS (SELECT 1 FROM balance_rollup_suspend)
+         AND NOT EXISTS (
+            SELECT 1 FROM journal_lines
+            WHERE entry_id = NEW.entry_id AND account_id = NEW.account_id AND id <> NEW.id
+         )
+        BEGIN
+            {_search_refresh_entry("NEW.entry_id")}
+        END;
+
+        CREATE TRIGGER trg_search_line_delete AFTER DELETE ON journal_lines
+        WHEN NOT EXISTS (SELECT 1 FROM journal_lines WHERE entry_id = OLD.entry_id AND account_id = OLD.account_id)
+        BEGIN
+            {_search_refresh_entry("OLD.entry_id")}
+        END;
+
+        CREATE TRIGGER trg_search_line_update AFTER UPDATE OF entry_id, account_id ON journal_lines
+        BEGIN
+            {_search_refresh_entry("OLD.entry_id")}
+            {_search_refresh_entry("NEW.entry_id")}
+        END;
+
+        CREATE TRIGGER trg_search_account_insert AFTER INSERT ON accounts
+        BEGIN
+            {_search_account_docs("a.id = NEW.id")}
+        END;
+
+        -- A renamed account also re-indexes the entries that post to it.
+        CREATE TRIGGER trg_search_account_update AFTER UPDATE OF id, name, code, type ON accounts
+        BEGIN
+            DELETE FROM search_index WHERE rowid = {search_rowid("account", "OLD.id")};
+            {_search_account_docs("a.id = NEW.id")}
+            DELETE FROM search_index
+            WHERE {renamed}
+              AND rowid IN (SELECT DISTINCT {search_rowid("entry", "entry_id")} FROM journal_lines WHERE account_id = NEW.id);
+            {_search_entry_docs(f"{renamed} AND je.id IN (SELECT entry_id FROM journal_lines WHERE account_id = NEW.id)")}
+        END;
+
+        CREATE TRIGGER trg_search_account_delete AFTER DELETE ON accounts
+        BEGIN
+            DELETE FROM search_index WHERE rowid = {search_rowid("account", "OLD.id")};
+        END;
+        """
+        + "\n".join(party_triggers)
+    )
+    if created:
+        rebuild_search_index(conn=conn)
+
+
+def _index_entries(conn: sqlite3.Connection, first_entry_id: int, last_entry_id: int) -> None:
+    """(Re)index entries ``first_entry_id..last_entry_id`` in two statements."""
+    conn.execute(
+        f"DELETE FROM search_index WHERE rowid BETWEEN {search_rowid('entry', '?1')} AND {search_rowid('entry', '?2')}",
+        (first_entry_id, last_entry_id),
+    )
+    conn.execute(_search_entry_docs("je.id BETWEEN ? AND ?"), (first_entry_id, last_entry_id))
+
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    cur = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='search_index'")
+    return cur.fetchone() is not None
+
+
+def rebuild_search_index(*, conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Repopulate the full-text search index from the source tables and merge its
+    segments. Used to backfill existing databases; returns the rows indexed.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        conn.execute("DELETE FROM search_index")
+        conn.execute(_search_entry_docs("1"))
+        conn.execute(_search_account_docs("1"))
+        for table in ("customers", "vendors"):
+            conn.execute(_search_party_docs(table, "1"))
+        conn.execute("INSERT INTO search_index(search_index) VALUES ('optimize')")
+        _commit(conn)
+        row = conn.execute("SELECT COUNT(*) AS n FROM search_index").fetchone()
+        return int(row["n"])
+    finally:
+        if not owned:
+            conn.close()
+
+
+# --- Ledger version ----------------------------------------------------------
+
+# Counters bumped in the same transaction as every change to entries, lines or
+# accounts, so derived results (dashboard metrics, cached reports) can be
+# checked against them across connections: one for the whole ledger, one for
+# accounts and one per period (0 = entries without a period). The token is
+# drawn when the row is created, which keeps versions of a recreated database
+# from matching old ones.
+_LEDGER_VERSION_TRIGGERS = (
+    "trg_ledger_version_entry_insert",
+    "trg_ledger_version_entry_update",
+    "trg_ledger_version_entry_delete",
+    "trg_ledger_version_line_insert",
+    "trg_ledger_version_line_update",
+    "trg_ledger_version_line_delete",
+    "trg_ledger_version_account_insert",
+    "trg_ledger_version_account_update",
+    "trg_ledger_version_account_delete",
+)
+
+_BUMP_LEDGER_VERSION = "UPDATE ledger_version SET version = version + 1 WHERE id = 1"
+
+
+def _bump_period_version_sql(select: str) -> str:
+    """Bump the version of every period ``select`` returns (as ``period_id``)."""
+    # WHERE true: an upsert after INSERT ... SELECT needs a WHERE to parse.
+    return f"""
+        INSERT INTO ledger_period_versions(period_id, version)
+        SELECT DISTINCT COALESCE(period_id, 0), 1 FROM ({select}) WHERE true
+        ON CONFLICT(period_id) DO UPDATE SET version = version + 1
+    """
+
+
+def _ensure_ledger_version(conn: sqlite3.Connection) -> None:
+    """Create the ledger version counters and the triggers that bump them."""
+    _ensure_table(
+        conn,
+        "ledger_version",
+        """
+        CREATE TABLE ledger_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            token TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            accounts_version INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+    )
+    _ensure_column(conn, "ledger_version", "accounts_version INTEGER NOT NULL DEFAULT 0")
+    conn.execute("INSERT OR IGNORE INTO ledger_version(id, token) VALUES (1, lower(hex(randomblob(8))))")
+    _ensure_table(
+        conn,
+        "ledger_period_versions",
+        """
+        CREATE TABLE ledger_period_versions (
+            period_id INTEGER PRIMARY KEY,   -- 0 = entries without a period
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+    )
+    for name in _LEDGER_VERSION_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    # Bulk posting suspends the insert triggers and bumps once for the whole
+    # batch instead (see _bump_ledger_version_bulk).
+    suspended = "WHEN NOT EXISTS (SELECT 1 FROM balance_rollup_suspend)"
+    entry_period = "SELECT period_id FROM journal_entries WHERE id = {row}.entry_id"
+    conn.executescript(
+        f"""
+        CREATE TRIGGER trg_ledger_version_entry_insert AFTER INSERT ON journal_entries {suspended}
+        BEGIN
+            {_BUMP_LEDGER_VERSION};
+            {_bump_period_version_sql("SELECT NEW.period_id AS period_id")};
+        END;
+
+        CREATE TRIGGER trg_ledger_version_entry_update AFTER UPDATE ON journal_entries
+        BEGIN
+            {_BUMP_LEDGER_VERSION};
+            {_bump_period_version_sql("SELECT OLD.period_id AS period_id UNION SELECT NEW.period_id")};
+        END;
+
+        CREATE TRIGGER trg_ledger_version_entry_delete AFTER DELETE ON journal_entries
+        BEGIN
+            {_BUMP_LEDGER_VERSION};
+            {_bump_period_version_sql("SELECT OLD.period_id AS period_id")};
+        END;
+
+        CREATE TRIGGER trg_ledger_version_line_insert AFTER INSERT ON journal_lines {suspended}
+        BEGIN
+            {_BUMP_LEDGER_VERSION};
+            {_bump_period_version_sql(entry_period.format(row="NEW"))};
+        END;
+
+        CREATE TRIGGER trg_ledger_version_line_update AFTER UPDATE ON journal_lines
+        BEGIN
+            {_BUMP_LEDGER_VERSION};
+            {_bump_period_version_sql("SELECT period_id FROM journal_entries WHERE id IN (OLD.entry_id, NEW.entry_id)")};
+        END;
+
+        -- Lines removed by an entry's cascade find no header; the entry's own
+        -- trigger has bumped its period already.
+        CREATE TRIGGER trg_ledger_version_line_delete AFTER DELETE ON journal_lines
+        BEGIN
+            {_BUMP_LEDGER_VERSION};
+            {_bump_period_version_sql(entry_period.format(row="OLD"))};
+        END;
+        """
+    )
+    for event in ("insert", "update", "delete"):
+        conn.execute(
+            f"""
+            CREATE TRIGGER trg_ledger_version_account_{event} AFTER {event.upper()} ON accounts
+            BEGIN
+                UPDATE ledger_version SET version = version + 1, accounts_version = accounts_version + 1 WHERE id = 1;
+            END
+            """
+        )
+
+
+def _bump_ledger_version_bulk(conn: sqlite3.Connection, first_entry_id: int, last_entry_id: int) -> None:
+    """Bump the versions once for bulk-posted entries ``first_entry_id..last_entry_id``."""
+    conn.execute(_BUMP_LEDGER_VERSION)
+    conn.execute(
+        _bump_period_version_sql("SELECT period_id FROM journal_entries WHERE id BETWEEN ? AND ?"),
+        (first_entry_id, last_entry_id),
+    )
+
+
+def invalidate_ledger_versions(conn: sqlite3.Connection) -> None:
+    """Bump every ledger counter, e.g. after rows were loaded with the triggers suspended."""
+    conn.execute(
+        "UPDATE ledger_version SET version = version + 1, accounts_version = accounts_version + 1 WHERE id = 1"
+    )
+    conn.execute("UPDATE ledger_period_versions SET version = version + 1")
+    conn.execute(_bump_period_version_sql("SELECT period_id FROM journal_entries"))
+
+
+def get_ledger_version(conn: Optional[sqlite3.Connection] = None, *, period_id: Optional[int] = None) -> Tuple:
+    """
+    Version token of the ledger: ``(token, version)``, which changes whenever
+    entries, lines or accounts do. With ``period_id`` it is ``(token,
+    accounts_version, period_version)`` instead, which only changes when an
+    entry of that period (or any account) does.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        if period_id is None:
+            row = conn.execute("SELECT token, version FROM ledger_version WHERE id = 1").fetchone()
+            return (row["token"], int(row["version"])) if row else ("", 0)
+        row = conn.execute(
+            """
+            SELECT token, accounts_version,
+                   COALESCE((SELECT version FROM ledger_period_versions WHERE period_id = ?), 0) AS period_version
+            FROM ledger_version WHERE id = 1
+            """,
+            (int(period_id),),
+        ).fetchone()
+        return (row["token"], int(row["accounts_version"]), int(row["period_version"])) if row else ("", 0, 0)
+    finally:
+        if not owned:
+            conn.close()
+
+
 # --- Simple helpers for users / roles / companies --------------------------
 
 def ensure_default_role_and_user(*, conn: Optional[sqlite3.Connection] = None) -> None:
@@ -843,7 +2026,7 @@ def ensure_default_role_and_user(*, conn: Optional[sqlite3.Connection] = None) -
                     """,
                     (role_id, company_id, default_password_hash),
                 )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -893,7 +2076,7 @@ def create_currency(
             """,
             (code, name, symbol),
         )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -932,7 +2115,7 @@ def create_tax_code(
             """,
             (code, name, float(rate), account_id),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -1006,7 +2189,7 @@ def set_period_closed(
             "UPDATE accounting_periods SET is_closed=? WHERE id=?",
             (1 if is_closed else 0, period_id),
         )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -1034,7 +2217,7 @@ def create_customer(
             """,
             (name, code, contact, email, phone),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -1075,7 +2258,7 @@ def create_vendor(
             """,
             (name, code, contact, email, phone),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -1118,7 +2301,7 @@ def create_sales_invoice(
             """,
             (customer_id, entry_id, invoice_no, date, due_date, float(total_amount), status),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -1147,7 +2330,7 @@ def create_purchase_bill(
             """,
             (vendor_id, entry_id, bill_no, date, due_date, float(total_amount), status),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -1167,13 +2350,16 @@ def _ensure_column(conn: sqlite3.Connection, table: str, column_def: str) -> Non
         pass
 
 
-def _ensure_table(conn: sqlite3.Connection, table: str, create_sql: str) -> None:
+def _ensure_table(conn: sqlite3.Connection, table: str, create_sql: str) -> bool:
+    """Create ``table`` if missing; returns True when it was just created."""
     cur = conn.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
         (table,),
     )
     if cur.fetchone() is None:
         conn.execute(create_sql)
+        return True
+    return False
 
 
 def seed_chart_of_accounts(conn: Optional[sqlite3.Connection] = None) -> None:
@@ -1235,7 +2421,7 @@ def seed_chart_of_accounts(conn: Optional[sqlite3.Connection] = None) -> None:
             """,
             rows,
         )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -1336,39 +2522,215 @@ def insert_journal_entry(
             ),
         )
         entry_id = cur.lastrowid
+        stored_date = conn.execute("SELECT date FROM journal_entries WHERE id = ?", (entry_id,)).fetchone()[0]
         for account_id, debit, credit in lines_list:
             cur.execute(
                 """
-                INSERT INTO journal_lines(entry_id, account_id, debit, credit)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO journal_lines(entry_id, account_id, debit, credit, entry_date)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (entry_id, account_id, float(debit), float(credit), stored_date),
+            )
+        _commit(conn)
+
+        log_audit(
+            action="journal_entry_created",
+            details=json.dumps(
+                {
+                    "entry_id": entry_id,
+                    "date": date,
+                    "description": description,
+                    "is_adjusting": bool(is_adjusting),
+                    "is_closing": bool(is_closing),
+                    "is_reversing": bool(is_reversing),
+                    "period_id": period_id,
+                    "status": status,
+                }
+            ),
+            user=created_by,
+            conn=conn,
+        )
+        return int(entry_id)
+    finally:
+        if not owned:
+            conn.close()
+
+def insert_journal_entries_bulk(
+    entries: Iterable[Dict[str, Any]],
+    *,
+    all_or_nothing: bool = True,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Tuple[List[Optional[int]], List[Tuple[int, str]]]:
+    """
+    Insert many balanced journal entries in a single transaction.
+
+    Each entry is a dict of :func:`insert_journal_entry` keyword arguments
+    (``date``, ``description``, ``lines`` plus the optional flags and refs),
+    optionally with ``attachments`` as ``(label, path)`` pairs and
+    ``schedule_reverse_on``.  The whole batch is validated before anything
+    is written; with ``all_or_nothing`` any invalid entry raises ValueError,
+    otherwise invalid entries are skipped.
+
+    Returns ``(ids, errors)``: ``ids`` lines up with ``entries`` (None for
+    skipped ones) and ``errors`` holds ``(index, message)`` pairs.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        entries = list(entries)
+        account_ids = {int(r[0]) for r in conn.execute("SELECT id FROM accounts")}
+        default_period_id: Optional[int] = None
+        if any(e.get("period_id") is None for e in entries):
+            period = get_current_period(conn=conn)
+            default_period_id = period["id"] if period else None
+
+        errors: List[Tuple[int, str]] = []
+        valid: List[Tuple[int, Dict[str, Any], List[Tuple[int, float, float]]]] = []
+        for index, entry in enumerate(entries):
+            try:
+                if not entry.get("date") or entry.get("description") is None:
+                    raise ValueError("Journal entry needs a date and a description.")
+                lines_list = [(int(a), float(d or 0), float(c or 0)) for a, d, c in entry.get("lines") or ()]
+                if not lines_list:
+                    raise ValueError("Journal entry must have at least one line (debit or credit).")
+                unknown = sorted({a for a, _, _ in lines_list if a not in account_ids})
+                if unknown:
+                    raise ValueError(f"Unknown account id(s): {', '.join(map(str, unknown))}.")
+                total_debits = sum(d for _, d, _ in lines_list)
+                total_credits = sum(c for _, _, c in lines_list)
+                if round(total_debits - total_credits, 2) != 0:
+                    raise ValueError("Entry is not balanced: debits must equal credits.")
+            except (TypeError, ValueError) as exc:
+                errors.append((index, str(exc)))
+                continue
+            valid.append((index, entry, lines_list))
+
+        if errors and all_or_nothing:
+            detail = "; ".join(f"#{i}: {msg}" for i, msg in errors[:5])
+            more = f" (+{len(errors) - 5} more)" if len(errors) > 5 else ""
+            raise ValueError(f"{len(errors)} of {len(entries)} entries rejected: {detail}{more}")
+
+        ids: List[Optional[int]] = [None] * len(entries)
+        if not valid:
+            return ids, errors
+
+        with unit_of_work(conn):
+            next_id = int(
+                conn.execute(
+                    """
+                    SELECT MAX(
+                        COALESCE((SELECT MAX(id) FROM journal_entries), 0),
+                        COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'journal_entries'), 0)
+                    ) + 1
+                    """
+                ).fetchone()[0]
+            )
+            now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            headers, lines_rows, audit_rows, documents, reversals = [], [], [], [], []
+            for offset, (index, entry, lines_list) in enumerate(valid):
+                entry_id = next_id + offset
+                ids[index] = entry_id
+                status = entry.get("status") or "posted"
+                posted = status == "posted"
+                period_id = entry.get("period_id")
+                if period_id is None:
+                    period_id = default_period_id
+                created_by = entry.get("created_by") or "system"
+                flags = [int(bool(entry.get(k))) for k in ("is_adjusting", "is_closing", "is_reversing")]
+                headers.append(
+                    (
+                        entry_id,
+                        entry["date"],
+                        entry["description"],
+                        *flags,
+                        entry.get("document_ref"),
+                        entry.get("external_ref"),
+                        entry.get("memo"),
+                        period_id,
+                        entry.get("source_type"),
+                        status,
+                        created_by,
+                        now if posted else None,
+                        entry.get("posted_by") if posted else None,
+                        entry.get("company_id"),
+                        entry.get("created_by_user_id"),
+                        entry.get("posted_by_user_id") if posted else None,
+                    )
+                )
+                lines_rows.extend((entry_id, a, d, c) for a, d, c in lines_list)
+                audit_rows.append(
+                    (
+                        created_by,
+                        "journal_entry_created",
+                        json.dumps(
+                            {
+                                "entry_id": entry_id,
+                                "date": entry["date"],
+                                "description": entry["description"],
+                                "is_adjusting": bool(flags[0]),
+                                "is_closing": bool(flags[1]),
+                                "is_reversing": bool(flags[2]),
+                                "period_id": period_id,
+                                "status": status,
+                            }
+                        ),
+                        now,
+                    )
+                )
+                documents.extend(
+                    (entry_id, label, path) for label, path in entry.get("attachments") or () if path
+                )
+                if entry.get("schedule_reverse_on"):
+                    reversals.append((entry_id, entry["schedule_reverse_on"]))
+
+            # Suspends the per-row rollup, search-index and ledger-version
+            # triggers; all are brought up to date once the lines are in.
+            conn.execute("INSERT INTO balance_rollup_suspend(flag) VALUES (1)")
+            conn.executemany(
+                """
+                INSERT INTO journal_entries(
+                    id, date, description, is_adjusting, is_closing, is_reversing,
+                    document_ref, external_ref, memo, period_id, source_type, status,
+                    created_by, posted_at, posted_by, company_id, created_by_user_id, posted_by_user_id
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (entry_id, account_id, float(debit), float(credit)),
+                headers,
             )
-        conn.commit()
-
-        log_audit(
-            action="journal_entry_created",
-            details=json.dumps(
-                {
-                    "entry_id": entry_id,
-                    "date": date,
-                    "description": description,
-                    "is_adjusting": bool(is_adjusting),
-                    "is_closing": bool(is_closing),
-                    "is_reversing": bool(is_reversing),
-                    "period_id": period_id,
-                    "status": status,
-                }
-            ),
-            user=created_by,
-            conn=conn,
-        )
-        return int(entry_id)
+            conn.executemany(
+                """
+                INSERT INTO journal_lines(entry_id, account_id, debit, credit, entry_date)
+                VALUES (?1, ?2, ?3, ?4, (SELECT date FROM journal_entries WHERE id = ?1))
+                """,
+                lines_rows,
+            )
+            conn.execute("DELETE FROM balance_rollup_suspend")
+            _apply_bulk_balance_deltas(conn, next_id, next_id + len(valid) - 1)
+            _bump_ledger_version_bulk(conn, next_id, next_id + len(valid) - 1)
+            if has_search_index(conn):
+                _index_entries(conn, next_id, next_id + len(valid) - 1)
+            if documents:
+                conn.executemany(
+                    "INSERT INTO source_documents(entry_id, label, file_path) VALUES (?, ?, ?)",
+                    documents,
+                )
+            if reversals:
+                conn.executemany(
+                    "INSERT INTO reversing_entry_queue(original_entry_id, reverse_on) VALUES (?, ?)",
+                    reversals,
+                )
+            conn.executemany(
+                "INSERT INTO audit_log(user, action, details, timestamp) VALUES (?, ?, ?, ?)",
+                audit_rows,
+            )
+        return ids, errors
     finally:
         if not owned:
             conn.close()
 
 
+
 def get_accounts(conn: Optional[sqlite3.Connection] = None) -> list[sqlite3.Row]:
     owned = conn is not None
     if not conn:
@@ -1434,7 +2796,7 @@ def ensure_default_period(*, conn: Optional[sqlite3.Connection] = None) -> sqlit
                 "UPDATE accounting_periods SET is_current=0 WHERE name<>?",
                 (period_name,),
             )
-            conn.commit()
+            _commit(conn)
             cur = conn.execute("SELECT * FROM accounting_periods WHERE name=?", (period_name,))
             row = cur.fetchone()
         ensure_cycle_steps(int(row["id"]), conn=conn)
@@ -1463,7 +2825,7 @@ def create_period(
             """,
             (name, start_date, end_date),
         )
-        conn.commit()
+        _commit(conn)
         row = conn.execute(
             "SELECT id FROM accounting_periods WHERE name=?",
             (name,),
@@ -1500,7 +2862,7 @@ def set_current_period(period_id: int, *, conn: Optional[sqlite3.Connection] = N
     try:
         conn.execute("UPDATE accounting_periods SET is_current=0")
         conn.execute("UPDATE accounting_periods SET is_current=1 WHERE id=?", (period_id,))
-        conn.commit()
+        _commit(conn)
         ensure_cycle_steps(period_id, conn=conn)
     finally:
         if not owned:
@@ -1542,7 +2904,7 @@ def realign_period(
         if set_as_current:
             conn.execute("UPDATE accounting_periods SET is_current = 0 WHERE id <> ?", (period_id,))
             conn.execute("UPDATE accounting_periods SET is_current = 1 WHERE id = ?", (period_id,))
-        conn.commit()
+        _commit(conn)
         ensure_cycle_steps(period_id, conn=conn)
     finally:
         if not owned:
@@ -1561,7 +2923,7 @@ def ensure_cycle_steps(period_id: int, *, conn: Optional[sqlite3.Connection] = N
             """,
             [(period_id, idx + 1, name) for idx, name in enumerate(ACCOUNTING_CYCLE_STEPS)],
         )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -1613,7 +2975,7 @@ def set_cycle_step_status(
             "UPDATE accounting_periods SET current_step=? WHERE id=?",
             (step, period_id),
         )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -1637,7 +2999,7 @@ def log_audit(
             """,
             (user, action, details, datetime.now(timezone.utc).isoformat(timespec="seconds")),
         )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -1685,7 +3047,7 @@ def create_adjustment_request(
             """,
             (period_id, description, requested_on, requested_by, notes),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -1743,7 +3105,7 @@ def link_adjustment_to_entry(
                 adjustment_id,
             ),
         )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -1770,7 +3132,7 @@ def update_adjustment_status(
             """,
             (status, notes, status, adjustment_id),
         )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -1796,7 +3158,7 @@ def capture_trial_balance_snapshot(
             """,
             (period_id, stage, as_of, payload),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -1857,7 +3219,7 @@ def add_source_document(
             """,
             (entry_id, label, file_path),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -1927,7 +3289,7 @@ def schedule_reversing_entry(
                 int(authorization_level),
             ),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -1982,7 +3344,7 @@ def update_reversing_status(item_id: int, status: str, *, reversed_entry_id: Opt
             ,
             (status, reversed_entry_id, item_id),
         )
-        conn.commit()
+        _commit(conn)
         conn.execute(
             """
             INSERT INTO reversing_entry_history(queue_id, field, old_value, new_value)
@@ -1990,7 +3352,7 @@ def update_reversing_status(item_id: int, status: str, *, reversed_entry_id: Opt
             """,
             (item_id, old_status, status),
         )
-        conn.commit()
+        _commit(conn)
         
     finally:
         if not owned:
@@ -2012,54 +3374,267 @@ def get_account_by_name(name: str, conn: Optional[sqlite3.Connection] = None) ->
 def compute_trial_balance(
     *, from_date: Optional[str] = None, up_to_date: Optional[str] = None, include_temporary: bool = True, period_id: Optional[int] = None, exclude_closing: bool = False, exclude_adjusting: bool = False, conn: Optional[sqlite3.Connection] = None
 ) -> list[sqlite3.Row]:
+    """
+    Trial balance rows (account, net_debit, net_credit) for posted entries.
+
+    Served from account_period_balances when the requested date range covers
+    every bucket in scope (O(accounts)), from the daily prefix sums in
+    account_daily_balances for any other date range, and by scanning the
+    journal lines only on databases that have not been migrated.
+    """
     owned = conn is not None
     if not conn:
         conn = get_connection()
     try:
-        params: list = []
-        where_extra = ""
-        if up_to_date:
-            where_extra += " AND date(je.date) <= date(?)"
-            params.append(up_to_date)
-        if from_date:
-            where_extra += " AND date(je.date) >= date(?)"
-            params.append(from_date)
-
-        temp_filter = ""
-        if not include_temporary:
-            temp_filter = "AND a.is_permanent = 1"
+        options = dict(
+            from_date=from_date,
+            up_to_date=up_to_date,
+            include_temporary=include_temporary,
+            period_id=period_id,
+            exclude_closing=exclude_closing,
+            exclude_adjusting=exclude_adjusting,
+        )
+        try:
+            rows = _trial_balance_from_balances(conn, **options)
+            if rows is None:
+                rows = _trial_balance_from_daily(conn, **options)
+            return rows
+        except sqlite3.OperationalError:
+            # Database has not been migrated yet (no balance tables).
+            return _trial_balance_from_lines(conn, **options)
+    finally:
+        if not owned:
+            conn.close()
+
+
+def _trial_balance_from_balances(
+    conn: sqlite3.Connection,
+    *,
+    from_date: Optional[str],
+    up_to_date: Optional[str],
+    include_temporary: bool,
+    period_id: Optional[int],
+    exclude_closing: bool,
+    exclude_adjusting: bool,
+) -> Optional[list[sqlite3.Row]]:
+    """Trial balance from the materialized buckets, or None if dates cut through them."""
+    scope = " WHERE period_id = ?" if period_id is not None else ""
+    scope_params: list = [period_id] if period_id is not None else []
+    if from_date or up_to_date:
+        bounds = conn.execute(
+            f"""
+            SELECT MIN(min_date) AS lo, MAX(max_date) AS hi, date(?) AS from_d, date(?) AS to_d
+            FROM account_period_balances{scope}
+            """,
+            [from_date, up_to_date] + scope_params,
+        ).fetchone()
+        if bounds["lo"] is not None:
+            if from_date and (bounds["from_d"] is None or bounds["lo"] < bounds["from_d"]):
+                return None
+            if up_to_date and (bounds["to_d"] is None or bounds["hi"] > bounds["to_d"]):
+                return None
+
+    filters = ["status = 'posted'"]
+    params: list = []
+    if period_id is not None:
+        filters.append("period_id = ?")
+        params.append(period_id)
+    if exclude_closing:
+        filters.append("is_closing = 0")
+    if exclude_adjusting:
+        filters.append("is_adjusting = 0")
+    temp_filter = "AND a.is_permanent = 1" if not include_temporary else ""
+    # Mirror the line scan: without a date/period filter, accounts that have no
+    # lines at all are still listed with zero balances.
+    idle_accounts = ""
+    if not (from_date or up_to_date or period_id is not None):
+        idle_accounts = "OR NOT EXISTS (SELECT 1 FROM account_period_balances x WHERE x.account_id = a.id)"
+
+    balance_expr = "(COALESCE(b.debit_total,0) - COALESCE(b.credit_total,0))"
+    sql = f"""
+        SELECT a.id as account_id, a.code, a.name, a.type, a.normal_side,
+               ROUND(CASE WHEN {balance_expr} > 0 THEN {balance_expr} ELSE 0 END, 2) AS net_debit,
+               ROUND(CASE WHEN {balance_expr} < 0 THEN -({balance_expr}) ELSE 0 END, 2) AS net_credit
+        FROM accounts a
+        LEFT JOIN (
+            SELECT account_id, SUM(debit_total) AS debit_total, SUM(credit_total) AS credit_total,
+                   SUM(line_count) AS line_count
+            FROM account_period_balances
+            WHERE {' AND '.join(filters)}
+            GROUP BY account_id
+        ) b ON b.account_id = a.id
+        WHERE a.is_active = 1
+          {temp_filter}
+          AND (b.line_count > 0 {idle_accounts})
+        ORDER BY a.code
+    """
+    return conn.execute(sql, params).fetchall()
+
+
+def _trial_balance_from_daily(
+    conn: sqlite3.Connection,
+    *,
+    from_date: Optional[str],
+    up_to_date: Optional[str],
+    include_temporary: bool,
+    period_id: Optional[int],
+    exclude_closing: bool,
+    exclude_adjusting: bool,
+) -> list[sqlite3.Row]:
+    """
+    Date-filtered trial balance from the daily prefix sums: for every bucket,
+    the running totals at the last day <= up_to_date minus those at the last
+    day < from_date.
+    """
+    filters = ["p.status = 'posted'"]
+    params: list = []
+    hi_day = ""
+    if up_to_date:
+        hi_day = "AND x.day <= date(?)"
+        params.append(up_to_date)
+    lo_join = ""
+    if from_date:
+        lo_join = f"""
+            LEFT JOIN account_daily_balances lo ON lo.rowid = (
+                SELECT x.rowid FROM account_daily_balances x
+                WHERE {_bucket_match("x", "p")} AND x.day < date(?)
+                ORDER BY x.day DESC LIMIT 1
+            )
+        """
+        params.append(from_date)
+    if period_id is not None:
+        filters.append("p.period_id = ?")
+        params.append(period_id)
+    if exclude_closing:
+        filters.append("p.is_closing = 0")
+    if exclude_adjusting:
+        filters.append("p.is_adjusting = 0")
+    temp_filter = "AND a.is_permanent = 1" if not include_temporary else ""
+    lo = "COALESCE(lo.{col}, 0)" if from_date else "0"
+
+    balance_expr = "(COALESCE(b.debit_total,0) - COALESCE(b.credit_total,0))"
+    sql = f"""
+        SELECT a.id as account_id, a.code, a.name, a.type, a.normal_side,
+               ROUND(CASE WHEN {balance_expr} > 0 THEN {balance_expr} ELSE 0 END, 2) AS net_debit,
+               ROUND(CASE WHEN {balance_expr} < 0 THEN -({balance_expr}) ELSE 0 END, 2) AS net_credit
+        FROM accounts a
+        JOIN (
+            SELECT p.account_id,
+                   SUM(COALESCE(hi.cum_debit, 0) - {lo.format(col='cum_debit')}) AS debit_total,
+                   SUM(COALESCE(hi.cum_credit, 0) - {lo.format(col='cum_credit')}) AS credit_total,
+                   SUM(COALESCE(hi.cum_lines, 0) - {lo.format(col='cum_lines')}) AS line_count
+            FROM account_period_balances p
+            LEFT JOIN account_daily_balances hi ON hi.rowid = (
+                SELECT x.rowid FROM account_daily_balances x
+                WHERE {_bucket_match("x", "p")} {hi_day}
+                ORDER BY x.day DESC LIMIT 1
+            )
+            {lo_join}
+            WHERE {' AND '.join(filters)}
+            GROUP BY p.account_id
+        ) b ON b.account_id = a.id
+        WHERE a.is_active = 1
+          {temp_filter}
+          AND b.line_count > 0
+        ORDER BY a.code
+    """
+    return conn.execute(sql, params).fetchall()
+
+
+def _trial_balance_from_lines(
+    conn: sqlite3.Connection,
+    *,
+    from_date: Optional[str],
+    up_to_date: Optional[str],
+    include_temporary: bool,
+    period_id: Optional[int],
+    exclude_closing: bool,
+    exclude_adjusting: bool,
+) -> list[sqlite3.Row]:
+    params: list = []
+    where_extra = ""
+    if up_to_date:
+        where_extra += " AND je.date <= date(?)"
+        params.append(up_to_date)
+    if from_date:
+        where_extra += " AND je.date >= date(?)"
+        params.append(from_date)
+
+    temp_filter = ""
+    if not include_temporary:
+        temp_filter = "AND a.is_permanent = 1"
+
+    if period_id is not None:
+        where_extra += " AND je.period_id = ?"
+        params.append(period_id)
+
+    # Exclude closing entries if requested (for income statement calculations)
+    closing_filter = ""
+    if exclude_closing:
+        closing_filter = "AND (je.is_closing = 0 OR je.is_closing IS NULL)"
+
+    # Exclude adjusting entries if requested (for unadjusted trial balance)
+    adjusting_filter = ""
+    if exclude_adjusting:
+        adjusting_filter = "AND (je.is_adjusting = 0 OR je.is_adjusting IS NULL)"
+
+    # Compute a signed balance then split into non-negative net_debit / net_credit
+    # Only include posted entries for accurate balances
+    balance_expr = "(COALESCE(SUM(jl.debit),0) - COALESCE(SUM(jl.credit),0))"
+    sql = f"""
+        SELECT a.id as account_id, a.code, a.name, a.type, a.normal_side,
+               ROUND(CASE WHEN {balance_expr} > 0 THEN {balance_expr} ELSE 0 END, 2) AS net_debit,
+               ROUND(CASE WHEN {balance_expr} < 0 THEN -({balance_expr}) ELSE 0 END, 2) AS net_credit
+        FROM accounts a
+        LEFT JOIN journal_lines jl ON jl.account_id = a.id
+        LEFT JOIN journal_entries je ON je.id = jl.entry_id
+        WHERE a.is_active = 1 
+          AND (je.status = 'posted' OR je.status IS NULL OR je.id IS NULL)
+          {temp_filter} {where_extra} {closing_filter} {adjusting_filter}
+        GROUP BY a.id, a.code, a.name, a.type, a.normal_side
+        ORDER BY a.code
+    """
+    cur = conn.execute(sql, params)
+    return cur.fetchall()
 
-        if period_id is not None:
-            where_extra += " AND je.period_id = ?"
-            params.append(period_id)
 
-        # Exclude closing entries if requested (for income statement calculations)
-        closing_filter = ""
+def get_period_account_totals(
+    period_id: Optional[int],
+    *,
+    account_types: Optional[Sequence[str]] = None,
+    exclude_closing: bool = False,
+    exclude_reversing: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+) -> list[sqlite3.Row]:
+    """
+    Posted debit/credit totals per active account for one period, read from
+    account_period_balances. Accounts without activity are omitted.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        filters = ["b.status = 'posted'", "b.period_id = ?", "a.is_active = 1"]
+        params: list = [period_id]
+        if account_types:
+            filters.append(f"a.type IN ({', '.join('?' for _ in account_types)})")
+            params.extend(account_types)
         if exclude_closing:
-            closing_filter = "AND (je.is_closing = 0 OR je.is_closing IS NULL)"
-
-        # Exclude adjusting entries if requested (for unadjusted trial balance)
-        adjusting_filter = ""
-        if exclude_adjusting:
-            adjusting_filter = "AND (je.is_adjusting = 0 OR je.is_adjusting IS NULL)"
-
-        # Compute a signed balance then split into non-negative net_debit / net_credit
-        # Only include posted entries for accurate balances
-        balance_expr = "(COALESCE(SUM(jl.debit),0) - COALESCE(SUM(jl.credit),0))"
-        sql = f"""
-            SELECT a.id as account_id, a.code, a.name, a.type, a.normal_side,
-                   ROUND(CASE WHEN {balance_expr} > 0 THEN {balance_expr} ELSE 0 END, 2) AS net_debit,
-                   ROUND(CASE WHEN {balance_expr} < 0 THEN -({balance_expr}) ELSE 0 END, 2) AS net_credit
-            FROM accounts a
-            LEFT JOIN journal_lines jl ON jl.account_id = a.id
-            LEFT JOIN journal_entries je ON je.id = jl.entry_id
-            WHERE a.is_active = 1 
-              AND (je.status = 'posted' OR je.status IS NULL OR je.id IS NULL)
-              {temp_filter} {where_extra} {closing_filter} {adjusting_filter}
-            GROUP BY a.id, a.code, a.name, a.type, a.normal_side
+            filters.append("b.is_closing = 0")
+        if exclude_reversing:
+            filters.append("b.is_reversing = 0")
+        cur = conn.execute(
+            f"""
+            SELECT a.id, a.code, a.name, a.type,
+                   SUM(b.debit_total) AS debit_total, SUM(b.credit_total) AS credit_total
+            FROM account_period_balances b
+            JOIN accounts a ON a.id = b.account_id
+            WHERE {' AND '.join(filters)}
+            GROUP BY a.id, a.code, a.name, a.type
             ORDER BY a.code
-        """
-        cur = conn.execute(sql, params)
+            """,
+            params,
+        )
         return cur.fetchall()
     finally:
         if not owned:
@@ -2083,100 +3658,546 @@ def compute_unadjusted_trial_balance(
     )
 
 
+def _journal_query(period_id: Optional[int]) -> Tuple[str, list]:
+    sql = (
+        """
+        SELECT je.id as entry_id, je.date, je.description, je.is_adjusting, je.is_closing, je.is_reversing,
+               je.document_ref, je.external_ref,
+               jl.id as line_id, a.code, a.name, jl.debit, jl.credit
+        FROM journal_entries je
+        JOIN journal_lines jl ON jl.entry_id = je.id
+        JOIN accounts a ON a.id = jl.account_id
+        {period_clause}
+        ORDER BY je.date, je.id, jl.id
+        """
+    )
+    params: list = []
+    period_clause = ""
+    if period_id is not None:
+        period_clause = "WHERE je.period_id = ?"
+        params.append(period_id)
+    return sql.format(period_clause=period_clause), params
+
+
+def _ledger_query(period_id: Optional[int]) -> Tuple[str, list]:
+    sql = (
+        """
+        SELECT a.id as account_id, a.code, a.name, a.type, a.normal_side,
+               je.date, je.description, jl.debit, jl.credit
+        FROM accounts a
+        INNER JOIN journal_lines jl ON jl.account_id = a.id
+        INNER JOIN journal_entries je ON je.id = jl.entry_id
+        WHERE a.is_active = 1 
+          AND (je.status = 'posted' OR je.status IS NULL)
+          {period_clause}
+        ORDER BY a.code, je.date, je.id, jl.id
+        """
+    )
+    params: list = []
+    period_clause = ""
+    if period_id is not None:
+        period_clause = "AND je.period_id = ?"
+        params.append(period_id)
+    return sql.format(period_clause=period_clause), params
+
+
+def _iter_query(query: Tuple[str, list], batch_size: int, conn: Optional[sqlite3.Connection]) -> Iterator[sqlite3.Row]:
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        cur = conn.execute(*query)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        if not owned:
+            conn.close()
+
+
 def fetch_journal(period_id: Optional[int] = None, conn: Optional[sqlite3.Connection] = None) -> list[sqlite3.Row]:
+    return list(iter_journal(period_id, conn=conn))
+
+
+def iter_journal(
+    period_id: Optional[int] = None, *, batch_size: int = 2000, conn: Optional[sqlite3.Connection] = None
+) -> Iterator[sqlite3.Row]:
+    """The rows of ``fetch_journal``, read ``batch_size`` at a time from one cursor."""
+    return _iter_query(_journal_query(period_id), batch_size, conn)
+
+
+def fetch_ledger(period_id: Optional[int] = None, conn: Optional[sqlite3.Connection] = None) -> list[sqlite3.Row]:
+    return list(iter_ledger(period_id, conn=conn))
+
+
+def iter_ledger(
+    period_id: Optional[int] = None, *, batch_size: int = 2000, conn: Optional[sqlite3.Connection] = None
+) -> Iterator[sqlite3.Row]:
+    """The rows of ``fetch_ledger``, read ``batch_size`` at a time from one cursor."""
+    return _iter_query(_ledger_query(period_id), batch_size, conn)
+
+
+def _period_bound(aggregate: str, account_expr: str) -> str:
+    """Date bound of an account's lines in one period, from account_period_balances."""
+    return (
+        f"(SELECT {aggregate} FROM account_period_balances b "
+        f"WHERE b.account_id = {account_expr} AND b.period_id = ?)"
+    )
+
+
+def _date_range_filter(column: str, lower: Sequence[Tuple[str, Any]], upper: Sequence[Tuple[str, Any]]) -> Tuple[list, list]:
+    """
+    Fold several lower/upper date bounds into one ``>=`` and one ``<=`` on
+    ``column``, so SQLite seeks the index at the tightest bound (usually a
+    page cursor) rather than whichever bound it happens to pick.
+    """
+    filters: list = []
+    params: list = []
+    for op, bounds in ((">=", lower), ("<=", upper)):
+        if not bounds:
+            continue
+        exprs = [expr for expr, _ in bounds]
+        # Scalar max()/min() need two arguments; one argument is the aggregate.
+        folded = exprs[0] if len(exprs) == 1 else f"{'max' if op == '>=' else 'min'}({', '.join(exprs)})"
+        filters.append(f"{column} {op} {folded}")
+        params.extend(value for _, value in bounds)
+    return filters, params
+
+
+def fetch_journal_page(
+    period_id: Optional[int] = None,
+    *,
+    account_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    status: Optional[str] = None,
+    after: Optional[Sequence[Any]] = None,
+    page_size: int = 500,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Tuple[list[sqlite3.Row], Optional[Tuple[str, int, int]]]:
+    """
+    One page of journal lines in (date, entry_id, line_id) order.
+
+    ``after`` is the keyset cursor returned for the previous page; every
+    filter runs in SQL, so any page costs the same as the first. A page never
+    splits an entry: it runs past ``page_size`` to finish its last entry.
+    With ``account_id`` only that account's lines are returned.
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
     owned = conn is not None
     if not conn:
         conn = get_connection()
     try:
-        sql = (
-            """
-            SELECT je.id as entry_id, je.date, je.description, je.is_adjusting, je.is_closing, je.is_reversing,
-                   je.document_ref, je.external_ref,
-                   jl.id as line_id, a.code, a.name, jl.debit, jl.credit
-            FROM journal_entries je
-            JOIN journal_lines jl ON jl.entry_id = je.id
-            JOIN accounts a ON a.id = jl.account_id
-            {period_clause}
-            ORDER BY je.date, je.id, jl.id
+        columns = """
+            je.id AS entry_id, je.date, je.description, je.is_adjusting, je.is_closing, je.is_reversing,
+            je.document_ref, je.external_ref, je.status,
+            jl.id AS line_id, jl.account_id, a.code, a.name, jl.debit, jl.credit
+        """
+        if account_id is not None:
+            # Driven by journal_lines(account_id, entry_date, entry_id, id).
+            key = ("jl.entry_date", "jl.entry_id", "jl.id")
+            source = (
+                "journal_lines jl JOIN journal_entries je ON je.id = jl.entry_id "
+                "JOIN accounts a ON a.id = jl.account_id"
+            )
+        else:
+            # Driven by journal_entries(period_id, date, id) or (date, id).
+            key = ("je.date", "je.id", "jl.id")
+            source = (
+                "journal_entries je JOIN journal_lines jl ON jl.entry_id = je.id "
+                "JOIN accounts a ON a.id = jl.account_id"
+            )
+
+        def select(cursor: Optional[Sequence[Any]], limit: int) -> list[sqlite3.Row]:
+            filters: list = []
+            params: list = []
+            lower: list = []
+            upper: list = []
+            if account_id is not None:
+                filters.append("jl.account_id = ?")
+                params.append(account_id)
+                if period_id is not None:
+                    lower.append((_period_bound("MIN(b.min_date)", "jl.account_id"), period_id))
+                    upper.append((_period_bound("MAX(b.max_date)", "jl.account_id"), period_id))
+            if period_id is not None:
+                filters.append("je.period_id = ?")
+                params.append(period_id)
+            if status:
+                filters.append("je.status = ?")
+                params.append(status)
+            if date_from:
+                lower.append(("date(?)", date_from))
+            if date_to:
+                upper.append(("date(?)", date_to))
+            if cursor:
+                lower.append(("?", cursor[0]))
+            range_filters, range_params = _date_range_filter(key[0], lower, upper)
+            filters += range_filters
+            params += range_params
+            if cursor:
+                filters.append(f"({', '.join(key)}) > (?, ?, ?)")
+                params.extend(cursor[:3])
+            sql = f"""
+                SELECT {columns}
+                FROM {source}
+                WHERE {' AND '.join(filters) or '1=1'}
+                ORDER BY {', '.join(key)}
+                LIMIT {int(limit)}
             """
+            return conn.execute(sql, params).fetchall()
+
+        rows = select(after, page_size + 1)
+        if len(rows) <= page_size:
+            return rows, None
+        last = rows[page_size - 1]
+        rows = rows[:page_size]
+        # Finish the last entry: its remaining lines share its date, period and status.
+        rest_filter = " AND jl.account_id = ?" if account_id is not None else ""
+        rows.extend(
+            conn.execute(
+                f"""
+                SELECT {columns}
+                FROM journal_lines jl
+                JOIN journal_entries je ON je.id = jl.entry_id
+                JOIN accounts a ON a.id = jl.account_id
+                WHERE jl.entry_id = ? AND jl.id > ?{rest_filter}
+                ORDER BY jl.id
+                """,
+                [last["entry_id"], last["line_id"]] + ([account_id] if account_id is not None else []),
+            ).fetchall()
         )
-        params: list = []
-        period_clause = ""
-        if period_id is not None:
-            period_clause = "WHERE je.period_id = ?"
-            params.append(period_id)
-        sql = sql.format(period_clause=period_clause)
-        cur = conn.execute(sql, params)
-        return cur.fetchall()
+        last = rows[-1]
+        cursor = (last["date"], int(last["entry_id"]), int(last["line_id"]))
+        has_more = bool(select(cursor, 1))
+        return rows, (cursor if has_more else None)
     finally:
         if not owned:
             conn.close()
 
 
-def fetch_ledger(period_id: Optional[int] = None, conn: Optional[sqlite3.Connection] = None) -> list[sqlite3.Row]:
+def _ledger_opening_balance_sql(first: str, status: Optional[str]) -> Tuple[str, list]:
+    """
+    Debit-minus-credit balance of ``{first}.account_id`` before the line
+    ``({first}.date, {first}.entry_id, {first}.line_id)``: the daily prefix
+    sums up to the previous day plus that day's earlier lines, so the cost
+    does not depend on how much history precedes the line.
+    """
+    status_bucket = "AND b.status = ?" if status else ""
+    status_line = "AND je.status = ?" if status else ""
+    sql = f"""(
+        COALESCE((
+            SELECT SUM(x.cum_debit - x.cum_credit)
+            FROM account_period_balances b
+            JOIN account_daily_balances x ON x.rowid = (
+                SELECT y.rowid FROM account_daily_balances y
+                WHERE {_bucket_match("y", "b")} AND y.day < {first}.date
+                ORDER BY y.day DESC LIMIT 1
+            )
+            WHERE b.account_id = {first}.account_id {status_bucket}
+        ), 0)
+        + COALESCE((
+            SELECT SUM(COALESCE(jl.debit, 0) - COALESCE(jl.credit, 0))
+            FROM journal_lines jl
+            JOIN journal_entries je ON je.id = jl.entry_id
+            WHERE jl.account_id = {first}.account_id AND jl.entry_date = {first}.date
+              AND (jl.entry_id, jl.id) < ({first}.entry_id, {first}.line_id) {status_line}
+        ), 0)
+    )"""
+    return sql, ([status, status] if status else [])
+
+
+def iter_ledger_rows(
+    period_id: Optional[int] = None,
+    *,
+    page_size: int = 2000,
+    conn: Optional[sqlite3.Connection] = None,
+    **filters: Any,
+) -> Iterator[sqlite3.Row]:
+    """Every row ``fetch_ledger_page`` would return, read one page at a time."""
     owned = conn is not None
     if not conn:
         conn = get_connection()
     try:
-        sql = (
-            """
-            SELECT a.id as account_id, a.code, a.name, a.type, a.normal_side,
-                   je.date, je.description, jl.debit, jl.credit
-            FROM accounts a
-            INNER JOIN journal_lines jl ON jl.account_id = a.id
-            INNER JOIN journal_entries je ON je.id = jl.entry_id
-            WHERE a.is_active = 1 
-              AND (je.status = 'posted' OR je.status IS NULL)
-              {period_clause}
-            ORDER BY a.code, je.date, je.id, jl.id
+        cursor = None
+        while True:
+            rows, cursor = fetch_ledger_page(period_id, after=cursor, page_size=page_size, conn=conn, **filters)
+            yield from rows
+            if cursor is None:
+                return
+    finally:
+        if not owned:
+            conn.close()
+
+
+def fetch_ledger_page(
+    period_id: Optional[int] = None,
+    *,
+    account_id: Optional[int] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    status: Optional[str] = "posted",
+    after: Optional[Sequence[Any]] = None,
+    page_size: int = 500,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Tuple[list[sqlite3.Row], Optional[Tuple[str, str, int, int]]]:
+    """
+    One page of ledger lines for active accounts, in (account code, date,
+    entry_id, line_id) order, starting after the keyset cursor ``after``.
+
+    Accounts drive the join (CROSS JOIN pins that loop order) and each
+    account's lines are read from journal_lines(account_id, entry_date,
+    entry_id, id), so any page costs the same as the first.
+
+    ``running_balance`` is the account's debit-minus-credit balance through
+    each line, over every line with the given status: a window sum over the
+    page on top of the balance before the page's first row of that account
+    (see ``_ledger_opening_balance_sql``).
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        def select(extra: Sequence[str], extra_params: Sequence[Any], cursor_date: Optional[str], limit: int) -> list[sqlite3.Row]:
+            filters = ["a.is_active = 1"]
+            params: list = []
+            lower: list = []
+            upper: list = []
+            if account_id is not None:
+                filters.append("a.id = ?")
+                params.append(account_id)
+            if status:
+                filters.append("je.status = ?")
+                params.append(status)
+            if period_id is not None:
+                filters.append("je.period_id = ?")
+                params.append(period_id)
+                lower.append((_period_bound("MIN(b.min_date)", "a.id"), period_id))
+                upper.append((_period_bound("MAX(b.max_date)", "a.id"), period_id))
+            if date_from:
+                lower.append(("date(?)", date_from))
+            if date_to:
+                upper.append(("date(?)", date_to))
+            if cursor_date is not None:
+                lower.append(("?", cursor_date))
+            range_filters, range_params = _date_range_filter("jl.entry_date", lower, upper)
+            filters += range_filters + list(extra)
+            params += range_params + list(extra_params)
+            opening_sql, opening_params = _ledger_opening_balance_sql("f", status)
+            sql = f"""
+                WITH page AS MATERIALIZED (
+                    SELECT a.id AS account_id, a.code, a.name, a.type, a.normal_side,
+                           je.date, je.description, jl.debit, jl.credit,
+                           jl.entry_id, jl.id AS line_id
+                    FROM accounts a
+                    CROSS JOIN journal_lines jl ON jl.account_id = a.id
+                    CROSS JOIN journal_entries je ON je.id = jl.entry_id
+                    WHERE {' AND '.join(filters)}
+                    ORDER BY a.code, jl.entry_date, jl.entry_id, jl.id
+                    LIMIT {int(limit)}
+                ),
+                firsts AS (
+                    SELECT account_id, date, entry_id, line_id,
+                           ROW_NUMBER() OVER (PARTITION BY account_id ORDER BY date, entry_id, line_id) AS rn
+                    FROM page
+                ),
+                openings AS MATERIALIZED (
+                    SELECT f.account_id, {opening_sql} AS opening
+                    FROM firsts f
+                    WHERE f.rn = 1
+                )
+                SELECT p.*,
+                       ROUND(o.opening + SUM(COALESCE(p.debit, 0) - COALESCE(p.credit, 0)) OVER (
+                           PARTITION BY p.account_id ORDER BY p.date, p.entry_id, p.line_id
+                       ), 2) AS running_balance
+                FROM page p
+                JOIN openings o ON o.account_id = p.account_id
+                ORDER BY p.code, p.date, p.entry_id, p.line_id
             """
-        )
-        params: list = []
-        period_clause = ""
+            return conn.execute(sql, params + opening_params).fetchall()
+
+        limit = page_size + 1
+        if after:
+            # Rest of the cursor's account first, then the accounts after it.
+            rows = select(
+                ["a.code = ?", "(jl.entry_date, jl.entry_id, jl.id) > (?, ?, ?)"],
+                list(after[:4]), after[1], limit,
+            )
+            if len(rows) < limit:
+                rows.extend(select(["a.code > ?"], [after[0]], None, limit - len(rows)))
+        else:
+            rows = select([], [], None, limit)
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        last = rows[-1]
+        return rows, (last["code"], last["date"], int(last["entry_id"]), int(last["line_id"]))
+    finally:
+        if not owned:
+            conn.close()
+
+
+def _ledger_bucket_filters(
+    period_id: Optional[int], account_id: Optional[int], status: Optional[str], alias: str
+) -> Tuple[str, list]:
+    filters = ["a.is_active = 1"]
+    params: list = []
+    if period_id is not None:
+        filters.append(f"{alias}.period_id = ?")
+        params.append(period_id)
+    if account_id is not None:
+        filters.append("a.id = ?")
+        params.append(account_id)
+    if status:
+        filters.append(f"{alias}.status = ?")
+        params.append(status)
+    return " AND ".join(filters), params
+
+
+def ledger_totals(
+    period_id: Optional[int] = None,
+    *,
+    account_id: Optional[int] = None,
+    status: Optional[str] = "posted",
+    conn: Optional[sqlite3.Connection] = None,
+) -> sqlite3.Row:
+    """
+    Line count and debit/credit totals of the rows ``fetch_ledger_page`` walks
+    (without date filters), read from account_period_balances.
+    """
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        where, params = _ledger_bucket_filters(period_id, account_id, status, "b")
+        return conn.execute(
+            f"""
+            SELECT COALESCE(SUM(b.line_count), 0) AS line_count,
+                   COALESCE(SUM(b.debit_total), 0) AS debit_total,
+                   COALESCE(SUM(b.credit_total), 0) AS credit_total
+            FROM account_period_balances b
+            JOIN accounts a ON a.id = b.account_id
+            WHERE {where}
+            """,
+            params,
+        ).fetchone()
+    finally:
+        if not owned:
+            conn.close()
+
+
+def ledger_cursor_at(
+    position: int,
+    period_id: Optional[int] = None,
+    *,
+    account_id: Optional[int] = None,
+    status: Optional[str] = "posted",
+    conn: Optional[sqlite3.Connection] = None,
+) -> Optional[Tuple[str, str, int, int]]:
+    """
+    Keyset cursor that makes ``fetch_ledger_page`` start at row ``position``
+    (0-based), or None for the first row.
+
+    The account and then the day holding the row are found from the line
+    counts in account_period_balances and account_daily_balances, so jumping
+    anywhere in the ledger costs a few indexed lookups plus one day's lines.
+    """
+    if position <= 0:
+        return None
+    owned = conn is not None
+    if not conn:
+        conn = get_connection()
+    try:
+        target = position - 1  # the cursor is the row just before ``position``
+        where, params = _ledger_bucket_filters(period_id, account_id, status, "b")
+        acct = conn.execute(
+            f"""
+            SELECT account_id, code, before FROM (
+                SELECT a.id AS account_id, a.code,
+                       SUM(SUM(b.line_count)) OVER (ORDER BY a.code) - SUM(b.line_count) AS before,
+                       SUM(SUM(b.line_count)) OVER (ORDER BY a.code) AS through
+                FROM account_period_balances b
+                JOIN accounts a ON a.id = b.account_id
+                WHERE {where}
+                GROUP BY a.id
+            )
+            WHERE through > ?
+            ORDER BY code
+            LIMIT 1
+            """,
+            params + [target],
+        ).fetchone()
+        if acct is None:
+            return None
+        offset = target - int(acct["before"])
+        where, params = _ledger_bucket_filters(period_id, acct["account_id"], status, "d")
+        day = conn.execute(
+            f"""
+            SELECT day, before FROM (
+                SELECT d.day,
+                       SUM(SUM(d.line_count)) OVER (ORDER BY d.day) - SUM(d.line_count) AS before,
+                       SUM(SUM(d.line_count)) OVER (ORDER BY d.day) AS through
+                FROM account_daily_balances d
+                JOIN accounts a ON a.id = d.account_id
+                WHERE {where}
+                GROUP BY d.day
+            )
+            WHERE through > ?
+            ORDER BY day
+            LIMIT 1
+            """,
+            params + [offset],
+        ).fetchone()
+        filters = ["jl.account_id = ?"]
+        line_params: list = [acct["account_id"]]
         if period_id is not None:
-            period_clause = "AND je.period_id = ?"
-            params.append(period_id)
-        sql = sql.format(period_clause=period_clause)
-        cur = conn.execute(sql, params)
-        return cur.fetchall()
+            filters.append("je.period_id = ?")
+            line_params.append(period_id)
+        if status:
+            filters.append("je.status = ?")
+            line_params.append(status)
+        if day is not None:
+            filters.append("jl.entry_date = ?")
+            line_params.append(day["day"])
+            offset -= int(day["before"])
+        # Without a day (undated lines are not rolled up daily) fall back to an
+        # offset within the account.
+        row = conn.execute(
+            f"""
+            SELECT jl.entry_date, jl.entry_id, jl.id
+            FROM journal_lines jl
+            JOIN journal_entries je ON je.id = jl.entry_id
+            WHERE {' AND '.join(filters)}
+            ORDER BY jl.entry_date, jl.entry_id, jl.id
+            LIMIT 1 OFFSET ?
+            """,
+            line_params + [offset],
+        ).fetchone()
+        if row is None:
+            return None
+        return (acct["code"], row["entry_date"], int(row["entry_id"]), int(row["id"]))
     finally:
         if not owned:
             conn.close()
 
 
+
 def export_rows_to_csv(rows: Iterable[sqlite3.Row], headers: Iterable[str], output_path: Path) -> None:
-    import csv
+    """Write rows (any iterable, e.g. ``iter_journal``) to CSV as they stream; ``.gz`` paths are gzipped."""
+    from . import export
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(list(headers))
-        for r in rows:
-            if isinstance(r, sqlite3.Row):
-                writer.writerow([r[h] for h in headers])
-            else:
-                writer.writerow(list(r))
+    export.write_csv(rows, list(headers), output_path)
 
 
 def export_rows_to_excel(rows: Iterable[sqlite3.Row], headers: Iterable[str], output_path: Path, *, sheet_name: str = "Sheet1") -> None:
-    try:
-        from openpyxl import Workbook
-    except ImportError as e:
-        raise RuntimeError("openpyxl is required for Excel export. Install with: pip install openpyxl") from e
-
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    wb = Workbook()
-    ws = wb.active
-    ws.title = sheet_name
+    """Write rows to a one-sheet workbook through a write-only (streaming) worksheet."""
+    from . import export
 
-    hdrs = list(headers)
-    ws.append(hdrs)
-    for r in rows:
-        if isinstance(r, sqlite3.Row):
-            ws.append([r[h] for h in hdrs])
-        else:
-            ws.append(list(r))
-    wb.save(str(output_path))
+    export.write_excel(rows, list(headers), output_path, sheet_name=sheet_name)
 
 
 def export_text_to_excel(lines: Iterable[str], output_path: Path, *, sheet_name: str = "Report") -> None:
@@ -2222,7 +4243,7 @@ def create_reversing_template(
                 int(approval_required),
             ),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -2263,7 +4284,7 @@ def add_reversing_approval(
             """,
             (queue_id, reviewer, role, int(level), status, approved_on, notes),
         )
-        conn.commit()
+        _commit(conn)
         return int(cur.lastrowid)
     finally:
         if not owned:
@@ -2291,12 +4312,12 @@ def set_reversing_deadline(item_id: int, deadline_on: str, *, conn: Optional[sql
         prev = conn.execute("SELECT deadline_on FROM reversing_entry_queue WHERE id=?", (item_id,)).fetchone()
         old = prev["deadline_on"] if prev else None
         conn.execute("UPDATE reversing_entry_queue SET deadline_on=? WHERE id=?", (deadline_on, item_id))
-        conn.commit()
+        _commit(conn)
         conn.execute(
             "INSERT INTO reversing_entry_history(queue_id, field, old_value, new_value) VALUES (?, 'deadline_on', ?, ?)",
             (item_id, old, deadline_on),
         )
-        conn.commit()
+        _commit(conn)
     finally:
         if not owned:
             conn.close()
@@ -0,0 +1,194 @@
+"""
+Export Module
+Streaming CSV and Excel writers: rows are consumed one at a time (e.g. from
+``db.iter_journal``), so memory stays flat whatever the number of rows.
+"""
+from __future__ import annotations
+
+import csv
+import gzip
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+ProgressCallback = Callable[[int], None]
+
+#: Rows between two progress reports.
+PROGRESS_EVERY = 10000
+
+# Styled cells register their font in the workbook's shared style list, which
+# is not thread-safe; sheets of one workbook may be filled on several threads.
+_STYLE_LOCK = threading.Lock()
+
+
+def row_values(row: Any, headers: Sequence[str]) -> List[Any]:
+    """Values of ``row`` in ``headers`` order (sqlite3.Row, mapping or plain sequence)."""
+    if isinstance(row, sqlite3.Row):
+        return [row[h] for h in headers]
+    if isinstance(row, dict):
+        return [row.get(h) for h in headers]
+    return list(row)
+
+
+class RunningTotals:
+    """Sums of some columns, kept while the rows stream past."""
+
+    def __init__(self, headers: Sequence[str], columns: Sequence[str], *, label: str = "Totals:") -> None:
+        self.width = len(headers)
+        self.indexes = [list(headers).index(c) for c in columns]
+        self.sums = [0.0] * len(self.indexes)
+        self.label = label
+
+    def add(self, values: Sequence[Any]) -> None:
+        for n, i in enumerate(self.indexes):
+            try:
+                self.sums[n] += float(values[i] or 0)
+            except (TypeError, ValueError):
+                pass
+
+    def row(self) -> List[Any]:
+        """The totals row: the label left of the first totalled column, then the sums."""
+        out: List[Any] = [None] * self.width
+        if self.indexes and min(self.indexes) > 0:
+            out[min(self.indexes) - 1] = self.label
+        for n, i in enumerate(self.indexes):
+            out[i] = round(self.sums[n], 2)
+        return out
+
+
+def _to_number(value: Any) -> Any:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return value
+
+
+def _stream(
+    rows: Iterable[Any],
+    headers: Sequence[str],
+    write: Callable[[List[Any]], None],
+    *,
+    numeric: Sequence[str],
+    totals: Optional[RunningTotals],
+    progress: Optional[ProgressCallback],
+) -> int:
+    numeric_idx = [headers.index(c) for c in numeric if c in headers]
+    count = 0
+    for row in rows:
+        values = row_values(row, headers)
+        for i in numeric_idx:
+            values[i] = _to_number(values[i])
+        if totals is not None:
+            totals.add(values)
+        write(values)
+        count += 1
+        if progress is not None and count % PROGRESS_EVERY == 0:
+            progress(count)
+    if progress is not None and count % PROGRESS_EVERY:
+        progress(count)
+    return count
+
+
+def write_csv(
+    rows: Iterable[Any],
+    headers: Sequence[str],
+    output_path: Path,
+    *,
+    compress: Optional[bool] = None,
+    numeric: Sequence[str] = (),
+    totals: Sequence[str] = (),
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """
+    Write ``rows`` to a CSV file as they arrive; returns the number of rows.
+
+    The file is gzip-compressed when ``compress`` is true, or by default when
+    ``output_path`` ends in ``.gz``. ``totals`` names columns summed into a
+    final totals row.
+    """
+    headers = list(headers)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if compress is None:
+        compress = output_path.suffix.lower() == ".gz"
+    opener = gzip.open if compress else open
+    running = RunningTotals(headers, totals) if totals else None
+    with opener(output_path, "wt", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        count = _stream(rows, headers, writer.writerow, numeric=numeric, totals=running, progress=progress)
+        if running is not None and count:
+            writer.writerow(running.row())
+    return count
+
+
+def _require_openpyxl():
+    try:
+        import openpyxl
+    except ImportError as e:
+        raise RuntimeError("openpyxl is required for Excel export. Install with: pip install openpyxl") from e
+    return openpyxl
+
+
+def new_workbook():
+    """A write-only openpyxl workbook: rows go to disk as they are appended."""
+    return _require_openpyxl().Workbook(write_only=True)
+
+
+def bold(ws, value: Any, **font: Any):
+    """A bold cell for appending to a write-only worksheet."""
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    cell = WriteOnlyCell(ws, value=value)
+    with _STYLE_LOCK:
+        cell.font = Font(bold=True, **font)
+    return cell
+
+
+def set_widths(ws, widths: Dict[int, float]) -> None:
+    """Column widths by 1-based index; call before appending rows."""
+    from openpyxl.utils import get_column_letter
+
+    for index, width in widths.items():
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+
+def write_sheet(
+    ws,
+    rows: Iterable[Any],
+    headers: Sequence[str],
+    *,
+    numeric: Sequence[str] = (),
+    totals: Sequence[str] = (),
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """Append a bold header, ``rows`` and an optional totals row to a write-only sheet."""
+    headers = list(headers)
+    ws.append([bold(ws, h) for h in headers])
+    running = RunningTotals(headers, totals) if totals else None
+    count = _stream(rows, headers, ws.append, numeric=numeric, totals=running, progress=progress)
+    if running is not None and count:
+        ws.append([bold(ws, v) if isinstance(v, str) else v for v in running.row()])
+    return count
+
+
+def write_excel(
+    rows: Iterable[Any],
+    headers: Sequence[str],
+    output_path: Path,
+    *,
+    sheet_name: str = "Sheet1",
+    numeric: Sequence[str] = (),
+    totals: Sequence[str] = (),
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """Stream ``rows`` into a one-sheet .xlsx file; returns the number of rows."""
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    wb = new_workbook()
+    ws = wb.create_sheet(title=sheet_name)
+    count = write_sheet(ws, rows, headers, numeric=numeric, totals=totals, progress=progress)
+    wb.save(str(output_path))
+    return count
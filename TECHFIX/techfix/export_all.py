@@ -0,0 +1,411 @@
+"""
+Export All Module
+Builds the Export All workbook as a pipeline: every sheet is a stage that runs
+on its own worker thread and read connection, then one save assembles them.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import date
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import db, export, report_cache
+from .accounting import AccountingEngine
+
+#: ``progress(stage, rows, finished)``: rows written so far by one sheet stage.
+StageProgress = Callable[[str, int, bool], None]
+
+JOURNAL_HEADERS = ["entry_id", "date", "description", "code", "name", "debit", "credit"]
+LEDGER_HEADERS = ["account_id", "code", "name", "date", "description", "debit", "credit"]
+
+
+class ExportAborted(Exception):
+    """Raised inside the stages still running once another stage has failed."""
+
+
+def balance_to_columns(row: Any) -> Tuple[float, float]:
+    """Convert a trial balance row into (debit, credit) columns on its normal side."""
+    try:
+        acc_type = (row['type'] if 'type' in row.keys() and row['type'] else '').lower()
+        normal = (row['normal_side'] if 'normal_side' in row.keys() and row['normal_side'] else 'debit').lower()
+        net_debit = float(row['net_debit'] if 'net_debit' in row.keys() and row['net_debit'] is not None else 0)
+        net_credit = float(row['net_credit'] if 'net_credit' in row.keys() and row['net_credit'] is not None else 0)
+
+        # Contra-assets always have credit balances and should be shown on credit side
+        if acc_type == 'contra asset':
+            if net_credit > 0:
+                return (0.0, net_credit)
+            elif net_debit > 0:
+                # Abnormal debit balance (shouldn't happen, but handle it)
+                return (net_debit, 0.0)
+            else:
+                return (0.0, 0.0)
+
+        if normal == 'debit':
+            bal = net_debit - net_credit
+            return (bal, 0.0) if bal >= 0 else (0.0, abs(bal))
+        bal = net_credit - net_debit
+        return (0.0, bal) if bal >= 0 else (abs(bal), 0.0)
+    except Exception:
+        return (0.0, 0.0)
+
+
+class _Stage:
+    """One sheet: its worksheet, build function and progress/cancel plumbing."""
+
+    def __init__(self, title: str, build: Callable[["_Stage"], int], pipeline: "ExportAllPipeline") -> None:
+        self.title = title
+        self.build = build
+        self.pipeline = pipeline
+        self.ws = None
+        self.conn = None
+        self.rows = 0
+
+    def tick(self, rows: int) -> None:
+        """Record progress; raises if the export was cancelled or another stage failed."""
+        self.rows = rows
+        self.pipeline._check()
+        self.pipeline._report(self.title, rows, False)
+
+    def run(self) -> int:
+        self.pipeline._check()
+        self.conn = db.get_connection()
+        try:
+            self.rows = self.build(self) or 0
+        finally:
+            self.conn.close()
+            self.conn = None
+        self.pipeline._report(self.title, self.rows, True)
+        return self.rows
+
+
+class ExportAllPipeline:
+    """
+    Journal, Ledger, Trial Balance, Post-Closing TB, Worksheet, Income
+    Statement, Balance Sheet and Cash Flow sheets, built concurrently.
+
+    Each stage fetches and formats its own data on a worker thread with a
+    separate pooled connection and appends to its own write-only worksheet
+    (openpyxl spools every such sheet to its own temporary file), so stages
+    share no state: the trial balance queries and cursor reads of one sheet
+    overlap the formatting of the others. Cell formatting itself holds the
+    GIL, so on large ledgers the journal and ledger sheets still dominate.
+    ``save`` is the single assembly step. ``check`` is called between
+    batches and may raise to cancel (e.g. ``TaskContext.check``); no file is
+    written then.
+
+    The statement sheets come from ``engine``'s income statement, balance
+    sheet and cash flow reports, run on each stage's own connection, for
+    ``period_id`` (the engine's current period when None) between
+    ``start_date`` and ``end_date`` (default: the period's own dates). Without
+    an engine, ``save`` creates one for the duration of the export.
+    """
+
+    def __init__(
+        self,
+        *,
+        period_id: Optional[int] = None,
+        engine: Optional[AccountingEngine] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        progress: Optional[StageProgress] = None,
+        check: Optional[Callable[[], None]] = None,
+        max_workers: int = 4,
+    ) -> None:
+        self.period_id = period_id
+        self.engine = engine
+        self.start_date = start_date
+        self.end_date = end_date
+        self.progress = progress
+        self.check = check
+        self.max_workers = max(1, max_workers)
+        self._failed = threading.Event()
+        self._report_lock = threading.Lock()
+        self.stages = [
+            _Stage("Journal", self._journal, self),
+            _Stage("Ledger", self._ledger, self),
+            _Stage("Trial Balance", self._trial_balance, self),
+            _Stage("Post-Closing TB", self._post_closing, self),
+            _Stage("Worksheet", self._worksheet, self),
+            _Stage("Income Statement", self._income_statement, self),
+            _Stage("Balance Sheet", self._balance_sheet, self),
+            _Stage("Cash Flow", self._cash_flow, self),
+        ]
+
+    def _check(self) -> None:
+        if self._failed.is_set():
+            raise ExportAborted()
+        if self.check is not None:
+            self.check()
+
+    def _report(self, stage: str, rows: int, finished: bool) -> None:
+        if self.progress is not None:
+            with self._report_lock:
+                self.progress(stage, rows, finished)
+
+    def save(self, path: str) -> str:
+        """Run every stage, then write the workbook to ``path``."""
+        owned_engine = None
+        if self.engine is None:
+            self.engine = owned_engine = AccountingEngine()
+        try:
+            wb = export.new_workbook()
+            for stage in self.stages:  # sheet order is fixed up front
+                stage.ws = wb.create_sheet(title=stage.title)
+            self._failed.clear()
+            pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.stages)), thread_name_prefix="techfix-export")
+            futures = [pool.submit(stage.run) for stage in self.stages]
+            try:
+                finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                failed = [f for f in finished if f.exception() is not None]
+                if failed:
+                    raise failed[0].exception()
+            except BaseException:  # includes KeyboardInterrupt in the CLI
+                self._failed.set()
+                pool.shutdown(wait=True)
+                self._discard()
+                raise
+            pool.shutdown(wait=True)
+            wb.save(path)
+            return path
+        finally:
+            if owned_engine is not None:
+                self.engine = None
+                owned_engine.close()
+
+    def _discard(self) -> None:
+        # Finish the abandoned sheets and drop their spooled temporary files.
+        for stage in self.stages:
+            try:
+                stage.ws.close()
+                writer = getattr(stage.ws, "_writer", None)
+                if writer is not None:
+                    writer.cleanup()
+            except Exception:
+                pass
+
+    # --- stages ---
+
+    def _stream(self, stage: _Stage, rows, headers: List[str]) -> int:
+        # Header, streamed rows, then SUM formulas under debit/credit.
+        ws = stage.ws
+        export.set_widths(ws, {i: 15 for i in range(1, len(headers) + 1)})
+        count = export.write_sheet(ws, rows, headers, numeric=("debit", "credit"), progress=stage.tick)
+        if count:
+            last = count + 1
+            ws.append([None, None, None, None, export.bold(ws, "Totals:"),
+                       f"=SUM(F2:F{last})", f"=SUM(G2:G{last})"])
+        return count
+
+    def _journal(self, stage: _Stage) -> int:
+        return self._stream(stage, db.iter_journal(self.period_id, conn=stage.conn), JOURNAL_HEADERS)
+
+    def _ledger(self, stage: _Stage) -> int:
+        return self._stream(stage, db.iter_ledger(self.period_id, conn=stage.conn), LEDGER_HEADERS)
+
+    def _balances(self, stage: _Stage, **options: Any) -> Dict[str, Any]:
+        rows = report_cache.trial_balance(period_id=self.period_id, conn=stage.conn, **options)
+        return {r["code"]: r for r in rows if "code" in r.keys() and r["code"]}
+
+    def _trial_balance(self, stage: _Stage) -> int:
+        ws, bold = stage.ws, export.bold
+        export.set_widths(ws, {1: 10, 2: 25, 3: 18, 4: 18, 5: 18, 6: 18})
+        ws.merged_cells.add("A1:F1")
+        ws.append([bold(ws, "TRIAL BALANCE", size=14)])
+        ws.append([bold(ws, h) for h in (
+            "Code", "Account Name", "Unadjusted Debit", "Unadjusted Credit", "Adjusted Debit", "Adjusted Credit",
+        )])
+        unadj_by_code = self._balances(stage, exclude_adjusting=True)
+        adj_by_code = self._balances(stage)
+        codes = sorted(set(unadj_by_code) | set(adj_by_code))
+        for code in codes:
+            unadj_r = unadj_by_code.get(code)
+            adj_r = adj_by_code.get(code)
+            # Prefer the adjusted row's name, fall back to the unadjusted one
+            name_row = adj_r or unadj_r
+            name = name_row["name"] if "name" in name_row.keys() else ""
+            unadj_d, unadj_c = balance_to_columns(unadj_r) if unadj_r else (0.0, 0.0)
+            adj_d, adj_c = balance_to_columns(adj_r) if adj_r else (0.0, 0.0)
+            ws.append([code, name, float(unadj_d or 0), float(unadj_c or 0), float(adj_d or 0), float(adj_c or 0)])
+        if codes:
+            last = len(codes) + 2
+            ws.append([None, bold(ws, "Totals:")] + [bold(ws, f"=SUM({c}3:{c}{last})") for c in "CDEF"])
+        return len(codes)
+
+    def _post_closing(self, stage: _Stage) -> int:
+        ws, bold = stage.ws, export.bold
+        export.set_widths(ws, {1: 10, 2: 25, 3: 18, 4: 18})
+        ws.merged_cells.add("A1:D1")
+        ws.append([bold(ws, "POST-CLOSING TRIAL BALANCE", size=14)])
+        ws.append([bold(ws, h) for h in ("Code", "Account Name", "Debit", "Credit")])
+        # Permanent accounts with a non-zero balance only
+        rows = []
+        for r in report_cache.trial_balance(period_id=self.period_id, include_temporary=False, conn=stage.conn):
+            d, c = balance_to_columns(r)
+            if (d or 0) != 0 or (c or 0) != 0:
+                rows.append([r["code"] if "code" in r.keys() else "", r["name"] if "name" in r.keys() else "",
+                             float(d or 0), float(c or 0)])
+        for row in rows:
+            ws.append(row)
+        if rows:
+            last = len(rows) + 2
+            ws.append([None, bold(ws, "Totals:")] + [bold(ws, f"=SUM({c}3:{c}{last})") for c in "CD"])
+        return len(rows)
+
+    def _adjusting_balances(self, conn) -> Dict[str, Any]:
+        # Net of this period's adjusting entries per active account.
+        balance = """
+            COALESCE(SUM(CASE WHEN je.period_id = ? AND je.is_adjusting = 1 THEN jl.debit ELSE 0 END), 0) -
+            COALESCE(SUM(CASE WHEN je.period_id = ? AND je.is_adjusting = 1 THEN jl.credit ELSE 0 END), 0)
+        """
+        sql = f"""
+            SELECT a.code, a.name, a.type,
+                   ROUND(CASE WHEN ({balance}) > 0 THEN ({balance}) ELSE 0 END, 2) AS net_debit,
+                   ROUND(CASE WHEN ({balance}) < 0 THEN -(({balance})) ELSE 0 END, 2) AS net_credit
+            FROM accounts a
+            LEFT JOIN journal_lines jl ON jl.account_id = a.id
+            LEFT JOIN journal_entries je ON je.id = jl.entry_id
+            WHERE a.is_active = 1
+            GROUP BY a.id, a.code, a.name, a.type
+            ORDER BY a.code
+        """
+        return {r["code"]: r for r in conn.execute(sql, [self.period_id] * 8).fetchall()}
+
+    def _worksheet(self, stage: _Stage) -> int:
+        ws = stage.ws
+        ws.append([
+            "Account No.",
+            "Account Title",
+            "Unadjusted Trial Balance Dr",
+            "Unadjusted Trial Balance Cr",
+            "Adjustments Dr",
+            "Adjustments Cr",
+            "Adjusted Trial Balance Dr",
+            "Adjusted Trial Balance Cr",
+            "Statement of Financial Performance Dr",
+            "Statement of Financial Performance Cr",
+            "Statement of Financial Position Dr",
+            "Statement of Financial Position Cr",
+        ])
+        unadj_by_code = self._balances(stage, exclude_adjusting=True)
+        adjs_by_code = self._adjusting_balances(stage.conn)
+        adjtb_by_code = self._balances(stage)
+        codes = sorted(set(unadj_by_code) | set(adjs_by_code) | set(adjtb_by_code))
+        keys = ("un_dr", "un_cr", "aj_dr", "aj_cr", "ad_dr", "ad_cr", "is_dr", "is_cr", "sfp_dr", "sfp_cr")
+        totals = dict.fromkeys(keys, 0.0)
+        for code in codes:
+            ru = unadj_by_code.get(code)
+            ra = adjs_by_code.get(code)
+            rt = adjtb_by_code.get(code)
+            row_for_name = rt or ru or ra
+            name = row_for_name["name"] if "name" in row_for_name.keys() else ""
+            typ = (row_for_name["type"] if "type" in row_for_name.keys() else "") or ""
+            temporary = typ.lower() in ("revenue", "expense")
+            un_dr = float(ru["net_debit"]) if ru else 0.0
+            un_cr = float(ru["net_credit"]) if ru else 0.0
+            aj_dr = float(ra["net_debit"]) if ra else 0.0
+            aj_cr = float(ra["net_credit"]) if ra else 0.0
+            ad_dr = float(rt["net_debit"]) if rt else 0.0
+            ad_cr = float(rt["net_credit"]) if rt else 0.0
+            is_dr = ad_dr if temporary and ad_dr > 0 else 0.0
+            is_cr = ad_cr if temporary and ad_cr > 0 else 0.0
+            sfp_dr = ad_dr if not temporary and ad_dr > 0 else 0.0
+            sfp_cr = ad_cr if not temporary and ad_cr > 0 else 0.0
+            values = (un_dr, un_cr, aj_dr, aj_cr, ad_dr, ad_cr, is_dr, is_cr, sfp_dr, sfp_cr)
+            ws.append([code, name, *values])
+            for key, value in zip(keys, values):
+                totals[key] += value
+        ws.append(["TOTAL", "", *(totals[k] for k in keys)])
+        net_income = round(totals["is_cr"] - totals["is_dr"], 2)
+        if net_income != 0:
+            is_dr = 0.0 if net_income > 0 else abs(net_income)
+            is_cr = net_income if net_income > 0 else 0.0
+            ws.append(["INCOME STATEMENT", "", "", "", "", "", "", "", is_dr, is_cr, "", ""])
+            ws.append(["TOTAL", "", *(totals[k] for k in keys[:6]),
+                       totals["is_dr"] + is_dr, totals["is_cr"] + is_cr, totals["sfp_dr"], totals["sfp_cr"]])
+        return len(codes)
+
+    def _stage_engine(self, stage: _Stage) -> Tuple[AccountingEngine, str, str]:
+        # The engine on this stage's connection, set to the exported period, and the statement dates.
+        engine = self.engine.with_connection(stage.conn)
+        if self.period_id is not None and self.period_id != engine.current_period_id:
+            engine.current_period = db.get_accounting_period_by_id(self.period_id, conn=stage.conn)
+        period = engine.current_period
+        start = self.start_date or (period["start_date"] if period and period["start_date"] else "1900-01-01")
+        end = self.end_date or (period["end_date"] if period and period["end_date"] else date.today().isoformat())
+        return engine, start, end
+
+    def _statement_title(self, ws, title: str, subtitle: str) -> None:
+        export.set_widths(ws, {1: 12, 2: 40, 3: 18})
+        ws.merged_cells.add("A1:C1")
+        ws.append([export.bold(ws, title, size=14)])
+        ws.append([subtitle])
+        ws.append([])
+
+    def _statement_section(self, ws, title: str, items: List[Dict[str, Any]], total_label: str, total: float) -> int:
+        ws.append([export.bold(ws, title)])
+        for item in items:
+            ws.append([item.get("code"), item.get("name"), float(item.get("amount") or 0)])
+        ws.append([None, export.bold(ws, total_label), export.bold(ws, float(total or 0))])
+        ws.append([])
+        return len(items)
+
+    def _income_statement(self, stage: _Stage) -> int:
+        engine, start, end = self._stage_engine(stage)
+        report = engine.generate_income_statement(start, end)
+        ws = stage.ws
+        self._statement_title(ws, "INCOME STATEMENT", f"For the period {start} to {end}")
+        count = self._statement_section(ws, "Revenues", report["revenues"], "Total Revenue", report["total_revenue"])
+        count += self._statement_section(ws, "Expenses", report["expenses"], "Total Expenses", report["total_expense"])
+        ws.append([None, export.bold(ws, "Net Income"), export.bold(ws, float(report["net_income"]))])
+        return count
+
+    def _balance_sheet(self, stage: _Stage) -> int:
+        engine, _, end = self._stage_engine(stage)
+        report = engine.generate_balance_sheet(end)
+        ws = stage.ws
+        self._statement_title(ws, "BALANCE SHEET", f"As of {end}")
+        count = self._statement_section(ws, "Assets", report["assets"], "Total Assets", report["total_assets"])
+        count += self._statement_section(
+            ws, "Liabilities", report["liabilities"], "Total Liabilities", report["total_liabilities"],
+        )
+        count += self._statement_section(ws, "Equity", report["equity"], "Total Equity", report["total_equity"])
+        ws.append([None, export.bold(ws, "Total Liabilities and Equity"),
+                   export.bold(ws, round(report["total_liabilities"] + report["total_equity"], 2))])
+        return count
+
+    def _cash_flow(self, stage: _Stage) -> int:
+        engine, start, end = self._stage_engine(stage)
+        report = engine.generate_cash_flow(start, end)
+        ws = stage.ws
+        self._statement_title(ws, "CASH FLOW STATEMENT", f"For the period {start} to {end}")
+        if report.get("error"):
+            ws.append([None, f"Error: {report['error']}"])
+            return 0
+        count = 0
+        for section in report["sections"]:
+            items = [{"code": item["date"], "name": f"Entry #{item['entry_id']}", "amount": item["amount"]}
+                     for item in report["sections"][section]]
+            count += self._statement_section(ws, section, items, f"Total {section}", report["totals"][section])
+        ws.append([None, export.bold(ws, "Net Change in Cash"), export.bold(ws, float(report["net_change_in_cash"]))])
+        return count
+
+
+def write_all_workbook(
+    path: str,
+    *,
+    period_id: Optional[int] = None,
+    engine: Optional[AccountingEngine] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    progress: Optional[StageProgress] = None,
+    check: Optional[Callable[[], None]] = None,
+    max_workers: int = 4,
+) -> str:
+    """Build the Export All workbook at ``path`` through an ``ExportAllPipeline``."""
+    pipeline = ExportAllPipeline(
+        period_id=period_id, engine=engine, start_date=start_date, end_date=end_date,
+        progress=progress, check=check, max_workers=max_workers,
+    )
+    return pipeline.save(path)
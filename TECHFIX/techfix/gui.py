@@ -7,7 +7,7 @@ import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta, date
 import calendar
-from typing import Optional, Sequence, List, Dict
+from typing import Any, Callable, Optional, Sequence, List, Dict, Tuple
 import json
 import sys
 import subprocess
@@ -25,15 +25,19 @@ except Exception:
 # Support running as a module (package) or as a script
 try:
     if __package__:
-        from . import db  # type: ignore
-        from .accounting import AccountingEngine, JournalLine  # type: ignore
+        from . import columnar, db, export, export_all, report_cache  # type: ignore
+        from .accounting import AccountingEngine, JournalLine, PostingEvent  # type: ignore
+        from .virtual_tree import VirtualTreeview, LedgerRowProvider, SequenceRowProvider  # type: ignore
+        from .tasks import Task, TaskExecutor  # type: ignore
     else:
         raise ImportError
 except Exception:
     import os, sys
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-    from techfix import db  # type: ignore
-    from techfix.accounting import AccountingEngine, JournalLine  # type: ignore
+    from techfix import columnar, db, export, export_all, report_cache  # type: ignore
+    from techfix.accounting import AccountingEngine, JournalLine, PostingEvent  # type: ignore
+    from techfix.virtual_tree import VirtualTreeview, LedgerRowProvider, SequenceRowProvider  # type: ignore
+    from techfix.tasks import Task, TaskExecutor  # type: ignore
 
 
 logger = logging.getLogger(__name__)
@@ -472,6 +476,11 @@ class TechFixApp(tk.Tk):
             self.session_token = None
 
         self.engine = AccountingEngine()
+        # Loads and exports run here; results come back through after().
+        self.tasks = TaskExecutor(self)
+        # Views apply the engine's posting events instead of reloading everything.
+        self._posting_events: List[PostingEvent] = []
+        self.engine.subscribe(self._on_posting_event)
         self.periods: List = []
         self.current_period_id: Optional[int] = self.engine.current_period_id
         self.cycle_status_rows: List = []
@@ -533,8 +542,19 @@ class TechFixApp(tk.Tk):
         except Exception:
             pass
 
+        # Scheduled snapshots run on their own thread and wait while the user works.
+        self.backup_scheduler = None
+        self._start_backup_scheduler()
+        self.bind_all("<Key>", lambda e: self._note_activity(), add="+")
+
     def destroy(self) -> None:
         try:
+            scheduler = getattr(self, 'backup_scheduler', None)
+            if scheduler is not None:
+                scheduler.stop()
+            tasks = getattr(self, 'tasks', None)
+            if tasks is not None:
+                tasks.shutdown()
             self.engine.close()
         finally:
             super().destroy()
@@ -2407,7 +2427,8 @@ class TechFixApp(tk.Tk):
                     dialog.unbind("<MouseWheel>")
                 except:
                     pass
-            dialog.bind("<Destroy>", lambda e: cleanup_bindings())
+                session.close()
+            dialog.bind("<Destroy>", lambda e: cleanup_bindings() if e.widget is dialog else None)
             
             def create_result_card(parent, icon, title, subtitle, data_type, item_id, on_click=None):
                 """Create a clickable result card."""
@@ -2490,6 +2511,7 @@ class TechFixApp(tk.Tk):
                 
                 if on_click:
                     def handle_click(e):
+                        session.record(shown_query[0])
                         on_click()
                     card_frame.bind('<Button-1>', handle_click)
                     content_frame.bind('<Button-1>', handle_click)
@@ -2500,10 +2522,27 @@ class TechFixApp(tk.Tk):
                 
                 return card_frame
             
-            def do_search():
+            def current_query():
                 query = search_entry.get().strip()
                 if query == "Search transactions, accounts, customers, vendors...":
                     query = ""
+                return query
+            
+            def use_suggestion(text):
+                on_search_focus_in(None)
+                search_entry.delete(0, tk.END)
+                search_entry.insert(0, text)
+                session.record(text)
+                do_search()
+            
+            def do_search():
+                query = current_query()
+                if query and len(query) >= 2:
+                    # Debounced; cached or narrowed queries come back at once
+                    session.schedule(query)
+                    return
+                session.cancel()
+                shown_results[0] = None
                 
                 # Clear results
                 for widget in results_frame.winfo_children():
@@ -2540,10 +2579,51 @@ class TechFixApp(tk.Tk):
                         fg=self.palette.get("text_secondary", "#6b7280")
                     )
                     empty_subtitle.pack()
+                    
+                    # Recent searches from search_history, served from memory
+                    recent = session.suggestions(query)
+                    if recent:
+                        tk.Label(
+                            empty_frame,
+                            text="Recent searches",
+                            font=("{Segoe UI Semibold} 11"),
+                            bg=self.palette.get("surface_bg", "#ffffff"),
+                            fg=self.palette.get("text_primary", "#111827")
+                        ).pack(pady=(24, 4))
+                        for text in recent:
+                            link = tk.Label(
+                                empty_frame,
+                                text=text,
+                                font=("{Segoe UI} 11"),
+                                bg=self.palette.get("surface_bg", "#ffffff"),
+                                fg=self.palette.get("accent_color", "#2563eb"),
+                                cursor="hand2"
+                            )
+                            link.pack()
+                            link.bind('<Button-1>', lambda e, t=text: use_suggestion(t))
+                    return
+            
+            shown_query = [""]
+            shown_results = [None]
+            
+            def render_results(query, results):
+                """Show ``results``; skipped when the same hits are already on screen."""
+                if not results_frame.winfo_exists() or query != current_query():
                     return
+                shown_query[0] = query
+                signature = (
+                    None if any(results.values()) else query,  # the empty state names the query
+                    tuple(
+                        (kind, tuple((row.get('id'), row.get('match')) for row in rows))
+                        for kind, rows in results.items()
+                    ),
+                )
+                if signature == shown_results[0]:
+                    return
+                shown_results[0] = signature
                 
-                # Perform search
-                results = search.global_search(query, limit=20)
+                for widget in results_frame.winfo_children():
+                    widget.destroy()
                 
                 total_results = sum(len(v) for v in results.values())
                 
@@ -2618,11 +2698,15 @@ class TechFixApp(tk.Tk):
                             self._nav_to(0)  # Navigate to Transactions tab
                             # Could add logic to highlight/select the entry
                         
+                        subtitle = f"{date_str} • Status: {status}"
+                        if entry.get('match'):
+                            subtitle += f" • {entry['match']}"
+                        
                         create_result_card(
                             section_frame,
                             "🧾",
                             desc,
-                            f"{date_str} • Status: {status}",
+                            subtitle,
                             "journal_entry",
                             entry_id,
                             navigate_to_entry
@@ -2748,8 +2832,19 @@ class TechFixApp(tk.Tk):
                 canvas.update_idletasks()
                 canvas.configure(scrollregion=canvas.bbox("all"))
             
-            search_entry.bind('<Return>', lambda e: do_search())
-            search_entry.bind('<KeyRelease>', lambda e: do_search() if len(search_entry.get().strip()) >= 2 else None)
+            session = search.SearchSession(
+                dialog,
+                render_results,
+                user_id=self.current_user.get('id') if self.current_user else None,
+                limit=20,
+            )
+            
+            def on_return(e):
+                session.record(current_query())
+                do_search()
+            
+            search_entry.bind('<Return>', on_return)
+            search_entry.bind('<KeyRelease>', lambda e: do_search())
             
             # Action buttons
             btn_frame = ttk.Frame(main_frame, style="Techfix.Surface.TFrame")
@@ -2778,14 +2873,14 @@ class TechFixApp(tk.Tk):
     def _show_backup_dialog(self) -> None:
         """Show backup dialog."""
         try:
-            from . import backup
+            from . import backup, backup_store
             
             # Show dialog for backup description
             dialog = tk.Toplevel(self)
             dialog.title("Backup Database")
             dialog.transient(self)
             dialog.grab_set()
-            dialog.geometry("500x200")
+            dialog.geometry("520x280")
             dialog.configure(bg=self.palette.get("surface_bg", "#ffffff"))
             
             main_frame = ttk.Frame(dialog, style="Techfix.Surface.TFrame", padding=24)
@@ -2817,59 +2912,105 @@ class TechFixApp(tk.Tk):
             )
             info_label.pack(anchor=tk.W, pady=(0, 12))
             
+            snapshot_var = tk.BooleanVar(value=False)
+            snapshot_check = ttk.Checkbutton(
+                main_frame,
+                text="Deduplicated snapshot (stores only what changed since earlier snapshots)",
+                variable=snapshot_var,
+            )
+            snapshot_check.pack(anchor=tk.W, pady=(0, 12))
+            
+            progress_var = tk.DoubleVar(value=0.0)
+            progress_bar = ttk.Progressbar(main_frame, variable=progress_var, maximum=100.0, mode="determinate")
+            
+            def cancel():
+                # Abandons a running backup (its partial copy is removed) or just closes.
+                self.tasks.cancel("backup")
+                self.set_status("")
+                dialog.destroy()
+            
+            def done(backup_path):
+                if dialog.winfo_exists():
+                    dialog.destroy()
+                if backup_path:
+                    # Get file size (for a snapshot, the new data it added to the store)
+                    try:
+                        if backup_store.is_snapshot(backup_path):
+                            size_bytes = backup_store.read_manifest(backup_path)['stored']
+                        else:
+                            size_bytes = backup_path.stat().st_size
+                        size_str = f"{size_bytes / (1024*1024):.2f} MB" if size_bytes > 1024*1024 else f"{size_bytes / 1024:.2f} KB"
+                    except:
+                        size_str = "Unknown"
+                    
+                    messagebox.showinfo(
+                        "Backup Created Successfully",
+                        f"Backup created successfully!\n\n"
+                        f"File: {backup_path.name}\n"
+                        f"Size: {size_str}\n"
+                        f"Location: {backup_path.parent}\n\n"
+                        f"Your database and settings have been backed up.",
+                        parent=self
+                    )
+                    self.set_status(f"Backup created: {backup_path.name}", "success")
+                else:
+                    messagebox.showerror("Backup Failed", "Failed to create backup. Please check the logs for details.", parent=self)
+                    self.set_status("Backup failed", "error")
+            
+            def failed(e: BaseException):
+                if dialog.winfo_exists():
+                    dialog.destroy()
+                logger.error(f"Backup error: {e}", exc_info=e)
+                messagebox.showerror("Backup Error", f"An error occurred while creating backup:\n{e}", parent=self)
+                self.set_status("Backup error", "error")
+            
+            def on_progress(value):
+                done_pages, total_pages = value
+                percent = 100.0 * done_pages / total_pages if total_pages else 100.0
+                if dialog.winfo_exists():
+                    progress_var.set(percent)
+                self.set_status(f"Creating backup... {percent:.0f}%", "info")
+            
             def create_backup():
+                if self.tasks.pending("backup"):
+                    return
                 description = desc_var.get().strip() or None
-                dialog.destroy()
-                
-                # Show progress
+                make = backup_store.create_snapshot if snapshot_var.get() else backup.create_full_backup
+                create_btn.state(["disabled"])
+                desc_entry.state(["disabled"])
+                snapshot_check.state(["disabled"])
+                info_label.configure(text="Copying database; you can keep working meanwhile.")
+                progress_bar.pack(fill=tk.X, pady=(0, 12), before=btn_frame)
                 self.set_status("Creating backup...", "info")
-                self.update()
-                
-                try:
-                    backup_path = backup.create_full_backup(description)
-                    
-                    if backup_path:
-                        # Get file size
-                        try:
-                            size_bytes = backup_path.stat().st_size
-                            size_str = f"{size_bytes / (1024*1024):.2f} MB" if size_bytes > 1024*1024 else f"{size_bytes / 1024:.2f} KB"
-                        except:
-                            size_str = "Unknown"
-                        
-                        messagebox.showinfo(
-                            "Backup Created Successfully",
-                            f"Backup created successfully!\n\n"
-                            f"File: {backup_path.name}\n"
-                            f"Size: {size_str}\n"
-                            f"Location: {backup_path.parent}\n\n"
-                            f"Your database and settings have been backed up.",
-                            parent=self
-                        )
-                        self.set_status(f"Backup created: {backup_path.name}", "success")
-                    else:
-                        messagebox.showerror("Backup Failed", "Failed to create backup. Please check the logs for details.", parent=self)
-                        self.set_status("Backup failed", "error")
-                except Exception as e:
-                    logger.error(f"Backup error: {e}", exc_info=True)
-                    messagebox.showerror("Backup Error", f"An error occurred while creating backup:\n{e}", parent=self)
-                    self.set_status("Backup error", "error")
+                # The online copy runs off the Tk thread; writers are only paused per step.
+                self.tasks.submit(
+                    "backup",
+                    lambda ctx: make(
+                        description, check=ctx.check, progress=lambda done, total: ctx.progress((done, total)),
+                    ),
+                    done,
+                    failed,
+                    on_progress=on_progress,
+                )
             
             btn_frame = ttk.Frame(main_frame, style="Techfix.Surface.TFrame")
             btn_frame.pack(fill=tk.X, pady=(12, 0))
             
-            ttk.Button(
+            create_btn = ttk.Button(
                 btn_frame,
                 text="Create Backup",
                 command=create_backup,
                 style="Techfix.TButton"
-            ).pack(side=tk.RIGHT, padx=(8, 0))
+            )
+            create_btn.pack(side=tk.RIGHT, padx=(8, 0))
             
             ttk.Button(
                 btn_frame,
                 text="Cancel",
-                command=dialog.destroy,
+                command=cancel,
                 style="Techfix.TButton"
             ).pack(side=tk.RIGHT)
+            dialog.protocol("WM_DELETE_WINDOW", cancel)
             
             # Allow Enter key to create backup
             desc_entry.bind('<Return>', lambda e: create_backup())
@@ -2878,6 +3019,109 @@ class TechFixApp(tk.Tk):
             logger.error(f"Backup dialog error: {e}", exc_info=True)
             messagebox.showerror("Error", f"Backup dialog error: {e}")
     
+    def _start_backup_scheduler(self) -> None:
+        """(Re)start the backup scheduler from the saved settings."""
+        try:
+            from . import backup_scheduler
+            
+            if self.backup_scheduler is not None:
+                self.backup_scheduler.stop()
+                self.backup_scheduler = None
+            config = backup_scheduler.load_config()
+            if config.get("enabled", True):
+                self.backup_scheduler = backup_scheduler.BackupScheduler.from_config(config)
+                self.backup_scheduler.start()
+        except Exception as e:
+            logger.warning(f"Backup scheduler not started: {e}")
+    
+    def _note_activity(self) -> None:
+        """Typing and posting hold scheduled backups back until the user is idle."""
+        if getattr(self, 'backup_scheduler', None) is not None:
+            self.backup_scheduler.touch()
+    
+    def _show_backup_schedule_dialog(self) -> None:
+        """Show the scheduled backup and retention settings."""
+        try:
+            from . import backup_scheduler
+            
+            config = backup_scheduler.load_config()
+            dialog = tk.Toplevel(self)
+            dialog.title("Backup Schedule")
+            dialog.transient(self)
+            dialog.grab_set()
+            dialog.geometry("460x330")
+            dialog.configure(bg=self.palette.get("surface_bg", "#ffffff"))
+            
+            main_frame = ttk.Frame(dialog, style="Techfix.Surface.TFrame", padding=24)
+            main_frame.pack(fill=tk.BOTH, expand=True)
+            
+            enabled_var = tk.BooleanVar(value=bool(config.get("enabled", True)))
+            ttk.Checkbutton(
+                main_frame,
+                text="Take scheduled snapshots when the data has changed",
+                variable=enabled_var,
+            ).grid(row=0, column=0, columnspan=2, sticky=tk.W, pady=(0, 12))
+            
+            ttk.Label(main_frame, text="Schedule:", style="TLabel").grid(row=1, column=0, sticky=tk.W, pady=4)
+            schedule_var = tk.StringVar(value=str(config.get("schedule", backup_scheduler.DEFAULT_SCHEDULE)))
+            ttk.Entry(main_frame, textvariable=schedule_var, width=24, style="Techfix.TEntry").grid(
+                row=1, column=1, sticky=tk.W, pady=4
+            )
+            ttk.Label(
+                main_frame,
+                text="e.g. 6h, @daily, or cron \"30 18 * * 1-5\"",
+                style="TLabel",
+                foreground=self.palette.get("text_secondary", "#6b7280")
+            ).grid(row=2, column=1, sticky=tk.W, pady=(0, 8))
+            
+            keep_vars = {}
+            for row, (key, label) in enumerate(
+                (("daily", "Daily snapshots to keep:"), ("weekly", "Weekly snapshots to keep:"),
+                 ("monthly", "Monthly snapshots to keep:")),
+                start=3,
+            ):
+                ttk.Label(main_frame, text=label, style="TLabel").grid(row=row, column=0, sticky=tk.W, pady=4)
+                keep_vars[key] = tk.IntVar(value=int(config.get(key, 0)))
+                ttk.Spinbox(main_frame, from_=0, to=999, textvariable=keep_vars[key], width=6).grid(
+                    row=row, column=1, sticky=tk.W, pady=4
+                )
+            
+            scheduler = self.backup_scheduler
+            next_text = (
+                f"Next run: {scheduler.next_run().astimezone():%Y-%m-%d %H:%M}" if scheduler else "Scheduler is off"
+            )
+            ttk.Label(
+                main_frame,
+                text=next_text,
+                style="TLabel",
+                foreground=self.palette.get("text_secondary", "#6b7280")
+            ).grid(row=6, column=0, columnspan=2, sticky=tk.W, pady=(8, 0))
+            
+            def save():
+                try:
+                    backup_scheduler.parse_schedule(schedule_var.get())
+                    new_config = {
+                        "enabled": enabled_var.get(),
+                        "schedule": schedule_var.get().strip(),
+                        **{key: max(0, int(var.get())) for key, var in keep_vars.items()},
+                    }
+                except (backup_scheduler.ScheduleError, tk.TclError, ValueError) as e:
+                    messagebox.showerror("Backup Schedule", f"Invalid setting: {e}", parent=dialog)
+                    return
+                backup_scheduler.save_config(new_config)
+                self._start_backup_scheduler()
+                dialog.destroy()
+                self.set_status("Backup schedule saved", "success")
+            
+            btn_frame = ttk.Frame(main_frame, style="Techfix.Surface.TFrame")
+            btn_frame.grid(row=7, column=0, columnspan=2, sticky=tk.E, pady=(16, 0))
+            ttk.Button(btn_frame, text="Save", command=save, style="Techfix.TButton").pack(side=tk.RIGHT, padx=(8, 0))
+            ttk.Button(btn_frame, text="Cancel", command=dialog.destroy, style="Techfix.TButton").pack(side=tk.RIGHT)
+            
+        except Exception as e:
+            logger.error(f"Backup schedule dialog error: {e}", exc_info=True)
+            messagebox.showerror("Error", f"Backup schedule dialog error: {e}")
+    
     def _show_restore_dialog(self) -> None:
         """Show restore dialog with list of available backups."""
         try:
@@ -3159,36 +3403,25 @@ class TechFixApp(tk.Tk):
                 messagebox.showerror("Error", "Unsupported file format. Please select an Excel (.xlsx, .xls) or CSV (.csv) file.", parent=self)
                 return
             
-            # Check if pandas is available for CSV
-            if file_path.suffix.lower() == '.csv':
-                if not import_data.PANDAS_AVAILABLE:
-                    messagebox.showerror(
-                        "Error",
-                        "CSV import requires pandas library.\n\n"
-                        "Please install it using: pip install pandas",
-                        parent=self
-                    )
-                    return
+            # .xls still needs pandas; CSV and .xlsx are streamed without it
+            if file_path.suffix.lower() == '.xls' and not import_data.PANDAS_AVAILABLE:
+                messagebox.showerror(
+                    "Error",
+                    "Importing .xls files requires the pandas library.\n\n"
+                    "Please install it using: pip install pandas xlrd\n"
+                    "or save the file as .xlsx.",
+                    parent=self
+                )
+                return
             
-            # Show progress
-            self.set_status(f"Importing transactions from {file_path.name}...", "info")
-            self.update()
+            if self.tasks.pending("import"):
+                messagebox.showinfo("Import", "An import is already running.", parent=self)
+                return
             
-            try:
-                # Perform import
-                if file_path.suffix.lower() in ['.xlsx', '.xls']:
-                    success, errors, error_msgs = import_data.import_transactions_from_excel(
-                        file_path,
-                        period_id=self.current_period_id,
-                        default_status="draft"
-                    )
-                else:  # CSV
-                    success, errors, error_msgs = import_data.import_transactions_from_csv(
-                        file_path,
-                        period_id=self.current_period_id,
-                        default_status="draft"
-                    )
-                
+            reject_path = import_data.default_reject_path(file_path)
+            
+            def done(result):
+                success, errors, error_msgs = result
                 # Build result message
                 if success > 0:
                     msg = f"✅ Successfully imported {success} transaction(s)"
@@ -3196,8 +3429,9 @@ class TechFixApp(tk.Tk):
                         msg += f"\n⚠️ {errors} error(s) occurred"
                         if error_msgs:
                             msg += "\n\nErrors:\n" + "\n".join(error_msgs[:10])
-                            if len(error_msgs) > 10:
-                                msg += f"\n... and {len(error_msgs) - 10} more error(s)"
+                            if errors > 10:
+                                msg += f"\n... and {errors - 10} more error(s)"
+                        msg += f"\n\nRejected rows were saved to:\n{reject_path}"
                     
                     messagebox.showinfo("Import Complete", msg, parent=self)
                     self.set_status(f"Imported {success} transaction(s) from {file_path.name}", "success")
@@ -3209,21 +3443,50 @@ class TechFixApp(tk.Tk):
                         msg = f"❌ Import failed: {errors} error(s) occurred"
                         if error_msgs:
                             msg += "\n\nErrors:\n" + "\n".join(error_msgs[:10])
-                            if len(error_msgs) > 10:
-                                msg += f"\n... and {len(error_msgs) - 10} more error(s)"
+                            if errors > 10:
+                                msg += f"\n... and {errors - 10} more error(s)"
+                        msg += f"\n\nRejected rows were saved to:\n{reject_path}"
                         messagebox.showerror("Import Failed", msg, parent=self)
                         self.set_status("Import failed", "error")
+                    elif error_msgs:
+                        messagebox.showerror("Import Error", f"An error occurred during import:\n\n{error_msgs[0]}", parent=self)
+                        self.set_status("Import error", "error")
                     else:
                         messagebox.showwarning("Import Complete", "No transactions were imported. Please check your file format.", parent=self)
                         self.set_status("No transactions imported", "warning")
-                        
-            except Exception as import_error:
-                logger.error(f"Import error: {import_error}", exc_info=True)
+            
+            def failed(import_error: BaseException):
+                logger.error(f"Import error: {import_error}", exc_info=import_error)
                 error_msg = str(import_error)
                 if "pandas" in error_msg.lower() or "openpyxl" in error_msg.lower():
-                    error_msg = f"Import library error: {error_msg}\n\nPlease ensure required libraries are installed:\npip install pandas openpyxl"
+                    error_msg = f"Import library error: {error_msg}\n\nPlease ensure required libraries are installed:\npip install openpyxl"
                 messagebox.showerror("Import Error", f"An error occurred during import:\n\n{error_msg}", parent=self)
                 self.set_status("Import error", "error")
+                # Chunks posted before the failure are kept
+                self._load_all_views()
+            
+            def on_progress(value):
+                read, imported = value
+                self.set_status(f"Importing from {file_path.name}... {read:,} rows read, {imported:,} imported", "info")
+            
+            self.set_status(f"Importing transactions from {file_path.name}...", "info")
+            # Rows are read and posted chunk by chunk off the Tk thread
+            period_id = self.current_period_id
+            self.tasks.submit(
+                "import",
+                lambda ctx: import_data.import_transactions(
+                    file_path,
+                    period_id=period_id,
+                    default_status="draft",
+                    reject_path=reject_path,
+                    progress=lambda read, imported: ctx.progress((read, imported)),
+                    check=ctx.check,
+                    conn=ctx.conn,
+                ),
+                done,
+                failed,
+                on_progress=on_progress,
+            )
                 
         except Exception as e:
             logger.error(f"Import dialog error: {e}", exc_info=True)
@@ -3372,26 +3635,64 @@ class TechFixApp(tk.Tk):
             create_metric_card(metrics_container, "📊", "Net Income", f"₱{net_income:,.2f}", "#3b82f6", 0, 2)
             create_metric_card(metrics_container, "🧾", "Transactions", f"{txn_count:,}", "#8b5cf6", 0, 3)
             
-            # Revenue trend chart section
-            trend_frame = ttk.LabelFrame(main_frame, text="📈 Revenue Trend (Last 30 Days)", style="Techfix.TLabelframe")
+            # Trend chart section
+            trend_frame = ttk.LabelFrame(main_frame, text="📈 Trend", style="Techfix.TLabelframe")
             trend_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
             
+            trend_controls = ttk.Frame(trend_frame, style="Techfix.Surface.TFrame")
+            trend_controls.pack(fill=tk.X, padx=16, pady=(12, 0))
+            
+            trend_ranges = {
+                "Last 30 days": 30,
+                "Last 6 months": 182,
+                "Last 12 months": 365,
+                "Last 3 years": 1095,
+            }
+            trend_series = {
+                "Revenue": ("revenue", False),
+                "Expenses": ("expense", False),
+                "Net income": ("net_income", False),
+                "Cumulative net income": ("net_income", True),
+                "Cash balance": ("cash_balance", False),
+            }
+            range_var = tk.StringVar(value="Last 30 days")
+            series_var = tk.StringVar(value="Revenue")
+            ttk.Combobox(trend_controls, textvariable=series_var, values=list(trend_series), state="readonly", width=22).pack(side=tk.LEFT)
+            ttk.Combobox(trend_controls, textvariable=range_var, values=list(trend_ranges), state="readonly", width=16).pack(side=tk.LEFT, padx=(8, 0))
+            trend_caption = ttk.Label(trend_controls, text="", foreground=self.palette.get("text_secondary", "#6b7280"))
+            trend_caption.pack(side=tk.LEFT, padx=(12, 0))
+            
             trend_inner = ttk.Frame(trend_frame, style="Techfix.Surface.TFrame")
             trend_inner.pack(fill=tk.BOTH, expand=True, padx=16, pady=16)
             
-            trend_data = analytics.get_revenue_trend(days=30)
-            if trend_data:
-                chart = self._create_mini_chart(trend_inner, [d['revenue'] for d in trend_data], width=920, height=250, title=None)
-                chart.pack(fill=tk.BOTH, expand=True)
-            else:
-                empty_chart = tk.Label(
-                    trend_inner,
-                    text="📊 No revenue data available",
-                    font=("{Segoe UI} 14"),
-                    bg=self.palette.get("surface_bg", "#ffffff"),
-                    fg=self.palette.get("text_secondary", "#6b7280")
-                )
-                empty_chart.pack(expand=True)
+            def draw_trend(*_):
+                for child in trend_inner.winfo_children():
+                    child.destroy()
+                end = datetime.now().date()
+                start = end - timedelta(days=trend_ranges.get(range_var.get(), 30) - 1)
+                granularity = analytics.pick_granularity(start, end)
+                series = analytics.get_time_series(start, end, granularity=granularity)
+                key, running = trend_series.get(series_var.get(), ("revenue", False))
+                values = series[key]
+                if running:
+                    values = analytics.cumulative(values)
+                trend_caption.configure(text=f"{len(values)} {granularity}s from {series['start']}")
+                if any(values):
+                    chart = self._create_mini_chart(trend_inner, values, width=920, height=250, title=None)
+                    chart.pack(fill=tk.BOTH, expand=True)
+                else:
+                    empty_chart = tk.Label(
+                        trend_inner,
+                        text="📊 No data for this range",
+                        font=("{Segoe UI} 14"),
+                        bg=self.palette.get("surface_bg", "#ffffff"),
+                        fg=self.palette.get("text_secondary", "#6b7280")
+                    )
+                    empty_chart.pack(expand=True)
+            
+            range_var.trace_add("write", draw_trend)
+            series_var.trace_add("write", draw_trend)
+            draw_trend()
             
             # Action buttons
             btn_frame = ttk.Frame(main_frame, style="Techfix.Surface.TFrame")
@@ -7227,6 +7528,7 @@ Help:
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Backup Database...", command=self._show_backup_dialog)
         self.file_menu.add_command(label="Restore Database...", command=self._show_restore_dialog)
+        self.file_menu.add_command(label="Backup Schedule...", command=self._show_backup_schedule_dialog)
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Exit", command=self._on_close, accelerator="Ctrl+Q")
         self.menubar.add_cascade(label="File", menu=self.file_menu)
@@ -9842,7 +10144,7 @@ Help:
                 """
                 + (clause or "")
                 + """
-                ORDER BY date(je.date) DESC, je.id DESC
+                ORDER BY je.date DESC, je.id DESC
                 LIMIT ?
                 """
             )
@@ -9978,38 +10280,20 @@ Help:
             if not messagebox.askyesno("Confirm Delete", f"Delete transaction #{entry_id}?\n\nThis action cannot be undone."):
                 return
             
-            # Delete from database
-            conn = self.engine.conn
+            # Delete from database (journal_lines cascade); views update from the posting event
             try:
-                # Delete journal entry (journal_lines will cascade delete due to foreign key)
-                conn.execute("DELETE FROM journal_entries WHERE id=?", (entry_id,))
-                conn.commit()
+                self.engine.delete_entry(entry_id)
                 messagebox.showinfo("Success", f"Transaction #{entry_id} has been deleted.")
             except Exception as e:
                 logger.exception("Error deleting transaction")
                 messagebox.showerror("Delete Failed", f"Error deleting transaction: {str(e)}")
-                conn.rollback()
                 return
             
-            # Reload transactions in window
+            # Reload transactions in window; the other views update from the posting event
             try:
                 self._load_recent_transactions_window(tree=tree)
             except Exception as e:
                 logger.exception("Error reloading transactions window")
-            
-            # Refresh other views that might show this transaction
-            try:
-                self._load_journal_entries()
-            except Exception:
-                pass
-            try:
-                self._load_recent_transactions()
-            except Exception:
-                pass
-            try:
-                self._refresh_cycle_and_views()
-            except Exception:
-                pass
                 
         except Exception as e:
             logger.exception("Unexpected error in _delete_selected_transaction_window")
@@ -10043,21 +10327,12 @@ Help:
                 return
             if not messagebox.askyesno("Confirm Delete", f"Delete transaction #{entry_id}? This cannot be undone."):
                 return
-            conn = self.engine.conn
             try:
-                conn.execute("DELETE FROM journal_entries WHERE id=?", (entry_id,))
-                conn.commit()
+                # Views (recent transactions, journal, ...) update from the posting event.
+                self.engine.delete_entry(entry_id)
             except Exception as e:
                 messagebox.showerror("Delete Failed", f"Error deleting transaction: {e}")
                 return
-            try:
-                self._load_recent_transactions()
-            except Exception:
-                pass
-            try:
-                self._load_journal_entries()
-            except Exception:
-                pass
         except Exception:
             pass
 
@@ -10256,12 +10531,11 @@ Help:
 
         try:
             date_str = (self.adjust_date.get().strip() if hasattr(self, 'adjust_date') else '') or datetime.utcnow().date().isoformat()
-            entry_id = db.insert_journal_entry(
-                date=date_str,
-                description=f"Adjust supplies: used {amt:.2f}",
-                lines=[(supplies_exp['id'], amt, 0.0), (supplies['id'], 0.0, amt)],
-                is_adjusting=1,
-                conn=self.engine.conn,
+            entry_id = self.engine.record_entry(
+                date_str,
+                f"Adjust supplies: used {amt:.2f}",
+                [JournalLine(account_id=supplies_exp['id'], debit=amt), JournalLine(account_id=supplies['id'], credit=amt)],
+                is_adjusting=True,
             )
             messagebox.showinfo("Adjusted", f"Created adjusting entry {entry_id} for supplies ({amt:.2f})")
             self._refresh_after_post()
@@ -10288,12 +10562,11 @@ Help:
 
         try:
             date_str = (self.adjust_date.get().strip() if hasattr(self, 'adjust_date') else '') or datetime.utcnow().date().isoformat()
-            entry_id = db.insert_journal_entry(
-                date=date_str,
-                description=f"Amortize prepaid rent: {amt:.2f}",
-                lines=[(rent_exp['id'], amt, 0.0), (prepaid['id'], 0.0, amt)],
-                is_adjusting=1,
-                conn=self.engine.conn,
+            entry_id = self.engine.record_entry(
+                date_str,
+                f"Amortize prepaid rent: {amt:.2f}",
+                [JournalLine(account_id=rent_exp['id'], debit=amt), JournalLine(account_id=prepaid['id'], credit=amt)],
+                is_adjusting=True,
             )
             messagebox.showinfo("Amortized", f"Created amortization entry {entry_id} ({amt:.2f})")
             self._refresh_after_post()
@@ -10320,12 +10593,11 @@ Help:
 
         try:
             date_str = (self.adjust_date.get().strip() if hasattr(self, 'adjust_date') else '') or datetime.utcnow().date().isoformat()
-            entry_id = db.insert_journal_entry(
-                date=date_str,
-                description=f"Record depreciation: {amt:.2f}",
-                lines=[(depr_exp['id'], amt, 0.0), (acc_depr['id'], 0.0, amt)],
-                is_adjusting=1,
-                conn=self.engine.conn,
+            entry_id = self.engine.record_entry(
+                date_str,
+                f"Record depreciation: {amt:.2f}",
+                [JournalLine(account_id=depr_exp['id'], debit=amt), JournalLine(account_id=acc_depr['id'], credit=amt)],
+                is_adjusting=True,
             )
             messagebox.showinfo("Depreciated", f"Created depreciation entry {entry_id} ({amt:.2f})")
             self._refresh_after_post()
@@ -10596,15 +10868,20 @@ Help:
             pass
         self.journal_account_filter.bind("<<ComboboxSelected>>", lambda e: self._load_journal_entries())
 
-        # Create the treeview for journal entries
+        # Virtual treeview: only the journal lines in view are rendered
         columns = ("date", "reference", "description", "debit", "credit", "account")
-        self.journal_tree = ttk.Treeview(
+        self._journal_rows: list = []
+        self._journal_row_entries: list = []
+        self._journal_totals_row = None
+        self.journal_view = VirtualTreeview(
             frame,
-            columns=columns,
-            show="headings",
+            columns,
+            frame_style="Techfix.Surface.TFrame",
+            row_tags=lambda values: ("totals",) if values is self._journal_totals_row else (),
             selectmode="browse",
             style="Techfix.Treeview",
         )
+        self.journal_tree = self.journal_view.tree
 
         # Configure columns
         self.journal_tree.heading("date", text="Date")
@@ -10622,13 +10899,14 @@ Help:
         self.journal_tree.column("credit", width=100, anchor=tk.E)
         self.journal_tree.column("account", width=200, anchor=tk.W)
 
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.journal_tree.yview)
-        self.journal_tree.configure(yscrollcommand=scrollbar.set)
-
-        # Pack the treeview and scrollbar
-        self.journal_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=4, pady=4)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=4)
+        # Make the totals row visually distinct and bold
+        self.journal_tree.tag_configure(
+            'totals',
+            background=self.palette.get('tab_selected_bg', '#e0ecff'),
+            foreground=self.palette.get('text_primary', '#000000'),
+            font=FONT_BOLD,
+        )
+        self.journal_view.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
 
         # Bind double-click event
         self.journal_tree.bind("<Double-1>", self._on_journal_entry_double_click)
@@ -10637,31 +10915,21 @@ Help:
 
     def _load_journal_entries(self):
         try:
-            # Basic in‑memory pagination: fetch a chunk and remember if there is more.
+            # Keyset pagination: filters run in SQL and each page starts at a cursor.
             if not hasattr(self, "_journal_page"):
                 self._journal_page = 0
             page_size = getattr(self, "_journal_page_size", 500)
 
-            # Always clear existing rows before loading a page so we don't duplicate content.
-            for item in self.journal_tree.get_children():
-                self.journal_tree.delete(item)
-
-            offset = self._journal_page * page_size
-
-            rows = db.fetch_journal(period_id=self.engine.current_period_id, conn=self.engine.conn)
             # Optional account filtering from dropdown
             sel = ''
             try:
                 sel = self.journal_account_filter.get().strip()
             except Exception:
                 sel = ''
+            account_id = None
             if sel and sel.lower() != 'all':
-                try:
-                    code, name_match = sel.split(' - ', 1)
-                except Exception:
-                    code, name_match = sel, ''
-                rows = [r for r in rows if ((('code' in r.keys()) and r['code'] == code) or r['name'] == name_match)]
-            # Optional date range filter (from/to)
+                account_id = self._resolve_account_id(sel)
+            # Optional date range filter (from/to); invalid dates are ignored
             from_s = to_s = ''
             try:
                 from_s = self.journal_date_from.get().strip()
@@ -10671,111 +10939,45 @@ Help:
                 to_s = self.journal_date_to.get().strip()
             except Exception:
                 to_s = ''
-            if from_s or to_s:
-                from_dt = None
-                to_dt = None
-                try:
-                    if from_s:
-                        from_dt = datetime.strptime(from_s, '%Y-%m-%d').date()
-                except Exception:
-                    from_dt = None
-                try:
-                    if to_s:
-                        to_dt = datetime.strptime(to_s, '%Y-%m-%d').date()
-                except Exception:
-                    to_dt = None
-                def _in_range(dstr: str) -> bool:
-                    try:
-                        d = datetime.strptime(dstr, '%Y-%m-%d').date()
-                    except Exception:
-                        return False
-                    if from_dt and d < from_dt:
-                        return False
-                    if to_dt and d > to_dt:
-                        return False
-                    return True
-                rows = [r for r in rows if _in_range(r['date'])]
-            # Apply offset/limit after filters
-            sliced = rows[offset : offset + page_size + 1]
-            has_more = len(sliced) > page_size
-            rows = sliced[:page_size]
-            setattr(self, "_journal_has_more", has_more)
-
-            current_entry = None
-            total_debit = 0.0
-            total_credit = 0.0
-            for r in rows:
-                eid = r["entry_id"]
-                date = r["date"]
-                desc = r["description"]
-                try:
-                    doc_ref = r["document_ref"] if "document_ref" in r.keys() else None
-                except Exception:
-                    doc_ref = None
-                try:
-                    ext_ref = r["external_ref"] if "external_ref" in r.keys() else None
-                except Exception:
-                    ext_ref = None
-                ref = (str(doc_ref).strip() if doc_ref else "") or (str(ext_ref).strip() if ext_ref else "")
-                acct = r["name"]
-                debit = r["debit"]
-                credit = r["credit"]
-                try:
-                    total_debit += float(debit or 0)
-                except Exception:
-                    pass
-                try:
-                    total_credit += float(credit or 0)
-                except Exception:
-                    pass
-                # Insert a header row (first line for an entry) with the date and description.
-                # Let Tk generate item IDs automatically to avoid duplicate-iid errors when
-                # reloading or paging.
-                if current_entry != eid:
-                    self.journal_tree.insert(
-                        '',
-                        'end',
-                        values=(
-                            date,
-                            ref,
-                            desc,
-                            f"{debit:,.2f}" if debit else "",
-                            f"{credit:,.2f}" if credit else "",
-                            acct,
-                        ),
-                    )
-                    current_entry = eid
-                else:
-                    # Subsequent lines for the same entry should show blanks for date/description
-                    self.journal_tree.insert(
-                        '',
-                        'end',
-                        values=(
-                            "",
-                            "",
-                            "",
-                            f"{debit:,.2f}" if debit else "",
-                            f"{credit:,.2f}" if credit else "",
-                            acct,
-                        ),
-                    )
-            # Insert totals row
-            try:
-                self.journal_tree.insert(
-                    '',
-                    'end',
-                    values=("", "", "Totals:", f"{total_debit:,.2f}", f"{total_credit:,.2f}", ""),
-                    tags=('totals',),
-                )
-                # Make totals row visually distinct and bold
-                self.journal_tree.tag_configure(
-                    'totals',
-                    background=self.palette.get('tab_selected_bg', '#e0ecff'),
-                    foreground=self.palette.get('text_primary', '#000000'),
-                    font=FONT_BOLD,
-                )
-            except Exception:
-                pass
+            date_from = self._iso_date_or_none(from_s)
+            date_to = self._iso_date_or_none(to_s)
+
+            period_id = self.engine.current_period_id
+            after = self._keyset_page_start("journal", (period_id, sel, account_id, date_from, date_to))
+            if sel and sel.lower() != 'all' and account_id is None:
+                self.tasks.cancel("journal")
+                self._show_journal_page([], None)
+                return
+        except Exception as e:
+            self._journal_load_failed(e)
+            return
+
+        self.tasks.submit(
+            "journal",
+            lambda ctx: db.fetch_journal_page(
+                period_id,
+                account_id=account_id,
+                date_from=date_from,
+                date_to=date_to,
+                after=after,
+                page_size=page_size,
+                conn=ctx.conn,
+            ),
+            lambda page: self._show_journal_page(*page),
+            self._journal_load_failed,
+        )
+
+    def _show_journal_page(self, rows: list, next_cursor) -> None:
+        """Render a fetched journal page; runs on the Tk thread."""
+        try:
+            self._keyset_page_loaded("journal", next_cursor)
+
+            # A new page replaces the rows shown and scrolls back to the top.
+            self._journal_rows = []
+            self._journal_row_entries = []
+            self._journal_totals_row = None
+            self._journal_shown = {"first": None, "last": None, "lines": 0, "debit": 0.0, "credit": 0.0}
+            self._append_journal_rows(rows, keep_position=False)
             # Update page label if present
             try:
                 if hasattr(self, "journal_page_label"):
@@ -10783,11 +10985,65 @@ Help:
             except Exception:
                 pass
         except Exception as e:
+            self._journal_load_failed(e)
+
+    def _append_journal_rows(self, rows, *, keep_position: bool = True) -> None:
+        """Add journal lines below the ones shown and refresh the totals row."""
+        shown = self._journal_shown
+        display = self._journal_rows
+        entries = self._journal_row_entries
+        if self._journal_totals_row is not None and display and display[-1] is self._journal_totals_row:
+            display.pop()
+            entries.pop()
+        current_entry = shown["last"][1] if shown["last"] else None
+        total_debit = shown["debit"]
+        total_credit = shown["credit"]
+        for r in rows:
+            eid = r["entry_id"]
+            try:
+                doc_ref = r["document_ref"] if "document_ref" in r.keys() else None
+            except Exception:
+                doc_ref = None
             try:
-                self._handle_exception("load_journal_entries", e)
+                ext_ref = r["external_ref"] if "external_ref" in r.keys() else None
+            except Exception:
+                ext_ref = None
+            ref = (str(doc_ref).strip() if doc_ref else "") or (str(ext_ref).strip() if ext_ref else "")
+            debit = r["debit"]
+            credit = r["credit"]
+            try:
+                total_debit += float(debit or 0)
+            except Exception:
+                pass
+            try:
+                total_credit += float(credit or 0)
             except Exception:
                 pass
-            messagebox.showerror("Error", f"Failed to load journal entries: {str(e)}")
+            amounts = (f"{debit:,.2f}" if debit else "", f"{credit:,.2f}" if credit else "", r["name"])
+            if current_entry != eid:
+                # The first line of an entry carries its date, reference and description.
+                display.append((r["date"], ref, r["description"]) + amounts)
+                current_entry = eid
+            else:
+                # Subsequent lines for the same entry show blanks for date/description
+                display.append(("", "", "") + amounts)
+            entries.append(eid)
+        if rows:
+            shown["first"] = shown["first"] or (rows[0]["date"], rows[0]["entry_id"])
+            shown["last"] = (rows[-1]["date"], rows[-1]["entry_id"])
+            shown["lines"] += len(rows)
+        shown["debit"], shown["credit"] = total_debit, total_credit
+        self._journal_totals_row = ("", "", "Totals:", f"{total_debit:,.2f}", f"{total_credit:,.2f}", "")
+        display.append(self._journal_totals_row)
+        entries.append(None)
+        self.journal_view.set_provider(SequenceRowProvider(display), keep_position=keep_position)
+
+    def _journal_load_failed(self, e: BaseException) -> None:
+        try:
+            self._handle_exception("load_journal_entries", e)
+        except Exception:
+            pass
+        messagebox.showerror("Error", f"Failed to load journal entries: {str(e)}")
 
     def _change_journal_page(self, delta: int) -> None:
         """Move forward/backward through journal pages and reload."""
@@ -10827,7 +11083,7 @@ Help:
                 """
                 + (clause or "")
                 + """
-                ORDER BY date(je.date) DESC, je.id DESC
+                ORDER BY je.date DESC, je.id DESC
                 LIMIT ?
                 """
             )
@@ -10883,40 +11139,9 @@ Help:
     
     def _on_journal_entry_double_click(self, event):
         """Handle double-click on a journal entry"""
-        sel = self.journal_tree.selection()
-        if not sel:
-            return
-        item = sel[0]
-        # Try to extract the entry id from the item's IID which we set when populating the tree
-        iid = str(item)
-        entry_id = None
-        try:
-            if iid.startswith('je-'):
-                # IID format: je-<entry_id>-line-<line_id>
-                parts = iid.split('-')
-                if len(parts) >= 3:
-                    entry_id = int(parts[1])
-        except Exception:
-            entry_id = None
-
-        # Fallback: if we couldn't parse an entry_id from the IID, try reading the visible date column
-        if entry_id is None:
-            values = self.journal_tree.item(item, 'values')
-            if values:
-                # If the first displayed column contains a date, this is a header row; otherwise do nothing
-                maybe_date = values[0]
-                try:
-                    # If the date value exists, try to find the corresponding entry by matching date+description
-                    if maybe_date:
-                        desc = values[2] if len(values) > 2 else None
-                        # Query DB for an entry with this date and description (pick the latest match)
-                        cur = self.engine.conn.execute("SELECT id FROM journal_entries WHERE date=? AND description=? ORDER BY id DESC LIMIT 1", (maybe_date, desc))
-                        row = cur.fetchone()
-                        if row:
-                            entry_id = int(row['id'])
-                except Exception:
-                    entry_id = None
-
+        index = self.journal_view.selected_index()
+        entries = getattr(self, '_journal_row_entries', [])
+        entry_id = entries[index] if index is not None and index < len(entries) else None
         if entry_id:
             try:
                 self._load_transaction_for_editing(entry_id)
@@ -10972,37 +11197,18 @@ Help:
         )
         post_btn.grid(row=0, column=1, padx=6, pady=2, sticky="w")
         
-        # Export ledger to Excel
+        # Export ledger to Excel (the whole ledger, not just the rows in view)
         export_btn = ttk.Button(
             left_buttons,
             text="Export to Excel",
-            command=lambda: self._export_tree_to_excel(
-                self.ledger_tree,
-                default_name=f"ledger_{self.fs_date_to.get() if hasattr(self, 'fs_date_to') else ''}.xlsx",
-            ),
+            command=self._export_ledger,
             style="Techfix.TButton",
         )
         export_btn.grid(row=0, column=2, padx=6, pady=2, sticky="w")
 
-        # Simple paging controls
-        paging_frame = ttk.Frame(left_buttons, style="Techfix.Surface.TFrame")
-        paging_frame.grid(row=0, column=3, padx=6, pady=2, sticky="w")
-        self.ledger_page_label = ttk.Label(paging_frame, text="Page 1", style="Techfix.TLabel")
-        self.ledger_page_label.pack(side=tk.LEFT, padx=(0, 4))
-        prev_btn = ttk.Button(
-            paging_frame,
-            text="◀ Prev",
-            style="Techfix.TButton",
-            command=lambda: self._change_ledger_page(-1),
-        )
-        next_btn = ttk.Button(
-            paging_frame,
-            text="Next ▶",
-            style="Techfix.TButton",
-            command=lambda: self._change_ledger_page(1),
-        )
-        prev_btn.pack(side=tk.LEFT, padx=2)
-        next_btn.pack(side=tk.LEFT, padx=2)
+        # Line count and totals for the whole (filtered) ledger
+        self.ledger_totals_label = ttk.Label(left_buttons, text="", style="Techfix.TLabel")
+        self.ledger_totals_label.grid(row=0, column=3, padx=6, pady=2, sticky="w")
 
         # Add account filter - use grid for responsive layout
         filter_frame = ttk.Frame(toolbar, style="Techfix.Surface.TFrame")
@@ -11044,15 +11250,16 @@ Help:
         except Exception:
             pass
 
-        # Create the treeview for ledger entries
+        # Virtual treeview: rows are read from the ledger as they scroll into view
         columns = ("account", "date", "description", "debit", "credit", "balance")
-        self.ledger_tree = ttk.Treeview(
+        self.ledger_view = VirtualTreeview(
             frame,
-            columns=columns,
-            show="headings",
+            columns,
+            frame_style="Techfix.Surface.TFrame",
             selectmode="browse",
             style="Techfix.Treeview",
         )
+        self.ledger_tree = self.ledger_view.tree
 
         # Configure columns
         self.ledger_tree.heading("account", text="Account", anchor=tk.W)
@@ -11070,13 +11277,7 @@ Help:
         self.ledger_tree.column("credit", width=120, anchor=tk.E)
         self.ledger_tree.column("balance", width=120, anchor=tk.E)
 
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.ledger_tree.yview)
-        self.ledger_tree.configure(yscrollcommand=scrollbar.set)
-
-        # Pack the treeview and scrollbar
-        self.ledger_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=4, pady=4)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=4)
+        self.ledger_view.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
 
         # Bind double-click event
         self.ledger_tree.bind("<Double-1>", self._on_ledger_entry_double_click)
@@ -11086,117 +11287,44 @@ Help:
 
     def _load_ledger_entries(self):
         try:
-            if not hasattr(self, "_ledger_page"):
-                self._ledger_page = 0
-            page_size = getattr(self, "_ledger_page_size", 500)
-
-            # Always clear existing rows before loading a page so we don't duplicate content.
-            for item in self.ledger_tree.get_children():
-                self.ledger_tree.delete(item)
-
-            offset = self._ledger_page * page_size
-
-            # Fetch individual ledger transactions (not trial balance)
-            rows = db.fetch_ledger(period_id=self.engine.current_period_id, conn=self.engine.conn)
-            
             # Apply account filter if specified
             sel = ''
             try:
                 sel = self.ledger_account_filter.get().strip()
             except Exception:
                 sel = ''
+            account_id = None
             if sel and sel.lower() != 'all':
-                try:
-                    code, name_match = sel.split(' - ', 1)
-                except Exception:
-                    code, name_match = sel, ''
-                rows = [r for r in rows if (('code' in r.keys() and r['code'] == code) or ('name' in r.keys() and r['name'] == name_match))]
+                account_id = self._resolve_account_id(sel)
 
-            # Apply paging after filters
-            sliced = rows[offset : offset + page_size + 1]
-            has_more = len(sliced) > page_size
-            rows = sliced[:page_size]
-            setattr(self, "_ledger_has_more", has_more)
-            
-            # Calculate running balances per account
-            account_balances = {}  # account_id -> running balance
-            total_debit = 0.0
-            total_credit = 0.0
-            
-            for r in rows:
-                # sqlite3.Row objects use dictionary-style access, not .get()
-                account_id = r['account_id'] if 'account_id' in r.keys() else None
-                code = r['code'] if 'code' in r.keys() else ''
-                name = r['name'] if 'name' in r.keys() else ''
-                date = r['date'] if 'date' in r.keys() else ''
-                description = r['description'] if 'description' in r.keys() else ''
-                debit = float(r['debit'] if 'debit' in r.keys() and r['debit'] is not None else 0)
-                credit = float(r['credit'] if 'credit' in r.keys() and r['credit'] is not None else 0)
-                
-                # Initialize account balance if first transaction for this account
-                if account_id not in account_balances:
-                    account_balances[account_id] = 0.0
-                
-                # Update running balance
-                account_balances[account_id] += (debit - credit)
-                running_balance = account_balances[account_id]
-                
-                # Format account display
-                account_display = f"{code} - {name}" if code else name
-                
-                # Format balance with Dr/Cr indicator
-                if abs(running_balance) < 0.01:
-                    balance_display = "0.00"
-                elif running_balance > 0:
-                    balance_display = f"{running_balance:,.2f} Dr"
-                else:
-                    balance_display = f"{abs(running_balance):,.2f} Cr"
-                
-                # Insert row
-                self.ledger_tree.insert(
-                    '',
-                    'end',
-                    values=(
-                        account_display,
-                        date,
-                        description,
-                        f"{debit:,.2f}" if debit else '',
-                        f"{credit:,.2f}" if credit else '',
-                        balance_display
-                    )
-                )
-                
-                total_debit += debit
-                total_credit += credit
-            
-            # Totals row
-            try:
-                self.ledger_tree.insert(
-                    '',
-                    'end',
-                    values=(
-                        "Totals",
-                        "",
-                        "",
-                        f"{total_debit:,.2f}" if total_debit else '',
-                        f"{total_credit:,.2f}" if total_credit else '',
-                        "",
-                    ),
-                    tags=('totals',),
-                )
-                # Make totals row visually distinct and bold
-                self.ledger_tree.tag_configure(
-                    'totals',
-                    background=self.palette.get('tab_selected_bg', '#e0ecff'),
-                    foreground=self.palette.get('text_primary', '#000000'),
-                    font=FONT_BOLD,
+            period_id = self.engine.current_period_id
+            filter_key = (period_id, sel, account_id)
+            if sel and sel.lower() != 'all' and account_id is None:
+                provider = SequenceRowProvider([])
+                totals = None
+            else:
+                provider = LedgerRowProvider(
+                    self.engine.conn,
+                    period_id,
+                    account_id=account_id,
+                    format_row=self._format_ledger_row,
                 )
-            except Exception:
-                pass
-            # Update page label if present
+                totals = db.ledger_totals(period_id, account_id=account_id, conn=self.engine.conn)
+            # Refreshing with the same filters keeps the scroll position.
+            keep = getattr(self, "_ledger_filter_key", None) == filter_key
+            self._ledger_filter_key = filter_key
+            self.ledger_view.set_provider(provider, keep_position=keep)
+
             try:
-                if hasattr(self, "ledger_page_label"):
-                    self.ledger_page_label.config(text=f"Page {self._ledger_page + 1}")
+                if totals is None:
+                    text = "0 lines"
+                else:
+                    text = (
+                        f"{int(totals['line_count']):,} lines   "
+                        f"Debit {float(totals['debit_total']):,.2f}   "
+                        f"Credit {float(totals['credit_total']):,.2f}"
+                    )
+                self.ledger_totals_label.config(text=text)
             except Exception:
                 pass
         except Exception as e:
@@ -11206,24 +11334,61 @@ Help:
                 pass
             messagebox.showerror("Error", f"Failed to load ledger entries: {str(e)}")
 
-    def _change_ledger_page(self, delta: int) -> None:
-        """Move forward/backward through ledger pages and reload."""
-        try:
-            if not hasattr(self, "_ledger_page"):
-                self._ledger_page = 0
-            page_size = getattr(self, "_ledger_page_size", 500)
-            if page_size <= 0:
-                page_size = 500
-            new_page = max(0, self._ledger_page + int(delta))
-            if delta > 0 and not getattr(self, "_ledger_has_more", False):
-                return
-            self._ledger_page = new_page
-            self._load_ledger_entries()
-        except Exception as e:
-            try:
-                self._handle_exception("change_ledger_page", e)
-            except Exception:
-                pass
+    @staticmethod
+    def _format_ledger_row(r) -> tuple:
+        """Display values for one fetch_ledger_page row in the Ledger tab."""
+        code = r['code'] or ''
+        name = r['name'] or ''
+        debit = float(r['debit'] or 0)
+        credit = float(r['credit'] or 0)
+        running_balance = float(r['running_balance'] or 0)
+        # Format balance with Dr/Cr indicator
+        if abs(running_balance) < 0.01:
+            balance_display = "0.00"
+        elif running_balance > 0:
+            balance_display = f"{running_balance:,.2f} Dr"
+        else:
+            balance_display = f"{abs(running_balance):,.2f} Cr"
+        return (
+            f"{code} - {name}" if code else name,
+            r['date'] or '',
+            r['description'] or '',
+            f"{debit:,.2f}" if debit else '',
+            f"{credit:,.2f}" if credit else '',
+            balance_display,
+        )
+
+    def _keyset_page_start(self, name: str, filter_key: tuple):
+        """Cursor that starts the current page of a keyset-paged view.
+
+        Cursors for visited pages are kept in ``_<name>_cursors``; changing the
+        filters drops them and goes back to the first page.
+        """
+        cursors = getattr(self, f"_{name}_cursors", None)
+        if not cursors or getattr(self, f"_{name}_filter_key", None) != filter_key:
+            cursors = [None]
+            setattr(self, f"_{name}_cursors", cursors)
+            setattr(self, f"_{name}_filter_key", filter_key)
+            setattr(self, f"_{name}_page", 0)
+        page = min(max(0, getattr(self, f"_{name}_page", 0)), len(cursors) - 1)
+        setattr(self, f"_{name}_page", page)
+        return cursors[page]
+
+    def _keyset_page_loaded(self, name: str, next_cursor) -> None:
+        """Remember where the page after the current one starts."""
+        page = getattr(self, f"_{name}_page", 0)
+        cursors = getattr(self, f"_{name}_cursors")
+        del cursors[page + 1:]
+        if next_cursor is not None:
+            cursors.append(next_cursor)
+        setattr(self, f"_{name}_has_more", next_cursor is not None)
+
+    @staticmethod
+    def _iso_date_or_none(value: str) -> Optional[str]:
+        try:
+            return datetime.strptime((value or '').strip(), '%Y-%m-%d').date().isoformat()
+        except Exception:
+            return None
 
     def _resolve_account_id(self, sel: str) -> Optional[int]:
         try:
@@ -12505,35 +12670,18 @@ Help:
             try:
                 date_from = from_entry.get().strip() or None
                 date_to = to_entry.get().strip() or None
-                params = [acc_id]
-                where = ["jl.account_id = ?"]
-                if date_from:
-                    where.append("je.date >= ?")
-                    params.append(date_from)
-                if date_to:
-                    where.append("je.date <= ?")
-                    params.append(date_to)
-                where_sql = " AND ".join(where)
-                cur = self.engine.conn.execute(
-                    f"""
-                    SELECT
-                        je.id AS entry_id,
-                        je.date,
-                        je.description,
-                        jl.debit,
-                        jl.credit
-                    FROM journal_lines jl
-                    JOIN journal_entries je ON je.id = jl.entry_id
-                    WHERE {where_sql}
-                    ORDER BY je.date, je.id, jl.id
-                    """,
-                    params,
+                # Balances include everything before date_from, not just the range shown.
+                rows = db.iter_ledger_rows(
+                    account_id=acc_id,
+                    date_from=date_from,
+                    date_to=date_to,
+                    status=None,
+                    conn=self.engine.conn,
                 )
-                bal = 0.0
-                for row in cur.fetchall():
+                for row in rows:
                     d = float(row["debit"] or 0.0)
                     c = float(row["credit"] or 0.0)
-                    bal += d - c
+                    bal = float(row["running_balance"] or 0.0)
                     tree.insert(
                         "",
                         "end",
@@ -12670,12 +12818,8 @@ Help:
         
         def load_financials_with_loading():
             loading = self.show_loading("Please wait... Generating financial statements...")
-            try:
-                self.update()  # Update UI to show loading indicator
-                self._load_financials()
-            finally:
-                if loading:
-                    self.hide_loading(loading)
+            # Statements are built in the background; the spinner stays up until they arrive.
+            self._load_financials(on_finished=lambda: loading and self.hide_loading(loading))
         
         run_btn = ttk.Button(
             btn_frame, 
@@ -12812,37 +12956,54 @@ Help:
 
     def _load_trial_balances(self) -> None:
         """Compute and display the trial balance"""
-        # Clear existing items
-        if hasattr(self, 'trial_tree'):
-            for item in self.trial_tree.get_children():
-                self.trial_tree.delete(item)
+        as_of = None
+        if hasattr(self, 'tb_date'):
+            d = self.tb_date.get().strip()
+            as_of = d or None
+        period_id = self.engine.current_period_id
 
-        try:
-            as_of = None
-            if hasattr(self, 'tb_date'):
-                d = self.tb_date.get().strip()
-                as_of = d or None
-
-            rows = db.compute_trial_balance(up_to_date=as_of, include_temporary=True, period_id=self.engine.current_period_id, conn=self.engine.conn)
+        def fetch(ctx):
+            rows = report_cache.trial_balance(up_to_date=as_of, include_temporary=True, period_id=period_id, conn=ctx.conn)
             try:
                 # Check if there are any adjusting entries in the current period
-                # If adjusting entries exist, show "Adjusted Trial Balance", otherwise "Unadjusted Trial Balance"
-                cur = self.engine.conn.execute("""
+                cur = ctx.conn.execute("""
                     SELECT COUNT(*) as count
                     FROM journal_entries
                     WHERE period_id = ? 
                       AND is_adjusting = 1 
                       AND status = 'posted'
-                """, (self.engine.current_period_id,))
+                """, (period_id,))
                 result = cur.fetchone()
-                has_adjusting_entries = result and result['count'] > 0
-                
-                if has_adjusting_entries:
-                    self.tb_status_label.configure(text="Adjusted Trial Balance")
-                else:
-                    self.tb_status_label.configure(text="Unadjusted Trial Balance")
+                has_adjusting_entries = bool(result and result['count'] > 0)
             except Exception:
-                # Default to showing "Adjusted Trial Balance" since compute_trial_balance includes all entries
+                has_adjusting_entries = None
+            return rows, has_adjusting_entries
+
+        self.tasks.submit(
+            "trial_balance",
+            fetch,
+            lambda result: self._show_trial_balance(*result, key=(period_id, as_of)),
+            lambda e: messagebox.showerror("Error", f"Failed to load trial balances: {str(e)}"),
+        )
+
+    def _show_trial_balance(self, rows: list, has_adjusting_entries: Optional[bool], key: Optional[tuple] = None) -> None:
+        """Render trial balance rows; runs on the Tk thread.
+
+        ``key`` is the (period_id, as_of) the rows were computed for; the rows
+        are kept so posting events can be applied to them (see ``_apply_posting_events``).
+        """
+        self._tb_state = {"key": key, "rows": [dict(r) for r in rows], "has_adjusting": has_adjusting_entries}
+        # Clear existing items
+        if hasattr(self, 'trial_tree'):
+            for item in self.trial_tree.get_children():
+                self.trial_tree.delete(item)
+
+        try:
+            # If adjusting entries exist, show "Adjusted Trial Balance", otherwise "Unadjusted Trial Balance".
+            # Default to "Adjusted Trial Balance" since compute_trial_balance includes all entries.
+            if has_adjusting_entries is False:
+                self.tb_status_label.configure(text="Unadjusted Trial Balance")
+            else:
                 self.tb_status_label.configure(text="Adjusted Trial Balance")
             # Show only accounts with non-zero balance/activity for the active period
             def _has_activity(r: dict) -> bool:
@@ -12879,6 +13040,15 @@ Help:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load trial balances: {str(e)}")
 
+    @staticmethod
+    def _tree_rows(tree: ttk.Treeview) -> List[Sequence]:
+        """Every row's values: all of a VirtualTreeview's rows, not only the ones in view."""
+        view = tree.master
+        if isinstance(view, VirtualTreeview):
+            provider = view.provider
+            return list(provider.rows(0, provider.row_count())) if provider is not None else []
+        return [tree.item(iid, 'values') or () for iid in tree.get_children()]
+
     def _export_tree_to_excel(self, tree: ttk.Treeview, *, default_name: str = "export.xlsx") -> None:
         """Export the contents of a Treeview to an Excel file using `db.export_rows_to_excel`.
 
@@ -12889,8 +13059,7 @@ Help:
             cols = list(tree['columns']) if tree and 'columns' in tree.keys() else []
             headers = [str(c).title() for c in cols]
             rows = []
-            for iid in tree.get_children():
-                vals = tree.item(iid, 'values') or ()
+            for vals in self._tree_rows(tree):
                 # Ensure the row is a simple list matching headers length
                 row = [vals[i] if i < len(vals) else '' for i in range(len(headers))]
                 rows.append(row)
@@ -12970,40 +13139,8 @@ Help:
 
         Returns (debit_amount, credit_amount)
         """
-        try:
-            # Handle both dict and sqlite3.Row objects
-            acc_type = (row['type'] if 'type' in row.keys() and row['type'] else '').lower()
-            normal = (row['normal_side'] if 'normal_side' in row.keys() and row['normal_side'] else 'debit').lower()
-            net_debit = float(row['net_debit'] if 'net_debit' in row.keys() and row['net_debit'] is not None else 0)
-            net_credit = float(row['net_credit'] if 'net_credit' in row.keys() and row['net_credit'] is not None else 0)
-
-            # Contra-assets always have credit balances and should be shown on credit side
-            if acc_type == 'contra asset':
-                # For contra-assets, credit balance is positive (normal)
-                # Show the credit amount on credit side, debit amount (if any) on debit side
-                if net_credit > 0:
-                    return (0.0, net_credit)
-                elif net_debit > 0:
-                    # Abnormal debit balance (shouldn't happen, but handle it)
-                    return (net_debit, 0.0)
-                else:
-                    return (0.0, 0.0)
+        return export_all.balance_to_columns(row)
 
-            if normal == 'debit':
-                bal = net_debit - net_credit
-                if bal >= 0:
-                    return (bal, 0.0)
-                else:
-                    return (0.0, abs(bal))
-            else:
-                bal = net_credit - net_debit
-                if bal >= 0:
-                    return (0.0, bal)
-                else:
-                    return (abs(bal), 0.0)
-        except Exception:
-            return (0.0, 0.0)
-        
     def _create_fs_text_widgets(self):
         """Create and configure text widgets for financial statements"""
         # Create text widgets directly in their respective frames
@@ -13137,6 +13274,69 @@ Help:
                 widget.insert(tk.END, text)
         widget.config(state=tk.DISABLED)
     
+    def _income_statement_content(self, engine: AccountingEngine, as_of_date: str = None, start_date: str = None) -> List[tuple]:
+        """Build the income statement text; reads only through ``engine`` so it can run on a worker."""
+        # Determine date range for income statement
+        # Use provided start_date if available, otherwise determine it
+        end_date = as_of_date or date.today().isoformat()
+        
+        if not start_date:
+            try:
+                if engine.current_period and 'start_date' in engine.current_period:
+                    start_date = engine.current_period['start_date']
+                else:
+                    # Get earliest entry date as fallback
+                    cur = engine.conn.execute("""
+                        SELECT MIN(date) as min_date FROM journal_entries 
+                        WHERE period_id = ?
+                    """, (engine.current_period_id,))
+                    result = cur.fetchone()
+                    start_date = result['min_date'] if result and result['min_date'] else '1900-01-01'
+            except Exception:
+                start_date = '1900-01-01'
+        
+        # Use backend method for consistent calculation (handles contra-revenue, etc.)
+        # Pass period_id=None to allow cross-period reporting when dates are set
+        income_stmt = engine.generate_income_statement(start_date, end_date, period_id=None)
+        
+        # Extract data from backend result
+        revenues = income_stmt.get('revenues', [])
+        expenses = income_stmt.get('expenses', [])
+        total_revenue = income_stmt.get('total_revenue', 0.0)
+        total_expense = income_stmt.get('total_expense', 0.0)
+        net_income = income_stmt.get('net_income', 0.0)
+        
+        # Build the income statement content
+        content = []
+        content.append(('Income Statement\n', 'header'))
+        content.append((f'For the period ended {end_date}\n\n', 'subheader'))
+        
+        # Add revenues section
+        content.append(('Revenues\n', 'section'))
+        if revenues:
+            for rev in revenues:
+                amount = rev.get('amount', 0.0)
+                if abs(amount) > 0.005:  # Only show non-zero amounts
+                    content.append((f"{rev.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
+        else:
+            content.append(('(none)\n', None))
+        content.append((f'\nTotal Revenue: {self._format_amount(total_revenue)}\n\n', 'total'))
+        
+        # Add expenses section
+        content.append(('Expenses\n', 'section'))
+        if expenses:
+            for exp in expenses:
+                amount = exp.get('amount', 0.0)
+                if abs(amount) > 0.005:  # Only show non-zero amounts
+                    content.append((f"{exp.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
+        else:
+            content.append(('(none)\n', None))
+        content.append((f'\nTotal Expenses: {self._format_amount(total_expense)}\n\n', 'total'))
+        
+        # Add net income
+        content.append((f'Net Income: {self._format_amount(net_income)}\n', 'net'))
+        return content
+
     def _generate_income_statement(self, trial_balance: list, as_of_date: str = None, start_date: str = None) -> None:
         """Generate and display the income statement using backend method for consistency"""
         try:
@@ -13145,66 +13345,8 @@ Help:
                 logger.warning("Income statement text widget not initialized yet")
                 return
             
-            # Determine date range for income statement
-            # Use provided start_date if available, otherwise determine it
-            end_date = as_of_date or date.today().isoformat()
-            
-            if not start_date:
-                try:
-                    if self.engine.current_period and 'start_date' in self.engine.current_period:
-                        start_date = self.engine.current_period['start_date']
-                    else:
-                        # Get earliest entry date as fallback
-                        cur = self.engine.conn.execute("""
-                            SELECT MIN(date) as min_date FROM journal_entries 
-                            WHERE period_id = ?
-                        """, (self.engine.current_period_id,))
-                        result = cur.fetchone()
-                        start_date = result['min_date'] if result and result['min_date'] else '1900-01-01'
-                except Exception:
-                    start_date = '1900-01-01'
-            
-            # Use backend method for consistent calculation (handles contra-revenue, etc.)
-            # Pass period_id=None to allow cross-period reporting when dates are set
-            income_stmt = self.engine.generate_income_statement(start_date, end_date, period_id=None)
-            
-            # Extract data from backend result
-            revenues = income_stmt.get('revenues', [])
-            expenses = income_stmt.get('expenses', [])
-            total_revenue = income_stmt.get('total_revenue', 0.0)
-            total_expense = income_stmt.get('total_expense', 0.0)
-            net_income = income_stmt.get('net_income', 0.0)
-            
-            # Build the income statement content
-            content = []
-            content.append(('Income Statement\n', 'header'))
-            content.append((f'For the period ended {end_date}\n\n', 'subheader'))
-            
-            # Add revenues section
-            content.append(('Revenues\n', 'section'))
-            if revenues:
-                for rev in revenues:
-                    amount = rev.get('amount', 0.0)
-                    if abs(amount) > 0.005:  # Only show non-zero amounts
-                        content.append((f"{rev.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
-            else:
-                content.append(('(none)\n', None))
-            content.append((f'\nTotal Revenue: {self._format_amount(total_revenue)}\n\n', 'total'))
-            
-            # Add expenses section
-            content.append(('Expenses\n', 'section'))
-            if expenses:
-                for exp in expenses:
-                    amount = exp.get('amount', 0.0)
-                    if abs(amount) > 0.005:  # Only show non-zero amounts
-                        content.append((f"{exp.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
-            else:
-                content.append(('(none)\n', None))
-            content.append((f'\nTotal Expenses: {self._format_amount(total_expense)}\n\n', 'total'))
-            
-            # Add net income
-            content.append((f'Net Income: {self._format_amount(net_income)}\n', 'net'))
-            
+            content = self._income_statement_content(self.engine, as_of_date, start_date)
+
             # Update the text widget (check if it exists first)
             if hasattr(self, 'income_text') and self.income_text:
                 try:
@@ -13230,17 +13372,18 @@ Help:
             except Exception:
                 pass
     
-    def _diagnose_balance_sheet_imbalance(self) -> list[str]:
+    def _diagnose_balance_sheet_imbalance(self, engine: Optional[AccountingEngine] = None) -> list[str]:
         """Diagnose common issues that cause balance sheet imbalances."""
+        engine = engine or self.engine
         issues = []
         try:
-            conn = self.engine.conn
+            conn = engine.conn
             
             # Check 1: Draft transactions that aren't included in balance sheet
             draft_count = conn.execute("""
                 SELECT COUNT(*) as cnt FROM journal_entries 
                 WHERE period_id = ? AND status = 'draft'
-            """, (self.engine.current_period_id,)).fetchone()
+            """, (engine.current_period_id,)).fetchone()
             if draft_count and draft_count['cnt'] > 0:
                 issues.append(f"You have {draft_count['cnt']} draft transaction(s). Drafts are NOT included in the balance sheet. Post them using 'Record & Post' button.")
             
@@ -13253,7 +13396,7 @@ Help:
                 WHERE je.period_id = ? AND je.status = 'posted'
                 GROUP BY je.id
                 HAVING ABS(SUM(jl.debit) - SUM(jl.credit)) > 0.01
-            """, (self.engine.current_period_id,)).fetchall()
+            """, (engine.current_period_id,)).fetchall()
             if unbalanced:
                 issues.append(f"You have {len(unbalanced)} unbalanced journal entry/entries. Each entry must have equal debits and credits.")
             
@@ -13265,7 +13408,7 @@ Help:
                 WHERE je.period_id = ? AND je.status = 'posted'
                 GROUP BY je.id
                 HAVING COUNT(jl.id) < 2
-            """, (self.engine.current_period_id,)).fetchall()
+            """, (engine.current_period_id,)).fetchall()
             if single_line:
                 issues.append(f"You have {len(single_line)} entry/entries with only one line. Each transaction needs both a debit and credit.")
             
@@ -13276,7 +13419,7 @@ Help:
                 JOIN journal_lines jl ON jl.entry_id = je.id
                 WHERE je.period_id = ? AND je.status = 'posted'
                   AND jl.debit = 0 AND jl.credit = 0
-            """, (self.engine.current_period_id,)).fetchall()
+            """, (engine.current_period_id,)).fetchall()
             if zero_amount:
                 issues.append(f"You have {len(zero_amount)} entry/entries with zero amounts. These won't affect the balance sheet.")
             
@@ -13287,7 +13430,7 @@ Help:
             wrong_period = conn.execute("""
                 SELECT COUNT(*) as cnt FROM journal_entries 
                 WHERE period_id IS NULL OR period_id != ?
-            """, (self.engine.current_period_id,)).fetchone()
+            """, (engine.current_period_id,)).fetchone()
             if wrong_period and wrong_period['cnt'] > 0:
                 issues.append(f"You have {wrong_period['cnt']} transaction(s) not assigned to the current period. They won't appear in this period's balance sheet.")
             
@@ -13296,325 +13439,337 @@ Help:
         
         return issues
     
-    def _generate_balance_sheet(self, trial_balance: list, as_of_date: str = None) -> None:
-        """Generate and display the balance sheet using the backend engine method
+    def _balance_sheet_content(
+        self,
+        engine: AccountingEngine,
+        as_of_date: str = None,
+        income_range: Optional[tuple] = None,
+    ) -> List[tuple]:
+        """Build the balance sheet text. ``income_range`` is the (from, to) pair
+        whose net income is shown before closing; reads only through ``engine``."""
+        # Determine the date to use
+        if not as_of_date:
+            try:
+                cur = engine.conn.execute("""
+                    SELECT MAX(date) as max_date FROM journal_entries 
+                    WHERE period_id = ?
+                """, (engine.current_period_id,))
+                result = cur.fetchone()
+                as_of_date = result['max_date'] if result and result['max_date'] else date.today().isoformat()
+            except Exception:
+                as_of_date = date.today().isoformat()
         
-        Note: The trial_balance parameter is kept for API consistency but is not used.
-        The backend generate_balance_sheet method recalculates the trial balance to ensure accuracy.
-        """
+        # If closing entries exist, check if the requested date is before the latest entry
+        # This prevents imbalance when viewing balance sheet before all transactions are included
         try:
-            # Determine the date to use
-            if not as_of_date:
-                try:
-                    cur = self.engine.conn.execute("""
-                        SELECT MAX(date) as max_date FROM journal_entries 
-                        WHERE period_id = ?
-                    """, (self.engine.current_period_id,))
-                    result = cur.fetchone()
-                    as_of_date = result['max_date'] if result and result['max_date'] else date.today().isoformat()
-                except Exception:
-                    as_of_date = date.today().isoformat()
-            
-            # If closing entries exist, check if the requested date is before the latest entry
-            # This prevents imbalance when viewing balance sheet before all transactions are included
-            try:
-                closing_entries_exist = False
-                closing_count = self.engine.conn.execute("""
-                    SELECT COUNT(*) as cnt FROM journal_entries 
-                    WHERE is_closing = 1 AND period_id = ?
-                """, (self.engine.current_period_id,)).fetchone()
-                closing_entries_exist = closing_count and closing_count['cnt'] > 0
-                
-                if closing_entries_exist:
-                    # Get the latest entry date
-                    latest_date = self.engine.conn.execute("""
-                        SELECT MAX(date) as max_date FROM journal_entries 
-                        WHERE period_id = ? AND (status = 'posted' OR status IS NULL)
-                    """, (self.engine.current_period_id,)).fetchone()
-                    
-                    if latest_date and latest_date['max_date']:
-                        latest_entry_date = latest_date['max_date']
-                        # If requested date is before latest entry, use latest entry date to avoid imbalance
-                        if as_of_date < latest_entry_date:
-                            as_of_date = latest_entry_date
-            except Exception:
-                pass  # If check fails, just use the original date
-            
-            # Generate balance sheet using backend method
-            # The backend method recalculates the trial balance with include_temporary=False
-            # to ensure only permanent accounts are included in the balance sheet
-            balance_sheet = self.engine.generate_balance_sheet(as_of_date)
-            
-            # Extract data from backend result
-            assets = balance_sheet.get('assets', [])
-            liabilities = balance_sheet.get('liabilities', [])
-            equity = balance_sheet.get('equity', [])
-            total_assets = balance_sheet.get('total_assets', 0.0)
-            total_liabilities = balance_sheet.get('total_liabilities', 0.0)
-            total_equity = balance_sheet.get('total_equity', 0.0)
-            balance_check = balance_sheet.get('balance_check', 0.0)
-            
-            # ALWAYS recalculate totals from individual items to ensure accuracy
-            # This fixes any discrepancies between backend calculation and display
-            calculated_assets = sum(asset.get('amount', 0.0) for asset in assets)
-            calculated_liabilities = sum(liab.get('amount', 0.0) for liab in liabilities)
-            calculated_equity = sum(eq.get('amount', 0.0) for eq in equity)
-            
-            # Log if there's a discrepancy (for debugging)
-            if abs(total_assets - calculated_assets) > 0.01:
-                try:
-                    logger.warning(
-                        f"Balance sheet asset total mismatch: "
-                        f"reported={total_assets:.2f}, calculated={calculated_assets:.2f}, "
-                        f"difference={abs(total_assets - calculated_assets):.2f}"
-                    )
-                except Exception:
-                    pass
-            
-            if abs(total_liabilities - calculated_liabilities) > 0.01:
-                try:
-                    logger.warning(
-                        f"Balance sheet liability total mismatch: "
-                        f"reported={total_liabilities:.2f}, calculated={calculated_liabilities:.2f}"
-                    )
-                except Exception:
-                    pass
-            
-            if abs(total_equity - calculated_equity) > 0.01:
-                try:
-                    logger.warning(
-                        f"Balance sheet equity total mismatch: "
-                        f"reported={total_equity:.2f}, calculated={calculated_equity:.2f}"
-                    )
-                except Exception:
-                    pass
-            
-            # ALWAYS use calculated totals (sum of displayed items) for display
-            # This ensures the displayed total matches what the user sees
-            # This fixes the issue where backend might return incorrect totals
-            total_assets = round(calculated_assets, 2)
-            total_liabilities = round(calculated_liabilities, 2)
-            total_equity = round(calculated_equity, 2)
-            
-            # Recalculate balance_check with corrected totals
-            # Formula: Assets = Liabilities + Equity (should equal 0)
-            balance_check = round(total_assets - (total_liabilities + total_equity), 2)
-            
-            # Final verification - if still unbalanced, add diagnostic info
-            if abs(balance_check) > 0.01:
-                # Double-check by recalculating from displayed items
-                displayed_assets_sum = sum(
-                    asset.get('amount', 0.0) 
-                    for asset in assets 
-                    if abs(asset.get('amount', 0.0)) > 0.005
-                )
-                displayed_liab_sum = sum(
-                    liab.get('amount', 0.0) 
-                    for liab in liabilities 
-                    if abs(liab.get('amount', 0.0)) > 0.005
+            closing_entries_exist = False
+            closing_count = engine.conn.execute("""
+                SELECT COUNT(*) as cnt FROM journal_entries 
+                WHERE is_closing = 1 AND period_id = ?
+            """, (engine.current_period_id,)).fetchone()
+            closing_entries_exist = closing_count and closing_count['cnt'] > 0
+            
+            if closing_entries_exist:
+                # Get the latest entry date
+                latest_date = engine.conn.execute("""
+                    SELECT MAX(date) as max_date FROM journal_entries 
+                    WHERE period_id = ? AND (status = 'posted' OR status IS NULL)
+                """, (engine.current_period_id,)).fetchone()
+                
+                if latest_date and latest_date['max_date']:
+                    latest_entry_date = latest_date['max_date']
+                    # If requested date is before latest entry, use latest entry date to avoid imbalance
+                    if as_of_date < latest_entry_date:
+                        as_of_date = latest_entry_date
+        except Exception:
+            pass  # If check fails, just use the original date
+        
+        # Generate balance sheet using backend method
+        # The backend method recalculates the trial balance with include_temporary=False
+        # to ensure only permanent accounts are included in the balance sheet
+        balance_sheet = engine.generate_balance_sheet(as_of_date)
+        
+        # Extract data from backend result
+        assets = balance_sheet.get('assets', [])
+        liabilities = balance_sheet.get('liabilities', [])
+        equity = balance_sheet.get('equity', [])
+        total_assets = balance_sheet.get('total_assets', 0.0)
+        total_liabilities = balance_sheet.get('total_liabilities', 0.0)
+        total_equity = balance_sheet.get('total_equity', 0.0)
+        balance_check = balance_sheet.get('balance_check', 0.0)
+        
+        # ALWAYS recalculate totals from individual items to ensure accuracy
+        # This fixes any discrepancies between backend calculation and display
+        calculated_assets = sum(asset.get('amount', 0.0) for asset in assets)
+        calculated_liabilities = sum(liab.get('amount', 0.0) for liab in liabilities)
+        calculated_equity = sum(eq.get('amount', 0.0) for eq in equity)
+        
+        # Log if there's a discrepancy (for debugging)
+        if abs(total_assets - calculated_assets) > 0.01:
+            try:
+                logger.warning(
+                    f"Balance sheet asset total mismatch: "
+                    f"reported={total_assets:.2f}, calculated={calculated_assets:.2f}, "
+                    f"difference={abs(total_assets - calculated_assets):.2f}"
                 )
-                displayed_equity_sum = sum(
-                    eq.get('amount', 0.0) 
-                    for eq in equity 
-                    if abs(eq.get('amount', 0.0)) > 0.005
+            except Exception:
+                pass
+        
+        if abs(total_liabilities - calculated_liabilities) > 0.01:
+            try:
+                logger.warning(
+                    f"Balance sheet liability total mismatch: "
+                    f"reported={total_liabilities:.2f}, calculated={calculated_liabilities:.2f}"
                 )
-                
-                # Use displayed sums if they differ
-                if abs(total_assets - displayed_assets_sum) > 0.01:
-                    total_assets = round(displayed_assets_sum, 2)
-                if abs(total_liabilities - displayed_liab_sum) > 0.01:
-                    total_liabilities = round(displayed_liab_sum, 2)
-                if abs(total_equity - displayed_equity_sum) > 0.01:
-                    total_equity = round(displayed_equity_sum, 2)
-                
-                # Recalculate balance check one more time
-                balance_check = round(total_assets - (total_liabilities + total_equity), 2)
-            
-            # Build the balance sheet content
-            content = []
-            content.append(("Balance Sheet\n", "header"))
-            content.append((f"As of {as_of_date}\n", "subheader"))
-            content.append(("\n", None))
-            
-            # Add assets section
-            content.append(("Assets\n", "section"))
-            if assets:
-                for asset in assets:
-                    amount = asset.get('amount', 0.0)
-                    if abs(amount) > 0.005:  # Only show accounts with non-zero balances
-                        content.append((f"{asset.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
-            else:
-                content.append(("(none)\n", None))
-            # Add Total Assets row
-            content.append(("─" * 50 + "\n", None))
-            content.append((f"Total Assets: {self._format_amount(total_assets)}\n\n", "total"))
-            
-            # Add liabilities section
-            content.append(("Liabilities\n", "section"))
-            if liabilities:
-                for liab in liabilities:
-                    amount = liab.get('amount', 0.0)
-                    if abs(amount) > 0.005:  # Only show accounts with non-zero balances
-                        content.append((f"{liab.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
-            else:
-                content.append(("(none)\n", None))
-            # Add Total Liabilities row
-            content.append(("─" * 50 + "\n", None))
-            content.append((f"Total Liabilities: {self._format_amount(total_liabilities)}\n\n", "total"))
-            
-            # Add equity section
-            content.append(("Equity\n", "section"))
-            if equity:
-                for eq in equity:
-                    amount = eq.get('amount', 0.0)
-                    if abs(amount) > 0.005:  # Only show accounts with non-zero balances
-                        content.append((f"{eq.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
-            else:
-                content.append(("(none)\n", None))
-            # Add Total Equity row
-            content.append(("─" * 50 + "\n", None))
-            content.append((f"Total Equity: {self._format_amount(total_equity)}\n\n", "total"))
-            
-            # Check if closing entries have been completed (step 8)
-            # After closing entries, Net Income is already included in Owner's Capital
-            # So we need different balance check logic for open vs closed periods
-            closing_completed = False
+            except Exception:
+                pass
+        
+        if abs(total_equity - calculated_equity) > 0.01:
             try:
-                statuses = self.engine.get_cycle_status()
-                step8 = next((r for r in statuses if int(r['step']) == 8), None)
-                # Check both status and if closing entries actually exist
-                status_completed = step8 and (step8['status'] == 'completed')
-                
-                # Also check if closing entries exist in database (more reliable)
-                closing_entries_exist = False
-                try:
-                    closing_count = self.engine.conn.execute("""
-                        SELECT COUNT(*) as cnt FROM journal_entries 
-                        WHERE is_closing = 1 AND period_id = ?
-                    """, (self.engine.current_period_id,)).fetchone()
-                    closing_entries_exist = closing_count and closing_count['cnt'] > 0
-                except Exception:
-                    pass
-                
-                # Closing is completed if status says so OR if closing entries exist
-                closing_completed = status_completed or closing_entries_exist
+                logger.warning(
+                    f"Balance sheet equity total mismatch: "
+                    f"reported={total_equity:.2f}, calculated={calculated_equity:.2f}"
+                )
             except Exception:
                 pass
+        
+        # ALWAYS use calculated totals (sum of displayed items) for display
+        # This ensures the displayed total matches what the user sees
+        # This fixes the issue where backend might return incorrect totals
+        total_assets = round(calculated_assets, 2)
+        total_liabilities = round(calculated_liabilities, 2)
+        total_equity = round(calculated_equity, 2)
+        
+        # Recalculate balance_check with corrected totals
+        # Formula: Assets = Liabilities + Equity (should equal 0)
+        balance_check = round(total_assets - (total_liabilities + total_equity), 2)
+        
+        # Final verification - if still unbalanced, add diagnostic info
+        if abs(balance_check) > 0.01:
+            # Double-check by recalculating from displayed items
+            displayed_assets_sum = sum(
+                asset.get('amount', 0.0) 
+                for asset in assets 
+                if abs(asset.get('amount', 0.0)) > 0.005
+            )
+            displayed_liab_sum = sum(
+                liab.get('amount', 0.0) 
+                for liab in liabilities 
+                if abs(liab.get('amount', 0.0)) > 0.005
+            )
+            displayed_equity_sum = sum(
+                eq.get('amount', 0.0) 
+                for eq in equity 
+                if abs(eq.get('amount', 0.0)) > 0.005
+            )
+            
+            # Use displayed sums if they differ
+            if abs(total_assets - displayed_assets_sum) > 0.01:
+                total_assets = round(displayed_assets_sum, 2)
+            if abs(total_liabilities - displayed_liab_sum) > 0.01:
+                total_liabilities = round(displayed_liab_sum, 2)
+            if abs(total_equity - displayed_equity_sum) > 0.01:
+                total_equity = round(displayed_equity_sum, 2)
+            
+            # Recalculate balance check one more time
+            balance_check = round(total_assets - (total_liabilities + total_equity), 2)
+        
+        # Build the balance sheet content
+        content = []
+        content.append(("Balance Sheet\n", "header"))
+        content.append((f"As of {as_of_date}\n", "subheader"))
+        content.append(("\n", None))
+        
+        # Add assets section
+        content.append(("Assets\n", "section"))
+        if assets:
+            for asset in assets:
+                amount = asset.get('amount', 0.0)
+                if abs(amount) > 0.005:  # Only show accounts with non-zero balances
+                    content.append((f"{asset.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
+        else:
+            content.append(("(none)\n", None))
+        # Add Total Assets row
+        content.append(("─" * 50 + "\n", None))
+        content.append((f"Total Assets: {self._format_amount(total_assets)}\n\n", "total"))
+        
+        # Add liabilities section
+        content.append(("Liabilities\n", "section"))
+        if liabilities:
+            for liab in liabilities:
+                amount = liab.get('amount', 0.0)
+                if abs(amount) > 0.005:  # Only show accounts with non-zero balances
+                    content.append((f"{liab.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
+        else:
+            content.append(("(none)\n", None))
+        # Add Total Liabilities row
+        content.append(("─" * 50 + "\n", None))
+        content.append((f"Total Liabilities: {self._format_amount(total_liabilities)}\n\n", "total"))
+        
+        # Add equity section
+        content.append(("Equity\n", "section"))
+        if equity:
+            for eq in equity:
+                amount = eq.get('amount', 0.0)
+                if abs(amount) > 0.005:  # Only show accounts with non-zero balances
+                    content.append((f"{eq.get('name', 'Unknown')}: {self._format_amount(amount)}\n", None))
+        else:
+            content.append(("(none)\n", None))
+        # Add Total Equity row
+        content.append(("─" * 50 + "\n", None))
+        content.append((f"Total Equity: {self._format_amount(total_equity)}\n\n", "total"))
+        
+        # Check if closing entries have been completed (step 8)
+        # After closing entries, Net Income is already included in Owner's Capital
+        # So we need different balance check logic for open vs closed periods
+        closing_completed = False
+        try:
+            statuses = engine.get_cycle_status()
+            step8 = next((r for r in statuses if int(r['step']) == 8), None)
+            # Check both status and if closing entries actually exist
+            status_completed = step8 and (step8['status'] == 'completed')
             
-            # Calculate net income from income statement for clearer breakdown
-            # Get net income from the current period's income statement
-            net_income = 0.0
+            # Also check if closing entries exist in database (more reliable)
+            closing_entries_exist = False
             try:
-                if hasattr(self, 'fs_date_from') and hasattr(self, 'fs_date_to'):
-                    date_from = self.fs_date_from.get().strip() or None
-                    date_to = self.fs_date_to.get().strip() or None
-                    if date_from and date_to:
-                        income_stmt = self.engine.generate_income_statement(date_from, date_to, period_id=None)
-                        net_income = income_stmt.get('net_income', 0.0)
+                closing_count = engine.conn.execute("""
+                    SELECT COUNT(*) as cnt FROM journal_entries 
+                    WHERE is_closing = 1 AND period_id = ?
+                """, (engine.current_period_id,)).fetchone()
+                closing_entries_exist = closing_count and closing_count['cnt'] > 0
             except Exception:
                 pass
             
-            # Add summary section at the bottom with all totals (matching FINAL_ACCOUNTING.py format)
+            # Closing is completed if status says so OR if closing entries exist
+            closing_completed = status_completed or closing_entries_exist
+        except Exception:
+            pass
+        
+        # Calculate net income from income statement for clearer breakdown
+        # Get net income from the current period's income statement
+        net_income = 0.0
+        try:
+            date_from, date_to = income_range or (None, None)
+            if date_from and date_to:
+                income_stmt = engine.generate_income_statement(date_from, date_to, period_id=None)
+                net_income = income_stmt.get('net_income', 0.0)
+        except Exception:
+            pass
+        
+        # Add summary section at the bottom with all totals (matching FINAL_ACCOUNTING.py format)
+        content.append(("=" * 50 + "\n", None))
+        content.append(("SUMMARY\n", "section"))
+        content.append(("=" * 50 + "\n", None))
+        content.append((f"Total Assets: {self._format_amount(total_assets)}\n", "total"))
+        content.append((f"Total Liabilities: {self._format_amount(total_liabilities)}\n", "total"))
+        
+        if closing_completed:
+            # After closing entries, Net Income is already in Owner's Capital
+            content.append((f"Total Equity (Net Income already included): {self._format_amount(total_equity)}\n", "total"))
+            content.append(("─" * 50 + "\n", None))
+            total_liab_equity = total_liabilities + total_equity
+            content.append((f"Total Liabilities + Equity: {self._format_amount(total_liab_equity)}\n", "total"))
             content.append(("=" * 50 + "\n", None))
-            content.append(("SUMMARY\n", "section"))
+            # GRAND TOTAL line (should equal Total Assets when balanced)
+            content.append((f"GRAND TOTAL (Assets = L + E): {self._format_amount(total_assets)}\n", "total"))
+            content.append(("=" * 50 + "\n\n", None))
+            
+            # Balance check for closed periods: Assets = Liabilities + Equity
+            balance_check = total_assets - (total_liabilities + total_equity)
+        else:
+            # Before closing entries, Net Income is separate
+            content.append((f"Total Equity (excluding Net Income): {self._format_amount(total_equity)}\n", "total"))
+            content.append((f"Total Equity (including Net Income): {self._format_amount(total_equity + net_income)}\n", "total"))
+            content.append(("─" * 50 + "\n", None))
+            total_liab_equity_net = total_liabilities + total_equity + net_income
+            content.append((f"Total Liabilities + Equity + Net Income: {self._format_amount(total_liab_equity_net)}\n", "total"))
             content.append(("=" * 50 + "\n", None))
-            content.append((f"Total Assets: {self._format_amount(total_assets)}\n", "total"))
-            content.append((f"Total Liabilities: {self._format_amount(total_liabilities)}\n", "total"))
+            # GRAND TOTAL line (should equal Total Assets when balanced)
+            content.append((f"GRAND TOTAL (Assets = L + E + Net Income): {self._format_amount(total_assets)}\n", "total"))
+            content.append(("=" * 50 + "\n\n", None))
             
+            # Balance check for open periods: Assets = Liabilities + Equity + Net Income
+            balance_check = total_assets - (total_liabilities + total_equity + net_income)
+        
+        # Check accounting equation (balance_check should be 0.00)
+        if abs(balance_check) > 0.05:  # Allow for small floating point differences
             if closing_completed:
-                # After closing entries, Net Income is already in Owner's Capital
-                content.append((f"Total Equity (Net Income already included): {self._format_amount(total_equity)}\n", "total"))
-                content.append(("─" * 50 + "\n", None))
-                total_liab_equity = total_liabilities + total_equity
-                content.append((f"Total Liabilities + Equity: {self._format_amount(total_liab_equity)}\n", "total"))
-                content.append(("=" * 50 + "\n", None))
-                # GRAND TOTAL line (should equal Total Assets when balanced)
-                content.append((f"GRAND TOTAL (Assets = L + E): {self._format_amount(total_assets)}\n", "total"))
-                content.append(("=" * 50 + "\n\n", None))
-                
-                # Balance check for closed periods: Assets = Liabilities + Equity
-                balance_check = total_assets - (total_liabilities + total_equity)
-            else:
-                # Before closing entries, Net Income is separate
-                content.append((f"Total Equity (excluding Net Income): {self._format_amount(total_equity)}\n", "total"))
-                content.append((f"Total Equity (including Net Income): {self._format_amount(total_equity + net_income)}\n", "total"))
-                content.append(("─" * 50 + "\n", None))
-                total_liab_equity_net = total_liabilities + total_equity + net_income
-                content.append((f"Total Liabilities + Equity + Net Income: {self._format_amount(total_liab_equity_net)}\n", "total"))
-                content.append(("=" * 50 + "\n", None))
-                # GRAND TOTAL line (should equal Total Assets when balanced)
-                content.append((f"GRAND TOTAL (Assets = L + E + Net Income): {self._format_amount(total_assets)}\n", "total"))
-                content.append(("=" * 50 + "\n\n", None))
-                
-                # Balance check for open periods: Assets = Liabilities + Equity + Net Income
-                balance_check = total_assets - (total_liabilities + total_equity + net_income)
-            
-            # Check accounting equation (balance_check should be 0.00)
-            if abs(balance_check) > 0.05:  # Allow for small floating point differences
-                if closing_completed:
-                    # Check if the imbalance is due to viewing balance sheet before all transactions
-                    try:
-                        latest_date = self.engine.conn.execute("""
-                            SELECT MAX(date) as max_date FROM journal_entries 
-                            WHERE period_id = ? AND (status = 'posted' OR status IS NULL)
-                        """, (self.engine.current_period_id,)).fetchone()
-                        
-                        if latest_date and latest_date['max_date'] and as_of_date < latest_date['max_date']:
-                            content.append((
-                                f"\n⚠ Warning: Accounting equation does not balance!\n"
-                                f"Assets ({self._format_amount(total_assets)}) ≠ Liabilities + Equity ({self._format_amount(total_liabilities + total_equity)})\n"
-                                f"Difference: {self._format_amount(abs(balance_check))}\n\n"
-                                f"Note: You are viewing the balance sheet 'As of {as_of_date}', but closing entries\n"
-                                f"closed revenue/expenses from the entire period (up to {latest_date['max_date']}).\n"
-                                f"Assets only include transactions up to {as_of_date}, creating this imbalance.\n\n"
-                                f"To see a balanced sheet, view 'As of {latest_date['max_date']}' (latest entry date).\n",
-                                "warning"
-                            ))
-                        else:
-                            content.append((
-                                f"\n⚠ Warning: Accounting equation does not balance!\n"
-                                f"Assets ({self._format_amount(total_assets)}) ≠ Liabilities + Equity ({self._format_amount(total_liabilities + total_equity)})\n"
-                                f"Difference: {self._format_amount(abs(balance_check))}\n", 
-                                "warning"
-                            ))
-                            # Add diagnostic information
-                            try:
-                                diagnostics = self._diagnose_balance_sheet_imbalance()
-                                if diagnostics:
-                                    content.append(("\nPossible Issues:\n", "section"))
-                                    for issue in diagnostics:
-                                        content.append((f"  • {issue}\n", "warning"))
-                            except Exception:
-                                pass
-                    except Exception:
+                # Check if the imbalance is due to viewing balance sheet before all transactions
+                try:
+                    latest_date = engine.conn.execute("""
+                        SELECT MAX(date) as max_date FROM journal_entries 
+                        WHERE period_id = ? AND (status = 'posted' OR status IS NULL)
+                    """, (engine.current_period_id,)).fetchone()
+                    
+                    if latest_date and latest_date['max_date'] and as_of_date < latest_date['max_date']:
+                        content.append((
+                            f"\n⚠ Warning: Accounting equation does not balance!\n"
+                            f"Assets ({self._format_amount(total_assets)}) ≠ Liabilities + Equity ({self._format_amount(total_liabilities + total_equity)})\n"
+                            f"Difference: {self._format_amount(abs(balance_check))}\n\n"
+                            f"Note: You are viewing the balance sheet 'As of {as_of_date}', but closing entries\n"
+                            f"closed revenue/expenses from the entire period (up to {latest_date['max_date']}).\n"
+                            f"Assets only include transactions up to {as_of_date}, creating this imbalance.\n\n"
+                            f"To see a balanced sheet, view 'As of {latest_date['max_date']}' (latest entry date).\n",
+                            "warning"
+                        ))
+                    else:
                         content.append((
                             f"\n⚠ Warning: Accounting equation does not balance!\n"
                             f"Assets ({self._format_amount(total_assets)}) ≠ Liabilities + Equity ({self._format_amount(total_liabilities + total_equity)})\n"
                             f"Difference: {self._format_amount(abs(balance_check))}\n", 
                             "warning"
                         ))
-                else:
+                        # Add diagnostic information
+                        try:
+                            diagnostics = self._diagnose_balance_sheet_imbalance(engine)
+                            if diagnostics:
+                                content.append(("\nPossible Issues:\n", "section"))
+                                for issue in diagnostics:
+                                    content.append((f"  • {issue}\n", "warning"))
+                        except Exception:
+                            pass
+                except Exception:
                     content.append((
                         f"\n⚠ Warning: Accounting equation does not balance!\n"
-                        f"Assets ({self._format_amount(total_assets)}) ≠ Liabilities + Equity + Net Income ({self._format_amount(total_liabilities + total_equity + net_income)})\n"
+                        f"Assets ({self._format_amount(total_assets)}) ≠ Liabilities + Equity ({self._format_amount(total_liabilities + total_equity)})\n"
                         f"Difference: {self._format_amount(abs(balance_check))}\n", 
                         "warning"
                     ))
-                    # Add diagnostic information
-                    try:
-                        diagnostics = self._diagnose_balance_sheet_imbalance()
-                        if diagnostics:
-                            content.append(("\nPossible Issues:\n", "section"))
-                            for issue in diagnostics:
-                                content.append((f"  • {issue}\n", "warning"))
-                    except Exception:
-                        pass
             else:
                 content.append((
-                    f"\n✓ Balance Sheet balances ✅\n",
-                    None
+                    f"\n⚠ Warning: Accounting equation does not balance!\n"
+                    f"Assets ({self._format_amount(total_assets)}) ≠ Liabilities + Equity + Net Income ({self._format_amount(total_liabilities + total_equity + net_income)})\n"
+                    f"Difference: {self._format_amount(abs(balance_check))}\n", 
+                    "warning"
                 ))
-            
+                # Add diagnostic information
+                try:
+                    diagnostics = self._diagnose_balance_sheet_imbalance(engine)
+                    if diagnostics:
+                        content.append(("\nPossible Issues:\n", "section"))
+                        for issue in diagnostics:
+                            content.append((f"  • {issue}\n", "warning"))
+                except Exception:
+                    pass
+        else:
+            content.append((
+                f"\n✓ Balance Sheet balances ✅\n",
+                None
+            ))
+        return content
+
+    def _generate_balance_sheet(self, trial_balance: list, as_of_date: str = None) -> None:
+        """Generate and display the balance sheet using the backend engine method
+        
+        Note: The trial_balance parameter is kept for API consistency but is not used.
+        The backend generate_balance_sheet method recalculates the trial balance to ensure accuracy.
+        """
+        try:
+            income_range = None
+            if hasattr(self, 'fs_date_from') and hasattr(self, 'fs_date_to'):
+                income_range = (self.fs_date_from.get().strip() or None, self.fs_date_to.get().strip() or None)
+            content = self._balance_sheet_content(self.engine, as_of_date, income_range)
+
             # Update the text widget
             self._update_text_widget(self.balance_sheet_text, content)
             
@@ -13624,102 +13779,98 @@ Help:
             # Show error in widget
             self._show_error_in_text_widget(self.balance_sheet_text, str(e), "balance sheet")
     
-    def _generate_cash_flow_statement(self, start_date: str = None, end_date: str = None) -> None:
-        """Generate and display the cash flow statement"""
-        try:
-            # Determine safe start/end for cash flow
-            start = start_date or (
-                (self.engine.current_period['start_date'] if self.engine.current_period and 'start_date' in self.engine.current_period else None)
-            ) or '1900-01-01'
-            end = end_date or date.today().isoformat()
-            
-            # Generate cash flow using backend engine
-            # Cash flow already filters by date, so it should work across periods
-            cf = self.engine.generate_cash_flow(start, end)
-            
-            # Check for errors
-            if isinstance(cf, dict) and cf.get('error'):
-                content = []
-                content.append(("Cash Flow Statement\n", 'header'))
-                content.append((f"Period: {start} → {end}\n\n", 'subheader'))
-                content.append((f"Error: {cf.get('error')}\n", 'warning'))
-                self._update_text_widget(self.cash_flow_text, content)
-                return
-            
-            # Extract data from backend result
-            sections = cf.get('sections', {}) if isinstance(cf, dict) else {}
-            totals = cf.get('totals', {}) if isinstance(cf, dict) else {}
-            net_change = cf.get('net_change_in_cash', 0.0)
-            
-            # Build the cash flow statement content
+    def _cash_flow_content(self, engine: AccountingEngine, start_date: str = None, end_date: str = None) -> List[tuple]:
+        """Build the cash flow statement text; reads only through ``engine``."""
+        # Determine safe start/end for cash flow
+        start = start_date or (
+            (engine.current_period['start_date'] if engine.current_period and 'start_date' in engine.current_period else None)
+        ) or '1900-01-01'
+        end = end_date or date.today().isoformat()
+        
+        # Generate cash flow using backend engine
+        # Cash flow already filters by date, so it should work across periods
+        cf = engine.generate_cash_flow(start, end)
+        
+        # Check for errors
+        if isinstance(cf, dict) and cf.get('error'):
             content = []
             content.append(("Cash Flow Statement\n", 'header'))
             content.append((f"Period: {start} → {end}\n\n", 'subheader'))
-            
-            # Add each section (Operating, Investing, Financing)
-            for sec in ('Operating', 'Investing', 'Financing'):
-                items = sections.get(sec, [])
-                content.append((f"{sec}\n", 'section'))
-                
-                if not items:
-                    content.append(("  (no activity)\n\n", None))
-                else:
-                    for it in items:
-                        try:
-                            amt = float(it.get('amount', 0))
-                        except (ValueError, TypeError):
-                            amt = 0.0
-                        entry_date = it.get('date', '')
-                        entry_id = it.get('entry_id', '')
-                        content.append((f"  {entry_date}: Entry #{entry_id}: {self._format_amount(amt)}\n", None))
-                    
-                    # Add section total
-                    section_total = totals.get(sec, 0.0)
-                    content.append((f"\n  Total {sec}: {self._format_amount(section_total)}\n\n", 'total'))
-            
-            # Add net change in cash
-            content.append((f"Net Change in Cash: {self._format_amount(net_change)}\n", 'net'))
-            
-            # Add simpler cash receipts/payments summary (matching FINAL_ACCOUNTING.py approach)
-            try:
-                # Get cash account ID
-                cash_acc = db.get_account_by_name("Cash", conn=self.engine.conn)
-                if cash_acc:
-                    cash_id = int(cash_acc["id"])
-                    # Calculate simple cash receipts (debits) and payments (credits) for the period
-                    period_filter = self._get_period_filter_for_dates(start, end)
-                    period_clause = " AND je.period_id = ?" if period_filter else ""
-                    period_params = [start, end] + ([period_filter] if period_filter else [])
-                    
-                    cur = self.engine.conn.execute(f"""
-                        SELECT COALESCE(SUM(jl.debit), 0) as cash_in,
-                               COALESCE(SUM(jl.credit), 0) as cash_out
-                        FROM journal_lines jl
-                        JOIN journal_entries je ON je.id = jl.entry_id
-                        WHERE jl.account_id = ?
-                          AND date(je.date) BETWEEN date(?) AND date(?)
-                          AND (je.status = 'posted' OR je.status IS NULL)
-                          {period_clause}
-                    """, [cash_id] + period_params)
-                    
-                    result = cur.fetchone()
-                    if result:
-                        cash_in = float(result['cash_in'] or 0)
-                        cash_out = float(result['cash_out'] or 0)
-                        net_cash_simple = cash_in - cash_out
-                        
-                        content.append(("\n" + "=" * 50 + "\n", None))
-                        content.append(("SIMPLE CASH SUMMARY\n", 'section'))
-                        content.append(("=" * 50 + "\n", None))
-                        content.append((f"Cash Receipts (debits to Cash): {self._format_amount(cash_in)}\n", 'total'))
-                        content.append((f"Cash Payments (credits from Cash): {self._format_amount(cash_out)}\n", 'total'))
-                        content.append(("─" * 50 + "\n", None))
-                        content.append((f"Net Cash Change: {self._format_amount(net_cash_simple)}\n", 'net'))
-            except Exception as e:
-                logger.debug(f"Could not add simple cash summary: {e}")
-            
-            # Update the text widget
-            self._update_text_widget(self.cash_flow_text, content)
+            content.append((f"Error: {cf.get('error')}\n", 'warning'))
+            return content
+        
+        # Extract data from backend result
+        sections = cf.get('sections', {}) if isinstance(cf, dict) else {}
+        totals = cf.get('totals', {}) if isinstance(cf, dict) else {}
+        net_change = cf.get('net_change_in_cash', 0.0)
+        
+        # Build the cash flow statement content
+        content = []
+        content.append(("Cash Flow Statement\n", 'header'))
+        content.append((f"Period: {start} → {end}\n\n", 'subheader'))
+        
+        # Add each section (Operating, Investing, Financing)
+        for sec in ('Operating', 'Investing', 'Financing'):
+            items = sections.get(sec, [])
+            content.append((f"{sec}\n", 'section'))
+            
+            if not items:
+                content.append(("  (no activity)\n\n", None))
+            else:
+                for it in items:
+                    try:
+                        amt = float(it.get('amount', 0))
+                    except (ValueError, TypeError):
+                        amt = 0.0
+                    entry_date = it.get('date', '')
+                    entry_id = it.get('entry_id', '')
+                    content.append((f"  {entry_date}: Entry #{entry_id}: {self._format_amount(amt)}\n", None))
+                
+                # Add section total
+                section_total = totals.get(sec, 0.0)
+                content.append((f"\n  Total {sec}: {self._format_amount(section_total)}\n\n", 'total'))
+        
+        # Add net change in cash
+        content.append((f"Net Change in Cash: {self._format_amount(net_change)}\n", 'net'))
+        
+        # Add simpler cash receipts/payments summary (matching FINAL_ACCOUNTING.py approach).
+        # Derived from the same cash movements as the sections above.
+        amounts = [float(it.get('amount', 0) or 0) for sec in ('Operating', 'Investing', 'Financing') for it in sections.get(sec, [])]
+        cash_in = round(sum(a for a in amounts if a > 0), 2)
+        cash_out = round(-sum(a for a in amounts if a < 0), 2)
+        content.append(("\n" + "=" * 50 + "\n", None))
+        content.append(("SIMPLE CASH SUMMARY\n", 'section'))
+        content.append(("=" * 50 + "\n", None))
+        content.append((f"Cash Receipts (debits to Cash): {self._format_amount(cash_in)}\n", 'total'))
+        content.append((f"Cash Payments (credits from Cash): {self._format_amount(cash_out)}\n", 'total'))
+        content.append(("─" * 50 + "\n", None))
+        content.append((f"Net Cash Change: {self._format_amount(cash_in - cash_out)}\n", 'net'))
+
+        # Indirect method: net income reconciled to cash through balance changes
+        try:
+            ind = engine.generate_cash_flow_indirect(start, end)
+            if isinstance(ind, dict) and not ind.get('error'):
+                content.append(("\n" + "=" * 50 + "\n", None))
+                content.append(("INDIRECT METHOD\n", 'section'))
+                content.append(("=" * 50 + "\n", None))
+                content.append((f"Net Income: {self._format_amount(ind.get('net_income', 0.0))}\n", None))
+                for sec in ('Operating', 'Investing', 'Financing'):
+                    content.append((f"{sec}\n", 'section'))
+                    for it in ind['sections'].get(sec, []):
+                        content.append((f"  {it['code']} - {it['name']}: {self._format_amount(it['amount'])}\n", None))
+                    content.append((f"  Total {sec}: {self._format_amount(ind['totals'].get(sec, 0.0))}\n", 'total'))
+                content.append((f"Net Change in Cash: {self._format_amount(ind.get('net_change_in_cash', 0.0))}\n", 'net'))
+        except Exception as e:
+            logger.debug(f"Could not add indirect cash flow: {e}")
+        return content
+
+    def _generate_cash_flow_statement(self, start_date: str = None, end_date: str = None) -> None:
+        """Generate and display the cash flow statement"""
+        try:
+            content = self._cash_flow_content(self.engine, start_date, end_date)
+
+            # Update the text widget
+            self._update_text_widget(self.cash_flow_text, content)
             
         except Exception as e:
             logger.error(f"Error generating cash flow statement: {e}", exc_info=True)
@@ -13790,14 +13941,14 @@ Help:
             period_filter = self._get_period_filter_for_dates(date_from, date_to)
             inc_temp_bs = self._should_include_temporary_accounts_in_bs()
             
-            rows_is = db.compute_trial_balance(
+            rows_is = report_cache.trial_balance(
                 from_date=date_from,
                 up_to_date=date_to,
                 include_temporary=True,
                 period_id=period_filter,
                 conn=self.engine.conn,
             )
-            rows_bs = db.compute_trial_balance(
+            rows_bs = report_cache.trial_balance(
                 up_to_date=date_to,
                 include_temporary=inc_temp_bs,
                 period_id=period_filter,
@@ -13819,8 +13970,15 @@ Help:
             # Fail silently during theme refresh to avoid interrupting UI
             pass
     
-    def _load_financials(self, mark_status: bool = True) -> None:
-        """Load and display financial statements based on date range"""
+    def _load_financials(self, mark_status: bool = True, on_finished: Optional[Callable[[], None]] = None) -> None:
+        """Load and display financial statements based on date range.
+
+        Dates are resolved here; the statements are built on a worker with its
+        own connection and rendered when they arrive, after which ``on_finished``
+        is called (also when a newer load replaces this one).
+        """
+        if on_finished:
+            self._financials_waiters = getattr(self, '_financials_waiters', []) + [on_finished]
         try:
             # Get date range from the UI (with fallback if fields don't exist yet)
             try:
@@ -13873,133 +14031,164 @@ Help:
                 # Text widgets might not exist if tab hasn't been viewed yet
                 pass
             
-            # Use helper methods to determine period filter and temporary account inclusion
-            period_filter = self._get_period_filter_for_dates(date_from, date_to)
-            inc_temp_bs = self._should_include_temporary_accounts_in_bs()
-            
-            # Get trial balance data for the specified date range
-            # Exclude closing entries for income statement to show revenue/expenses before closing
-            rows_is = db.compute_trial_balance(
-                from_date=date_from,
-                up_to_date=date_to,
-                include_temporary=True,
-                period_id=period_filter,
-                exclude_closing=True,
-                conn=self.engine.conn
-            )
-            rows_bs = db.compute_trial_balance(
-                up_to_date=date_to,
-                include_temporary=inc_temp_bs,
-                period_id=period_filter,
-                conn=self.engine.conn
+        except Exception as e:
+            self._financials_failed(e, mark_status)
+            return
+
+        def build(ctx) -> dict:
+            engine = self.engine.with_connection(ctx.conn)
+            builders = (
+                ("income", lambda: self._income_statement_content(engine, date_to, start_date=date_from)),
+                ("balance", lambda: self._balance_sheet_content(engine, date_to, (date_from, date_to))),
+                ("cash_flow", lambda: self._cash_flow_content(engine, date_from, date_to)),
             )
-            
-            # Process data for financial statements
-            # Pass date_from to income statement so it uses the correct date range
-            self._generate_income_statement(rows_is, date_to, start_date=date_from)
-            self._generate_balance_sheet(rows_bs, date_to)
-            # Generate cash flow using dedicated method
-            self._generate_cash_flow_statement(date_from, date_to)
-            
-            # Check balance sheet balance and show notification (matching FINAL_ACCOUNTING.py approach)
-            try:
-                balance_sheet = self.engine.generate_balance_sheet(date_to or date.today().isoformat())
-                total_assets = balance_sheet.get('total_assets', 0.0)
-                total_liabilities = balance_sheet.get('total_liabilities', 0.0)
-                total_equity = balance_sheet.get('total_equity', 0.0)
-                
-                # Check if closing entries have been completed
-                closing_completed = False
+            results: dict = {}
+            for name, make in builders:
+                ctx.check()
                 try:
-                    statuses = self.engine.get_cycle_status()
-                    step8 = next((r for r in statuses if int(r['step']) == 8), None)
-                    # Check both status and if closing entries actually exist
-                    status_completed = step8 and (step8['status'] == 'completed')
-                    
-                    # Also check if closing entries exist in database (more reliable)
-                    closing_entries_exist = False
+                    results[name] = make()
+                except Exception as e:
+                    logger.error(f"Failed to generate {name} statement: {e}", exc_info=True)
+                    results[name] = e
+            ctx.check()
+            try:
+                results["balance_check"] = self._balance_check_difference(engine, date_from, date_to)
+            except Exception:
+                results["balance_check"] = None  # Fail silently if balance check fails
+            return results
+
+        def show(results: dict) -> None:
+            try:
+                for key, attr, label in (
+                    ("income", "income_text", "income statement"),
+                    ("balance", "balance_sheet_text", "balance sheet"),
+                    ("cash_flow", "cash_flow_text", "cash flow statement"),
+                ):
+                    widget = getattr(self, attr, None)
+                    if widget is None:
+                        continue
+                    content = results[key]
+                    if isinstance(content, Exception):
+                        self._show_error_in_text_widget(widget, str(content), label)
+                        if key == "balance":
+                            messagebox.showerror("Error", f"Failed to generate balance sheet: {content}")
+                    else:
+                        self._update_text_widget(widget, content)
+
+                balance_check = results.get("balance_check")
+                if balance_check is not None and mark_status:
+                    # Only notify if mark_status is True (to avoid spam during theme changes)
                     try:
-                        closing_count = self.engine.conn.execute("""
-                            SELECT COUNT(*) as cnt FROM journal_entries 
-                            WHERE is_closing = 1 AND period_id = ?
-                        """, (self.engine.current_period_id,)).fetchone()
-                        closing_entries_exist = closing_count and closing_count['cnt'] > 0
-                    except Exception:
-                        pass
-                    
-                    # Closing is completed if status says so OR if closing entries exist
-                    closing_completed = status_completed or closing_entries_exist
-                except Exception:
-                    pass
-                
-                # Balance check depends on whether closing entries are completed
-                if closing_completed:
-                    # After closing: Assets = Liabilities + Equity (Net Income already in Capital)
-                    balance_check = abs(total_assets - (total_liabilities + total_equity))
-                else:
-                    # Before closing: Assets = Liabilities + Equity + Net Income
-                    income_stmt = self.engine.generate_income_statement(
-                        date_from or '1900-01-01', 
-                        date_to or date.today().isoformat(), 
-                        period_id=None
-                    )
-                    net_income = income_stmt.get('net_income', 0.0)
-                    balance_check = abs(total_assets - (total_liabilities + total_equity + net_income))
-                
-                if balance_check < 0.05:
-                    # Only show success message if mark_status is True (to avoid spam during theme changes)
-                    if mark_status:
-                        try:
+                        if balance_check < 0.05:
                             messagebox.showinfo("Balance Check", "Balance Sheet balances ✅")
-                        except Exception:
-                            pass
-                else:
-                    if mark_status:
-                        try:
+                        else:
                             messagebox.showwarning(
-                                "Balance Check", 
+                                "Balance Check",
                                 f"Balance Sheet does NOT balance ❌ — check entries and adjustments.\n"
                                 f"Difference: {self._format_amount(balance_check)}"
                             )
-                        except Exception:
-                            pass
+                    except Exception:
+                        pass
+
+                # Only mark as completed if we got this far without errors and caller allows status changes
+                if mark_status:
+                    self.engine.set_cycle_step_status(
+                        7,
+                        "completed",
+                        note=f"Financial statements generated as of {date_to or 'latest'}",
+                    )
+                    self.engine.set_cycle_step_status(
+                        8,
+                        "in_progress",
+                        note="Ready to prepare closing entries",
+                    )
+            except Exception as e:
+                self._financials_failed(e, mark_status)
+                return
+            try:
+                self._load_cycle_status()
             except Exception:
-                pass  # Fail silently if balance check fails
-            
-            # Only mark as completed if we got this far without errors and caller allows status changes
-            if mark_status:
+                pass
+            self._financials_finished()
+
+        self.tasks.submit("financials", build, show, lambda e: self._financials_failed(e, mark_status))
+
+    def _balance_check_difference(self, engine: AccountingEngine, date_from: Optional[str], date_to: Optional[str]) -> float:
+        """Absolute difference in the accounting equation (matching FINAL_ACCOUNTING.py approach)."""
+        balance_sheet = engine.generate_balance_sheet(date_to or date.today().isoformat())
+        total_assets = balance_sheet.get('total_assets', 0.0)
+        total_liabilities = balance_sheet.get('total_liabilities', 0.0)
+        total_equity = balance_sheet.get('total_equity', 0.0)
+
+        # Check if closing entries have been completed
+        closing_completed = False
+        try:
+            statuses = engine.get_cycle_status()
+            step8 = next((r for r in statuses if int(r['step']) == 8), None)
+            # Check both status and if closing entries actually exist
+            status_completed = step8 and (step8['status'] == 'completed')
+
+            # Also check if closing entries exist in database (more reliable)
+            closing_entries_exist = False
+            try:
+                closing_count = engine.conn.execute("""
+                    SELECT COUNT(*) as cnt FROM journal_entries 
+                    WHERE is_closing = 1 AND period_id = ?
+                """, (engine.current_period_id,)).fetchone()
+                closing_entries_exist = closing_count and closing_count['cnt'] > 0
+            except Exception:
+                pass
+
+            # Closing is completed if status says so OR if closing entries exist
+            closing_completed = status_completed or closing_entries_exist
+        except Exception:
+            pass
+
+        # Balance check depends on whether closing entries are completed
+        if closing_completed:
+            # After closing: Assets = Liabilities + Equity (Net Income already in Capital)
+            balance_check = abs(total_assets - (total_liabilities + total_equity))
+        else:
+            # Before closing: Assets = Liabilities + Equity + Net Income
+            income_stmt = engine.generate_income_statement(
+                date_from or '1900-01-01', 
+                date_to or date.today().isoformat(), 
+                period_id=None
+            )
+            net_income = income_stmt.get('net_income', 0.0)
+            balance_check = abs(total_assets - (total_liabilities + total_equity + net_income))
+        return balance_check
+
+    def _financials_finished(self) -> None:
+        waiters, self._financials_waiters = getattr(self, '_financials_waiters', []), []
+        for callback in waiters:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def _financials_failed(self, e: BaseException, mark_status: bool) -> None:
+        try:
+            self._handle_exception("load_financials", e)
+        except Exception:
+            pass
+        messagebox.showerror("Error", f"Failed to generate financial statements: {str(e)}")
+        # Don't mark as completed or change cycle status if caller disallowed status changes
+        if mark_status:
+            try:
                 self.engine.set_cycle_step_status(
                     7,
-                    "completed",
-                    note=f"Financial statements generated as of {date_to or 'latest'}",
-                )
-                self.engine.set_cycle_step_status(
-                    8,
                     "in_progress",
-                    note="Ready to prepare closing entries",
+                    note=f"Error generating statements: {str(e)[:100]}",
                 )
-            
-        except Exception as e:
-            try:
-                self._handle_exception("load_financials", e)
             except Exception:
                 pass
-            messagebox.showerror("Error", f"Failed to generate financial statements: {str(e)}")
-            # Don't mark as completed or change cycle status if caller disallowed status changes
-            if mark_status:
-                try:
-                    self.engine.set_cycle_step_status(
-                        7,
-                        "in_progress",
-                        note=f"Error generating statements: {str(e)[:100]}",
-                    )
-                except Exception:
-                    pass
         # Always refresh cycle status display in the UI
         try:
             self._load_cycle_status()
         except Exception:
             pass
+        self._financials_finished()
 
     # --------------------- Closing Tab ---------------------
     def _build_closing_tab(self) -> None:
@@ -14307,11 +14496,13 @@ Help:
 
         buttons = [
             ("Export Journal (Excel)", self._export_journal),
+            ("Export Journal (Parquet/Arrow)", self._export_journal_columnar),
             ("Export Ledger (Excel)", self._export_ledger),
             ("Export Trial Balance (Excel)", self._export_tb),
             ("Export Financials (Excel)", self._export_fs),
             ("Export All (Excel)", self._export_all_to_excel),
             ("Export All to Email", self._export_all_to_email),
+            ("Cancel Export All", self._cancel_export_all),
             ("Export Documentation (PDF)", self._export_program_docs_pdf),
         ]
 
@@ -14333,16 +14524,14 @@ Help:
         ttk.Button(controls, text="Export CSV", command=lambda: self._export_audit_csv(), style="Techfix.TButton").pack(side=tk.LEFT, padx=(6,0))
 
         cols = ("id","timestamp","user","action","details")
-        self.audit_tree = ttk.Treeview(frame, columns=cols, show="headings", style="Techfix.Treeview")
+        self.audit_view = VirtualTreeview(frame, cols, frame_style="Techfix.Surface.TFrame", style="Techfix.Treeview")
+        self.audit_tree = self.audit_view.tree
         for c in cols:
             anchor = tk.W
             width = 100 if c in ("id","user") else (160 if c=="timestamp" else 640)
             self.audit_tree.heading(c, text=c.title(), anchor=anchor)
             self.audit_tree.column(c, stretch=True, width=width, anchor=anchor)
-        vsb = ttk.Scrollbar(frame, orient="vertical", command=self.audit_tree.yview)
-        self.audit_tree.configure(yscrollcommand=vsb.set)
-        self.audit_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=12, pady=(0, 12))
-        vsb.pack(side=tk.RIGHT, fill=tk.Y, pady=(0, 12))
+        self.audit_view.pack(fill=tk.BOTH, expand=True, padx=12, pady=(0, 12))
         try:
             self._load_audit_log()
         except Exception:
@@ -14350,26 +14539,24 @@ Help:
 
     def _load_audit_log(self) -> None:
         try:
-            if hasattr(self, 'audit_tree'):
-                for it in self.audit_tree.get_children():
-                    self.audit_tree.delete(it)
             filt = (self.audit_filter_var.get().strip().lower() if hasattr(self, 'audit_filter_var') else '')
             rows = db.list_audit_log(limit=500, conn=self.engine.conn)
+            shown = []
             for r in rows:
                 act = r['action'] if 'action' in r.keys() else ''
                 det = r['details'] if 'details' in r.keys() else ''
                 if filt and (filt not in str(act).lower() and filt not in str(det).lower()):
                     continue
-                self.audit_tree.insert('', 'end', values=(r['id'], r['timestamp'], r['user'], act, det))
+                shown.append((r['id'], r['timestamp'], r['user'], act, det))
+            if hasattr(self, 'audit_view'):
+                self.audit_view.set_provider(SequenceRowProvider(shown, self.audit_tree['columns']))
         except Exception:
             pass
 
     def _export_audit_csv(self) -> None:
         try:
             from pathlib import Path
-            rows = []
-            for it in self.audit_tree.get_children():
-                rows.append(self.audit_tree.item(it, 'values'))
+            rows = self._tree_rows(self.audit_tree)
             out = Path(str(db.DB_DIR)) / 'audit_export.csv'
             import csv
             with out.open('w', newline='', encoding='utf-8') as f:
@@ -14508,103 +14695,119 @@ Help:
         path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel","*.xlsx")])
         if not path:
             return
-        rows = db.fetch_journal(period_id=self.engine.current_period_id, conn=self.engine.conn)
-        headers = ["date","entry_id","description","code","name","debit","credit"]
-        try:
-            from openpyxl import Workbook
-            from openpyxl.utils import get_column_letter
-            from openpyxl.styles import Font
-
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Journal"
-
-            for cidx, h in enumerate(headers, start=1):
-                ws.cell(row=1, column=cidx, value=h).font = Font(bold=True)
-
-            for ridx, r in enumerate(rows, start=2):
-                ws.cell(row=ridx, column=1, value=r["date"])
-                ws.cell(row=ridx, column=2, value=r["entry_id"])
-                ws.cell(row=ridx, column=3, value=r["description"])
-                ws.cell(row=ridx, column=4, value=r["code"])
-                ws.cell(row=ridx, column=5, value=r["name"])
-                try:
-                    ws.cell(row=ridx, column=6, value=float(r["debit"] or 0))
-                except Exception:
-                    ws.cell(row=ridx, column=6, value=r["debit"])
-                try:
-                    ws.cell(row=ridx, column=7, value=float(r["credit"] or 0))
-                except Exception:
-                    ws.cell(row=ridx, column=7, value=r["credit"])
-
-            last = ws.max_row
-            # Add SUM formulas for debit (col 6) and credit (col 7) if there are data rows
-            if last >= 2:
-                col_f = get_column_letter(6)
-                col_g = get_column_letter(7)
-                total_row = last + 1
-                ws.cell(row=total_row, column=5, value="Totals:").font = Font(bold=True)
-                ws.cell(row=total_row, column=6, value=f"=SUM({col_f}2:{col_f}{last})")
-                ws.cell(row=total_row, column=7, value=f"=SUM({col_g}2:{col_g}{last})")
-
-            # auto-width
-            for i in range(1, len(headers) + 1):
-                ws.column_dimensions[get_column_letter(i)].width = 15
-
-            wb.save(path)
-            messagebox.showinfo("Exported", "Journal exported to Excel.")
-        except Exception as e:
-            messagebox.showerror("Export Error", str(e))
+        period_id = self.engine.current_period_id
+        self._stream_excel_export(
+            "export_journal",
+            "Journal",
+            path,
+            ["date","entry_id","description","code","name","debit","credit"],
+            lambda conn: db.iter_journal(period_id, conn=conn),
+        )
 
     def _export_ledger(self) -> None:
         path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel","*.xlsx")])
         if not path:
             return
-        rows = db.fetch_ledger(period_id=self.engine.current_period_id, conn=self.engine.conn)
-        headers = ["code","name","date","description","debit","credit"]
-        try:
-            from openpyxl import Workbook
-            from openpyxl.utils import get_column_letter
-            from openpyxl.styles import Font
+        period_id = self.engine.current_period_id
+        fields = ("code", "name", "date", "description", "debit", "credit", "running_balance")
+        self._stream_excel_export(
+            "export_ledger",
+            "Ledger",
+            path,
+            ["code","name","date","description","debit","credit","balance"],
+            lambda conn: ([r[f] for f in fields] for r in db.iter_ledger_rows(period_id, conn=conn)),
+        )
 
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Ledger"
+    def _stream_excel_export(
+        self,
+        key: str,
+        title: str,
+        path: str,
+        headers: List[str],
+        rows: Callable[[Any], Any],
+    ) -> None:
+        """Stream ``rows(conn)`` into a one-sheet workbook on a background worker.
+
+        Rows go straight to a write-only sheet, so memory stays flat whatever
+        the size of the journal; SUM formulas are added under debit/credit.
+        """
+        debit_col = headers.index("debit") + 1
+
+        def work(ctx) -> int:
+            wb = export.new_workbook()
+            ws = wb.create_sheet(title=title)
+            export.set_widths(ws, {i: 15 for i in range(1, len(headers) + 1)})
+            count = export.write_sheet(
+                ws,
+                rows(ctx.conn),
+                headers,
+                numeric=("debit", "credit"),
+                progress=lambda n: (ctx.check(), ctx.progress(n)),
+            )
+            if count:
+                from openpyxl.utils import get_column_letter
 
-            for cidx, h in enumerate(headers, start=1):
-                ws.cell(row=1, column=cidx, value=h).font = Font(bold=True)
+                last = count + 1
+                d, c = get_column_letter(debit_col), get_column_letter(debit_col + 1)
+                totals: List[Any] = [None] * (debit_col - 2)
+                totals += [export.bold(ws, "Totals:"), f"=SUM({d}2:{d}{last})", f"=SUM({c}2:{c}{last})"]
+                ws.append(totals)
+            ctx.check()
+            wb.save(path)
+            return count
 
-            for ridx, r in enumerate(rows, start=2):
-                ws.cell(row=ridx, column=1, value=r["code"]) if "code" in r.keys() else ws.cell(row=ridx, column=1, value="")
-                ws.cell(row=ridx, column=2, value=r["name"]) if "name" in r.keys() else ws.cell(row=ridx, column=2, value="")
-                ws.cell(row=ridx, column=3, value=r["date"]) if "date" in r.keys() else ws.cell(row=ridx, column=3, value="")
-                ws.cell(row=ridx, column=4, value=r["description"]) if "description" in r.keys() else ws.cell(row=ridx, column=4, value="")
-                try:
-                    ws.cell(row=ridx, column=5, value=float(r["debit"] or 0))
-                except Exception:
-                    ws.cell(row=ridx, column=5, value=r["debit"] if "debit" in r.keys() else "")
-                try:
-                    ws.cell(row=ridx, column=6, value=float(r["credit"] or 0))
-                except Exception:
-                    ws.cell(row=ridx, column=6, value=r["credit"] if "credit" in r.keys() else "")
+        def done(_count) -> None:
+            self.set_status("")
+            messagebox.showinfo("Exported", f"{title} exported to Excel.")
 
-            last = ws.max_row
-            if last >= 2:
-                col_e = get_column_letter(5)
-                col_f = get_column_letter(6)
-                total_row = last + 1
-                ws.cell(row=total_row, column=4, value="Totals:").font = Font(bold=True)
-                ws.cell(row=total_row, column=5, value=f"=SUM({col_e}2:{col_e}{last})")
-                ws.cell(row=total_row, column=6, value=f"=SUM({col_f}2:{col_f}{last})")
+        def failed(e: BaseException) -> None:
+            self.set_status("")
+            messagebox.showerror("Export Error", str(e))
 
-            for i in range(1, len(headers) + 1):
-                ws.column_dimensions[get_column_letter(i)].width = 15
+        self.set_status(f"Exporting {title.lower()}...")
+        self.tasks.submit(
+            key,
+            work,
+            done,
+            failed,
+            on_progress=lambda n: self.set_status(f"Exporting {title.lower()}... {n:,} rows"),
+        )
 
-            wb.save(path)
-            messagebox.showinfo("Exported", "Ledger exported to Excel.")
-        except Exception as e:
+    def _export_journal_columnar(self) -> None:
+        """Export typed journal lines of every period to a Parquet or Arrow IPC dataset."""
+        if not columnar.PYARROW_AVAILABLE:
+            messagebox.showerror("Export Error", "pyarrow is required for Parquet/Arrow export.\nInstall with: pip install pyarrow")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".parquet",
+            filetypes=[("Parquet dataset", "*.parquet"), ("Arrow IPC", "*.arrow")],
+            initialfile=f"techfix_journal_{datetime.now().date().isoformat()}.parquet",
+        )
+        if not path:
+            return
+
+        def done(result) -> None:
+            self.set_status("")
+            messagebox.showinfo(
+                "Exported",
+                f"{result['rows']:,} journal lines written to {path} ({len(result['files'])} period partitions).",
+            )
+
+        def failed(e: BaseException) -> None:
+            self.set_status("")
             messagebox.showerror("Export Error", str(e))
 
+        self.set_status("Exporting journal...")
+        self.tasks.submit(
+            "export_columnar",
+            lambda ctx: columnar.export_journal_lines(
+                path, conn=ctx.conn, progress=lambda n: (ctx.check(), ctx.progress(n)),
+            ),
+            done,
+            failed,
+            on_progress=lambda n: self.set_status(f"Exporting journal... {n:,} lines"),
+        )
+
     def _export_tb(self) -> None:
         path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel","*.xlsx")])
         if not path:
@@ -14644,7 +14847,7 @@ Help:
                 include_temporary=True,
                 conn=self.engine.conn
             )
-            adj_rows = db.compute_trial_balance(
+            adj_rows = report_cache.trial_balance(
                 period_id=self.engine.current_period_id,
                 conn=self.engine.conn
             )
@@ -14818,8 +15021,19 @@ Help:
             messagebox.showerror("Export Error", f"Failed to export financial statements: {str(e)}")
             raise
 
-    def _export_all_to_excel(self, path: Optional[str] = None, notify: bool = True) -> Optional[str]:
-        """Export Journal, Ledger, Trial Balance, and Financial Statements into one Excel workbook."""
+    def _export_all_to_excel(
+        self,
+        path: Optional[str] = None,
+        notify: bool = True,
+        on_done: Optional[Callable[[str], None]] = None,
+    ) -> Optional[Task]:
+        """Export Journal, Ledger, Trial Balance, and Financial Statements into one Excel workbook.
+
+        The workbook is written on a background worker and the task is
+        returned (None if no path was chosen). The file only exists once the
+        task completes: act on it from ``on_done(path)``, which runs on the
+        Tk thread after the workbook is saved.
+        """
         if path is None:
             path = filedialog.asksaveasfilename(
                 defaultextension=".xlsx",
@@ -14829,394 +15043,88 @@ Help:
         if not path:
             return None
 
-        try:
-            try:
-                from openpyxl import Workbook
-                from openpyxl.utils import get_column_letter
-                from openpyxl.styles import Font
-            except ImportError as e:
-                raise RuntimeError("openpyxl is required for Excel export. Install with: pip install openpyxl") from e
-
-            wb = Workbook()
+        dates = self._statement_date_range()
+        period_id = self.engine.current_period_id
 
-            # --- Journal sheet ---
-            ws_j = wb.active
-            ws_j.title = "Journal"
-            journal_rows = db.fetch_journal(period_id=self.engine.current_period_id, conn=self.engine.conn)
-            j_headers = ["entry_id", "date", "description", "code", "name", "debit", "credit"]
-            for cidx, h in enumerate(j_headers, start=1):
-                cell = ws_j.cell(row=1, column=cidx, value=h)
-                cell.font = Font(bold=True)
-            for ridx, r in enumerate(journal_rows, start=2):
-                ws_j.cell(row=ridx, column=1, value=r["entry_id"])
-                ws_j.cell(row=ridx, column=2, value=r["date"])
-                ws_j.cell(row=ridx, column=3, value=r["description"])
-                ws_j.cell(row=ridx, column=4, value=r["code"])
-                ws_j.cell(row=ridx, column=5, value=r["name"])
-                # numeric values
-                try:
-                    ws_j.cell(row=ridx, column=6, value=float(r["debit"] or 0))
-                except Exception:
-                    ws_j.cell(row=ridx, column=6, value=r["debit"])
-                try:
-                    ws_j.cell(row=ridx, column=7, value=float(r["credit"] or 0))
-                except Exception:
-                    ws_j.cell(row=ridx, column=7, value=r["credit"])
-
-            # Add totals row for journal debit/credit
-            last = ws_j.max_row
-            if last >= 2:
-                fcol = get_column_letter(6)
-                gcol = get_column_letter(7)
-                total_row = last + 1
-                ws_j.cell(row=total_row, column=5, value="Totals:").font = Font(bold=True)
-                ws_j.cell(row=total_row, column=6, value=f"=SUM({fcol}2:{fcol}{last})")
-                ws_j.cell(row=total_row, column=7, value=f"=SUM({gcol}2:{gcol}{last})")
-
-            # Auto-width
-            for i, _ in enumerate(j_headers, start=1):
-                ws_j.column_dimensions[get_column_letter(i)].width = 15
-
-            # --- Ledger sheet ---
-            ws_l = wb.create_sheet(title="Ledger")
-            l_headers = ["account_id", "code", "name", "date", "description", "debit", "credit"]
-            for cidx, h in enumerate(l_headers, start=1):
-                cell = ws_l.cell(row=1, column=cidx, value=h)
-                cell.font = Font(bold=True)
-            ledger_rows = db.fetch_ledger(period_id=self.engine.current_period_id, conn=self.engine.conn)
-            for ridx, r in enumerate(ledger_rows, start=2):
-                # r is a sqlite3.Row; access fields by key with safety checks
-                if "account_id" in r.keys():
-                    ws_l.cell(row=ridx, column=1, value=r["account_id"])
-                if "code" in r.keys():
-                    ws_l.cell(row=ridx, column=2, value=r["code"])
-                else:
-                    # fallback blank
-                    ws_l.cell(row=ridx, column=2, value="")
-                ws_l.cell(row=ridx, column=3, value=r["name"])
-                if "date" in r.keys():
-                    ws_l.cell(row=ridx, column=4, value=r["date"])
-                if "description" in r.keys():
-                    ws_l.cell(row=ridx, column=5, value=r["description"])
-                # debit/credit as numeric when possible
-                try:
-                    ws_l.cell(row=ridx, column=6, value=float(r["debit"] or 0))
-                except Exception:
-                    try:
-                        ws_l.cell(row=ridx, column=6, value=r["debit"])
-                    except Exception:
-                        ws_l.cell(row=ridx, column=6, value="")
-                try:
-                    ws_l.cell(row=ridx, column=7, value=float(r["credit"] or 0))
-                except Exception:
-                    try:
-                        ws_l.cell(row=ridx, column=7, value=r["credit"])
-                    except Exception:
-                        ws_l.cell(row=ridx, column=7, value="")
+        def done(saved: str) -> None:
+            self.set_status("")
+            if notify:
+                messagebox.showinfo("Export Successful", f"All data exported to {saved}")
+            if on_done is not None:
+                on_done(saved)
 
-            # Add totals row for ledger debit/credit
-            last_l = ws_l.max_row
-            if last_l >= 2:
-                ecol = get_column_letter(6)
-                fcol = get_column_letter(7)
-                total_row = last_l + 1
-                ws_l.cell(row=total_row, column=5, value="Totals:").font = Font(bold=True)
-                ws_l.cell(row=total_row, column=6, value=f"=SUM({ecol}2:{ecol}{last_l})")
-                ws_l.cell(row=total_row, column=7, value=f"=SUM({fcol}2:{fcol}{last_l})")
+        def failed(e: BaseException) -> None:
+            self.set_status("")
+            messagebox.showerror("Export Error", f"Failed to export all data: {str(e)}")
 
-            for i, _ in enumerate(l_headers, start=1):
-                ws_l.column_dimensions[get_column_letter(i)].width = 15
+        self.set_status("Exporting all data...")
+        return self.tasks.submit(
+            "export_all",
+            lambda ctx: self._write_all_workbook(path, period_id, dates, ctx),
+            done,
+            failed,
+            on_progress=self._export_all_progress("Exporting all data"),
+        )
 
-            # --- Combined Trial Balance sheet ---
-            ws_tb = wb.create_sheet(title="Trial Balance")
-            
-            # Title row
-            title_cell = ws_tb.cell(row=1, column=1, value="TRIAL BALANCE")
-            title_cell.font = Font(bold=True, size=14)
-            ws_tb.merge_cells(start_row=1, start_column=1, end_row=1, end_column=6)
-            
-            # Headers with clear labels
-            tb_headers = [
-                "Code", 
-                "Account Name", 
-                "Unadjusted Debit", 
-                "Unadjusted Credit",
-                "Adjusted Debit",
-                "Adjusted Credit"
-            ]
-            for cidx, h in enumerate(tb_headers, start=1):
-                cell = ws_tb.cell(row=2, column=cidx, value=h)
-                cell.font = Font(bold=True)
-            
-            # Get both unadjusted and adjusted trial balances
-            unadj_tb_data = db.compute_unadjusted_trial_balance(
-                period_id=self.engine.current_period_id,
-                include_temporary=True,
-                conn=self.engine.conn
-            )
-            adj_tb_rows = db.compute_trial_balance(
-                period_id=self.engine.current_period_id,
-                conn=self.engine.conn
-            )
-            
-            # Create dictionaries for easy lookup
-            unadj_by_code = {r["code"]: r for r in unadj_tb_data if "code" in r.keys() and r["code"]}
-            adj_by_code = {r["code"]: r for r in adj_tb_rows if "code" in r.keys() and r["code"]}
-            
-            # Get all unique account codes
-            all_codes = sorted(set(list(unadj_by_code.keys()) + list(adj_by_code.keys())))
-            
-            # Write data rows
-            for ridx, code in enumerate(all_codes, start=3):
-                unadj_r = unadj_by_code.get(code)
-                adj_r = adj_by_code.get(code)
-                
-                # Get account name (prefer from adjusted, fallback to unadjusted)
-                if adj_r:
-                    name = adj_r["name"] if "name" in adj_r.keys() else ""
-                elif unadj_r:
-                    name = unadj_r["name"] if "name" in unadj_r.keys() else ""
-                else:
-                    name = ""
-                
-                # Get unadjusted balances
-                if unadj_r:
-                    unadj_d, unadj_c = self._balance_to_columns(unadj_r)
-                else:
-                    unadj_d, unadj_c = 0.0, 0.0
-                
-                # Get adjusted balances
-                if adj_r:
-                    adj_d, adj_c = self._balance_to_columns(adj_r)
-                else:
-                    adj_d, adj_c = 0.0, 0.0
-                
-                ws_tb.cell(row=ridx, column=1, value=code)
-                ws_tb.cell(row=ridx, column=2, value=name)
-                ws_tb.cell(row=ridx, column=3, value=float(unadj_d or 0))
-                ws_tb.cell(row=ridx, column=4, value=float(unadj_c or 0))
-                ws_tb.cell(row=ridx, column=5, value=float(adj_d or 0))
-                ws_tb.cell(row=ridx, column=6, value=float(adj_c or 0))
-            
-            # Add totals row
-            last_tb = ws_tb.max_row
-            if last_tb >= 3:
-                total_row = last_tb + 1
-                ws_tb.cell(row=total_row, column=2, value="Totals:").font = Font(bold=True)
-                
-                # Unadjusted totals
-                col_unadj_d = get_column_letter(3)
-                col_unadj_c = get_column_letter(4)
-                ws_tb.cell(row=total_row, column=3, value=f"=SUM({col_unadj_d}3:{col_unadj_d}{last_tb})").font = Font(bold=True)
-                ws_tb.cell(row=total_row, column=4, value=f"=SUM({col_unadj_c}3:{col_unadj_c}{last_tb})").font = Font(bold=True)
-                
-                # Adjusted totals
-                col_adj_d = get_column_letter(5)
-                col_adj_c = get_column_letter(6)
-                ws_tb.cell(row=total_row, column=5, value=f"=SUM({col_adj_d}3:{col_adj_d}{last_tb})").font = Font(bold=True)
-                ws_tb.cell(row=total_row, column=6, value=f"=SUM({col_adj_c}3:{col_adj_c}{last_tb})").font = Font(bold=True)
-            
-            # Set column widths
-            ws_tb.column_dimensions[get_column_letter(1)].width = 10  # Code
-            ws_tb.column_dimensions[get_column_letter(2)].width = 25  # Account Name
-            ws_tb.column_dimensions[get_column_letter(3)].width = 18  # Unadjusted Debit
-            ws_tb.column_dimensions[get_column_letter(4)].width = 18  # Unadjusted Credit
-            ws_tb.column_dimensions[get_column_letter(5)].width = 18  # Adjusted Debit
-            ws_tb.column_dimensions[get_column_letter(6)].width = 18  # Adjusted Credit
+    def _statement_date_range(self) -> Tuple[Optional[str], Optional[str]]:
+        """The financial statements tab's From/To dates (None when blank), read on the Tk thread."""
+        dates = []
+        for attr in ("fs_date_from", "fs_date_to"):
+            try:
+                dates.append(getattr(self, attr).get().strip() or None)
+            except Exception:
+                dates.append(None)
+        return dates[0], dates[1]
 
-            # --- Post-Closing Trial Balance sheet ---
-            ws_pctb = wb.create_sheet(title="Post-Closing TB")
-            
-            # Title row
-            title_cell = ws_pctb.cell(row=1, column=1, value="POST-CLOSING TRIAL BALANCE")
-            title_cell.font = Font(bold=True, size=14)
-            ws_pctb.merge_cells(start_row=1, start_column=1, end_row=1, end_column=4)
-            
-            # Headers
-            pctb_headers = [
-                "Code", 
-                "Account Name", 
-                "Debit", 
-                "Credit"
-            ]
-            for cidx, h in enumerate(pctb_headers, start=1):
-                cell = ws_pctb.cell(row=2, column=cidx, value=h)
-                cell.font = Font(bold=True)
-            
-            # Get post-closing trial balance (exclude temporary accounts)
-            pctb_rows = db.compute_trial_balance(
-                period_id=self.engine.current_period_id,
-                include_temporary=False,
-                conn=self.engine.conn
+    def _write_all_workbook(
+        self,
+        path: str,
+        period_id: Optional[int],
+        dates: Tuple[Optional[str], Optional[str]] = (None, None),
+        ctx=None,
+    ) -> str:
+        """Build and save the Export All workbook. Touches no widgets, so it may run on a worker.
+
+        Sheets are built concurrently by ``export_all.ExportAllPipeline``, the
+        statement sheets from this engine's reports over ``dates``; with a
+        task context, per-sheet progress goes to ``ctx.progress`` and
+        cancelling the task abandons the export.
+        """
+        try:
+            return export_all.write_all_workbook(
+                path,
+                period_id=period_id,
+                engine=self.engine,
+                start_date=dates[0],
+                end_date=dates[1],
+                progress=(lambda stage, rows, finished: ctx.progress((stage, rows, finished))) if ctx else None,
+                check=ctx.check if ctx else None,
             )
-            
-            # Filter to only show accounts with non-zero balances
-            def _has_activity_pc(r: dict) -> bool:
-                d, c = self._balance_to_columns(r)
-                return bool((d or 0) != 0 or (c or 0) != 0)
-            
-            pctb_rows = [r for r in pctb_rows if _has_activity_pc(r)]
-            
-            # Write data rows
-            for ridx, r in enumerate(pctb_rows, start=3):
-                code = r["code"] if "code" in r.keys() else ""
-                name = r["name"] if "name" in r.keys() else ""
-                d, c = self._balance_to_columns(r)
-                
-                ws_pctb.cell(row=ridx, column=1, value=code)
-                ws_pctb.cell(row=ridx, column=2, value=name)
-                ws_pctb.cell(row=ridx, column=3, value=float(d or 0))
-                ws_pctb.cell(row=ridx, column=4, value=float(c or 0))
-            
-            # Add totals row
-            last_pctb = ws_pctb.max_row
-            if last_pctb >= 3:
-                total_row = last_pctb + 1
-                ws_pctb.cell(row=total_row, column=2, value="Totals:").font = Font(bold=True)
-                
-                col_d = get_column_letter(3)
-                col_c = get_column_letter(4)
-                ws_pctb.cell(row=total_row, column=3, value=f"=SUM({col_d}3:{col_d}{last_pctb})").font = Font(bold=True)
-                ws_pctb.cell(row=total_row, column=4, value=f"=SUM({col_c}3:{col_c}{last_pctb})").font = Font(bold=True)
-            
-            # Set column widths
-            ws_pctb.column_dimensions[get_column_letter(1)].width = 10  # Code
-            ws_pctb.column_dimensions[get_column_letter(2)].width = 25  # Account Name
-            ws_pctb.column_dimensions[get_column_letter(3)].width = 18  # Debit
-            ws_pctb.column_dimensions[get_column_letter(4)].width = 18  # Credit
-
-            # Helper function for adjusting entries (used by Worksheet)
-            def _tb_filtered_adjusting():
-                period_id = self.engine.current_period_id
-                # The balance expression uses 2 placeholders, and it's used 4 times in the SQL
-                # (twice in net_debit calculation, twice in net_credit calculation)
-                # So we need 8 placeholders total: 2 * 4 = 8
-                balance = """
-                    COALESCE(SUM(CASE 
-                        WHEN je.period_id = ? AND je.is_adjusting = 1 THEN jl.debit 
-                        ELSE 0 
-                    END), 0) - 
-                    COALESCE(SUM(CASE 
-                        WHEN je.period_id = ? AND je.is_adjusting = 1 THEN jl.credit 
-                        ELSE 0 
-                    END), 0)
-                """
-                sql = f"""
-                    SELECT a.code, a.name, a.type,
-                           ROUND(CASE WHEN ({balance}) > 0 THEN ({balance}) ELSE 0 END, 2) AS net_debit,
-                           ROUND(CASE WHEN ({balance}) < 0 THEN -(({balance})) ELSE 0 END, 2) AS net_credit
-                    FROM accounts a
-                    LEFT JOIN journal_lines jl ON jl.account_id = a.id
-                    LEFT JOIN journal_entries je ON je.id = jl.entry_id
-                    WHERE a.is_active = 1
-                    GROUP BY a.id, a.code, a.name, a.type
-                    ORDER BY a.code
-                """
-                # Supply 8 parameters: period_id for each of the 8 placeholders
-                cur = self.engine.conn.execute(sql, [period_id] * 8)
-                return list(cur.fetchall())
-
-            ws_w = wb.create_sheet(title="Worksheet")
-            ws_w.append([
-                "Account No.",
-                "Account Title",
-                "Unadjusted Trial Balance Dr",
-                "Unadjusted Trial Balance Cr",
-                "Adjustments Dr",
-                "Adjustments Cr",
-                "Adjusted Trial Balance Dr",
-                "Adjusted Trial Balance Cr",
-                "Statement of Financial Performance Dr",
-                "Statement of Financial Performance Cr",
-                "Statement of Financial Position Dr",
-                "Statement of Financial Position Cr",
-            ])
-            # Use the data we already fetched for Trial Balance sheet
-            # unadj_by_code and adj_by_code are already created above
-            # Use helper function for adjusting entries only
-            adjs = _tb_filtered_adjusting()
-            # adj_tb_rows is already fetched above as adj_tb_rows
-            # unadj_by_code and adj_by_code are already created above for Trial Balance sheet
-            adj_by_code_adjs = {r["code"]: r for r in adjs}
-            adjtb_by_code = adj_by_code  # Already created above
-            codes = sorted(set(list(unadj_by_code.keys()) + list(adj_by_code_adjs.keys()) + list(adjtb_by_code.keys())))
-            totals = {"un_dr":0.0,"un_cr":0.0,"aj_dr":0.0,"aj_cr":0.0,"ad_dr":0.0,"ad_cr":0.0,"is_dr":0.0,"is_cr":0.0,"sfp_dr":0.0,"sfp_cr":0.0}
-            for code in codes:
-                ru = unadj_by_code.get(code)
-                ra = adj_by_code_adjs.get(code)
-                rt = adjtb_by_code.get(code)
-                # Get name and type from first available row
-                row_for_name = rt or ru or ra
-                if row_for_name:
-                    name = row_for_name["name"] if "name" in row_for_name.keys() else ""
-                    typ = row_for_name["type"] if "type" in row_for_name.keys() else ""
-                else:
-                    name = ""
-                    typ = ""
-                un_dr = float(ru["net_debit"]) if ru else 0.0
-                un_cr = float(ru["net_credit"]) if ru else 0.0
-                aj_dr = float(ra["net_debit"]) if ra else 0.0
-                aj_cr = float(ra["net_credit"]) if ra else 0.0
-                ad_dr = float(rt["net_debit"]) if rt else 0.0
-                ad_cr = float(rt["net_credit"]) if rt else 0.0
-                is_dr = ad_dr if typ.lower() in ("revenue","expense") and ad_dr>0 else 0.0
-                is_cr = ad_cr if typ.lower() in ("revenue","expense") and ad_cr>0 else 0.0
-                sfp_dr = ad_dr if typ.lower() not in ("revenue","expense") and ad_dr>0 else 0.0
-                sfp_cr = ad_cr if typ.lower() not in ("revenue","expense") and ad_cr>0 else 0.0
-                ws_w.append([code, name, un_dr, un_cr, aj_dr, aj_cr, ad_dr, ad_cr, is_dr, is_cr, sfp_dr, sfp_cr])
-                totals["un_dr"] += un_dr; totals["un_cr"] += un_cr
-                totals["aj_dr"] += aj_dr; totals["aj_cr"] += aj_cr
-                totals["ad_dr"] += ad_dr; totals["ad_cr"] += ad_cr
-                totals["is_dr"] += is_dr; totals["is_cr"] += is_cr
-                totals["sfp_dr"] += sfp_dr; totals["sfp_cr"] += sfp_cr
-            ws_w.append(["TOTAL","", totals["un_dr"], totals["un_cr"], totals["aj_dr"], totals["aj_cr"], totals["ad_dr"], totals["ad_cr"], totals["is_dr"], totals["is_cr"], totals["sfp_dr"], totals["sfp_cr"]])
-            net_income = round(totals["is_cr"] - totals["is_dr"], 2)
-            if net_income != 0:
-                ws_w.append(["INCOME STATEMENT","", "", "", "", "", "", "", 0.0 if net_income>0 else abs(net_income), net_income if net_income>0 else 0.0, "", ""])
-                ws_w.append(["TOTAL","", totals["un_dr"], totals["un_cr"], totals["aj_dr"], totals["aj_cr"], totals["ad_dr"], totals["ad_cr"], totals["is_dr"] + (0.0 if net_income>0 else abs(net_income)), totals["is_cr"] + (net_income if net_income>0 else 0.0), totals["sfp_dr"], totals["sfp_cr"]])
-
-            # --- Financial statements sheets ---
-            # Income Statement
-            self.income_text.config(state=tk.NORMAL)
-            income_lines = self.income_text.get("1.0", tk.END).splitlines()
-            self.income_text.config(state=tk.DISABLED)
-            if any(line.strip() for line in income_lines):
-                ws_inc = wb.create_sheet(title="Income Statement")
-                for ridx, line in enumerate(income_lines, start=1):
-                    ws_inc.cell(row=ridx, column=1, value=line)
-                ws_inc.column_dimensions[get_column_letter(1)].width = 120
+        except Exception:
+            logger.exception("Export All failed")
+            raise
 
-            # Balance Sheet
-            self.balance_sheet_text.config(state=tk.NORMAL)
-            bs_lines = self.balance_sheet_text.get("1.0", tk.END).splitlines()
-            self.balance_sheet_text.config(state=tk.DISABLED)
-            if any(line.strip() for line in bs_lines):
-                ws_bs = wb.create_sheet(title="Balance Sheet")
-                for ridx, line in enumerate(bs_lines, start=1):
-                    ws_bs.cell(row=ridx, column=1, value=line)
-                ws_bs.column_dimensions[get_column_letter(1)].width = 120
+    def _export_all_progress(self, label: str) -> Callable[[tuple], None]:
+        """An ``on_progress`` callback that shows per-sheet Export All progress in the status bar."""
+        sheets: Dict[str, str] = {}
 
-            # Cash Flow
-            if hasattr(self, 'cash_flow_text'):
-                self.cash_flow_text.config(state=tk.NORMAL)
-                cf_lines = self.cash_flow_text.get("1.0", tk.END).splitlines()
-                self.cash_flow_text.config(state=tk.DISABLED)
-                if any(line.strip() for line in cf_lines):
-                    ws_cf = wb.create_sheet(title="Cash Flow")
-                    for ridx, line in enumerate(cf_lines, start=1):
-                        ws_cf.cell(row=ridx, column=1, value=line)
-                    ws_cf.column_dimensions[get_column_letter(1)].width = 120
+        def show(update: tuple) -> None:
+            stage, rows, finished = update
+            sheets[stage] = "done" if finished else f"{rows:,} rows"
+            done = sum(1 for state in sheets.values() if state == "done")
+            running = ", ".join(f"{name} {state}" for name, state in sheets.items() if state != "done")
+            self.set_status(f"{label}... {done} sheets done" + (f"; {running}" if running else ""))
 
-            # Save workbook
-            wb.save(path)
-            if notify:
-                messagebox.showinfo("Export Successful", f"All data exported to {path}")
+        return show
 
-        except Exception as e:
-            messagebox.showerror("Export Error", f"Failed to export all data: {str(e)}")
-            raise
-        
-        return path
+    def _cancel_export_all(self) -> None:
+        """Cancel a running Export All (to file or email); no partial file is kept."""
+        if not (self.tasks.pending("export_all") or self.tasks.pending("export_email")):
+            self.set_status("No export is running")
+            return
+        self.tasks.cancel("export_all")
+        self.tasks.cancel("export_email")
+        self.set_status("Export cancelled", "warning")
 
     def _export_all_to_email(self) -> None:
         """Export all reports to Excel and send as an email attachment."""
@@ -15268,74 +15176,84 @@ Help:
             smtp_user = config["smtp_user"]
             smtp_password = config["smtp_password"]
 
-        temp_path = None
-        try:
-            # Create a temporary Excel export without showing a save dialog
+        dates = self._statement_date_range()
+        period_id = self.engine.current_period_id
+
+        def send(ctx) -> None:
+            # Workbook, SMTP and clean-up all run on the worker thread.
             with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
                 temp_path = tmp.name
-            
-            exported_path = self._export_all_to_excel(path=temp_path, notify=False)
-            if not exported_path or not Path(exported_path).exists():
-                raise RuntimeError("Failed to generate export file.")
-
-            # Compose the email with attachment
-            msg = EmailMessage()
-            msg["Subject"] = f"TechFix Export - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            msg["From"] = smtp_user
-            msg["To"] = recipient
-
-            plain_body = (
-                "Hello,\n\n"
-                "Your TechFix full export is attached (journal, ledger, trial balance, financial statements).\n"
-                "If you have questions, reply to this email.\n\n"
-                "Thanks,\nTechFix"
-            )
-            html_body = f"""
-            <html>
-              <body style="font-family: 'Segoe UI', Arial, sans-serif; color: #1f2937; background: #f8fafc; padding: 16px;">
-                <div style="max-width: 520px; margin: 0 auto; background: #ffffff; border: 1px solid #e5e7eb; border-radius: 10px; padding: 18px;">
-                  <h2 style="margin: 0 0 12px 0; color: #2563eb;">TechFix Export</h2>
-                  <p style="margin: 0 0 12px 0;">Your full export is attached:</p>
-                  <ul style="margin: 0 0 12px 18px; padding: 0; color: #374151;">
-                    <li>Journal</li>
-                    <li>Ledger</li>
-                    <li>Trial Balance</li>
-                    <li>Financial Statements</li>
-                  </ul>
-                  <p style="margin: 0 0 12px 0; color: #4b5563;">Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
-                  <p style="margin: 0; color: #111827;">Thanks,<br/>TechFix</p>
-                </div>
-              </body>
-            </html>
-            """
-            msg.set_content(plain_body)
-            msg.add_alternative(html_body, subtype="html")
-
-            with open(exported_path, "rb") as f:
-                data = f.read()
-            filename = Path(exported_path).name
-            msg.add_attachment(
-                data,
-                maintype="application",
-                subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                filename=filename,
-            )
-
-            with smtplib.SMTP(smtp_server, int(smtp_port)) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-                server.send_message(msg)
+            try:
+                exported_path = self._write_all_workbook(temp_path, period_id, dates, ctx)
+                if not exported_path or not Path(exported_path).exists():
+                    raise RuntimeError("Failed to generate export file.")
+                ctx.check()
+
+                # Compose the email with attachment
+                msg = EmailMessage()
+                msg["Subject"] = f"TechFix Export - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+                msg["From"] = smtp_user
+                msg["To"] = recipient
+
+                plain_body = (
+                    "Hello,\n\n"
+                    "Your TechFix full export is attached (journal, ledger, trial balance, financial statements).\n"
+                    "If you have questions, reply to this email.\n\n"
+                    "Thanks,\nTechFix"
+                )
+                html_body = f"""
+                <html>
+                  <body style="font-family: 'Segoe UI', Arial, sans-serif; color: #1f2937; background: #f8fafc; padding: 16px;">
+                    <div style="max-width: 520px; margin: 0 auto; background: #ffffff; border: 1px solid #e5e7eb; border-radius: 10px; padding: 18px;">
+                      <h2 style="margin: 0 0 12px 0; color: #2563eb;">TechFix Export</h2>
+                      <p style="margin: 0 0 12px 0;">Your full export is attached:</p>
+                      <ul style="margin: 0 0 12px 18px; padding: 0; color: #374151;">
+                        <li>Journal</li>
+                        <li>Ledger</li>
+                        <li>Trial Balance</li>
+                        <li>Financial Statements</li>
+                      </ul>
+                      <p style="margin: 0 0 12px 0; color: #4b5563;">Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+                      <p style="margin: 0; color: #111827;">Thanks,<br/>TechFix</p>
+                    </div>
+                  </body>
+                </html>
+                """
+                msg.set_content(plain_body)
+                msg.add_alternative(html_body, subtype="html")
+
+                with open(exported_path, "rb") as f:
+                    data = f.read()
+                filename = Path(exported_path).name
+                msg.add_attachment(
+                    data,
+                    maintype="application",
+                    subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    filename=filename,
+                )
 
-            messagebox.showinfo("Email Sent", f"Export emailed to {recipient}.")
-        except Exception as e:
-            messagebox.showerror("Email Error", f"Failed to email export: {e}")
-        finally:
-            if temp_path:
+                with smtplib.SMTP(smtp_server, int(smtp_port)) as server:
+                    server.starttls()
+                    server.login(smtp_user, smtp_password)
+                    server.send_message(msg)
+            finally:
                 try:
                     Path(temp_path).unlink(missing_ok=True)
                 except Exception:
                     pass
 
+        def done(_result) -> None:
+            self.set_status("")
+            messagebox.showinfo("Email Sent", f"Export emailed to {recipient}.")
+
+        def failed(e: BaseException) -> None:
+            self.set_status("")
+            messagebox.showerror("Email Error", f"Failed to email export: {e}")
+
+        self.set_status("Emailing export...")
+        self.tasks.submit("export_email", send, done, failed,
+                          on_progress=self._export_all_progress("Building export"))
+
     def _prompt_email_settings(self, defaults: dict) -> Optional[dict]:
         """Display a styled, single-form dialog to collect email settings."""
         dialog = tk.Toplevel(self)
@@ -15671,7 +15589,7 @@ Help:
                         inc_temp_bs = False
                 except Exception:
                     pass
-                tb_rows = db.compute_trial_balance(include_temporary=inc_temp_bs, period_id=self.engine.current_period_id, conn=self.engine.conn)
+                tb_rows = report_cache.trial_balance(include_temporary=inc_temp_bs, period_id=self.engine.current_period_id, conn=self.engine.conn)
                 total_d = 0.0
                 total_c = 0.0
                 for r in tb_rows:
@@ -15711,6 +15629,8 @@ Help:
 
     # --------------------- Shared helpers ---------------------
     def _load_all_views(self) -> None:
+        # Trees and statements load on the task executor; repeated calls
+        # replace the loads still in flight rather than queueing behind them.
         self._load_cycle_status()
         if hasattr(self, 'journal_tree'):
             self._load_journal_entries()
@@ -15733,6 +15653,32 @@ Help:
             pass
 
     def _refresh_after_post(self) -> None:
+        """Refresh the views once the current event is handled.
+
+        Posting returns straight away; several posts in one event share a
+        single refresh. Changes the engine reported as posting events are
+        applied as deltas; without any, every view is reloaded.
+        """
+        if getattr(self, '_refresh_pending', False):
+            return
+        self._refresh_pending = True
+        self.after_idle(self._run_refresh_after_post)
+
+    def _on_posting_event(self, event: PostingEvent) -> None:
+        """Engine listener: queue the event for the next view refresh."""
+        self._note_activity()
+        self._posting_events.append(event)
+        self._refresh_after_post()
+
+    def _run_refresh_after_post(self) -> None:
+        self._refresh_pending = False
+        events, self._posting_events = self._posting_events, []
+        if events:
+            self._apply_posting_events(events)
+        else:
+            self._reload_views_after_post()
+
+    def _reload_views_after_post(self) -> None:
         self._load_journal_entries()
         self._load_ledger_entries()
         self._load_trial_balances()
@@ -15755,14 +15701,169 @@ Help:
         except Exception:
             pass
 
+    def _apply_posting_events(self, events: List[PostingEvent]) -> None:
+        """Update each view from the posted/deleted/re-statused entries.
+
+        A view falls back to reloading itself only when the change cannot be
+        applied in place (for instance a line lands inside the journal page
+        shown, or the view is still loading). None of this reads the period.
+        """
+        posted = [e for e in events if e.weight("posted")]
+        accounts = self._account_rows({a for e in events for a in e.account_ids})
+        steps = [
+            ("journal", lambda: self._apply_journal_events(events)),
+            ("ledger", lambda: self._apply_ledger_events(posted)),
+            ("trial balance", lambda: self._apply_trial_balance_events(posted)),
+            ("financial statements", lambda: self._apply_financials_events(posted)),
+            ("cycle status", self._load_cycle_status),
+            ("recent transactions", self._load_recent_transactions),
+        ]
+        if any(e.is_adjusting for e in events):
+            steps.append(("adjustments", self._load_adjustments))
+        if any(not accounts.get(a, {}).get("is_permanent", 1) for e in events for a in e.account_ids):
+            steps.append(("closing preview", self._load_closing_preview))
+        if any(e.reverse_on or e.is_reversing or e.kind == "deleted" for e in events):
+            steps.append(("reversing queue", self._load_reversing_queue))
+        for name, step in steps:
+            try:
+                step()
+            except Exception:
+                logger.exception("Error updating %s after posting", name)
+
+    def _account_rows(self, account_ids) -> Dict[int, dict]:
+        """Code, name, type and permanence of the given accounts, by id."""
+        ids = [int(a) for a in account_ids]
+        if not ids:
+            return {}
+        rows = self.engine.conn.execute(
+            f"SELECT id, code, name, type, is_permanent FROM accounts WHERE id IN ({','.join('?' * len(ids))})",
+            ids,
+        ).fetchall()
+        return {int(r["id"]): dict(r) for r in rows}
+
+    def _apply_journal_events(self, events: List[PostingEvent]) -> None:
+        """Append new lines that sort after the journal page shown; reload it if one lands inside."""
+        if not hasattr(self, 'journal_tree'):
+            return
+        shown = getattr(self, '_journal_shown', None)
+        key = getattr(self, '_journal_filter_key', None)
+        if shown is None or key is None or self.tasks.pending("journal"):
+            self._load_journal_entries()
+            return
+        period_id, sel, account_id, date_from, date_to = key
+        if sel and sel.lower() != 'all' and account_id is None:
+            return  # Unknown account filter: the page stays empty.
+        start = self._journal_cursors[self._journal_page]
+        page_size = getattr(self, "_journal_page_size", 500)
+        has_more = getattr(self, "_journal_has_more", False)
+        appended: list = []
+        for event in events:
+            if event.kind == "status_changed":
+                continue  # The journal lists drafts and posted entries alike.
+            lines = [ln for ln in event.lines if account_id is None or ln[0] == account_id]
+            if not lines or (period_id is not None and event.period_id != period_id):
+                continue
+            if (date_from and event.date < date_from) or (date_to and event.date > date_to):
+                continue
+            position = (event.date, event.entry_id)
+            if start is not None and position < (start[0], start[1]):
+                continue  # Before this page.
+            if shown["last"] is None or position > shown["last"]:
+                if has_more:
+                    continue  # Belongs to a later page.
+                if event.kind == "posted" and shown["lines"] + sum(len(l) for _, l in appended) + len(lines) <= page_size:
+                    appended.append((event, lines))
+                    continue
+            self._load_journal_entries()
+            return
+        if not appended:
+            return
+        names = self._account_rows({ln[0] for _, lines in appended for ln in lines})
+        rows = [
+            {
+                "entry_id": event.entry_id,
+                "date": event.date,
+                "description": event.description,
+                "document_ref": event.document_ref,
+                "external_ref": event.external_ref,
+                "name": names.get(acc, {}).get("name", ""),
+                "debit": debit,
+                "credit": credit,
+            }
+            for event, lines in sorted(appended, key=lambda item: (item[0].date, item[0].entry_id))
+            for acc, debit, credit in lines
+        ]
+        self._append_journal_rows(rows)
+
+    def _apply_ledger_events(self, events: List[PostingEvent]) -> None:
+        """The ledger reads one window at a time, so a matching change just re-reads the visible rows."""
+        if not hasattr(self, 'ledger_view'):
+            return
+        period_id, _sel, account_id = getattr(self, '_ledger_filter_key', (None, '', None))
+        for event in events:
+            if period_id is not None and event.period_id != period_id:
+                continue
+            if account_id is None or account_id in event.account_ids:
+                self._load_ledger_entries()
+                return
+
+    def _apply_trial_balance_events(self, events: List[PostingEvent]) -> None:
+        """Adjust the affected accounts' rows in the trial balance and post-closing TB."""
+        if not events:
+            return
+        views = (
+            ("trial_balance", "trial_tree", "_tb_state", True, self._load_trial_balances,
+             lambda rows, state: self._show_trial_balance(
+                 rows, True if any(e.is_adjusting and e.weight() > 0 for e in events) else state["has_adjusting"],
+                 key=state["key"])),
+            ("postclosing_tb", "pctb_tree", "_pctb_state", False, self._load_postclosing_tb,
+             lambda rows, state: self._show_postclosing_tb(rows, key=state["key"])),
+        )
+        for task_key, tree_attr, state_attr, include_temporary, reload, show in views:
+            if not hasattr(self, tree_attr):
+                continue
+            state = getattr(self, state_attr, None)
+            if not state or state["key"] is None or self.tasks.pending(task_key):
+                reload()
+                continue
+            period_id, as_of = state["key"]
+            rows = self.engine.apply_events_to_trial_balance(
+                state["rows"],
+                events,
+                period_id=period_id,
+                up_to_date=as_of,
+                include_temporary=include_temporary,
+            )
+            show(rows, state)
+
+    def _apply_financials_events(self, events: List[PostingEvent]) -> None:
+        """Rebuild the statements in the background when a change falls in their date range."""
+        if not events or not hasattr(self, 'income_text'):
+            return
+        try:
+            date_to = self.fs_date_to.get().strip() or None
+        except Exception:
+            date_to = None
+        if any(not date_to or event.date <= date_to for event in events):
+            self._load_financials(mark_status=False)
+
     def _load_postclosing_tb(self) -> None:
         if not hasattr(self, 'pctb_tree'):
             return
+        as_of = (self.pctb_date.get().strip() if hasattr(self, 'pctb_date') else '') or None
+        period_id = self.engine.current_period_id
+        self.tasks.submit(
+            "postclosing_tb",
+            lambda ctx: report_cache.trial_balance(up_to_date=as_of, include_temporary=False, period_id=period_id, conn=ctx.conn),
+            lambda rows: self._show_postclosing_tb(rows, key=(period_id, as_of)),
+            lambda e: messagebox.showerror("Error", f"Failed to load post-closing TB: {e}"),
+        )
+
+    def _show_postclosing_tb(self, rows: list, key: Optional[tuple] = None) -> None:
+        self._pctb_state = {"key": key, "rows": [dict(r) for r in rows]}
         for item in self.pctb_tree.get_children():
             self.pctb_tree.delete(item)
         try:
-            as_of = (self.pctb_date.get().strip() if hasattr(self, 'pctb_date') else '') or None
-            rows = db.compute_trial_balance(up_to_date=as_of, include_temporary=False, period_id=self.engine.current_period_id, conn=self.engine.conn)
             # Only show accounts with non-zero balances in post-closing snapshot
             def _has_activity_pc(r: dict) -> bool:
                 d, c = self._balance_to_columns(r)
@@ -15798,7 +15899,7 @@ Help:
     def _complete_postclosing_tb_action(self) -> None:
         try:
             as_of = (self.pctb_date.get().strip() if hasattr(self, 'pctb_date') else '') or None
-            rows = db.compute_trial_balance(up_to_date=as_of, include_temporary=False, period_id=self.engine.current_period_id, conn=self.engine.conn)
+            rows = report_cache.trial_balance(up_to_date=as_of, include_temporary=False, period_id=self.engine.current_period_id, conn=self.engine.conn)
             self._load_postclosing_tb()
             self.engine.capture_trial_balance_snapshot("post_closing", as_of or "latest", rows)
             self.engine.set_cycle_step_status(9, "completed", f"Post-closing TB prepared as of {as_of or 'latest'}")
@@ -4,10 +4,12 @@ Handles importing data from Excel, CSV, and other formats.
 """
 from __future__ import annotations
 
+import csv
 import sqlite3
+from itertools import islice
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 import logging
 
 try:
@@ -15,197 +17,325 @@ try:
     PANDAS_AVAILABLE = True
 except ImportError:
     PANDAS_AVAILABLE = False
-    logging.warning("pandas not available, CSV import disabled")
 
 from . import db
 from . import validation
 from .accounting import AccountingEngine, JournalLine
+from .tasks import TaskCancelled
 
 logger = logging.getLogger(__name__)
 
+# Expected columns: Date, Description, DebitAccount, DebitAmount, CreditAccount, CreditAmount
+REQUIRED_COLUMNS = ['Date', 'Description', 'DebitAccount', 'DebitAmount', 'CreditAccount', 'CreditAmount']
 
-def import_transactions_from_excel(
+#: Rows read, validated and posted (in one transaction) at a time.
+CHUNK_ROWS = 5000
+#: Error messages returned to the caller; every rejected row is in the reject file.
+MAX_ERROR_MESSAGES = 100
+
+#: ``progress(rows_read, rows_imported)`` after every chunk.
+ImportProgress = Callable[[int, int], None]
+
+ImportResult = Tuple[int, int, List[str]]
+
+
+def default_reject_path(file_path: Path) -> Path:
+    """Where rejected rows of ``file_path`` go unless told otherwise: ``<name>.rejects.csv`` beside it."""
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.stem}.rejects.csv")
+
+
+def _iter_csv_rows(file_path: Path) -> Iterator[Sequence[Any]]:
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+
+def _iter_xlsx_rows(file_path: Path) -> Iterator[Sequence[Any]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise RuntimeError("openpyxl is required for Excel import. Install with: pip install openpyxl") from e
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _iter_xls_rows(file_path: Path) -> Iterator[Sequence[Any]]:
+    # Legacy .xls has no streaming reader; pandas (with xlrd) loads it whole.
+    if not PANDAS_AVAILABLE:
+        raise RuntimeError("pandas is required for .xls files. Install with: pip install pandas xlrd, or save as .xlsx")
+    df = pd.read_excel(file_path, dtype=object)
+    yield list(df.columns)
+    for row in df.itertuples(index=False, name=None):
+        yield [None if (isinstance(v, float) and v != v) else v for v in row]
+
+
+def iter_rows(file_path: Path) -> Iterator[Sequence[Any]]:
+    """Rows of a CSV, XLSX or XLS file as they are read, header row first."""
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".csv":
+        return _iter_csv_rows(file_path)
+    if suffix in (".xlsx", ".xlsm"):
+        return _iter_xlsx_rows(file_path)
+    if suffix == ".xls":
+        return _iter_xls_rows(file_path)
+    raise ValueError(f"Unsupported file format: {suffix}")
+
+
+def _account_map(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Active accounts by name and by code, built once per import; codes win over names."""
+    rows = conn.execute("SELECT id, code, name FROM accounts WHERE is_active = 1").fetchall()
+    accounts = {str(name).strip(): int(account_id) for account_id, _, name in rows if name is not None}
+    accounts.update({str(code).strip(): int(account_id) for account_id, code, _ in rows if code is not None})
+    return accounts
+
+
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # an account code read as a number
+    return str(value).strip()
+
+
+class _Columns:
+    """
+    Column-at-a-time parsing of one chunk. Dates, amounts and accounts repeat
+    heavily in transaction files, so each distinct value is parsed once per
+    import and looked up afterwards.
+    """
+
+    def __init__(self, accounts: Dict[str, int]) -> None:
+        self.accounts = accounts
+        self._dates: Dict[Any, Optional[str]] = {}
+        self._amounts: Dict[Any, Optional[float]] = {}
+
+    def date(self, value: Any) -> Optional[str]:
+        try:
+            return self._dates[value]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable
+            return None
+        if isinstance(value, (datetime, date)) or (PANDAS_AVAILABLE and isinstance(value, pd.Timestamp)):
+            parsed: Optional[str] = value.strftime("%Y-%m-%d")
+        else:
+            valid, when = validation.validate_date(_cell_text(value))
+            parsed = when.strftime("%Y-%m-%d") if valid else None
+        self._dates[value] = parsed
+        return parsed
+
+    def amount(self, value: Any) -> Optional[float]:
+        if value is None or value == "":
+            return 0.0
+        try:
+            return self._amounts[value]
+        except KeyError:
+            pass
+        valid, amount = validation.validate_amount(str(value))
+        self._amounts[value] = amount if valid else None
+        return self._amounts[value]
+
+    def parse(self, rows: List[Sequence[Any]], idx: Sequence[int]) -> List[List[Any]]:
+        """Parsed columns of ``rows``: date, description, debit id, debit, credit id, credit."""
+        cols = [[row[i] if i < len(row) else None for row in rows] for i in idx]
+        date_col, desc_col, dacct_col, damt_col, cacct_col, camt_col = cols
+        return [
+            [self.date(v) if v not in (None, "") else "" for v in date_col],
+            [validation.sanitize_string(_cell_text(v), max_length=500) for v in desc_col],
+            [self.accounts.get(_cell_text(v)) for v in dacct_col],
+            [self.amount(v) for v in damt_col],
+            [self.accounts.get(_cell_text(v)) for v in cacct_col],
+            [self.amount(v) for v in camt_col],
+        ]
+
+
+def _row_error(row: Sequence[Any], idx: Sequence[int], parsed: Sequence[Any]) -> Optional[str]:
+    entry_date, description, debit_id, debit_amt, credit_id, credit_amt = parsed
+    if entry_date == "":
+        return "Missing date"
+    if entry_date is None:
+        return f"Invalid date format: {_cell_text(row[idx[0]])}"
+    if not description:
+        return "Missing description"
+    if debit_amt is None or credit_amt is None:
+        return "Invalid amounts"
+    if debit_amt == 0 and credit_amt == 0:
+        return "Both amounts cannot be zero"
+    if not debit_id:
+        return f"Debit account not found: {_cell_text(row[idx[2]] if idx[2] < len(row) else '')}"
+    if not credit_id:
+        return f"Credit account not found: {_cell_text(row[idx[4]] if idx[4] < len(row) else '')}"
+    lines = []
+    if debit_amt > 0:
+        lines.append(JournalLine(account_id=debit_id, debit=debit_amt, credit=0.0))
+    if credit_amt > 0:
+        lines.append(JournalLine(account_id=credit_id, debit=0.0, credit=credit_amt))
+    valid, error_msg = validation.validate_journal_entry_lines(lines)
+    return None if valid else error_msg
+
+
+class _Rejects:
+    """Rejected rows with their row number and reason, written as they come."""
+
+    def __init__(self, path: Optional[Path], header: Sequence[Any]) -> None:
+        self.path = path
+        self.header = ["Row", "Error", *[_cell_text(h) for h in header]]
+        self.count = 0
+        self.messages: List[str] = []
+        self._file = None
+        self._writer = None
+
+    def add(self, row_number: int, message: str, row: Sequence[Any]) -> None:
+        self.count += 1
+        if len(self.messages) < MAX_ERROR_MESSAGES:
+            self.messages.append(f"Row {row_number}: {message}")
+        if self.path is None:
+            return
+        if self._writer is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.header)
+        self._writer.writerow([row_number, message, *row])
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self.count > len(self.messages):
+            more = f"... and {self.count - len(self.messages)} more"
+            self.messages.append(f"{more}, see {self.path.name}" if self.path else more)
+
+
+def import_transactions(
     file_path: Path,
     *,
     period_id: Optional[int] = None,
     default_status: str = "draft",
+    chunk_rows: int = CHUNK_ROWS,
+    reject_path: Optional[Path] = None,
+    progress: Optional[ImportProgress] = None,
+    check: Optional[Callable[[], None]] = None,
     conn: Optional[sqlite3.Connection] = None
-) -> Tuple[int, int, List[str]]:
-    """Import transactions from Excel file.
-    
+) -> ImportResult:
+    """
+    Import one entry per row from a CSV, XLSX or XLS file, streaming.
+
+    Rows are read ``chunk_rows`` at a time (CSV through the csv module,
+    XLSX in openpyxl read-only mode; pandas is only needed for .xls). Each
+    chunk is validated column by column against an account code/name map
+    built once. Its valid rows are then posted in one transaction through
+    ``AccountingEngine.record_entries_bulk``, so memory stays flat however
+    long the file is. Rejected rows go to ``reject_path`` (by default
+    ``default_reject_path(file_path)``, created only if a row is rejected)
+    with their row number and reason. ``check`` runs between chunks; a
+    ``TaskCancelled`` it raises propagates and chunks already posted stay.
+
     Returns: (success_count, error_count, error_messages)
     """
-    if not PANDAS_AVAILABLE:
-        return (0, 0, ["pandas library not available"])
-    
-    errors = []
-    success_count = 0
-    error_count = 0
-    
+    file_path = Path(file_path)
+    owned = conn is not None
+    if not conn:
+        conn = db.get_connection()
+    rejects: Optional[_Rejects] = None
     try:
-        # Read Excel file
-        df = pd.read_excel(file_path)
-        
-        # Expected columns: Date, Description, DebitAccount, DebitAmount, CreditAccount, CreditAmount
-        required_columns = ['Date', 'Description', 'DebitAccount', 'DebitAmount', 'CreditAccount', 'CreditAmount']
-        
-        # Check columns
-        missing_cols = [col for col in required_columns if col not in df.columns]
+        rows = iter(iter_rows(file_path))
+        header = [_cell_text(h) for h in next(rows, [])]
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in header]
         if missing_cols:
             return (0, 0, [f"Missing required columns: {', '.join(missing_cols)}"])
-        
+        idx = [header.index(col) for col in REQUIRED_COLUMNS]
+
         engine = AccountingEngine(conn=conn)
-        
-        for idx, row in df.iterrows():
-            try:
-                # Validate and parse data
-                date_str = str(row['Date']).strip()
-                if pd.isna(row['Date']):
-                    errors.append(f"Row {idx+2}: Missing date")
-                    error_count += 1
-                    continue
-                
-                # Convert date if needed
-                if isinstance(row['Date'], pd.Timestamp):
-                    date_str = row['Date'].strftime('%Y-%m-%d')
-                elif isinstance(row['Date'], datetime):
-                    date_str = row['Date'].strftime('%Y-%m-%d')
-                
-                valid_date, date_obj = validation.validate_date(date_str)
-                if not valid_date:
-                    errors.append(f"Row {idx+2}: Invalid date format: {date_str}")
-                    error_count += 1
-                    continue
-                
-                description = validation.sanitize_string(str(row['Description']), max_length=500)
-                if not description:
-                    errors.append(f"Row {idx+2}: Missing description")
-                    error_count += 1
-                    continue
-                
-                # Parse amounts
-                valid_debit, debit_amt = validation.validate_amount(str(row['DebitAmount']))
-                valid_credit, credit_amt = validation.validate_amount(str(row['CreditAmount']))
-                
-                if not valid_debit or not valid_credit:
-                    errors.append(f"Row {idx+2}: Invalid amounts")
-                    error_count += 1
-                    continue
-                
-                if debit_amt == 0 and credit_amt == 0:
-                    errors.append(f"Row {idx+2}: Both amounts cannot be zero")
-                    error_count += 1
-                    continue
-                
-                # Get account IDs
-                debit_acct = str(row['DebitAccount']).strip()
-                credit_acct = str(row['CreditAccount']).strip()
-                
-                # Resolve account IDs (simplified - would need proper account lookup)
-                debit_id = _resolve_account_id(debit_acct, conn=conn)
-                credit_id = _resolve_account_id(credit_acct, conn=conn)
-                
-                if not debit_id:
-                    errors.append(f"Row {idx+2}: Debit account not found: {debit_acct}")
-                    error_count += 1
-                    continue
-                
-                if not credit_id:
-                    errors.append(f"Row {idx+2}: Credit account not found: {credit_acct}")
-                    error_count += 1
+        columns = _Columns(_account_map(conn))
+        rejects = _Rejects(reject_path or default_reject_path(file_path), header)
+        success_count = 0
+        read = 0
+        row_number = 1  # the header is row 1
+        while True:
+            if check is not None:
+                check()
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                break
+            numbers = list(range(row_number + 1, row_number + 1 + len(chunk)))
+            row_number += len(chunk)
+            read += len(chunk)
+            kept = [(n, row) for n, row in zip(numbers, chunk) if any(v not in (None, "") for v in row)]
+            if not kept:
+                continue
+            numbers, chunk = [n for n, _ in kept], [row for _, row in kept]
+
+            parsed = list(zip(*columns.parse(chunk, idx)))
+            entries: List[Dict[str, Any]] = []
+            sources: List[int] = []
+            for i, values in enumerate(parsed):
+                error = _row_error(chunk[i], idx, values)
+                if error:
+                    rejects.add(numbers[i], error, chunk[i])
                     continue
-                
-                # Create journal lines
+                entry_date, description, debit_id, debit_amt, credit_id, credit_amt = values
                 lines = []
                 if debit_amt > 0:
-                    lines.append(JournalLine(account_id=debit_id, debit=debit_amt, credit=0.0))
+                    lines.append((debit_id, debit_amt, 0.0))
                 if credit_amt > 0:
-                    lines.append(JournalLine(account_id=credit_id, debit=0.0, credit=credit_amt))
-                
-                # Validate lines
-                valid, error_msg = validation.validate_journal_entry_lines(lines)
-                if not valid:
-                    errors.append(f"Row {idx+2}: {error_msg}")
-                    error_count += 1
-                    continue
-                
-                # Record entry
-                engine.record_entry(
-                    date=date_str,
-                    description=description,
-                    lines=lines,
-                    status=default_status,
-                    period_id=period_id
-                )
-                
-                success_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {idx+2}: {str(e)}")
-                error_count += 1
-                logger.error(f"Error importing row {idx+2}: {e}", exc_info=True)
-        
-        return (success_count, error_count, errors)
-    
+                    lines.append((credit_id, 0.0, credit_amt))
+                entries.append({
+                    "date": entry_date,
+                    "description": description,
+                    "lines": lines,
+                    "status": default_status,
+                    "period_id": period_id,
+                })
+                sources.append(i)
+
+            if entries:
+                ids, errors = engine.record_entries_bulk(entries, all_or_nothing=False)
+                for pos, message in errors:
+                    rejects.add(numbers[sources[pos]], message, chunk[sources[pos]])
+                success_count += sum(1 for entry_id in ids if entry_id is not None)
+            if progress is not None:
+                progress(read, success_count)
+
+        return (success_count, rejects.count, rejects.messages)
+    except TaskCancelled:
+        raise
     except Exception as e:
-        logger.error(f"Excel import error: {e}", exc_info=True)
+        logger.error(f"Import error: {e}", exc_info=True)
         return (0, 0, [f"Import error: {str(e)}"])
+    finally:
+        if rejects is not None:
+            rejects.close()
+        if not owned:
+            conn.close()
 
 
-def import_transactions_from_csv(
+def import_transactions_from_excel(
     file_path: Path,
     *,
     period_id: Optional[int] = None,
     default_status: str = "draft",
-    conn: Optional[sqlite3.Connection] = None
-) -> Tuple[int, int, List[str]]:
-    """Import transactions from CSV file.
-    
+    conn: Optional[sqlite3.Connection] = None,
+    **options: Any
+) -> ImportResult:
+    """Import transactions from Excel file (see ``import_transactions``).
+
     Returns: (success_count, error_count, error_messages)
     """
-    if not PANDAS_AVAILABLE:
-        return (0, 0, ["pandas library not available"])
-    
-    try:
-        # Read CSV
-        df = pd.read_csv(file_path)
-        
-        # Use same logic as Excel import
-        return import_transactions_from_excel(
-            file_path,
-            period_id=period_id,
-            default_status=default_status,
-            conn=conn
-        )
-    except Exception as e:
-        logger.error(f"CSV import error: {e}", exc_info=True)
-        return (0, 0, [f"Import error: {str(e)}"])
+    return import_transactions(file_path, period_id=period_id, default_status=default_status, conn=conn, **options)
 
 
-def _resolve_account_id(account_identifier: str, *, conn: Optional[sqlite3.Connection] = None) -> Optional[int]:
-    """Resolve account identifier (code or name) to account ID."""
-    owned = conn is not None
-    if not conn:
-        conn = db.get_connection()
-    
-    try:
-        # Try by code first
-        cur = conn.execute("SELECT id FROM accounts WHERE code = ? AND is_active = 1", (account_identifier,))
-        row = cur.fetchone()
-        if row:
-            return int(row['id'])
-        
-        # Try by name
-        cur = conn.execute("SELECT id FROM accounts WHERE name = ? AND is_active = 1", (account_identifier,))
-        row = cur.fetchone()
-        if row:
-            return int(row['id'])
-        
-        return None
-    except Exception as e:
-        logger.error(f"Error resolving account: {e}", exc_info=True)
-        return None
-    finally:
-        if not owned:
-            conn.close()
+def import_transactions_from_csv(
+    file_path: Path,
+    *,
+    period_id: Optional[int] = None,
+    default_status: str = "draft",
+    conn: Optional[sqlite3.Connection] = None,
+    **options: Any
+) -> ImportResult:
+    """Import transactions from CSV file (see ``import_transactions``).
 
+    Returns: (success_count, error_count, error_messages)
+    """
+    return import_transactions(file_path, period_id=period_id, default_status=default_status, conn=conn, **options)
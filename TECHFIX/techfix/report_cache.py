@@ -0,0 +1,181 @@
+"""
+Report Cache Module
+Caches financial reports by parameters and ledger version.
+"""
+from __future__ import annotations
+
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import db
+
+DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+
+
+def approximate_size(value: Any) -> int:
+    """Rough memory footprint of a report: containers, rows and their values."""
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, sqlite3.Row):
+            stack.extend(tuple(obj))
+    return total
+
+
+class ReportCache:
+    """
+    LRU cache of report results within a memory budget.
+
+    Each entry is stored under its report kind and parameters together with
+    the ledger version it was computed at; a lookup whose version no longer
+    matches drops the entry. Reports scoped to a period are checked against
+    that period's version only, so posting to one period leaves the cached
+    reports of the others alone. A connection with uncommitted writes is
+    never served or cached (a rollback would reuse its version numbers).
+    Cached results are shared: treat them as read-only.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES) -> None:
+        self.budget_bytes = budget_bytes
+        self._entries: "OrderedDict[tuple, Tuple[tuple, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get_or_compute(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+        *,
+        period_id: Optional[int] = None,
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> Any:
+        """Cached result of ``compute()`` for ``kind`` and ``params``, computing it on a miss."""
+        owned = conn is not None
+        if not conn:
+            conn = db.get_connection()
+        try:
+            if conn.in_transaction:
+                return compute()
+            try:
+                version = db.get_ledger_version(conn, period_id=period_id or None)
+            except sqlite3.OperationalError:
+                return compute()  # database predates the ledger version tables
+            key = (str(db.DB_PATH), kind, period_id or None) + tuple(sorted(params.items()))
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[0] == version:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return entry[1]
+                    self._drop(key)
+                    self.invalidations += 1
+                self.misses += 1
+            value = compute()
+            self._store(key, version, value)
+            return value
+        finally:
+            if not owned:
+                conn.close()
+
+    def _store(self, key: tuple, version: tuple, value: Any) -> None:
+        size = approximate_size(value)
+        if size > self.budget_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (version, value, size)
+            self._bytes += size
+            while self._bytes > self.budget_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: tuple) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+_CACHE = ReportCache()
+
+
+def get_report_cache() -> ReportCache:
+    """The cache shared by the engine and the GUI."""
+    return _CACHE
+
+
+def report_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counts and memory use of the shared report cache."""
+    return _CACHE.stats()
+
+
+def trial_balance(
+    *,
+    from_date: Optional[str] = None,
+    up_to_date: Optional[str] = None,
+    include_temporary: bool = True,
+    period_id: Optional[int] = None,
+    exclude_closing: bool = False,
+    exclude_adjusting: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+) -> list:
+    """``db.compute_trial_balance`` through the shared cache (returns a new list)."""
+    owned = conn is not None
+    if not conn:
+        conn = db.get_connection()
+    options = dict(
+        from_date=from_date,
+        up_to_date=up_to_date,
+        include_temporary=include_temporary,
+        period_id=period_id,
+        exclude_closing=exclude_closing,
+        exclude_adjusting=exclude_adjusting,
+    )
+    try:
+        rows = _CACHE.get_or_compute(
+            "trial_balance",
+            options,
+            lambda: db.compute_trial_balance(conn=conn, **options),
+            period_id=period_id,
+            conn=conn,
+        )
+        return list(rows)
+    finally:
+        if not owned:
+            conn.close()
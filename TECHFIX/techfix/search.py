@@ -4,15 +4,108 @@ Provides search and filtering functionality across the application.
 """
 from __future__ import annotations
 
+import re
 import sqlite3
-from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Callable, Iterable, Tuple
 import logging
 
 from . import db
 
 logger = logging.getLogger(__name__)
 
+# Words as the index tokenizer (unicode61) sees them: letters and digits.
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Which column matched decides the order of search-as-you-type hits (title,
+# then reference/contact text, then line accounts); ties go to the newest row.
+_MATCH_COLUMNS = ("title", "detail", "accounts")
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text typed by a user: every word becomes a
+    quoted prefix term, so punctuation can never break the query syntax and a
+    partly typed word still matches. Returns None when there is no word to match.
+    """
+    words = _WORD_RE.findall(text or "")
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def search_index(
+    query: str,
+    *,
+    kinds: Optional[Iterable[str]] = None,
+    limit: int = 50,
+    full_rank: bool = False,
+    marks: Tuple[str, str] = ("[", "]"),
+    conn: Optional[sqlite3.Connection] = None
+) -> List[Dict[str, Any]]:
+    """
+    Ranked full-text hits from entries, accounts, customers and vendors.
+
+    By default only the newest ``limit * 4`` matches per kind are read, so the
+    cost does not grow with the number of matches; they are ordered by the
+    column that matched (title first), newest first. ``full_rank`` ranks every
+    match with bm25 instead. Each hit has ``kind``, ``id``, ``title`` (matches
+    wrapped in ``marks``), ``match`` (a highlighted snippet of the reference,
+    contact or account text that matched, if any), ``text`` (the indexed
+    title, detail and accounts text) and ``rank`` (lower is better). Returns [] when the query has no words or there is no index.
+    """
+    expr = fts_query(query)
+    if expr is None:
+        return []
+    owned = conn is not None
+    if not conn:
+        conn = db.get_connection()
+    try:
+        if not db.has_search_index(conn):
+            return []
+        start, end = marks
+        kinds = [k for k in db.SEARCH_KINDS if k in set(kinds or db.SEARCH_KINDS)]
+        # Reading ``rank`` computes bm25, which visits every match.
+        rank, order = ("rank", "rank") if full_rank else ("NULL", "rowid DESC")
+        window = limit if full_rank else limit * 4
+        # Each kind owns a rowid range and is read on its own with its own
+        # LIMIT, so matches of one kind never crowd out another.
+        hits = []
+        for kind in kinds:
+            lo, hi = db.search_rowid_range(kind)
+            cur = conn.execute(
+                f"""
+                SELECT kind, ref_id, {rank} AS rank, title AS raw_title, detail AS raw_detail, accounts AS raw_accounts,
+                       highlight(search_index, 2, ?1, ?2) AS title,
+                       snippet(search_index, 3, ?1, ?2, '…', 10) AS detail,
+                       snippet(search_index, 4, ?1, ?2, '…', 10) AS accounts
+                FROM search_index
+                WHERE search_index MATCH ?3 AND rowid BETWEEN ?4 AND ?5
+                ORDER BY {order}
+                LIMIT ?6
+                """,
+                (start, end, expr, lo, hi, window),
+            )
+            found: List[Dict[str, Any]] = []
+            for position, row in enumerate(cur.fetchall()):
+                marked = [c for c in _MATCH_COLUMNS if row[c] and start in row[c]]
+                weight = _MATCH_COLUMNS.index(marked[0]) if marked else len(_MATCH_COLUMNS)
+                found.append({
+                    "kind": row["kind"],
+                    "id": int(row["ref_id"]),
+                    "title": row["title"],
+                    "match": next((row[c] for c in marked if c != "title"), ""),
+                    "text": (row["raw_title"] or "", row["raw_detail"] or "", row["raw_accounts"] or ""),
+                    "rank": row["rank"] if full_rank else weight * window + position,
+                })
+            found.sort(key=lambda h: h["rank"])
+            hits.extend(found[:limit])
+        return hits
+    finally:
+        if not owned:
+            conn.close()
+
 
 def search_journal_entries(
     query: str,
@@ -33,8 +126,14 @@ def search_journal_entries(
         conditions = []
         params = []
         
-        # Text search
-        if query:
+        # Text search: the full-text index when present, LIKE scans otherwise
+        expr = fts_query(query) if query else None
+        if expr and db.has_search_index(conn):
+            conditions.append(
+                "je.id IN (SELECT ref_id FROM search_index WHERE search_index MATCH ? AND rowid BETWEEN ? AND ?)"
+            )
+            params.extend([expr, *db.search_rowid_range("entry")])
+        elif query:
             conditions.append(
                 "(je.description LIKE ? OR je.document_ref LIKE ? OR je.external_ref LIKE ? OR je.memo LIKE ?)"
             )
@@ -43,10 +142,10 @@ def search_journal_entries(
         
         # Date range
         if date_from:
-            conditions.append("date(je.date) >= date(?)")
+            conditions.append("je.date >= date(?)")
             params.append(date_from)
         if date_to:
-            conditions.append("date(je.date) <= date(?)")
+            conditions.append("je.date <= date(?)")
             params.append(date_to)
         
         # Account filter
@@ -100,7 +199,13 @@ def search_accounts(
         conditions = []
         params = []
         
-        if query:
+        expr = fts_query(query) if query else None
+        if expr and db.has_search_index(conn):
+            conditions.append(
+                "id IN (SELECT ref_id FROM search_index WHERE search_index MATCH ? AND rowid BETWEEN ? AND ?)"
+            )
+            params.extend([expr, *db.search_rowid_range("account")])
+        elif query:
             conditions.append("(name LIKE ? OR code LIKE ?)")
             search_term = f"%{query}%"
             params.extend([search_term, search_term])
@@ -131,13 +236,28 @@ def search_accounts(
             conn.close()
 
 
+_GLOBAL_SOURCES = (
+    ("journal_entries", "entry", "SELECT id, date, description, status FROM journal_entries"),
+    ("accounts", "account", "SELECT id, code, name, type FROM accounts"),
+    ("customers", "customer", "SELECT id, code, name, contact, email FROM customers"),
+    ("vendors", "vendor", "SELECT id, code, name, contact, email FROM vendors"),
+)
+
+
 def global_search(
     query: str,
     *,
     limit: int = 50,
     conn: Optional[sqlite3.Connection] = None
 ) -> Dict[str, List[Dict[str, Any]]]:
-    """Perform global search across all entities."""
+    """
+    Perform global search across all entities.
+
+    Served by the full-text index, best matches first; each row also carries
+    ``match``, a highlighted snippet of the reference/contact or account text
+    that matched, and ``text``, the indexed text. Databases without the index
+    fall back to LIKE scans.
+    """
     results = {
         'journal_entries': [],
         'accounts': [],
@@ -153,72 +273,10 @@ def global_search(
         conn = db.get_connection()
     
     try:
-        search_term = f"%{query.strip()}%"
-        
-        # Search journal entries
-        try:
-            cur = conn.execute(
-                """
-                SELECT id, date, description, status
-                FROM journal_entries
-                WHERE description LIKE ? OR document_ref LIKE ? OR external_ref LIKE ?
-                ORDER BY date DESC
-                LIMIT ?
-                """,
-                (search_term, search_term, search_term, limit)
-            )
-            results['journal_entries'] = [dict(row) for row in cur.fetchall()]
-        except Exception:
-            pass
-        
-        # Search accounts
-        try:
-            cur = conn.execute(
-                """
-                SELECT id, code, name, type
-                FROM accounts
-                WHERE name LIKE ? OR code LIKE ?
-                ORDER BY code
-                LIMIT ?
-                """,
-                (search_term, search_term, limit)
-            )
-            results['accounts'] = [dict(row) for row in cur.fetchall()]
-        except Exception:
-            pass
-        
-        # Search customers
-        try:
-            cur = conn.execute(
-                """
-                SELECT id, code, name, contact, email
-                FROM customers
-                WHERE name LIKE ? OR code LIKE ? OR contact LIKE ? OR email LIKE ?
-                ORDER BY name
-                LIMIT ?
-                """,
-                (search_term, search_term, search_term, search_term, limit)
-            )
-            results['customers'] = [dict(row) for row in cur.fetchall()]
-        except Exception:
-            pass
-        
-        # Search vendors
-        try:
-            cur = conn.execute(
-                """
-                SELECT id, code, name, contact, email
-                FROM vendors
-                WHERE name LIKE ? OR code LIKE ? OR contact LIKE ? OR email LIKE ?
-                ORDER BY name
-                LIMIT ?
-                """,
-                (search_term, search_term, search_term, search_term, limit)
-            )
-            results['vendors'] = [dict(row) for row in cur.fetchall()]
-        except Exception:
-            pass
-        
+        if fts_query(query) is not None and db.has_search_index(conn):
+            _global_search_indexed(conn, query.strip(), limit, results)
+        else:
+            _global_search_like(conn, query.strip(), limit, results)
     except Exception as e:
         logger.error(f"Global search error: {e}", exc_info=True)
     finally:
@@ -227,3 +285,340 @@ def global_search(
     
     return results
 
+
+def _global_search_indexed(
+    conn: sqlite3.Connection, query: str, limit: int, results: Dict[str, List[Dict[str, Any]]]
+) -> None:
+    hits = search_index(query, limit=limit, conn=conn)
+    for key, kind, select in _GLOBAL_SOURCES:
+        ranked = [h for h in hits if h["kind"] == kind]
+        if not ranked:
+            continue
+        ids = [h["id"] for h in ranked]
+        placeholders = ",".join("?" * len(ids))
+        rows = {r["id"]: dict(r) for r in conn.execute(f"{select} WHERE id IN ({placeholders})", ids)}
+        for hit in ranked:
+            row = rows.get(hit["id"])
+            if row is not None:
+                row["match"] = hit["match"]
+                row["text"] = hit["text"]
+                results[key].append(row)
+
+
+def _global_search_like(
+    conn: sqlite3.Connection, query: str, limit: int, results: Dict[str, List[Dict[str, Any]]]
+) -> None:
+    search_term = f"%{query}%"
+    
+    # Search journal entries
+    try:
+        cur = conn.execute(
+            """
+            SELECT id, date, description, status
+            FROM journal_entries
+            WHERE description LIKE ? OR document_ref LIKE ? OR external_ref LIKE ?
+            ORDER BY date DESC
+            LIMIT ?
+            """,
+            (search_term, search_term, search_term, limit)
+        )
+        results['journal_entries'] = [dict(row) for row in cur.fetchall()]
+    except Exception:
+        pass
+    
+    # Search accounts
+    try:
+        cur = conn.execute(
+            """
+            SELECT id, code, name, type
+            FROM accounts
+            WHERE name LIKE ? OR code LIKE ?
+            ORDER BY code
+            LIMIT ?
+            """,
+            (search_term, search_term, limit)
+        )
+        results['accounts'] = [dict(row) for row in cur.fetchall()]
+    except Exception:
+        pass
+    
+    # Search customers
+    try:
+        cur = conn.execute(
+            """
+            SELECT id, code, name, contact, email
+            FROM customers
+            WHERE name LIKE ? OR code LIKE ? OR contact LIKE ? OR email LIKE ?
+            ORDER BY name
+            LIMIT ?
+            """,
+            (search_term, search_term, search_term, search_term, limit)
+        )
+        results['customers'] = [dict(row) for row in cur.fetchall()]
+    except Exception:
+        pass
+    
+    # Search vendors
+    try:
+        cur = conn.execute(
+            """
+            SELECT id, code, name, contact, email
+            FROM vendors
+            WHERE name LIKE ? OR code LIKE ? OR contact LIKE ? OR email LIKE ?
+            ORDER BY name
+            LIMIT ?
+            """,
+            (search_term, search_term, search_term, search_term, limit)
+        )
+        results['vendors'] = [dict(row) for row in cur.fetchall()]
+    except Exception:
+        pass
+
+
+def _fold(text: str) -> str:
+    """Case- and accent-insensitive form of ``text``, as the index compares words."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _matched_fields(text: Iterable[str], words: List[str]) -> Optional[List[int]]:
+    """
+    Indexes of the fields of ``text`` holding a token that starts with one of
+    ``words``, when every word prefixes some token; None otherwise.
+    """
+    fields = [_WORD_RE.findall(_fold(field)) for field in text]
+    hit = [any(t.startswith(w) for w in words for t in tokens) for tokens in fields]
+    for word in words:
+        if not any(t.startswith(word) for tokens in fields for t in tokens):
+            return None
+    return [i for i, h in enumerate(hit) if h]
+
+
+def _highlight(text: str, words: List[str], marks: Tuple[str, str], width: int = 80) -> str:
+    """Wrap the tokens of ``text`` that start with one of ``words`` in ``marks``."""
+    start, end = marks
+
+    def mark(m: "re.Match[str]") -> str:
+        token = m.group(0)
+        return f"{start}{token}{end}" if any(_fold(token).startswith(w) for w in words) else token
+
+    marked = _WORD_RE.sub(mark, text)
+    if len(marked) > width and start in marked:
+        at = max(0, marked.index(start) - width // 4)
+        marked = ("…" if at else "") + marked[at:at + width] + "…"
+    return marked
+
+
+class SearchSession:
+    """
+    Search-as-you-type state for one search box.
+
+    ``schedule(query)`` debounces keystrokes through ``root.after`` and hands
+    ``on_results(query, results)`` the ``global_search`` result for the latest
+    query only. Results are cached per normalized query (LRU). A query that
+    extends a cached one whose result was complete (no kind hit the limit) is
+    answered by filtering that result in memory, word prefixes matched the
+    way the full-text index matches them. Either way no database round trip
+    or debounce delay is needed. The cache is dropped whenever another
+    connection commits (``PRAGMA data_version``), i.e. when the journal or the
+    directory changes, or on ``invalidate()``.
+
+    Recent queries from ``search_history`` are loaded once and served by
+    ``suggestions(prefix)`` from memory; ``record(query)`` adds to both.
+    """
+
+    def __init__(
+        self,
+        root: Any = None,
+        on_results: Optional[Callable[[str, Dict[str, List[Dict[str, Any]]]], None]] = None,
+        *,
+        user_id: Optional[int] = None,
+        limit: int = 20,
+        cache_size: int = 64,
+        delay_ms: int = 150,
+        history_size: int = 200,
+        marks: Tuple[str, str] = ("[", "]"),
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> None:
+        self._root = root
+        self._on_results = on_results
+        self.user_id = user_id
+        self.limit = limit
+        self.delay_ms = delay_ms
+        self.marks = marks
+        self._owned = conn is None
+        self.conn = conn or db.get_connection()
+        self._cache: "OrderedDict[str, Tuple[Dict[str, List[Dict[str, Any]]], bool]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._data_version = self._current_data_version()
+        self._pending = None
+        self._pending_query: Optional[str] = None
+        self.hits = 0
+        self.narrowed = 0
+        self.misses = 0
+        self._history: List[str] = []
+        self._history_size = history_size
+        self._load_history()
+
+    # --------------------- Querying ---------------------
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(_fold(query or "").split())
+
+    def search(self, query: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Results for ``query`` now: cached, narrowed from a cached prefix, or queried."""
+        key = self.normalize(query)
+        self._check_data_version()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached[0]
+        narrowed = self._narrow(key)
+        if narrowed is not None:
+            self.narrowed += 1
+            self._store(key, narrowed, True)
+            return narrowed
+        self.misses += 1
+        results = global_search(query, limit=self.limit, conn=self.conn)
+        complete = all(len(rows) < self.limit for rows in results.values()) and all(
+            "text" in row for rows in results.values() for row in rows
+        )
+        self._store(key, results, complete)
+        return results
+
+    def is_instant(self, query: str) -> bool:
+        """True when ``search(query)`` would not touch the database."""
+        key = self.normalize(query)
+        self._check_data_version()
+        return key in self._cache or self._narrowable_from(key) is not None
+
+    def _narrowable_from(self, key: str) -> Optional[str]:
+        if len(key) < 2:
+            return None
+        best = None
+        for cached_key, (_, complete) in self._cache.items():
+            if complete and len(cached_key) >= 2 and key.startswith(cached_key):
+                if best is None or len(cached_key) > len(best):
+                    best = cached_key
+        return best
+
+    def _narrow(self, key: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        base = self._narrowable_from(key)
+        if base is None:
+            return None
+        words = _WORD_RE.findall(key)
+        if not words:
+            return None
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, rows in self._cache[base][0].items():
+            kept = []
+            for position, row in enumerate(rows):
+                fields = _matched_fields(row["text"], words)
+                if fields is not None:
+                    shown = next((i for i in fields if i > 0), None)
+                    match = _highlight(row["text"][shown], words, self.marks) if shown else ""
+                    kept.append((fields[0], position, dict(row, match=match)))
+            kept.sort(key=lambda item: item[:2])
+            results[kind] = [row for _, _, row in kept]
+        return results
+
+    def _store(self, key: str, results: Dict[str, List[Dict[str, Any]]], complete: bool) -> None:
+        self._cache[key] = (results, complete)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    # --------------------- Invalidation ---------------------
+    def _current_data_version(self) -> int:
+        return int(self.conn.execute("PRAGMA data_version").fetchone()[0])
+
+    def _check_data_version(self) -> None:
+        version = self._current_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._cache.clear()
+
+    def invalidate(self) -> None:
+        """Forget every cached result (e.g. after writes on this session's connection)."""
+        self._cache.clear()
+
+    # --------------------- Debounce ---------------------
+    def schedule(self, query: str) -> None:
+        """
+        Deliver results for ``query`` to ``on_results``: immediately when they
+        are cached or can be narrowed, otherwise once typing pauses for
+        ``delay_ms``. A newer call replaces a pending one.
+        """
+        self.cancel()
+        if self._root is None or self.is_instant(query):
+            self._deliver(query)
+            return
+        self._pending_query = query
+        self._pending = self._root.after(self.delay_ms, self._fire)
+
+    def cancel(self) -> None:
+        if self._pending is not None:
+            try:
+                self._root.after_cancel(self._pending)
+            except Exception:
+                pass
+        self._pending = None
+        self._pending_query = None
+
+    def _fire(self) -> None:
+        query = self._pending_query
+        self._pending = None
+        self._pending_query = None
+        if query is not None:
+            self._deliver(query)
+
+    def _deliver(self, query: str) -> None:
+        results = self.search(query)
+        if self._on_results is not None:
+            self._on_results(query, results)
+
+    # --------------------- History ---------------------
+    def _load_history(self) -> None:
+        try:
+            cur = self.conn.execute(
+                """
+                SELECT query FROM search_history
+                WHERE search_type = 'global' AND (user_id IS ? OR ? IS NULL)
+                GROUP BY query
+                ORDER BY MAX(id) DESC
+                LIMIT ?
+                """,
+                (self.user_id, self.user_id, self._history_size),
+            )
+            self._history = [row["query"] for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            logger.debug(f"Could not load search history: {e}")
+            self._history = []
+
+    def suggestions(self, prefix: str = "", limit: int = 8) -> List[str]:
+        """Recent queries starting with ``prefix`` (case-insensitive), newest first."""
+        key = self.normalize(prefix)
+        return [q for q in self._history if self.normalize(q).startswith(key)][:limit]
+
+    def record(self, query: str) -> None:
+        """Remember a query the user acted on, in memory and in ``search_history``."""
+        query = " ".join((query or "").split())
+        if len(query) < 2:
+            return
+        self._history = [query] + [q for q in self._history if q != query][: self._history_size - 1]
+        try:
+            self.conn.execute(
+                "INSERT INTO search_history(user_id, query, search_type) VALUES (?, ?, 'global')",
+                (self.user_id, query),
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Could not save search history: {e}")
+
+    def close(self) -> None:
+        self.cancel()
+        self._cache.clear()
+        if self._owned and self.conn is not None:
+            self.conn.close()
+        self.conn = None
@@ -0,0 +1,200 @@
+"""
+Background Task Module
+Runs GUI data loads on worker threads and hands the results back to Tk.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from . import db
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCancelled(Exception):
+    """Raised by ``TaskContext.check`` once a newer request has replaced the task."""
+
+
+class Task:
+    """One submitted unit of work; ``key`` groups requests that supersede each other."""
+
+    def __init__(
+        self,
+        key: str,
+        work: Callable[["TaskContext"], Any],
+        on_done: Optional[Callable[[Any], None]],
+        on_error: Optional[Callable[[BaseException], None]],
+        on_progress: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self.key = key
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.future: Optional[Future] = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TaskContext:
+    """Passed to a task's work function: its own read connection and cancel state."""
+
+    def __init__(self, task: Task, conn: sqlite3.Connection, report: Optional[Callable[[Any], None]] = None) -> None:
+        self.task = task
+        self.conn = conn
+        self._report = report
+
+    @property
+    def cancelled(self) -> bool:
+        return self.task.cancelled
+
+    def check(self) -> None:
+        """Stop early (between steps of a long load) if the task was superseded."""
+        if self.task.cancelled:
+            raise TaskCancelled(self.task.key)
+
+    def progress(self, value: Any) -> None:
+        """Hand ``value`` to the task's ``on_progress`` on the Tk thread."""
+        if self._report is not None and self.task.on_progress is not None:
+            self._report(value)
+
+
+class TaskExecutor:
+    """
+    Worker threads for the GUI.
+
+    ``submit(key, work, on_done)`` runs ``work(ctx)`` on a worker with a pooled
+    connection of its own (``ctx.conn``); ``on_done(result)`` then runs on the
+    Tk thread, picked up by an ``after()`` poll. Submitting a key that is still
+    in flight cancels the older task: it is skipped if it has not started and
+    its result is dropped if it has, so repeated refreshes coalesce into the
+    latest one. Results are delivered within a per-tick time budget so a burst
+    of them never holds the UI for more than about a frame. Work may call
+    ``ctx.progress(value)``; ``on_progress(value)`` then runs on the Tk thread
+    while the task is still current.
+    """
+
+    def __init__(self, root: Any, *, max_workers: int = 2, poll_ms: int = 15, budget_ms: float = 12.0) -> None:
+        self._root = root
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="techfix-task")
+        self._results: "queue.Queue[tuple]" = queue.Queue()
+        self._latest: Dict[str, Task] = {}
+        self._lock = threading.Lock()
+        self._poll_ms = poll_ms
+        self._budget = budget_ms / 1000.0
+        self._polling = False
+        self._closed = False
+
+    def submit(
+        self,
+        key: str,
+        work: Callable[[TaskContext], Any],
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        on_progress: Optional[Callable[[Any], None]] = None,
+    ) -> Task:
+        """Run ``work`` in the background, superseding any pending task with ``key``."""
+        task = Task(key, work, on_done, on_error, on_progress)
+        if self._closed:
+            task.cancel()
+            return task
+        with self._lock:
+            previous = self._latest.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._latest[key] = task
+        task.future = self._pool.submit(self._run, task)
+        self._ensure_polling()
+        return task
+
+    def cancel(self, key: str) -> None:
+        with self._lock:
+            task = self._latest.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def pending(self, key: Optional[str] = None) -> bool:
+        with self._lock:
+            return bool(self._latest) if key is None else key in self._latest
+
+    def shutdown(self) -> None:
+        self._closed = True
+        with self._lock:
+            tasks = list(self._latest.values())
+            self._latest.clear()
+        for task in tasks:
+            task.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # --------------------- Worker side ---------------------
+    def _run(self, task: Task) -> None:
+        if task.cancelled:
+            return
+        conn = db.get_connection()
+        try:
+            report = lambda value: self._results.put((task, None, value))
+            outcome = (task, True, task.work(TaskContext(task, conn, report)))
+        except TaskCancelled:
+            return
+        except BaseException as e:  # delivered to on_error on the Tk thread
+            outcome = (task, False, e)
+        finally:
+            conn.close()
+        self._results.put(outcome)
+
+    # --------------------- Tk side ---------------------
+    def _ensure_polling(self) -> None:
+        if not self._polling and not self._closed:
+            self._polling = True
+            self._root.after(self._poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        self._polling = False
+        if self._closed:
+            return
+        deadline = time.perf_counter() + self._budget
+        while time.perf_counter() < deadline:
+            try:
+                task, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(task, ok, value)
+        if self.pending() or not self._results.empty():
+            self._ensure_polling()
+
+    def _deliver(self, task: Task, ok: Optional[bool], value: Any) -> None:
+        if ok is None:  # progress report; the task keeps running
+            with self._lock:
+                current = not task.cancelled and self._latest.get(task.key) is task
+            if current:
+                try:
+                    task.on_progress(value)
+                except Exception:
+                    logger.exception("Background task %s progress callback failed", task.key)
+            return
+        with self._lock:
+            if task.cancelled or self._latest.get(task.key) is not task:
+                return
+            del self._latest[task.key]
+        callback = task.on_done if ok else task.on_error
+        try:
+            if callback is not None:
+                callback(value)
+            elif not ok:
+                logger.error("Background task %s failed: %s", task.key, value, exc_info=value)
+        except Exception:
+            logger.exception("Background task %s callback failed", task.key)
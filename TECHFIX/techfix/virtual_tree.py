@@ -0,0 +1,392 @@
+"""Virtualized Treeview for TechFix - renders only the rows in view."""
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+import logging
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from . import db
+
+logger = logging.getLogger(__name__)
+
+
+class RowProvider(Protocol):
+    """Data source for VirtualTreeview; rows are addressed by position."""
+
+    def row_count(self) -> int:
+        ...
+
+    def rows(self, start: int, count: int) -> Sequence[Sequence[Any]]:
+        ...
+
+    def sort(self, column: str, descending: bool) -> bool:
+        """Reorder the rows; return False if ``column`` cannot be sorted."""
+        ...
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    """Numbers (including formatted amounts such as '1,250.00 Dr') before text."""
+    if isinstance(value, (int, float)):
+        return (0, value)
+    text = str(value or "").strip()
+    try:
+        return (0, float(text.split(" ", 1)[0].replace(",", "")))
+    except ValueError:
+        return (1, text.lower())
+
+
+class SequenceRowProvider:
+    """Provider over rows already in memory; sorts on any column."""
+
+    def __init__(self, rows: Sequence[Sequence[Any]] = (), columns: Sequence[str] = ()) -> None:
+        self._rows = list(rows)
+        self._columns = list(columns)
+
+    def row_count(self) -> int:
+        return len(self._rows)
+
+    def rows(self, start: int, count: int) -> Sequence[Sequence[Any]]:
+        return self._rows[start:start + count]
+
+    def sort(self, column: str, descending: bool) -> bool:
+        if column not in self._columns:
+            return False
+        index = self._columns.index(column)
+        self._rows.sort(key=lambda row: _sort_key(row[index] if index < len(row) else ""), reverse=descending)
+        return True
+
+
+class LedgerRowProvider:
+    """
+    Ledger lines read from ``db.fetch_ledger_page``.
+
+    A slice starts from the cursor ``db.ledger_cursor_at`` finds for its first
+    position, or from the cursor the previous slice ended on when scrolling
+    sequentially, so any position costs the same to read. Only the natural
+    (account, date) order can be sorted, ascending or descending.
+    """
+
+    sortable = ("account",)
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        period_id: Optional[int] = None,
+        *,
+        account_id: Optional[int] = None,
+        status: Optional[str] = "posted",
+        format_row: Optional[Callable[[sqlite3.Row], Sequence[Any]]] = None,
+    ) -> None:
+        self.conn = conn
+        self.period_id = period_id
+        self.account_id = account_id
+        self.status = status
+        self.format_row = format_row or tuple
+        self.descending = False
+        self._count: Optional[int] = None
+        self._cursors: Dict[int, Any] = {}
+
+    def invalidate(self) -> None:
+        self._count = None
+        self._cursors.clear()
+
+    def row_count(self) -> int:
+        if self._count is None:
+            totals = db.ledger_totals(
+                self.period_id, account_id=self.account_id, status=self.status, conn=self.conn
+            )
+            self._count = int(totals["line_count"])
+        return self._count
+
+    def rows(self, start: int, count: int) -> Sequence[Sequence[Any]]:
+        total = self.row_count()
+        if self.descending:
+            first = max(0, total - start - count)
+            count = max(0, total - start - first)
+            start = first
+        if count <= 0:
+            return []
+        if start in self._cursors:
+            after = self._cursors.pop(start)
+        else:
+            after = db.ledger_cursor_at(
+                start, self.period_id, account_id=self.account_id, status=self.status, conn=self.conn
+            )
+        rows, next_cursor = db.fetch_ledger_page(
+            self.period_id,
+            account_id=self.account_id,
+            status=self.status,
+            after=after,
+            page_size=count,
+            conn=self.conn,
+        )
+        if next_cursor is not None:
+            if len(self._cursors) >= 64:
+                self._cursors.clear()
+            self._cursors[start + len(rows)] = next_cursor
+        out = [self.format_row(r) for r in rows]
+        if self.descending:
+            out.reverse()
+        return out
+
+    def sort(self, column: str, descending: bool) -> bool:
+        if column not in self.sortable:
+            return False
+        self.descending = descending
+        return True
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    A Treeview that only holds the rows in view.
+
+    Rows come from a provider in blocks of ``block_size``; the last
+    ``max_blocks`` blocks are cached, so memory stays flat however many rows
+    the provider has. The scrollbar works in row positions, and ``refresh``
+    keeps the scroll position and selection. Clicking a heading asks the
+    provider to sort on that column.
+
+    ``tree`` is the underlying ttk.Treeview, for headings, columns and
+    selection; its items are reused as the view scrolls.
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        columns: Sequence[str],
+        *,
+        provider: Optional[RowProvider] = None,
+        block_size: int = 200,
+        max_blocks: int = 8,
+        row_tags: Optional[Callable[[Sequence[Any]], Sequence[str]]] = None,
+        frame_style: Optional[str] = None,
+        **tree_options: Any,
+    ) -> None:
+        if frame_style:
+            super().__init__(master, style=frame_style)
+        else:
+            super().__init__(master)
+        tree_options.setdefault("show", "headings")
+        self.tree = ttk.Treeview(self, columns=tuple(columns), **tree_options)
+        self.vsb = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.block_size = max(1, int(block_size))
+        self.max_blocks = max(1, int(max_blocks))
+        self.row_tags = row_tags
+        self._provider: Optional[RowProvider] = provider
+        self._total = 0
+        self._top = 0
+        self._selected: Optional[int] = None
+        self._blocks: "OrderedDict[int, List[Sequence[Any]]]" = OrderedDict()
+        self._items: List[str] = []
+        self._row_height: Optional[int] = None
+        self._heading_height = 0
+        self._sort: Optional[Tuple[str, bool]] = None
+        self._heading_text: Dict[str, str] = {}
+
+        for col in columns:
+            self.tree.heading(col, command=lambda c=col: self.sort_by(c))
+        self.tree.bind("<Configure>", lambda e: self._render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        for key, step in (("<Up>", -1), ("<Down>", 1)):
+            self.tree.bind(key, lambda e, s=step: self._move_selection(s))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._visible_count()))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._visible_count()))
+        self.tree.bind("<Home>", lambda e: self._move_selection(-self._total))
+        self.tree.bind("<End>", lambda e: self._move_selection(self._total))
+        if provider is not None:
+            self.refresh(keep_position=False)
+
+    # --------------------- Public API ---------------------
+    @property
+    def provider(self) -> Optional[RowProvider]:
+        return self._provider
+
+    @property
+    def row_count(self) -> int:
+        return self._total
+
+    def set_provider(self, provider: Optional[RowProvider], *, keep_position: bool = False) -> None:
+        self._provider = provider
+        if self._sort and provider is not None and not provider.sort(*self._sort):
+            self._set_sort_indicator(None)
+        self.refresh(keep_position=keep_position)
+
+    def refresh(self, *, keep_position: bool = True) -> None:
+        """Re-read the provider; keeps the scroll position unless told otherwise."""
+        invalidate = getattr(self._provider, "invalidate", None)
+        if callable(invalidate):
+            invalidate()
+        self._blocks.clear()
+        try:
+            self._total = int(self._provider.row_count()) if self._provider is not None else 0
+        except Exception as e:
+            logger.error("Virtual tree row count failed: %s", e)
+            self._total = 0
+        if not keep_position:
+            self._top = 0
+            self._selected = None
+        elif self._selected is not None and self._selected >= self._total:
+            self._selected = None
+        self._render()
+
+    def sort_by(self, column: str) -> None:
+        if self._provider is None:
+            return
+        descending = bool(self._sort and self._sort[0] == column and not self._sort[1])
+        try:
+            if not self._provider.sort(column, descending):
+                return
+        except Exception as e:
+            logger.error("Virtual tree sort failed: %s", e)
+            return
+        self._set_sort_indicator((column, descending))
+        self.refresh(keep_position=False)
+
+    def scroll(self, rows: int) -> None:
+        self._top += int(rows)
+        self._render()
+
+    def see(self, index: int) -> None:
+        visible = self._visible_count()
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + visible:
+            self._top = index - visible + 1
+        self._render()
+
+    def get_row(self, index: int) -> Optional[Sequence[Any]]:
+        if not 0 <= index < self._total:
+            return None
+        rows = self._slice(index, 1)
+        return rows[0] if rows else None
+
+    def selected_index(self) -> Optional[int]:
+        return self._selected
+
+    # --------------------- Rendering ---------------------
+    def _visible_count(self) -> int:
+        height = self.tree.winfo_height()
+        if height <= 1:
+            try:
+                return max(1, int(self.tree.cget("height")))
+            except Exception:
+                return 10
+        if self._row_height is None and self._items:
+            bbox = self.tree.bbox(self._items[0])
+            if bbox:
+                self._heading_height, self._row_height = bbox[1], bbox[3]
+        row_height = self._row_height
+        if not row_height:
+            try:
+                style = self.tree.cget("style") or "Treeview"
+                row_height = int(ttk.Style(self).lookup(style, "rowheight") or 20)
+            except Exception:
+                row_height = 20
+            self._heading_height = row_height + 4
+        return max(1, (height - self._heading_height) // row_height)
+
+    def _block(self, index: int) -> List[Sequence[Any]]:
+        block = self._blocks.get(index)
+        if block is not None:
+            self._blocks.move_to_end(index)
+            return block
+        start = index * self.block_size
+        count = min(self.block_size, self._total - start)
+        block = list(self._provider.rows(start, count)) if self._provider is not None and count > 0 else []
+        self._blocks[index] = block
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+    def _slice(self, start: int, count: int) -> List[Sequence[Any]]:
+        out: List[Sequence[Any]] = []
+        if count <= 0:
+            return out
+        first, last = start // self.block_size, (start + count - 1) // self.block_size
+        for index in range(first, last + 1):
+            out.extend(self._block(index))
+        offset = start - first * self.block_size
+        return out[offset:offset + count]
+
+    def _render(self) -> None:
+        visible = self._visible_count()
+        self._top = max(0, min(self._top, self._total - visible))
+        try:
+            rows = self._slice(self._top, min(visible, self._total - self._top))
+        except Exception as e:
+            logger.error("Virtual tree fetch failed: %s", e)
+            rows = []
+        while len(self._items) < len(rows):
+            self._items.append(self.tree.insert("", "end"))
+        while len(self._items) > len(rows):
+            self.tree.delete(self._items.pop())
+        for iid, values in zip(self._items, rows):
+            tags = tuple(self.row_tags(values)) if self.row_tags else ()
+            self.tree.item(iid, values=tuple(values), tags=tags)
+        selected = self._selected
+        if selected is not None and self._top <= selected < self._top + len(self._items):
+            iid = self._items[selected - self._top]
+            if self.tree.selection() != (iid,):
+                self.tree.selection_set(iid)
+            self.tree.focus(iid)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        self._selected = selected
+        self.tree.yview_moveto(0)
+        if self._total:
+            self.vsb.set(self._top / self._total, min(1.0, (self._top + visible) / self._total))
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    # --------------------- Events ---------------------
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        if action == "moveto":
+            self._top = int(float(amount) * self._total)
+        elif action == "scroll":
+            step = self._visible_count() if unit == "pages" else 1
+            self._top += int(amount) * step
+        self._render()
+
+    def _on_wheel(self, event: tk.Event) -> str:
+        delta = getattr(event, "delta", 0) or 0
+        if delta:
+            # Windows reports multiples of 120, macOS small integers.
+            steps = delta // 120 if abs(delta) >= 120 else delta
+            self.scroll(-3 * steps)
+        return "break"
+
+    def _on_select(self, event: Optional[tk.Event] = None) -> None:
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            self._selected = self._top + self._items.index(selection[0])
+
+    def _move_selection(self, step: int) -> str:
+        if not self._total:
+            return "break"
+        current = self._selected if self._selected is not None else self._top - (1 if step > 0 else 0)
+        self._selected = max(0, min(self._total - 1, current + step))
+        self.see(self._selected)
+        self.tree.event_generate("<<TreeviewSelect>>")
+        return "break"
+
+    def _set_sort_indicator(self, sort: Optional[Tuple[str, bool]]) -> None:
+        if self._sort:
+            column = self._sort[0]
+            self.tree.heading(column, text=self._heading_text.get(column, column))
+        self._sort = sort
+        if sort:
+            column, descending = sort
+            text = self.tree.heading(column, "text")
+            self._heading_text[column] = text
+            self.tree.heading(column, text=f"{text} {'▼' if descending else '▲'}")
@@ -0,0 +1,95 @@
+"""
+Benchmark the journal export paths: CSV (export.write_csv over
+db.iter_journal) against Parquet and Arrow IPC (columnar.export_journal_lines).
+
+Write time covers the cursor read and the file; read time is what an analyst
+pays to get typed columns back: csv.reader plus float/int conversion for CSV,
+pyarrow for the columnar files (and pandas.read_* when pandas is installed).
+Needs pyarrow.
+
+    TECHFIX_DATA_DIR=/tmp/techfix-bench python tests/benchmark_columnar_export.py [entries]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import columnar, db, export
+
+JOURNAL_HEADERS = ['entry_id', 'date', 'description', 'code', 'name', 'debit', 'credit']
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def size(path):
+    path = Path(path)
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+    return path.stat().st_size
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        return [(int(r[0]), r[1], r[2], r[3], r[4], float(r[5]), float(r[6])) for r in reader]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    if not columnar.PYARROW_AVAILABLE:
+        sys.exit("pyarrow is not installed")
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    db.init_db(reset=True)
+    conn = db.get_connection()
+    try:
+        db.seed_chart_of_accounts(conn)
+        cash = db.get_account_by_name('Cash', conn)['id']
+        revenue = db.get_account_by_name('Service Revenue', conn)['id']
+        db.insert_journal_entries_bulk(
+            [{'date': f'2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}', 'description': f'Benchmark {i}',
+              'lines': [(cash, 10.0, 0.0), (revenue, 0.0, 10.0)]}
+             for i in range(count)],
+            conn=conn)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp)
+            paths = {'csv': out / 'journal.csv', 'parquet': out / 'journal.parquet', 'arrow': out / 'journal.arrow'}
+            rows, csv_write = timed(lambda: export.write_csv(db.iter_journal(conn=conn), JOURNAL_HEADERS, paths['csv']))
+            _, parquet_write = timed(lambda: columnar.export_journal_lines(paths['parquet'], conn=conn))
+            _, arrow_write = timed(lambda: columnar.export_journal_lines(paths['arrow'], partition_by_period=False, conn=conn))
+
+            _, csv_read = timed(lambda: read_csv(paths['csv']))
+            _, parquet_read = timed(lambda: ds.dataset(paths['parquet'], format='parquet', partitioning='hive').to_table())
+            _, arrow_read = timed(lambda: pa.ipc.open_file(paths['arrow']).read_all())
+
+            print(f"{rows} journal lines")
+            print(f"{'format':<8} {'write s':>8} {'read s':>8} {'MB':>8}")
+            for name, write, read in (('csv', csv_write, csv_read), ('parquet', parquet_write, parquet_read),
+                                      ('arrow', arrow_write, arrow_read)):
+                print(f"{name:<8} {write:8.2f} {read:8.2f} {size(paths[name]) / 1e6:8.1f}")
+
+            try:
+                import pandas as pd
+            except ImportError:
+                return
+            _, pd_csv = timed(lambda: pd.read_csv(paths['csv']))
+            _, pd_parquet = timed(lambda: pd.read_parquet(paths['parquet']))
+            _, pd_arrow = timed(lambda: pd.read_feather(paths['arrow']))
+            print(f"pandas read s: csv {pd_csv:.2f} parquet {pd_parquet:.2f} arrow {pd_arrow:.2f}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark AccountingEngine.record_entry: commits and fsyncs per posted entry.
+
+"before" replays the old pipeline, where insert_journal_entry, log_audit,
+add_source_document, schedule_reversing_entry and every set_cycle_step_status
+commit on their own; "after" is record_entry, which runs the same work inside
+one db.unit_of_work. Commits are counted with sqlite3's trace callback. SQLite
+has no fsync counter, so fsyncs are derived: in WAL mode each commit syncs the
+log once with synchronous=FULL and not at all with NORMAL (syncs then happen
+only at checkpoints).
+
+    TECHFIX_DATA_DIR=/tmp/techfix-bench python tests/benchmark_posting.py [entries]
+"""
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db
+from techfix.accounting import AccountingEngine, JournalLine
+
+
+def legacy_post(eng, entry_date, description, lines, *, attachment, reverse_on):
+    """record_entry as it was before the unit of work (one commit per helper)."""
+    period = eng._check_posting_period(entry_date, None)
+    user = db.get_user_by_username(eng.current_user_name, conn=eng.conn)
+    entry_id = db.insert_journal_entry(
+        entry_date,
+        description,
+        [ln.as_tuple() for ln in lines],
+        period_id=period,
+        created_by=eng.current_user_name,
+        created_by_user_id=int(user["id"]) if user else None,
+        conn=eng.conn,
+    )
+    db.add_source_document(entry_id, attachment[1], label=attachment[0], conn=eng.conn)
+    db.schedule_reversing_entry(entry_id, reverse_on, conn=eng.conn)
+    eng._update_cycle_status_after_entry(is_adjusting=True, is_closing=False, status="posted")
+    return entry_id
+
+
+def run(label, post, eng, entries, synchronous):
+    eng.conn.execute(f"PRAGMA synchronous = {synchronous}")
+    commits = []
+    eng.conn.set_trace_callback(lambda sql: commits.append(1) if sql.strip().upper().startswith("COMMIT") else None)
+    started = time.perf_counter()
+    for entry_date, description, lines in entries:
+        post(entry_date, description, lines)
+    elapsed = time.perf_counter() - started
+    eng.conn.set_trace_callback(None)
+    per_post = len(commits) / len(entries)
+    fsyncs = per_post if synchronous == "FULL" else 0.0
+    print(
+        f"{label:<7} synchronous={synchronous:<6} commits/post={per_post:5.2f} "
+        f"fsyncs/post={fsyncs:5.2f} posts/s={len(entries) / elapsed:8.0f}"
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    db.init_db(reset=True)
+    eng = AccountingEngine()
+    try:
+        db.seed_chart_of_accounts(eng.conn)
+        cash = db.get_account_by_name('Cash', eng.conn)['id']
+        revenue = db.get_account_by_name('Service Revenue', eng.conn)['id']
+        start = eng.current_period['start_date']
+        entry_date = start or date.today().isoformat()
+        entries = [
+            (entry_date, f'Benchmark {i}', [JournalLine(cash, debit=10.0), JournalLine(revenue, credit=10.0)])
+            for i in range(count)
+        ]
+        attachment = ('Receipt', 'receipt.pdf')
+
+        def before(d, desc, lines):
+            legacy_post(eng, d, desc, lines, attachment=attachment, reverse_on=d)
+
+        def after(d, desc, lines):
+            eng.record_entry(
+                d, desc, lines, is_adjusting=True, attachments=[attachment], schedule_reverse_on=d
+            )
+
+        for synchronous in ("NORMAL", "FULL"):
+            run("before", before, eng, entries, synchronous)
+            run("after", after, eng, entries, synchronous)
+    finally:
+        eng.close()
+
+
+if __name__ == '__main__':
+    main()
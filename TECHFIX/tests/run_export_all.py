@@ -6,11 +6,23 @@ def main():
     out = Path(os.path.dirname(__file__)).parent / "export_all_test.xlsx"
     filedialog.asksaveasfilename = lambda **kwargs: str(out.resolve())
     app = TechFixApp()
+    saved = []
+
+    def wait() -> None:
+        # Stop once the export task has finished (saved or failed).
+        if app.tasks.pending("export_all"):
+            app.after(100, wait)
+        else:
+            app.quit()
+
     try:
-        app._export_all_to_excel()
+        if app._export_all_to_excel(notify=False, on_done=saved.append) is not None:
+            wait()
+            app.mainloop()
     finally:
         app.destroy()
-    print(str(out.resolve()))
+    if saved:
+        print(saved[0])
 
 if __name__ == '__main__':
     main()
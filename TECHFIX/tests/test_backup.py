@@ -0,0 +1,105 @@
+import sqlite3
+import tempfile
+import unittest
+import zipfile
+import os, sys
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import backup, db
+from techfix.tasks import TaskCancelled
+
+
+class Stop(Exception):
+    pass
+
+
+class OnlineBackupTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.conn = db.get_connection()
+        db.seed_chart_of_accounts(self.conn)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS filler (id INTEGER PRIMARY KEY, body TEXT)")
+        self.conn.executemany("INSERT INTO filler (body) VALUES (?)", [('x' * 500,) for _ in range(400)])
+        self.conn.commit()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = Path(self.tmp.name) / 'copy.db'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        self.conn.execute("DROP TABLE IF EXISTS filler")
+        self.conn.commit()
+        self.conn.close()
+
+    def test_writers_keep_working_during_a_stepped_copy(self):
+        writer = sqlite3.connect(str(db.DB_PATH), timeout=0.1)
+        steps = []
+
+        def progress(done, total):
+            steps.append((done, total))
+            # A write from another connection between steps must not block.
+            writer.execute("INSERT INTO filler (body) VALUES ('during')")
+            writer.commit()
+
+        try:
+            backup.online_backup(self.dest, step_pages=8, step_sleep=0, progress=progress)
+        finally:
+            writer.close()
+        self.assertGreater(len(steps), 3)
+        self.assertEqual(steps[-1][0], steps[-1][1])
+        self.assertFalse(self.dest.with_name('copy.db.part').exists())
+
+        copy = sqlite3.connect(str(self.dest))
+        try:
+            self.assertEqual(copy.execute("PRAGMA quick_check").fetchone()[0], 'ok')
+            self.assertEqual(copy.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+            self.assertGreaterEqual(copy.execute("SELECT COUNT(*) FROM filler").fetchone()[0], 400)
+        finally:
+            copy.close()
+
+    def test_cancelled_copy_leaves_nothing_behind(self):
+        calls = []
+
+        def check():
+            calls.append(1)
+            if len(calls) > 2:
+                raise Stop()
+
+        with self.assertRaises(Stop):
+            backup.online_backup(self.dest, step_pages=4, step_sleep=0, check=check)
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [])
+
+    def test_full_backup_holds_a_verified_database(self):
+        seen = []
+        path = backup.create_full_backup("nightly", progress=lambda done, total: seen.append(done))
+        try:
+            self.assertIsNotNone(path)
+            self.assertTrue(seen)
+            self.assertEqual([p for p in backup.BACKUP_DIR.glob('*.db') if path.stem in p.name], [])
+            with zipfile.ZipFile(path) as zf:
+                zf.extract(db.DB_PATH.name, self.tmp.name)
+            backup.verify_database_file(Path(self.tmp.name) / db.DB_PATH.name)
+        finally:
+            if path:
+                path.unlink()
+
+    def test_cancelled_full_backup_leaves_nothing_behind(self):
+        before = set(backup.BACKUP_DIR.iterdir())
+
+        def check():
+            raise TaskCancelled('backup')
+
+        with self.assertRaises(TaskCancelled):
+            backup.create_full_backup("cancelled", check=check)
+        self.assertEqual(set(backup.BACKUP_DIR.iterdir()), before)
+        self.assertFalse([b for b in backup.list_backups() if 'cancelled' in b['name']])
+
+    def test_corrupt_file_fails_verification(self):
+        self.dest.write_bytes(b'SQLite format 3\x00' + b'\x00' * 4000)
+        with self.assertRaises(backup.BackupError):
+            backup.verify_database_file(self.dest)
+        self.assertFalse(backup.restore_backup(self.dest))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import shutil
+import tempfile
+import threading
+import unittest
+import os, sys
+from datetime import datetime, timedelta
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import backup_scheduler, backup_store, db
+from techfix.backup_scheduler import CronSchedule, RetentionPolicy, ScheduleError, parse_schedule
+
+
+class ScheduleTests(unittest.TestCase):
+    def test_intervals_and_aliases(self):
+        self.assertEqual(parse_schedule('6h').seconds, 6 * 3600)
+        self.assertEqual(parse_schedule('every 30m').seconds, 1800)
+        self.assertEqual(str(parse_schedule('@daily')), '0 0 * * *')
+        for bad in ('', '61 * * * *', '* * *', 'soon'):
+            with self.assertRaises(ScheduleError):
+                parse_schedule(bad)
+
+    def test_cron_next_run(self):
+        weekdays = CronSchedule('30 18 * * 1-5')
+        friday_evening = datetime(2026, 10, 16, 19, 0).astimezone()
+        self.assertEqual(weekdays.next_after(friday_evening).replace(tzinfo=None), datetime(2026, 10, 19, 18, 30))
+        every_quarter = CronSchedule('*/15 * * * *')
+        self.assertEqual(every_quarter.next_after(datetime(2026, 1, 1, 10, 15).astimezone()).replace(tzinfo=None),
+                         datetime(2026, 1, 1, 10, 30))
+        # Both day fields restricted: either one matches (the 1st, or a Sunday).
+        either = CronSchedule('0 3 1 * 0')
+        self.assertEqual(either.next_after(datetime(2026, 10, 16, 12, 0).astimezone()).replace(tzinfo=None),
+                         datetime(2026, 10, 18, 3, 0))
+
+    def test_grandfather_father_son_retention(self):
+        start = datetime(2026, 1, 1, 1, 0).astimezone()
+        created = [start + timedelta(days=d, hours=h) for d in range(90) for h in (0, 12)]
+        kept = sorted(created[i] for i in RetentionPolicy(daily=3, weekly=2, monthly=2).keep(created))
+        newest_per_day = [created[-1] - timedelta(days=d) for d in (0, 1, 2)]
+        self.assertTrue(set(newest_per_day) <= set(kept))
+        self.assertIn(datetime(2026, 2, 28, 13, 0).astimezone(), kept)  # February's newest
+        self.assertEqual(len(kept), 4)  # Mar 29-31, plus Feb 28; week and month overlap the days
+        self.assertEqual(RetentionPolicy(0, 0, 0).keep(created), {len(created) - 1})
+
+
+class BackupSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        shutil.rmtree(backup_store.STORE_DIR, ignore_errors=True)
+        db.init_db(reset=True)
+        self.conn = db.get_connection()
+        db.seed_chart_of_accounts(self.conn)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state = Path(self.tmp.name) / 'state.json'
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+        shutil.rmtree(backup_store.STORE_DIR, ignore_errors=True)
+
+    def scheduler(self, **kwargs):
+        kwargs.setdefault('duty', 1.0)
+        kwargs.setdefault('idle_seconds', 0)
+        return backup_scheduler.BackupScheduler('1h', state_path=self.state, **kwargs)
+
+    def post(self):
+        cash = db.get_account_by_name('Cash', self.conn)['id']
+        revenue = db.get_account_by_name('Service Revenue', self.conn)['id']
+        db.insert_journal_entries_bulk(
+            [{'date': '2025-01-02', 'description': 'Sale', 'lines': [(cash, 5.0, 0.0), (revenue, 0.0, 5.0)]}],
+            conn=self.conn)
+
+    def test_runs_only_when_the_ledger_changed_and_are_audited(self):
+        scheduler = self.scheduler()
+        self.assertEqual(scheduler.run_once()['status'], 'created')
+        self.assertEqual(scheduler.run_once()['status'], 'unchanged')
+        self.post()
+        self.assertEqual(scheduler.run_once()['status'], 'created')
+        self.assertGreater(scheduler.next_run(), datetime.now().astimezone() + timedelta(minutes=59))
+
+        actions = [r['action'] for r in db.list_audit_log(conn=self.conn) if r['user'] == 'backup-scheduler']
+        self.assertEqual(actions, ['scheduled_backup'] * 3)
+
+    def test_prune_keeps_manual_snapshots(self):
+        manual = backup_store.create_snapshot('manual')
+        scheduler = self.scheduler(retention=RetentionPolicy(daily=1, weekly=0, monthly=0))
+        scheduler.run_once()
+        self.post()
+        result = scheduler.run_once()
+        self.assertEqual(result['pruned'], 1)
+        remaining = {s['description'] for s in backup_store.list_snapshots()}
+        self.assertEqual(remaining, {'manual', 'scheduled'})
+        self.assertTrue(manual.exists())
+
+    def test_waits_while_busy_and_stops_cleanly(self):
+        waiting = threading.Event()
+
+        def busy():
+            waiting.set()
+            return True
+
+        scheduler = self.scheduler(busy=busy)
+        threading.Thread(target=lambda: (waiting.wait(5), scheduler.stop())).start()
+        with self.assertNoLogs('techfix.backup_store', level='ERROR'):
+            self.assertEqual(scheduler.run_once()['status'], 'stopped')
+        self.assertEqual(backup_store.list_snapshots(), [])
+        self.assertFalse(self.state.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import shutil
+import unittest
+import zlib
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import backup, backup_store, db
+
+
+def store_bytes():
+    return sum(p.stat().st_size for p in backup_store.CHUNK_DIR.rglob('*') if p.is_file())
+
+
+class BackupStoreTests(unittest.TestCase):
+    def setUp(self):
+        shutil.rmtree(backup_store.STORE_DIR, ignore_errors=True)
+        db.init_db(reset=True)
+        self.conn = db.get_connection()
+        db.seed_chart_of_accounts(self.conn)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS filler (id INTEGER PRIMARY KEY, body TEXT)")
+        self.conn.executemany("INSERT INTO filler (body) VALUES (?)",
+                              [(os.urandom(400).hex(),) for _ in range(1000)])
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.execute("DROP TABLE IF EXISTS filler")
+        self.conn.commit()
+        self.conn.close()
+        shutil.rmtree(backup_store.STORE_DIR, ignore_errors=True)
+
+    def snapshot(self, description):
+        path = backup_store.create_snapshot(description, chunk_size=4096)
+        self.assertIsNotNone(path)
+        return path
+
+    def test_second_snapshot_stores_only_changed_chunks(self):
+        first = self.snapshot('monday')
+        full = store_bytes()
+        self.conn.execute("UPDATE filler SET body = 'posted' WHERE id = 500")
+        self.conn.commit()
+        second = self.snapshot('tuesday')
+
+        added = backup_store.read_manifest(second)['stored']
+        self.assertEqual(store_bytes(), full + added)
+        self.assertLess(added, full / 20)
+        listed = {b['name']: b for b in backup.list_backups()}
+        self.assertEqual(listed[second.name]['type'], 'snapshot')
+        self.assertEqual(listed[first.name]['size'], backup_store.read_manifest(first)['size'])
+
+    def test_restore_streams_the_snapshot_back(self):
+        snap = self.snapshot(None)
+        self.conn.execute("DELETE FROM filler WHERE id > 10")
+        self.conn.commit()
+        self.assertTrue(backup.restore_backup(snap))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM filler").fetchone()[0], 1000)
+
+    def test_delete_collects_only_unreferenced_chunks(self):
+        first = self.snapshot('a')
+        self.conn.execute("UPDATE filler SET body = 'changed' WHERE id = 1")
+        self.conn.commit()
+        second = self.snapshot('b')
+        (backup_store.CHUNK_DIR / 'ff' / ('f' * 64 + '.tmp')).parent.mkdir(parents=True, exist_ok=True)
+        (backup_store.CHUNK_DIR / 'ff' / ('f' * 64 + '.tmp')).write_bytes(b'partial')
+
+        self.assertTrue(backup.delete_backup(first))
+        self.assertFalse(first.exists())
+        live = {d for f in backup_store.read_manifest(second)['files'].values() for d in f['chunks']}
+        self.assertEqual({p.name for p in backup_store.CHUNK_DIR.glob('*/*')}, live)
+        self.assertTrue(backup.restore_backup(second))
+
+    def test_corrupt_chunk_fails_the_restore(self):
+        snap = self.snapshot(None)
+        digest = backup_store.read_manifest(snap)['files'][db.DB_PATH.name]['chunks'][3]
+        path = backup_store.CHUNK_DIR / digest[:2] / digest
+        path.write_bytes(zlib.compress(b'tampered'))
+        self.assertFalse(backup.restore_backup(snap))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM filler").fetchone()[0], 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
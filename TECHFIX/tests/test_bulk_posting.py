@@ -0,0 +1,126 @@
+import unittest
+from unittest import mock
+from datetime import date, timedelta
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db
+from techfix.accounting import AccountingEngine, JournalLine
+
+
+class BulkPostingTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        self.cash = db.get_account_by_name('Cash', self.conn)['id']
+        self.svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        start = self.eng.current_period['start_date']
+        self.d0 = date.fromisoformat(start) if start else date.today()
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def _entry(self, i, amount=10.0, **extra):
+        entry = dict(
+            date=(self.d0 + timedelta(days=i % 5)).isoformat(),
+            description=f'Bulk {i}',
+            lines=[JournalLine(self.cash, debit=amount), JournalLine(self.svc, credit=amount)],
+        )
+        entry.update(extra)
+        return entry
+
+    def _snapshot(self):
+        return (
+            [tuple(r) for r in self.conn.execute("SELECT * FROM account_period_balances ORDER BY 1, 2, 3, 4, 5, 6")],
+            [tuple(r) for r in self.conn.execute("SELECT * FROM account_daily_balances ORDER BY 1, 2, 3, 4, 5, 6, 7")],
+        )
+
+    def test_bulk_insert_returns_ids_and_keeps_rollups_exact(self):
+        self.eng.record_entry(self._entry(4)['date'], 'Existing', self._entry(4)['lines'])
+        ids, errors = self.eng.record_entries_bulk(
+            [self._entry(i, is_adjusting=(i % 3 == 0)) for i in range(20)]
+            + [self._entry(99, attachments=[('Receipt', 'r.pdf')], schedule_reverse_on=self.d0.isoformat())]
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(len(ids), 21)
+        self.assertEqual(ids, sorted(ids))
+        lines = self.conn.execute("SELECT COUNT(*) FROM journal_lines WHERE entry_id IN (%s)" % ",".join(map(str, ids))).fetchone()[0]
+        self.assertEqual(lines, 42)
+        self.assertEqual(len(db.list_source_documents(ids[-1], conn=self.conn)), 1)
+        audits = self.conn.execute("SELECT COUNT(*) FROM audit_log WHERE action='journal_entry_created'").fetchone()[0]
+        self.assertEqual(audits, 22)
+
+        incremental = self._snapshot()
+        db.rebuild_balance_rollups(conn=self.conn)
+        self.assertEqual(incremental, self._snapshot())
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM balance_rollup_suspend").fetchone()[0], 0)
+
+    def test_invalid_entry_rejects_whole_batch(self):
+        bad = self._entry(1)
+        bad['lines'] = [JournalLine(self.cash, debit=5.0), JournalLine(self.svc, credit=4.0)]
+        with self.assertRaises(ValueError):
+            self.eng.record_entries_bulk([self._entry(0), bad])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0], 0)
+
+    def test_per_entry_errors_skip_invalid_entries(self):
+        bad = self._entry(1)
+        bad['lines'] = [(999999, 5.0, 0.0), (self.svc, 0.0, 5.0)]
+        ids, errors = self.eng.record_entries_bulk(
+            [self._entry(0), bad, self._entry(2, date='not-a-date')], all_or_nothing=False
+        )
+        self.assertIsNotNone(ids[0])
+        self.assertEqual(ids[1:], [None, None])
+        self.assertEqual([i for i, _ in errors], [1, 2])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0], 1)
+
+    def test_bulk_insert_between_existing_days_keeps_prefix_sums_exact(self):
+        rent = db.get_account_by_name('Rent Expense', self.conn)['id']
+        for i in range(0, 12, 2):
+            self.eng.record_entry(self._entry(0, date=(self.d0 + timedelta(days=i)).isoformat())['date'],
+                                  'Existing', self._entry(0)['lines'])
+        self.eng.record_entry(self.d0.isoformat(), 'Untouched',
+                              [JournalLine(rent, debit=7.0), JournalLine(self.svc, credit=7.0)])
+        ids, errors = self.eng.record_entries_bulk(
+            [self._entry(0, amount=1.0 + i, date=(self.d0 + timedelta(days=d)).isoformat())
+             for i, d in enumerate((9, 1, 3, 3, 12, 5))]
+        )
+        self.assertEqual(errors, [])
+        incremental = self._snapshot()
+        db.rebuild_balance_rollups(conn=self.conn)
+        self.assertEqual(incremental, self._snapshot())
+
+    def _add_account(self):
+        self.conn.execute("INSERT INTO accounts(name, code, type, normal_side, is_permanent) "
+                          "VALUES ('Petty Cash', '109', 'Asset', 'Debit', 1)")
+
+    def test_failure_inside_unit_of_work_keeps_earlier_writes(self):
+        with db.unit_of_work(self.conn):
+            self._add_account()
+            with mock.patch.object(db, '_apply_bulk_balance_deltas', side_effect=RuntimeError('boom')):
+                with self.assertRaisesRegex(RuntimeError, 'boom'):
+                    db.insert_journal_entries_bulk(
+                        [self._entry(i, lines=[(self.cash, 10.0, 0.0), (self.svc, 0.0, 10.0)]) for i in range(3)],
+                        conn=self.conn)
+            self.assertTrue(self.conn.in_transaction)
+            self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0], 0)
+            self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM balance_rollup_suspend").fetchone()[0], 0)
+        self.assertIsNotNone(db.get_account_by_name('Petty Cash', self.conn))
+
+    def test_engine_failure_inside_callers_transaction_surfaces_original_error(self):
+        self._add_account()
+        with mock.patch.object(db, '_apply_bulk_balance_deltas', side_effect=RuntimeError('boom')):
+            with self.assertRaisesRegex(RuntimeError, 'boom'):
+                self.eng.record_entries_bulk([self._entry(i) for i in range(3)])
+        self.assertTrue(self.conn.in_transaction)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0], 0)
+        self.conn.commit()
+        self.assertIsNotNone(db.get_account_by_name('Petty Cash', self.conn))
+
+
+if __name__ == '__main__':
+    unittest.main()
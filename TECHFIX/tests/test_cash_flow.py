@@ -0,0 +1,174 @@
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import cashflow, db
+from techfix.accounting import AccountingEngine
+
+
+def per_entry_cash_flow(conn, cash_id, start, end, period_id):
+    """The original entry-by-entry algorithm, kept as the reference result."""
+    clause = " AND period_id = ?" if period_id else ""
+    params = [start, end] + ([period_id] if period_id else [])
+    entries = conn.execute(
+        "SELECT id, date FROM journal_entries WHERE date BETWEEN date(?) AND date(?) AND status = 'posted'"
+        + clause + " ORDER BY date, id", params).fetchall()
+    sections = {"Operating": [], "Investing": [], "Financing": []}
+    totals = {"Operating": 0.0, "Investing": 0.0, "Financing": 0.0}
+    for e in entries:
+        lines = conn.execute("SELECT account_id, debit, credit FROM journal_lines WHERE entry_id = ? ORDER BY id", (e["id"],)).fetchall()
+        by_type = {}
+        for l in lines:
+            if l["account_id"] != cash_id:
+                t = conn.execute("SELECT type FROM accounts WHERE id = ?", (l["account_id"],)).fetchone()["type"]
+                by_type[t] = by_type.get(t, 0.0) + abs(l["debit"] - l["credit"])
+        inv = by_type.get("Asset", 0) + by_type.get("Contra Asset", 0)
+        fin = by_type.get("Liability", 0) + by_type.get("Equity", 0)
+        op = by_type.get("Revenue", 0) + by_type.get("Expense", 0)
+        klass = "Investing" if inv > fin and inv > op else "Financing" if fin > op else "Operating"
+        for l in lines:
+            if l["account_id"] == cash_id:
+                amt = l["debit"] - l["credit"]
+                sections[klass].append({"entry_id": e["id"], "date": e["date"], "amount": round(amt, 2)})
+                totals[klass] = round(totals[klass] + amt, 2)
+    return sections, totals
+
+
+class CashFlowTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        acc = lambda name: db.get_account_by_name(name, self.conn)['id']
+        self.cash = acc('Cash')
+        cap, svc, rent = acc("Owner's Capital"), acc('Service Revenue'), acc('Rent Expense')
+        equip, ap, ar = acc('Office Equipment'), acc('Accounts Payable'), acc('Accounts Receivable')
+        dep, accum = acc('Depreciation Expense'), acc('Accumulated Depreciation - Equipment')
+        entries = [
+            ('2025-01-01', [(self.cash, 10000, 0), (cap, 0, 10000)], 'posted'),
+            ('2025-01-03', [(equip, 4000, 0), (self.cash, 0, 1500), (ap, 0, 2500)], 'posted'),
+            ('2025-01-04', [(ar, 900, 0), (svc, 0, 900)], 'posted'),
+            ('2025-01-05', [(self.cash, 600, 0), (ar, 0, 600)], 'posted'),
+            ('2025-01-06', [(rent, 800, 0), (self.cash, 0, 800)], 'posted'),
+            ('2025-01-06', [(self.cash, 300, 0), (svc, 0, 500), (self.cash, 200, 0)], 'posted'),
+            ('2025-01-07', [(ap, 1000, 0), (self.cash, 0, 1000)], 'posted'),
+            ('2025-01-08', [(rent, 50, 0), (self.cash, 0, 50)], 'draft'),
+            ('2025-01-09', [(dep, 120, 0), (accum, 0, 120)], 'posted'),
+            ('2025-02-02', [(self.cash, 70, 0), (svc, 0, 70)], 'posted'),
+        ]
+        db.insert_journal_entries_bulk(
+            [{'date': d, 'description': f'E{i}', 'lines': lines, 'status': status, 'period_id': self.eng.current_period_id}
+             for i, (d, lines, status) in enumerate(entries)],
+            conn=self.conn)
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def test_matches_per_entry_classification(self):
+        for start, end in (('2025-01-01', '2025-01-31'), ('2025-01-04', '2025-01-06'), ('2025-01-01', '2025-12-31')):
+            cf = self.eng.generate_cash_flow(start, end)
+            sections, totals = per_entry_cash_flow(self.conn, self.cash, start, end, self.eng.current_period_id)
+            self.assertEqual(cf['sections'], sections)
+            self.assertEqual(cf['totals'], totals)
+            self.assertAlmostEqual(cf['net_change_in_cash'], sum(totals.values()))
+
+    def test_query_count_does_not_grow_with_entries(self):
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            cf = cashflow.direct_cash_flow('2025-01-01', '2025-12-31', period_id=self.eng.current_period_id, conn=self.conn)
+        finally:
+            self.conn.set_trace_callback(None)
+        self.assertEqual(len([s for s in statements if s.lstrip().upper().startswith(('SELECT', 'WITH'))]), 3)
+        self.assertEqual(sum(len(v) for v in cf['sections'].values()), 8)
+
+    def test_indirect_method_reconciles_to_cash(self):
+        direct = self.eng.generate_cash_flow('2025-01-01', '2025-01-31')
+        ind = self.eng.generate_cash_flow_indirect('2025-01-01', '2025-01-31')
+        self.assertAlmostEqual(ind['net_income'], 900 + 500 - 800 - 120)
+        self.assertAlmostEqual(ind['net_change_in_cash'], direct['net_change_in_cash'])
+        self.assertAlmostEqual(ind['cash_account_change'], direct['net_change_in_cash'])
+        operating = {it['name']: it['amount'] for it in ind['sections']['Operating']}
+        self.assertEqual(operating, {'Accumulated Depreciation - Equipment': 120.0,
+                                     'Accounts Receivable': -300.0, 'Accounts Payable': 1500.0})
+        investing = {it['name']: it['amount'] for it in ind['sections']['Investing']}
+        self.assertEqual(investing, {'Office Equipment': -4000.0})
+        financing = {it['name']: it['amount'] for it in ind['sections']['Financing']}
+        self.assertEqual(financing, {"Owner's Capital": 10000.0})
+
+    def test_indirect_method_sections_borrowings_and_working_capital(self):
+        self.conn.execute("INSERT INTO accounts(name, code, type, normal_side, is_permanent) "
+                          "VALUES ('Notes Payable', '251', 'Liability', 'Credit', 1)")
+        acc = lambda name: db.get_account_by_name(name, self.conn)['id']
+        notes, supplies, util = acc('Notes Payable'), acc('Supplies'), acc('Utilities Payable')
+        db.insert_journal_entries_bulk(
+            [{'date': '2025-01-12', 'description': d, 'lines': lines, 'period_id': self.eng.current_period_id}
+             for d, lines in (('Bank loan', [(self.cash, 5000, 0), (notes, 0, 5000)]),
+                              ('Supplies on account', [(supplies, 250, 0), (util, 0, 250)]))],
+            conn=self.conn)
+
+        ind = cashflow.indirect_cash_flow('2025-01-10', '2025-01-31', period_id=self.eng.current_period_id, conn=self.conn)
+        by_section = {s: {it['name']: it['amount'] for it in items} for s, items in ind['sections'].items()}
+        self.assertEqual(by_section['Financing'], {'Notes Payable': 5000.0})
+        self.assertEqual(by_section['Operating'], {'Supplies': -250.0, 'Utilities Payable': 250.0})
+        self.assertEqual(by_section['Investing'], {})
+        self.assertAlmostEqual(ind['net_change_in_cash'], ind['cash_account_change'])
+
+    def test_indirect_method_sections_by_code_not_name(self):
+        # Names that read like fixed assets or borrowings but are coded as working capital,
+        # and a long-term loan whose name gives no hint.
+        self.conn.executemany(
+            "INSERT INTO accounts(name, code, type, normal_side, is_permanent) VALUES (?, ?, ?, 'Debit', 1)",
+            [('Land Transport Receivable', '110', 'Asset'), ('Property Tax Prepaid', '125', 'Asset'),
+             ('Delivery Van', '160', 'Asset')])
+        self.conn.executemany(
+            "INSERT INTO accounts(name, code, type, normal_side, is_permanent) VALUES (?, ?, 'Liability', 'Credit', 1)",
+            [('Customer Bond Deposits', '207'), ('Bank of Commerce', '255')])
+        acc = lambda name: db.get_account_by_name(name, self.conn)['id']
+        transport, prepaid, van = acc('Land Transport Receivable'), acc('Property Tax Prepaid'), acc('Delivery Van')
+        deposits, bank = acc('Customer Bond Deposits'), acc('Bank of Commerce')
+        db.insert_journal_entries_bulk(
+            [{'date': '2025-01-12', 'description': d, 'lines': lines, 'period_id': self.eng.current_period_id}
+             for d, lines in (('Fare advance', [(transport, 40, 0), (self.cash, 0, 40)]),
+                              ('Prepaid tax', [(prepaid, 60, 0), (self.cash, 0, 60)]),
+                              ('Deposit received', [(self.cash, 300, 0), (deposits, 0, 300)]),
+                              ('Term loan', [(self.cash, 7000, 0), (bank, 0, 7000)]),
+                              ('Van purchase', [(van, 6500, 0), (self.cash, 0, 6500)]))],
+            conn=self.conn)
+
+        ind = cashflow.indirect_cash_flow('2025-01-10', '2025-01-31', period_id=self.eng.current_period_id, conn=self.conn)
+        by_section = {s: {it['name']: it['amount'] for it in items} for s, items in ind['sections'].items()}
+        self.assertEqual(by_section['Operating'], {'Land Transport Receivable': -40.0, 'Property Tax Prepaid': -60.0,
+                                                   'Customer Bond Deposits': 300.0})
+        self.assertEqual(by_section['Investing'], {'Delivery Van': -6500.0})
+        self.assertEqual(by_section['Financing'], {'Bank of Commerce': 7000.0})
+        self.assertAlmostEqual(ind['net_change_in_cash'], ind['cash_account_change'])
+
+    def test_contra_revenue_reduces_net_income(self):
+        self.conn.execute("INSERT INTO accounts(name, code, type, normal_side, is_permanent) "
+                          "VALUES ('Sales Returns', '499', 'Contra Revenue', 'Debit', 0)")
+        acc = lambda name: db.get_account_by_name(name, self.conn)['id']
+        returns, svc, ar = acc('Sales Returns'), acc('Service Revenue'), acc('Accounts Receivable')
+        db.insert_journal_entries_bulk(
+            [{'date': '2025-01-10', 'description': d, 'lines': lines, 'period_id': self.eng.current_period_id}
+             for d, lines in (('Cash sale', [(self.cash, 1000, 0), (svc, 0, 1000)]),
+                              ('Cash refund', [(returns, 150, 0), (self.cash, 0, 150)]),
+                              ('Credit note', [(returns, 50, 0), (ar, 0, 50)]))],
+            conn=self.conn)
+
+        ind = cashflow.indirect_cash_flow('2025-01-01', '2025-01-31', period_id=self.eng.current_period_id, conn=self.conn)
+        income = self.eng.generate_income_statement('2025-01-01', '2025-01-31')
+        self.assertAlmostEqual(ind['net_income'], 900 + 500 + 1000 - 200 - 800 - 120)
+        self.assertAlmostEqual(ind['net_income'], income['net_income'])
+        self.assertNotIn('Sales Returns', [it['name'] for s in ind['sections'].values() for it in s])
+        _, totals = per_entry_cash_flow(self.conn, self.cash, '2025-01-01', '2025-01-31', self.eng.current_period_id)
+        self.assertAlmostEqual(ind['net_change_in_cash'], sum(totals.values()))
+        self.assertAlmostEqual(ind['cash_account_change'], sum(totals.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import tempfile
+import unittest
+import os, sys
+from datetime import date
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import columnar, db
+from techfix.accounting import AccountingEngine
+
+
+class ColumnarExportTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        acc = lambda name: db.get_account_by_name(name, self.conn)['id']
+        cash, svc, rent = acc('Cash'), acc('Service Revenue'), acc('Rent Expense')
+        self.pid = self.eng.current_period_id
+        self.other = db.create_period('Next', start_date='2026-01-01', end_date='2026-12-31', conn=self.conn)
+        db.insert_journal_entries_bulk(
+            [{'date': '2025-01-03', 'description': 'Rent', 'lines': [(rent, 120.0, 0.0), (cash, 0.0, 120.0)],
+              'period_id': self.pid, 'is_adjusting': 1},
+             {'date': '2025-01-02', 'description': 'Sale', 'lines': [(cash, 500.0, 0.0), (svc, 0.0, 500.0)],
+              'period_id': self.pid},
+             {'date': '2026-02-01', 'description': 'Later', 'lines': [(cash, 70.0, 0.0), (svc, 0.0, 70.0)],
+              'period_id': self.other},
+             {'date': '2025-03-01', 'description': 'Loose', 'lines': [(cash, 5.0, 0.0), (svc, 0.0, 5.0)]}],
+            conn=self.conn)
+        # Bulk posting files period-less entries under the current period.
+        self.conn.execute("UPDATE journal_entries SET period_id = NULL WHERE description = 'Loose'")
+        self.conn.commit()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    @unittest.skipUnless(columnar.PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_partitioned_parquet_dataset_is_typed(self):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        out = self.dir / 'journal.parquet'
+        seen = []
+        result = columnar.export_journal_lines(out, batch_size=1, progress=seen.append, conn=self.conn)
+        self.assertEqual(result['rows'], 8)
+        self.assertEqual(seen[-1], 8)
+        self.assertEqual(sorted(Path(f).parent.name for f in result['files']),
+                         sorted([f'period_id={self.pid}', f'period_id={self.other}',
+                                 f'period_id={columnar.NULL_PARTITION}']))
+
+        table = ds.dataset(out, format='parquet', partitioning='hive').to_table()
+        self.assertEqual(table.num_rows, 8)
+        self.assertEqual(table.schema.field('date').type, pa.date32())
+        self.assertEqual(table.schema.field('is_adjusting').type, pa.bool_())
+        self.assertEqual(table.schema.field('debit').type, pa.float64())
+        first = ds.dataset(out / f'period_id={self.pid}', format='parquet').to_table().to_pylist()[0]
+        self.assertEqual((first['date'], first['description'], first['account_name'], first['debit']),
+                         (date(2025, 1, 2), 'Sale', 'Cash', 500.0))
+
+        # A second export replaces every partition of the first.
+        columnar.export_journal_lines(out, period_id=self.other, conn=self.conn)
+        self.assertEqual([p.name for p in out.iterdir()], [f'period_id={self.other}'])
+
+    @unittest.skipUnless(columnar.PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_single_arrow_file_keeps_the_period_column(self):
+        import pyarrow as pa
+
+        out = self.dir / 'journal.arrow'
+        result = columnar.export_journal_lines(out, partition_by_period=False, conn=self.conn)
+        self.assertEqual(result['files'], [str(out)])
+        with pa.ipc.open_file(out) as reader:
+            table = reader.read_all()
+        self.assertEqual(table.num_rows, 8)
+        self.assertEqual(table.column('period_id').null_count, 2)
+        rent = [r for r in table.to_pylist() if r['description'] == 'Rent']
+        self.assertEqual({r['account_code'] for r in rent}, {'101', '403'})
+        self.assertTrue(all(r['is_adjusting'] for r in rent))
+
+    @unittest.skipIf(columnar.PYARROW_AVAILABLE, "pyarrow installed")
+    def test_missing_pyarrow_is_reported(self):
+        with self.assertRaises(RuntimeError):
+            columnar.export_journal_lines(self.dir / 'journal.parquet', conn=self.conn)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sqlite3
+import threading
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+
+    def test_tuning_profile_applied(self):
+        conn = db.get_connection()
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0].lower(), 'wal')
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+        finally:
+            conn.close()
+
+    def test_reuse_per_thread_and_nested_borrows(self):
+        outer = db.get_connection()
+        inner = db.get_connection()
+        self.assertIsNot(outer, inner)
+        self.assertEqual(db.connection_stats()['borrowed'], 2)
+        inner.close()
+        inner.close()  # double close is harmless
+        self.assertIs(db.get_connection(), inner)
+
+        seen = []
+        t = threading.Thread(target=lambda: seen.append(db.get_connection()))
+        t.start()
+        t.join()
+        self.assertIsNot(seen[0], inner)
+        seen[0].close()
+        inner.close()
+        outer.close()
+        self.assertEqual(db.connection_stats()['borrowed'], 0)
+
+    def test_release_discards_uncommitted_work(self):
+        conn = db.get_connection()
+        conn.execute("INSERT INTO accounts(name, code, type, normal_side) VALUES ('X', '999', 'Asset', 'Debit')")
+        conn.close()
+        conn = db.get_connection()
+        try:
+            self.assertFalse(conn.in_transaction)
+            self.assertIsNone(conn.execute("SELECT id FROM accounts WHERE code='999'").fetchone())
+        finally:
+            conn.close()
+
+    def test_max_open_blocks_until_release(self):
+        pool = db.ConnectionPool(max_open=2, timeout=5)
+        a, b = pool.acquire(), pool.acquire()
+        got = []
+        t = threading.Thread(target=lambda: got.append(pool.acquire()))
+        t.start()
+        t.join(0.2)
+        self.assertEqual(got, [])
+        a.close()  # idle for this thread; the waiter evicts it and opens its own
+        t.join(5)
+        self.assertEqual(len(got), 1)
+        self.assertLessEqual(pool.stats()['open'], 2)
+        self.assertEqual(pool.stats()['waits'], 1)
+        got[0].close()
+        b.close()
+        pool.close_idle()
+
+    def test_max_open_times_out(self):
+        pool = db.ConnectionPool(max_open=1, timeout=5)
+        conn = pool.acquire()
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                pool.acquire(timeout=0.05)
+        finally:
+            conn.close()
+        pool.acquire(timeout=0.05).close()
+        self.assertEqual(pool.stats()['created'], 1)
+        pool.close_idle()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import csv
+import gzip
+import tempfile
+import unittest
+import os, sys
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openpyxl import load_workbook
+
+from techfix import db, export
+from techfix.accounting import AccountingEngine
+
+JOURNAL_HEADERS = ['entry_id', 'date', 'description', 'code', 'name', 'debit', 'credit']
+
+
+class StreamingExportTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        cash = db.get_account_by_name('Cash', self.conn)['id']
+        svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        db.insert_journal_entries_bulk(
+            [{'date': f'2025-01-{i % 28 + 1:02d}', 'description': f'Sale {i}',
+              'lines': [(cash, float(i), 0.0), (svc, 0.0, float(i))],
+              'period_id': self.eng.current_period_id}
+             for i in range(1, 26)],
+            conn=self.conn)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def test_iterators_match_the_fetch_functions(self):
+        pid = self.eng.current_period_id
+        as_tuples = lambda rows: [tuple(r) for r in rows]
+        self.assertEqual(as_tuples(db.iter_journal(pid, batch_size=7, conn=self.conn)),
+                         as_tuples(db.fetch_journal(pid, conn=self.conn)))
+        self.assertEqual(as_tuples(db.iter_ledger(None, batch_size=3, conn=self.conn)),
+                         as_tuples(db.fetch_ledger(None, conn=self.conn)))
+
+    def test_csv_streams_with_totals_and_optional_gzip(self):
+        seen = []
+        plain = self.dir / 'journal.csv'
+        count = export.write_csv(db.iter_journal(conn=self.conn), JOURNAL_HEADERS, plain,
+                                 numeric=('debit', 'credit'), totals=('debit', 'credit'), progress=seen.append)
+        self.assertEqual(count, 50)
+        self.assertEqual(seen[-1], 50)
+        with open(plain, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], JOURNAL_HEADERS)
+        self.assertEqual(rows[-1], ['', '', '', '', 'Totals:', '325.0', '325.0'])
+
+        zipped = self.dir / 'journal.csv.gz'
+        db.export_rows_to_csv(db.iter_journal(conn=self.conn), JOURNAL_HEADERS, zipped)
+        with gzip.open(zipped, 'rt', newline='') as f:
+            self.assertEqual(len(list(csv.reader(f))), 51)
+
+    def test_excel_is_written_through_a_write_only_sheet(self):
+        path = self.dir / 'ledger.xlsx'
+        headers = ['account_id', 'code', 'name', 'date', 'description', 'debit', 'credit']
+        count = export.write_excel(db.iter_ledger(conn=self.conn), headers, path, sheet_name='Ledger',
+                                   numeric=('debit', 'credit'), totals=('debit', 'credit'))
+        self.assertEqual(count, 50)
+        ws = load_workbook(path)['Ledger']
+        values = list(ws.values)
+        self.assertEqual(list(values[0]), headers)
+        self.assertTrue(ws['A1'].font.bold)
+        self.assertEqual(values[-1][4:], ('Totals:', 325, 325))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import tempfile
+import threading
+import unittest
+import os, sys
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openpyxl import load_workbook
+
+from techfix import db, export_all
+from techfix.accounting import AccountingEngine
+
+
+class Stop(Exception):
+    pass
+
+
+class ExportAllPipelineTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        acc = lambda name: db.get_account_by_name(name, self.conn)['id']
+        cash, svc, rent = acc('Cash'), acc('Service Revenue'), acc('Rent Expense')
+        self.pid = self.eng.current_period_id
+        db.insert_journal_entries_bulk(
+            [{'date': '2025-01-02', 'description': 'Sale', 'lines': [(cash, 500.0, 0.0), (svc, 0.0, 500.0)], 'period_id': self.pid},
+             {'date': '2025-01-03', 'description': 'Rent', 'lines': [(rent, 120.0, 0.0), (cash, 0.0, 120.0)], 'period_id': self.pid}],
+            conn=self.conn)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / 'all.xlsx')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def test_sheets_are_built_concurrently_and_assembled_in_order(self):
+        events = []
+        progress = lambda stage, rows, finished: events.append((stage, rows, finished, threading.current_thread().name))
+        export_all.write_all_workbook(self.path, period_id=self.pid, progress=progress,
+                                      start_date='2025-01-01', end_date='2025-01-31')
+        wb = load_workbook(self.path)
+        self.assertEqual(wb.sheetnames, ['Journal', 'Ledger', 'Trial Balance', 'Post-Closing TB', 'Worksheet',
+                                         'Income Statement', 'Balance Sheet', 'Cash Flow'])
+        finished = {stage: rows for stage, rows, done, _ in events if done}
+        self.assertEqual(finished['Journal'], 4)
+        self.assertEqual(finished['Ledger'], 4)
+        self.assertEqual(len(finished), 8)
+        self.assertTrue(all(name.startswith('techfix-export') for *_, name in events))
+
+        journal = list(wb['Journal'].values)
+        self.assertEqual(journal[-1], (None, None, None, None, 'Totals:', '=SUM(F2:F5)', '=SUM(G2:G5)'))
+        tb = {row[0]: row for row in wb['Trial Balance'].iter_rows(min_row=3, values_only=True)}
+        self.assertEqual(tb['101'][2:], (380, 0, 380, 0))
+        worksheet = list(wb['Worksheet'].values)
+        self.assertEqual(worksheet[-1][0], 'TOTAL')
+        self.assertIn(('INCOME STATEMENT', None, None, None, None, None, None, None, 0, 380, None, None), worksheet)
+
+    def test_statement_sheets_come_from_the_engine_reports(self):
+        gui_path = str(Path(self.tmp.name) / 'gui.xlsx')
+        export_all.write_all_workbook(self.path, period_id=self.pid, start_date='2025-01-01', end_date='2025-01-31')
+        export_all.write_all_workbook(gui_path, period_id=self.pid, engine=self.eng,
+                                      start_date='2025-01-01', end_date='2025-01-31')
+        cli, gui = load_workbook(self.path), load_workbook(gui_path)
+        for title in ('Income Statement', 'Balance Sheet', 'Cash Flow'):
+            self.assertEqual(list(cli[title].values), list(gui[title].values))
+
+        totals = lambda title: {r[1]: r[2] for r in cli[title].iter_rows(values_only=True) if len(r) > 2 and r[1]}
+        income = totals('Income Statement')
+        self.assertEqual((income['Total Revenue'], income['Total Expenses'], income['Net Income']), (500, 120, 380))
+        self.assertEqual(income['Service Revenue'], 500)
+        self.assertEqual(totals('Balance Sheet')['Cash'], 380)
+        cash_flow = totals('Cash Flow')
+        self.assertEqual((cash_flow['Total Operating'], cash_flow['Net Change in Cash']), (380, 380))
+
+    def test_cancelling_stops_every_stage_and_writes_nothing(self):
+        calls = []
+
+        def check():
+            calls.append(1)
+            if len(calls) > 2:
+                raise Stop()
+
+        with self.assertRaises(Stop):
+            export_all.write_all_workbook(self.path, period_id=self.pid, check=check, max_workers=2)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_balance_to_columns_follows_the_normal_side(self):
+        row = lambda **kw: dict({'type': 'Asset', 'normal_side': 'debit', 'net_debit': 0, 'net_credit': 0}, **kw)
+        self.assertEqual(export_all.balance_to_columns(row(net_debit=50)), (50.0, 0.0))
+        self.assertEqual(export_all.balance_to_columns(row(net_credit=20)), (0.0, 20.0))
+        self.assertEqual(export_all.balance_to_columns(row(type='Contra Asset', normal_side='credit', net_credit=9)),
+                         (0.0, 9.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
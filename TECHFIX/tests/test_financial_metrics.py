@@ -0,0 +1,118 @@
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db, analytics
+from techfix.accounting import AccountingEngine
+
+
+def per_metric_scans(conn, period_id):
+    """The original one-scan-per-metric queries, kept as the reference result."""
+    clause = " AND (je.period_id = ? OR je.period_id IS NULL)" if period_id else ""
+    params = [period_id] if period_id else []
+
+    def total(expr, types, statuses):
+        sql = (f"SELECT COALESCE(SUM({expr}), 0) AS t FROM journal_lines jl "
+               "JOIN journal_entries je ON jl.entry_id = je.id JOIN accounts a ON jl.account_id = a.id "
+               f"WHERE a.type IN ({','.join('?' * len(types))}) AND je.status IN ({','.join('?' * len(statuses))})" + clause)
+        return float(conn.execute(sql, list(types) + list(statuses) + params).fetchone()['t'])
+
+    both = ('posted', 'draft')
+    # Revenue (credit - debit) less contra revenue (debit - credit).
+    revenue = total("jl.credit - jl.debit", ('Revenue', 'Contra Revenue'), both)
+    expenses = total("jl.debit - jl.credit", ('Expense',), both)
+    count_clause = " AND (period_id = ? OR period_id IS NULL)" if period_id else ""
+    return {
+        'total_revenue': revenue,
+        'total_expenses': expenses,
+        'net_income': revenue - expenses,
+        'total_assets': total("CASE WHEN a.type = 'Asset' THEN jl.debit - jl.credit ELSE jl.credit - jl.debit END",
+                              ('Asset', 'Contra Asset'), ('posted',)),
+        'total_liabilities': total("jl.credit - jl.debit", ('Liability',), ('posted',)),
+        'total_equity': total("jl.credit - jl.debit", ('Equity',), ('posted',)),
+        'transaction_count': conn.execute(
+            "SELECT COUNT(*) AS n FROM journal_entries WHERE status IN ('posted', 'draft')" + count_clause,
+            params).fetchone()['n'],
+    }
+
+
+class FinancialMetricsTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        analytics.clear_metrics_cache()
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        acc = lambda name: db.get_account_by_name(name, self.conn)['id']
+        self.cash, self.svc, self.rent = acc('Cash'), acc('Service Revenue'), acc('Rent Expense')
+        cap, loan, accum = acc("Owner's Capital"), acc('Accounts Payable'), acc('Accumulated Depreciation - Equipment')
+        dep = acc('Depreciation Expense')
+        self.pid = self.eng.current_period_id
+        other = db.create_period('Next', start_date='2026-01-01', end_date='2026-12-31', conn=self.conn)
+        entries = [
+            ('2025-01-01', [(self.cash, 5000, 0), (cap, 0, 5000)], 'posted', self.pid),
+            ('2025-01-02', [(self.cash, 800, 0), (self.svc, 0, 800)], 'posted', self.pid),
+            ('2025-01-03', [(self.rent, 300, 0), (loan, 0, 300)], 'draft', self.pid),
+            ('2025-01-04', [(dep, 90, 0), (accum, 0, 90)], 'posted', None),
+            ('2026-01-05', [(self.cash, 50, 0), (self.svc, 0, 50)], 'posted', other),
+        ]
+        db.insert_journal_entries_bulk(
+            [{'date': d, 'description': f'E{i}', 'lines': lines, 'status': status, 'period_id': pid}
+             for i, (d, lines, status, pid) in enumerate(entries)],
+            conn=self.conn)
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _values(metrics):
+        return {k: v for k, v in metrics.items() if k != 'timings'}
+
+    def test_matches_per_metric_queries(self):
+        for pid in (self.pid, None):
+            metrics = analytics.get_financial_metrics(pid, use_cache=False, conn=self.conn)
+            expected = per_metric_scans(self.conn, pid)
+            self.assertEqual(self._values(metrics).keys(), expected.keys())
+            for name, value in expected.items():
+                self.assertAlmostEqual(metrics[name], value, msg=name)
+            self.assertEqual(set(metrics['timings']), {'cached', 'balances', 'transaction_count', 'total'})
+        self.assertEqual(analytics.get_financial_metrics(self.pid, conn=self.conn)['transaction_count'], 4)
+
+    def test_snapshot_is_reused_until_the_ledger_changes(self):
+        first = analytics.get_financial_metrics(self.pid, conn=self.conn)
+        self.assertFalse(first['timings']['cached'])
+
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            again = analytics.get_financial_metrics(self.pid, conn=self.conn)
+        finally:
+            self.conn.set_trace_callback(None)
+        self.assertTrue(again['timings']['cached'])
+        self.assertEqual(self._values(again), self._values(first))
+        self.assertEqual(len(statements), 1)  # just the ledger version
+
+        # A write through another connection invalidates the snapshot.
+        other = db.get_connection()
+        try:
+            db.insert_journal_entry('2025-01-06', 'Late sale', [(self.cash, 25.0, 0.0), (self.svc, 0.0, 25.0)],
+                                    period_id=self.pid, conn=other)
+        finally:
+            other.close()
+        fresh = analytics.get_financial_metrics(self.pid, conn=self.conn)
+        self.assertFalse(fresh['timings']['cached'])
+        self.assertAlmostEqual(fresh['total_revenue'], first['total_revenue'] + 25.0)
+        self.assertEqual(fresh['transaction_count'], first['transaction_count'] + 1)
+
+        draft = self.conn.execute("SELECT id FROM journal_entries WHERE status = 'draft'").fetchone()['id']
+        self.eng.set_entry_status(draft, 'posted')
+        posted = analytics.get_financial_metrics(self.pid, conn=self.conn)
+        self.assertFalse(posted['timings']['cached'])
+        self.assertAlmostEqual(posted['total_liabilities'], fresh['total_liabilities'] + 300.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
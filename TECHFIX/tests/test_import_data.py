@@ -0,0 +1,115 @@
+import csv
+import tempfile
+import unittest
+import os, sys
+from datetime import datetime
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db, import_data
+from techfix.tasks import TaskCancelled
+
+HEADER = ['Date', 'Description', 'DebitAccount', 'DebitAmount', 'CreditAccount', 'CreditAmount']
+
+
+class StreamingImportTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.conn = db.get_connection()
+        db.seed_chart_of_accounts(self.conn)
+        self.cash = db.get_account_by_name('Cash', self.conn)
+        self.revenue = db.get_account_by_name('Service Revenue', self.conn)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def write_csv(self, rows, name='tx.csv'):
+        path = self.dir / name
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows([HEADER, *rows])
+        return path
+
+    def entry_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0]
+
+    def test_csv_is_posted_in_chunks_and_rejects_are_written(self):
+        code, name = self.cash['code'], self.revenue['name']
+        rows = [['2025-01-%02d' % (i % 28 + 1), f'Sale {i}', code, '1,250.00', name, '1250'] for i in range(23)]
+        rows[4] = ['2025-02-30', 'Bad date', code, '10', name, '10']
+        rows[9] = ['2025-01-05', 'Unknown', 'No Such Account', '10', name, '10']
+        rows[15] = ['2025-01-05', 'Unbalanced', code, '10', name, '12']
+        rows.insert(12, ['', '', '', '', '', ''])
+        path = self.write_csv(rows)
+        seen = []
+
+        success, errors, messages = import_data.import_transactions_from_csv(
+            path, chunk_rows=5, progress=lambda read, done: seen.append((read, done)), conn=self.conn)
+
+        self.assertEqual((success, errors), (20, 3))
+        self.assertEqual(self.entry_count(), 20)
+        self.assertEqual(seen[-1], (24, 20))
+        self.assertEqual(len(seen), 5)
+        self.assertTrue(messages[0].startswith('Row 6: Invalid date format'))
+        self.assertIn('Debit account not found: No Such Account', messages[1])
+        self.assertTrue(messages[2].startswith('Row 18:'))  # after the blank row 14
+        with open(import_data.default_reject_path(path), newline='', encoding='utf-8') as f:
+            rejects = list(csv.reader(f))
+        self.assertEqual(rejects[0], ['Row', 'Error', *HEADER])
+        self.assertEqual([r[0] for r in rejects[1:]], ['6', '11', '18'])
+        self.assertEqual(rejects[2][2:], rows[9])
+
+        lines = self.conn.execute(
+            "SELECT account_id, SUM(debit), SUM(credit) FROM journal_lines GROUP BY account_id ORDER BY account_id"
+        ).fetchall()
+        self.assertEqual({tuple(r) for r in lines},
+                         {(self.cash['id'], 25000.0, 0.0), (self.revenue['id'], 0.0, 25000.0)})
+
+    def test_xlsx_is_read_without_pandas(self):
+        from openpyxl import Workbook
+        wb = Workbook()
+        ws = wb.active
+        ws.append(HEADER)
+        ws.append([datetime(2025, 3, 1), 'Cash sale', self.cash['name'], 99.5, self.revenue['code'], 99.5])
+        ws.append(['2025-03-02', 'Typed date', self.cash['name'], '12', self.revenue['name'], None])
+        ws.append(['2025-03-03', 'Negative', self.cash['name'], -5, self.revenue['name'], -5])
+        path = self.dir / 'tx.xlsx'
+        wb.save(path)
+        reject_path = self.dir / 'out' / 'rejected.csv'
+        reject_path.parent.mkdir()
+
+        success, errors, messages = import_data.import_transactions_from_excel(
+            path, reject_path=reject_path, conn=self.conn)
+
+        self.assertEqual((success, errors), (1, 2), messages)
+        row = self.conn.execute("SELECT date, description, status FROM journal_entries").fetchone()
+        self.assertEqual(tuple(row), ('2025-03-01', 'Cash sale', 'draft'))
+        self.assertEqual(messages[1], 'Row 4: Invalid amounts')
+        self.assertTrue(reject_path.exists())
+        self.assertFalse(import_data.default_reject_path(path).exists())
+
+    def test_missing_columns_and_cancel(self):
+        path = self.dir / 'short.csv'
+        path.write_text('Date,Description\n2025-01-01,x\n', encoding='utf-8')
+        self.assertEqual(import_data.import_transactions(path, conn=self.conn),
+                         (0, 0, ['Missing required columns: DebitAccount, DebitAmount, CreditAccount, CreditAmount']))
+
+        rows = [['2025-01-01', f'Sale {i}', self.cash['code'], '5', self.revenue['code'], '5'] for i in range(10)]
+        path = self.write_csv(rows)
+        calls = []
+
+        def check():
+            calls.append(1)
+            if len(calls) > 2:
+                raise TaskCancelled('import')
+
+        with self.assertRaises(TaskCancelled):
+            import_data.import_transactions(path, chunk_rows=4, check=check, conn=self.conn)
+        self.assertEqual(self.entry_count(), 8)  # chunks already posted stay
+        self.assertFalse(import_data.default_reject_path(path).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import gzip
+import json
+import tempfile
+import unittest
+import os, sys
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import backup, db
+
+
+class NdjsonTransferTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.conn = db.get_connection()
+        db.seed_chart_of_accounts(self.conn)
+        acc = lambda name: db.get_account_by_name(name, self.conn)['id']
+        cash, svc, rent = acc('Cash'), acc('Service Revenue'), acc('Rent Expense')
+        db.insert_journal_entries_bulk(
+            [{'date': f'2025-01-{d:02d}', 'description': f'Sale {d}', 'lines': [(cash, 100.0 + d, 0.0), (svc, 0.0, 100.0 + d)]}
+             for d in range(1, 21)]
+            + [{'date': '2025-01-25', 'description': 'Rent', 'lines': [(rent, 40.0, 0.0), (cash, 0.0, 40.0)]}],
+            conn=self.conn)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS blobs (id INTEGER PRIMARY KEY, data BLOB)")
+        self.conn.execute("INSERT INTO blobs (data) VALUES (?)", (b'\x00\xffraw',))
+        self.conn.commit()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.conn.execute("DROP TABLE IF EXISTS blobs")
+        self.conn.commit()
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def snapshot(self):
+        return {
+            'lines': self.conn.execute("SELECT entry_id, account_id, debit, credit FROM journal_lines ORDER BY id").fetchall(),
+            'rollups': self.conn.execute(
+                "SELECT account_id, SUM(debit_total), SUM(credit_total) FROM account_period_balances GROUP BY 1 ORDER BY 1"
+            ).fetchall(),
+            'blob': self.conn.execute("SELECT data FROM blobs").fetchall(),
+        }
+
+    def test_round_trip_through_gzipped_ndjson(self):
+        before = [tuple(r) for rows in self.snapshot().values() for r in rows]
+        path = self.dir / 'data.ndjson.gz'
+        seen = []
+        self.assertTrue(backup.export_data_to_json(path, batch_size=7, progress=lambda t, n: seen.append((t, n))))
+        self.assertIn(('journal_lines', 42), seen)
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            items = [json.loads(line) for line in f]
+        self.assertEqual(items[0]['format'], backup.NDJSON_FORMAT)
+        order = [i['table'] for i in items if isinstance(i, dict) and 'table' in i]
+        self.assertLess(order.index('accounts'), order.index('journal_lines'))
+        self.assertLess(order.index('journal_entries'), order.index('journal_lines'))
+        self.assertFalse(set(order) & backup.DERIVED_TABLES)
+        self.assertFalse([t for t in order if t.startswith('search_index')])
+
+        # Into an empty database of the same schema.
+        self.conn.execute("DELETE FROM journal_lines")
+        self.conn.execute("DELETE FROM journal_entries")
+        self.conn.execute("DELETE FROM blobs")
+        self.conn.commit()
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM account_period_balances WHERE debit_total != 0").fetchone()[0], 0)
+        version = db.get_ledger_version(self.conn)
+
+        self.assertTrue(backup.import_data_from_json(path, batch_size=5))
+        self.assertEqual([tuple(r) for rows in self.snapshot().values() for r in rows], before)
+        self.assertNotEqual(db.get_ledger_version(self.conn), version)
+        hits = self.conn.execute("SELECT COUNT(*) FROM search_index WHERE search_index MATCH 'Rent'").fetchone()[0]
+        self.assertGreater(hits, 0)
+
+    def test_reimport_updates_in_place_without_cascading(self):
+        path = self.dir / 'entries.ndjson'
+        self.assertTrue(backup.export_data_to_json(path, tables=['journal_entries']))
+        self.conn.execute("UPDATE journal_entries SET description = 'Edited' WHERE description = 'Rent'")
+        self.conn.commit()
+        lines = self.conn.execute("SELECT COUNT(*) FROM journal_lines").fetchone()[0]
+
+        self.assertTrue(backup.import_data_from_json(path))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM journal_lines").fetchone()[0], lines)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM journal_entries WHERE description = 'Rent'").fetchone()[0], 1)
+
+    def test_legacy_dump_and_dropped_columns(self):
+        path = self.dir / 'old.json'
+        path.write_text(json.dumps({
+            'customers': [{'id': 900, 'code': 'C900', 'name': 'Old Customer', 'retired_column': 'x'}],
+            'account_period_balances': [{'account_id': 1, 'debit_total': 1e9}],
+        }, indent=2), encoding='utf-8')
+        self.assertTrue(backup.import_data_from_json(path))
+        self.assertEqual(self.conn.execute("SELECT name FROM customers WHERE id = 900").fetchone()[0], 'Old Customer')
+        self.assertLess(self.conn.execute("SELECT MAX(debit_total) FROM account_period_balances").fetchone()[0], 1e9)
+
+    def test_failed_import_changes_nothing(self):
+        path = self.dir / 'bad.ndjson'
+        lines = [
+            {'format': backup.NDJSON_FORMAT, 'version': backup.NDJSON_VERSION},
+            {'table': 'customers', 'columns': ['id', 'code', 'name']},
+            [901, 'C901', 'Fine'],
+            {'table': 'journal_lines', 'columns': ['id', 'entry_id', 'account_id', 'debit', 'credit']},
+            [99999, 424242, 1, 1.0, 0.0],  # entry 424242 does not exist
+        ]
+        path.write_text('\n'.join(json.dumps(x) for x in lines) + '\n', encoding='utf-8')
+        self.assertFalse(backup.import_data_from_json(path))
+        self.assertIsNone(self.conn.execute("SELECT 1 FROM customers WHERE id = 901").fetchone())
+
+    def test_unique_clash_on_other_column_fails_import(self):
+        cash = db.get_account_by_name('Cash', self.conn)
+        path = self.dir / 'clash.ndjson'
+        lines = [
+            {'format': backup.NDJSON_FORMAT, 'version': backup.NDJSON_VERSION},
+            {'table': 'accounts', 'columns': ['id', 'name', 'code', 'type', 'normal_side']},
+            [5000, 'Cash on Hand', cash['code'], 'Asset', 'Debit'],  # same code, different id
+        ]
+        path.write_text('\n'.join(json.dumps(x) for x in lines) + '\n', encoding='utf-8')
+        self.assertFalse(backup.import_data_from_json(path))
+        row = db.get_account_by_name('Cash', self.conn)
+        self.assertEqual((row['id'], row['code']), (cash['id'], cash['code']))
+        self.assertIsNone(self.conn.execute("SELECT 1 FROM accounts WHERE id = 5000").fetchone())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db
+from techfix.accounting import AccountingEngine
+
+
+class KeysetPaginationTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        self.pid = self.eng.current_period_id
+        self.cash = db.get_account_by_name('Cash', self.conn)['id']
+        self.svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        self.rent = db.get_account_by_name('Rent Expense', self.conn)['id']
+        entries = []
+        for i in range(40):
+            day = f"2025-0{1 + i % 3}-{10 + i % 7:02d}"
+            if i % 4 == 0:
+                lines = [(self.rent, 30.0, 0.0), (self.cash, 0.0, 20.0), (self.svc, 0.0, 10.0)]
+            else:
+                lines = [(self.cash, 10.0 + i, 0.0), (self.svc, 0.0, 10.0 + i)]
+            entries.append({'date': day, 'description': f"E{i}", 'lines': lines,
+                            'status': 'draft' if i % 9 == 0 else 'posted', 'period_id': self.pid})
+        db.insert_journal_entries_bulk(entries, conn=self.conn)
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def _walk(self, fetch, **kw):
+        pages, cursor = [], None
+        while True:
+            rows, cursor = fetch(conn=self.conn, after=cursor, **kw)
+            pages.append(rows)
+            if cursor is None:
+                return pages
+
+    def test_journal_pages_match_full_fetch_and_keep_entries_whole(self):
+        pages = self._walk(db.fetch_journal_page, period_id=self.pid, page_size=5)
+        self.assertGreater(len(pages), 5)
+        walked = [r['line_id'] for page in pages for r in page]
+        self.assertEqual(walked, [r['line_id'] for r in db.fetch_journal(self.pid, conn=self.conn)])
+        for before, after in zip(pages, pages[1:]):
+            self.assertNotEqual(before[-1]['entry_id'], after[0]['entry_id'])
+
+    def test_journal_filters_run_in_sql(self):
+        full = db.fetch_journal(self.pid, conn=self.conn)
+        pages = self._walk(db.fetch_journal_page, period_id=self.pid, account_id=self.cash,
+                           date_from='2025-02-01', date_to='2025-03-12', status='posted', page_size=3)
+        status = {r['id']: r['status'] for r in self.conn.execute("SELECT id, status FROM journal_entries")}
+        expected = [r['line_id'] for r in full
+                    if r['code'] == '101' and '2025-02-01' <= r['date'] <= '2025-03-12'
+                    and status[r['entry_id']] == 'posted']
+        self.assertTrue(expected)
+        self.assertEqual([r['line_id'] for page in pages for r in page], expected)
+
+    def test_ledger_pages_match_full_fetch(self):
+        full = [(r['code'], r['date'], r['debit'], r['credit']) for r in db.fetch_ledger(self.pid, conn=self.conn)]
+        for size in (1, 7, 500):
+            pages = self._walk(db.fetch_ledger_page, period_id=self.pid, page_size=size)
+            walked = [(r['code'], r['date'], r['debit'], r['credit']) for page in pages for r in page]
+            self.assertEqual(walked, full)
+        pages = self._walk(db.fetch_ledger_page, period_id=self.pid, account_id=self.rent, page_size=4)
+        self.assertEqual({r['account_id'] for page in pages for r in page}, {self.rent})
+
+    def test_running_balances_carry_across_pages(self):
+        # Earlier activity outside the period counts toward the opening balance.
+        db.insert_journal_entry('2024-12-31', 'Prior', [(self.cash, 1000.0, 0.0), (self.svc, 0.0, 1000.0)],
+                                conn=self.conn)
+        expected, balances = [], {}
+        for r in db.fetch_ledger(conn=self.conn):
+            balances[r['account_id']] = balances.get(r['account_id'], 0.0) + r['debit'] - r['credit']
+            expected.append(round(balances[r['account_id']], 2))
+        for size in (1, 4, 500):
+            walked = [r['running_balance'] for r in db.iter_ledger_rows(page_size=size, conn=self.conn)]
+            self.assertEqual(walked, expected)
+        rows, _ = db.fetch_ledger_page(account_id=self.cash, date_from='2025-02-01', page_size=1, conn=self.conn)
+        before = sum(r['debit'] - r['credit'] for r in db.fetch_ledger(conn=self.conn)
+                     if r['account_id'] == self.cash and r['date'] < '2025-02-01')
+        self.assertAlmostEqual(rows[0]['running_balance'], before + rows[0]['debit'] - rows[0]['credit'], places=2)
+
+    def test_last_page_has_no_cursor(self):
+        rows, cursor = db.fetch_journal_page(self.pid, page_size=10_000, conn=self.conn)
+        self.assertIsNone(cursor)
+        rows, cursor = db.fetch_ledger_page(self.pid, date_from='2030-01-01', conn=self.conn)
+        self.assertEqual((rows, cursor), ([], None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from datetime import date
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db
+from techfix.accounting import AccountingEngine
+
+
+class PeriodBalancesTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        self.cash = db.get_account_by_name('Cash', self.conn)['id']
+        self.svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        self.rent = db.get_account_by_name('Rent Expense', self.conn)['id']
+        self.d = date.today().isoformat()
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def _scan(self, **kw):
+        args = dict(from_date=None, up_to_date=None, include_temporary=True, period_id=None,
+                    exclude_closing=False, exclude_adjusting=False)
+        args.update(kw)
+        return [tuple(r) for r in db._trial_balance_from_lines(self.conn, **args)]
+
+    def _rollup(self, **kw):
+        args = dict(from_date=None, up_to_date=None, include_temporary=True, period_id=None,
+                    exclude_closing=False, exclude_adjusting=False)
+        args.update(kw)
+        rows = db._trial_balance_from_balances(self.conn, **args)
+        return None if rows is None else [tuple(r) for r in rows]
+
+    def test_balances_follow_insert_delete_and_status_change(self):
+        pid = self.eng.current_period_id
+        e1 = db.insert_journal_entry(self.d, 'Revenue', [(self.cash, 500.0, 0.0), (self.svc, 0.0, 500.0)], conn=self.conn)
+        db.insert_journal_entry(self.d, 'Rent', [(self.rent, 200.0, 0.0), (self.cash, 0.0, 200.0)], is_adjusting=1, conn=self.conn)
+        db.insert_journal_entry(self.d, 'Draft', [(self.rent, 50.0, 0.0), (self.cash, 0.0, 50.0)], status='draft', conn=self.conn)
+        for kw in ({}, {'period_id': pid}, {'up_to_date': self.d, 'period_id': pid}, {'exclude_adjusting': True}):
+            self.assertEqual(self._rollup(**kw), self._scan(**kw))
+
+        self.conn.execute("UPDATE journal_entries SET status='posted' WHERE status='draft'")
+        self.conn.execute("DELETE FROM journal_entries WHERE id=?", (e1,))
+        self.conn.commit()
+        self.assertEqual(self._rollup(period_id=pid), self._scan(period_id=pid))
+        rows = {r['account_id']: r for r in db.compute_trial_balance(period_id=pid, conn=self.conn)}
+        self.assertAlmostEqual(rows[self.cash]['net_credit'], 250.0, places=2)
+
+    def test_date_inside_activity_falls_back_to_scan(self):
+        db.insert_journal_entry('2020-01-05', 'Old', [(self.cash, 10.0, 0.0), (self.svc, 0.0, 10.0)], conn=self.conn)
+        db.insert_journal_entry('2020-02-05', 'New', [(self.cash, 20.0, 0.0), (self.svc, 0.0, 20.0)], conn=self.conn)
+        self.assertIsNone(self._rollup(up_to_date='2020-01-31'))
+        rows = {r['account_id']: r for r in db.compute_trial_balance(up_to_date='2020-01-31', conn=self.conn)}
+        self.assertAlmostEqual(rows[self.cash]['net_debit'], 10.0, places=2)
+
+    def test_rebuild_matches_incremental(self):
+        db.insert_journal_entry(self.d, 'Revenue', [(self.cash, 75.0, 0.0), (self.svc, 0.0, 75.0)], conn=self.conn)
+        before = [tuple(r) for r in self.conn.execute("SELECT * FROM account_period_balances ORDER BY 1, 2, 3, 4, 5, 6")]
+        db.rebuild_account_period_balances(conn=self.conn)
+        after = [tuple(r) for r in self.conn.execute("SELECT * FROM account_period_balances ORDER BY 1, 2, 3, 4, 5, 6")]
+        self.assertEqual(before, after)
+
+    def test_daily_prefix_sums_match_scan_for_date_ranges(self):
+        db.insert_journal_entry('2020-01-05', 'A', [(self.cash, 10.0, 0.0), (self.svc, 0.0, 10.0)], conn=self.conn)
+        e2 = db.insert_journal_entry('2020-01-20', 'B', [(self.cash, 20.0, 0.0), (self.svc, 0.0, 20.0)], conn=self.conn)
+        db.insert_journal_entry('2020-02-05', 'C', [(self.rent, 5.0, 0.0), (self.cash, 0.0, 5.0)], conn=self.conn)
+        self.conn.execute("UPDATE journal_entries SET date='2020-01-02' WHERE id=?", (e2,))
+        self.conn.commit()
+        for kw in ({'up_to_date': '2020-01-10'}, {'from_date': '2020-01-03', 'up_to_date': '2020-02-01'},
+                   {'from_date': '2020-01-06'}):
+            args = dict(from_date=None, up_to_date=None, include_temporary=True, period_id=None,
+                        exclude_closing=False, exclude_adjusting=False)
+            args.update(kw)
+            daily = [tuple(r) for r in db._trial_balance_from_daily(self.conn, **args)]
+            self.assertEqual(daily, self._scan(**kw))
+
+        before = [tuple(r) for r in self.conn.execute("SELECT * FROM account_daily_balances ORDER BY 1, 2, 3, 4, 5, 6, 7")]
+        db.rebuild_account_daily_balances(conn=self.conn)
+        after = [tuple(r) for r in self.conn.execute("SELECT * FROM account_daily_balances ORDER BY 1, 2, 3, 4, 5, 6, 7")]
+        self.assertEqual(before, after)
+
+    def test_revenue_trend_reads_daily_rollups(self):
+        from techfix import analytics
+        db.insert_journal_entry(self.d, 'Revenue', [(self.cash, 40.0, 0.0), (self.svc, 0.0, 40.0)], conn=self.conn)
+        trend = analytics.get_revenue_trend(7, conn=self.conn)
+        self.assertEqual(trend, [{'date': self.d, 'revenue': 40.0}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db
+from techfix.accounting import AccountingEngine, JournalLine
+
+
+class PostingEventTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        self.cash = db.get_account_by_name('Cash', self.conn)['id']
+        self.svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        self.rent = db.get_account_by_name('Rent Expense', self.conn)['id']
+        self.events = []
+        self.eng.subscribe(self.events.append)
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def _sale(self, day, amount, **kw):
+        return self.eng.record_entry(
+            f"2025-01-{day:02d}", f"Sale {amount}",
+            [JournalLine(self.cash, debit=amount), JournalLine(self.svc, credit=amount)], **kw)
+
+    @staticmethod
+    def _balances(rows):
+        return {r['account_id']: (round(float(r['net_debit']), 2), round(float(r['net_credit']), 2))
+                for r in rows if r['net_debit'] or r['net_credit']}
+
+    def test_engine_reports_each_change(self):
+        eid = self._sale(3, 100.0, document_ref='INV-1')
+        draft = self._sale(4, 40.0, status='draft')
+        ids, _ = self.eng.record_entries_bulk([
+            {'date': '2025-01-05', 'description': 'Rent', 'lines': [(self.rent, 30.0, 0.0), (self.cash, 0.0, 30.0)]},
+        ])
+        self.eng.set_entry_status(draft, 'posted')
+        self.assertTrue(self.eng.delete_entry(eid))
+        self.assertFalse(self.eng.delete_entry(eid))
+
+        kinds = [(e.kind, e.entry_id, e.weight()) for e in self.events]
+        self.assertEqual(kinds, [('posted', eid, 1), ('posted', draft, 0), ('posted', ids[0], 1),
+                                 ('status_changed', draft, 1), ('deleted', eid, -1)])
+        first = self.events[0]
+        self.assertEqual((first.date, first.period_id, first.document_ref), ('2025-01-03', self.eng.current_period_id, 'INV-1'))
+        self.assertEqual(first.lines, ((self.cash, 100.0, 0.0), (self.svc, 0.0, 100.0)))
+        self.assertEqual(self.events[3].previous_status, 'draft')
+        self.assertEqual(self.events[3].weight('draft'), -1)
+        self.assertEqual(self.events[4].lines, first.lines)
+
+    def test_events_bring_trial_balance_rows_up_to_date(self):
+        self._sale(2, 500.0)
+        pid = self.eng.current_period_id
+        scopes = [dict(include_temporary=True), dict(include_temporary=False), dict(include_temporary=True, up_to_date='2025-01-06')]
+        before = [db.compute_trial_balance(period_id=pid, conn=self.conn, **scope) for scope in scopes]
+        self.events.clear()
+
+        doomed = self._sale(3, 120.0)
+        draft = self._sale(4, 80.0, status='draft')
+        self.eng.record_entry('2025-01-09', 'Rent', [JournalLine(self.rent, debit=60.0), JournalLine(self.cash, credit=60.0)])
+        self.eng.set_entry_status(draft, 'posted')
+        self.eng.delete_entry(doomed)
+
+        for scope, rows in zip(scopes, before):
+            updated = self.eng.apply_events_to_trial_balance(rows, self.events, period_id=pid, **scope)
+            expected = db.compute_trial_balance(period_id=pid, conn=self.conn, **scope)
+            self.assertEqual(self._balances(updated), self._balances(expected))
+            self.assertEqual([r['code'] for r in updated], sorted(r['code'] for r in updated))
+
+    def test_failing_listener_does_not_break_posting(self):
+        self.eng.subscribe(lambda event: 1 / 0)
+        eid = self._sale(6, 10.0)
+        self.assertEqual(self.events[-1].entry_id, eid)
+        self.assertIsNotNone(self.conn.execute("SELECT 1 FROM journal_entries WHERE id = ?", (eid,)).fetchone())
+
+    def test_supplies_fix_up_reports_the_replaced_entry(self):
+        supplies = db.get_account_by_name('Supplies', self.conn)['id']
+        dep = db.get_account_by_name('Depreciation Expense', self.conn)['id']
+        self.eng.record_entry('2025-01-02', 'Supplies bought',
+                              [JournalLine(supplies, debit=50.0), JournalLine(self.cash, credit=50.0)])
+        wrong = self.eng.record_entry('2025-01-31', 'Depreciation expense', is_adjusting=True,
+                                      lines=[JournalLine(dep, debit=120.0), JournalLine(supplies, credit=120.0)])
+        pid = self.eng.current_period_id
+        before = db.compute_trial_balance(period_id=pid, include_temporary=True, conn=self.conn)
+        self.events.clear()
+
+        result = self.eng.fix_supplies_account_entries(dry_run=False)
+        self.assertEqual(result['fixed_count'], 1, result)
+        self.assertEqual([(e.kind, e.entry_id) for e in self.events],
+                         [('deleted', wrong), ('posted', result['fixed_entries'][wrong])])
+        updated = self.eng.apply_events_to_trial_balance(before, self.events, period_id=pid, include_temporary=True)
+        expected = db.compute_trial_balance(period_id=pid, include_temporary=True, conn=self.conn)
+        self.assertEqual(self._balances(updated), self._balances(expected))
+        self.assertEqual(self._balances(updated)[supplies], (50.0, 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db
+from techfix.accounting import AccountingEngine, JournalLine
+
+
+class PostingUnitOfWorkTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        self.cash = db.get_account_by_name('Cash', self.conn)['id']
+        self.svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        self.d = self.eng.current_period['start_date']
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def _post(self):
+        return self.eng.record_entry(
+            self.d,
+            'Unit of work',
+            [JournalLine(self.cash, debit=25.0), JournalLine(self.svc, credit=25.0)],
+            is_adjusting=True,
+            attachments=[('Receipt', 'receipt.pdf')],
+            schedule_reverse_on=self.d,
+        )
+
+    def test_record_entry_commits_once(self):
+        commits = []
+        self.conn.set_trace_callback(lambda sql: commits.append(sql) if sql.strip().upper().startswith('COMMIT') else None)
+        try:
+            entry_id = self._post()
+        finally:
+            self.conn.set_trace_callback(None)
+        self.assertEqual(len(commits), 1)
+        self.assertEqual(len(db.list_source_documents(entry_id, conn=self.conn)), 1)
+
+    def test_failure_rolls_back_whole_posting(self):
+        with mock.patch.object(db, 'schedule_reversing_entry', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                self._post()
+        self.assertFalse(self.conn.in_transaction)
+        for table in ('journal_entries', 'journal_lines', 'source_documents', 'account_period_balances'):
+            self.assertEqual(self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], 0, table)
+        self.assertIsNotNone(self._post())
+
+    def test_open_transaction_is_not_committed(self):
+        self.conn.execute("INSERT INTO accounts(name, code, type, normal_side, is_permanent) "
+                          "VALUES ('Petty Cash', '109', 'Asset', 'Debit', 1)")
+        self.assertTrue(self.conn.in_transaction)
+        self._post()
+        self.assertTrue(self.conn.in_transaction)
+        self.conn.rollback()
+        self.assertIsNone(db.get_account_by_name('Petty Cash', self.conn))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0], 0)
+
+    def test_failure_inside_open_transaction_keeps_callers_writes(self):
+        self.conn.execute("INSERT INTO accounts(name, code, type, normal_side, is_permanent) "
+                          "VALUES ('Petty Cash', '109', 'Asset', 'Debit', 1)")
+        with mock.patch.object(db, 'schedule_reversing_entry', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                self._post()
+        self.assertTrue(self.conn.in_transaction)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0], 0)
+        self.conn.commit()
+        self.assertIsNotNone(db.get_account_by_name('Petty Cash', self.conn))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import sqlite3
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db, search, analytics
+from techfix.accounting import AccountingEngine, JournalLine
+
+# Names the journal tables appear under in EXPLAIN QUERY PLAN output.
+JOURNAL_TABLES = {'je', 'jl', 'journal_entries', 'journal_lines'}
+
+
+class QueryPlanTests(unittest.TestCase):
+    """The journal hot paths must search indexes, never scan the journal tables."""
+
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        self.cash = db.get_account_by_name('Cash', self.conn)['id']
+        svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        self.d = self.eng.current_period['start_date']
+        self.pid = self.eng.current_period_id
+        for _ in range(3):
+            self.eng.record_entry(self.d, 'Plan', [JournalLine(self.cash, debit=5.0), JournalLine(svc, credit=5.0)])
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def _journal_scans(self, call):
+        statements = []
+        self.conn.set_trace_callback(
+            lambda sql: statements.append(sql) if sql.lstrip().upper().startswith(('SELECT', 'WITH')) else None
+        )
+        try:
+            call()
+        finally:
+            self.conn.set_trace_callback(None)
+        self.assertTrue(statements)
+        scans = []
+        for sql in statements:
+            for row in self.conn.execute('EXPLAIN QUERY PLAN ' + sql):
+                words = row['detail'].split()
+                if words[0] == 'SCAN' and words[1] in JOURNAL_TABLES:
+                    scans.append(row['detail'])
+        return scans
+
+    def test_hot_queries_use_indexes(self):
+        c, d, pid = self.conn, self.d, self.pid
+        calls = {
+            'compute_trial_balance': lambda: db._trial_balance_from_lines(
+                c, from_date=d, up_to_date=d, include_temporary=True, period_id=pid,
+                exclude_closing=True, exclude_adjusting=False,
+            ),
+            'fetch_journal': lambda: db.fetch_journal(pid, conn=c),
+            'fetch_ledger': lambda: db.fetch_ledger(pid, conn=c),
+            'fetch_journal_page': lambda: db.fetch_journal_page(
+                pid, after=db.fetch_journal_page(pid, page_size=1, conn=c)[1], page_size=1, conn=c
+            ),
+            'fetch_journal_page_account': lambda: db.fetch_journal_page(
+                pid, account_id=self.cash, date_from=d, after=(d, 0, 0), page_size=1, conn=c
+            ),
+            'fetch_ledger_page': lambda: db.fetch_ledger_page(
+                pid, after=db.fetch_ledger_page(pid, page_size=1, conn=c)[1], page_size=1, conn=c
+            ),
+            'search_journal_entries': lambda: search.search_journal_entries(
+                'Plan', date_from=d, date_to=d, account_id=self.cash, conn=c
+            ),
+            'get_financial_metrics': lambda: analytics.get_financial_metrics(pid, conn=c),
+            'get_expense_breakdown': lambda: analytics.get_expense_breakdown(pid, conn=c),
+            'get_revenue_trend': lambda: analytics.get_revenue_trend(30, conn=c),
+            'generate_cash_flow': lambda: self.eng.generate_cash_flow(d, d),
+        }
+        for name, call in calls.items():
+            with self.subTest(name):
+                self.assertEqual(self._journal_scans(call), [])
+
+    def test_dates_are_stored_canonically(self):
+        entry_id = db.insert_journal_entry(
+            self.d + ' 10:30:00', 'Timestamped', [(self.cash, 1.0, 0.0), (self.cash, 0.0, 1.0)], conn=self.conn
+        )
+        row = self.conn.execute("SELECT date FROM journal_entries WHERE id = ?", (entry_id,)).fetchone()
+        self.assertEqual(row['date'], self.d)
+
+    def test_unparseable_dates_are_rejected(self):
+        for bad in ('01/05/2025', '', 'soon'):
+            with self.subTest(bad):
+                with self.assertRaises(sqlite3.IntegrityError):
+                    db.insert_journal_entry(bad, 'Bad date', [(self.cash, 1.0, 0.0), (self.cash, 0.0, 1.0)], conn=self.conn)
+        entry_id = self.conn.execute("SELECT MIN(id) AS id FROM journal_entries").fetchone()['id']
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conn.execute("UPDATE journal_entries SET date = '2025/01/05' WHERE id = ?", (entry_id,))
+        self.conn.rollback()
+        rows = self.conn.execute(
+            "SELECT COUNT(*) AS n FROM journal_entries WHERE date(date) IS NULL OR date <> date(date)"
+        ).fetchone()
+        self.assertEqual(rows['n'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
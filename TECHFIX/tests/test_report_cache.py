@@ -0,0 +1,89 @@
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db, report_cache
+from techfix.accounting import AccountingEngine
+
+
+class ReportCacheTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        self.cash = db.get_account_by_name('Cash', self.conn)['id']
+        self.svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        self.pid = self.eng.current_period_id
+        self.other = db.create_period('Next', start_date='2026-01-01', end_date='2026-12-31', conn=self.conn)
+        self._sale('2025-01-02', 100.0)
+        self.cache = report_cache.get_report_cache()
+        self.cache.clear()
+        self.start = self.cache.stats()
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def _sale(self, day, amount, period_id=None):
+        return db.insert_journal_entry(day, 'Sale', [(self.cash, amount, 0.0), (self.svc, 0.0, amount)],
+                                       period_id=period_id or self.pid, conn=self.conn)
+
+    def _delta(self, name):
+        return self.cache.stats()[name] - self.start[name]
+
+    def test_repeat_reports_are_served_from_the_cache(self):
+        first = self.eng.generate_income_statement('2025-01-01', '2025-12-31')
+        self.assertIs(self.eng.generate_income_statement('2025-01-01', '2025-12-31'), first)
+        self.eng.generate_balance_sheet('2025-12-31')
+        self.eng.generate_balance_sheet('2025-12-31')
+        self.eng.generate_cash_flow('2025-01-01', '2025-12-31')
+        self.eng.generate_cash_flow('2025-01-01', '2025-12-31')
+        rows = report_cache.trial_balance(up_to_date='2025-12-31', period_id=self.pid, conn=self.conn)
+        self.assertEqual(report_cache.trial_balance(up_to_date='2025-12-31', period_id=self.pid, conn=self.conn), rows)
+        self.assertEqual((self._delta('misses'), self._delta('hits')), (4, 4))
+        self.assertEqual(first['total_revenue'], 100.0)
+
+    def test_writes_invalidate_only_the_period_they_touch(self):
+        self.eng.generate_balance_sheet('2025-12-31')
+        self._sale('2026-01-05', 40.0, period_id=self.other)
+        self.eng.generate_balance_sheet('2025-12-31')
+        self.assertEqual((self._delta('hits'), self._delta('invalidations')), (1, 0))
+
+        self._sale('2025-01-03', 25.0)
+        sheet = self.eng.generate_balance_sheet('2025-12-31')
+        self.assertEqual(self._delta('invalidations'), 1)
+        self.assertEqual(sheet['total_assets'], 125.0)
+
+        self.conn.execute("UPDATE accounts SET name = 'Cash on Hand' WHERE id = ?", (self.cash,))
+        self.conn.commit()
+        sheet = self.eng.generate_balance_sheet('2025-12-31')
+        self.assertEqual(self._delta('invalidations'), 2)
+        self.assertEqual(sheet['assets'][0]['name'], 'Cash on Hand')
+
+    def test_uncommitted_writes_bypass_the_cache(self):
+        self.eng.generate_income_statement('2025-01-01', '2025-12-31')
+        self.conn.execute("UPDATE journal_lines SET credit = 60.0 WHERE account_id = ?", (self.svc,))
+        self.assertEqual(self.eng.generate_income_statement('2025-01-01', '2025-12-31')['total_revenue'], 60.0)
+        self.conn.rollback()
+        self.assertEqual(self.eng.generate_income_statement('2025-01-01', '2025-12-31')['total_revenue'], 100.0)
+        self.assertEqual(self._delta('hits'), 1)
+
+    def test_lru_eviction_within_the_budget(self):
+        cache = report_cache.ReportCache(budget_bytes=3000)
+        for i in range(5):
+            cache.get_or_compute('blob', {'i': i}, lambda: 'x' * 900, conn=self.conn)
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['evictions']), (3, 2))
+        self.assertLessEqual(stats['bytes'], 3000)
+        cache.get_or_compute('blob', {'i': 4}, lambda: self.fail('should be cached'), conn=self.conn)
+        cache.get_or_compute('blob', {'i': 0}, lambda: 'y', conn=self.conn)
+        self.assertEqual(cache.stats()['misses'], 6)
+        cache.get_or_compute('huge', {}, lambda: 'z' * 4000, conn=self.conn)
+        self.assertEqual(cache.stats()['entries'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
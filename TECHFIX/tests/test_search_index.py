@@ -0,0 +1,97 @@
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db, search
+from techfix.accounting import AccountingEngine
+
+
+class SearchIndexTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        self.cash = db.get_account_by_name('Cash', self.conn)['id']
+        self.svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        self.rent = db.get_account_by_name('Rent Expense', self.conn)['id']
+        self.sale = db.insert_journal_entry(
+            '2025-01-02', 'Laptop repair for Acme', [(self.cash, 100.0, 0.0), (self.svc, 0.0, 100.0)],
+            document_ref='INV-0042', conn=self.conn)
+        self.rent_id = db.insert_journal_entry(
+            '2025-01-03', 'Office rent', [(self.rent, 50.0, 0.0), (self.cash, 0.0, 50.0)],
+            memo='paid to Acme Properties', conn=self.conn)
+        ids, _ = db.insert_journal_entries_bulk([
+            {'date': '2025-01-04', 'description': f'Bulk sale {i}', 'document_ref': f'BLK-{i}',
+             'lines': [(self.cash, 10.0, 0.0), (self.svc, 0.0, 10.0)]}
+            for i in range(3)
+        ], conn=self.conn)
+        self.bulk_ids = ids
+        self.conn.execute("INSERT INTO customers(name, code, contact, email) VALUES ('Acme Corp', 'C-001', 'Wile E.', 'wile@acme.test')")
+        self.conn.execute("INSERT INTO vendors(name, code, email) VALUES ('Globex', 'V-001', 'ap@globex.test')")
+        self.conn.commit()
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def _ids(self, query, kind):
+        return [h['id'] for h in search.search_index(query, kinds=[kind], conn=self.conn)]
+
+    def test_prefix_ranking_and_highlighting(self):
+        hits = search.search_index('acm', kinds=['entry'], conn=self.conn)
+        # A title match outranks a memo match.
+        self.assertEqual([h['id'] for h in hits], [self.sale, self.rent_id])
+        self.assertEqual(hits[0]['title'], 'Laptop repair for [Acme]')
+        self.assertIn('[Acme]', hits[1]['match'])
+        self.assertEqual(self._ids('inv-0042', 'entry'), [self.sale])
+        self.assertCountEqual(self._ids('service rev', 'entry'), [self.sale] + self.bulk_ids)
+        self.assertEqual(self._ids('blk 2', 'entry'), [self.bulk_ids[2]])
+        self.assertEqual(search.search_index('"(*', conn=self.conn), [])
+        ranked = search.search_index('acme', full_rank=True, conn=self.conn)
+        self.assertEqual([(h['kind'], h['id']) for h in ranked][:2], [('entry', self.sale), ('entry', self.rent_id)])
+        self.assertEqual([h['kind'] for h in ranked][2:], ['customer'])
+
+    def test_index_follows_writes(self):
+        self.conn.execute("UPDATE journal_entries SET description = 'Desktop repair' WHERE id = ?", (self.sale,))
+        self.conn.execute("UPDATE accounts SET name = 'Consulting Revenue' WHERE id = ?", (self.svc,))
+        self.conn.execute("UPDATE customers SET email = 'road@runner.test' WHERE code = 'C-001'")
+        self.conn.execute("DELETE FROM journal_entries WHERE id = ?", (self.bulk_ids[0],))
+        self.assertEqual(self._ids('laptop', 'entry'), [])
+        self.assertEqual(self._ids('desktop', 'entry'), [self.sale])
+        self.assertCountEqual(self._ids('consulting', 'entry'), [self.sale] + self.bulk_ids[1:])
+        self.assertEqual(self._ids('consulting', 'account'), [self.svc])
+        self.assertEqual(len(self._ids('runner', 'customer')), 1)
+
+        before = self.conn.execute("SELECT rowid, * FROM search_index ORDER BY rowid").fetchall()
+        self.assertEqual(db.rebuild_search_index(conn=self.conn), len(before))
+        after = self.conn.execute("SELECT rowid, * FROM search_index ORDER BY rowid").fetchall()
+        self.assertEqual([tuple(r) for r in after], [tuple(r) for r in before])
+
+    def test_global_and_filtered_search_use_the_index(self):
+        results = search.global_search('acme', limit=10, conn=self.conn)
+        self.assertEqual([r['id'] for r in results['journal_entries']], [self.sale, self.rent_id])
+        self.assertEqual([r['name'] for r in results['customers']], ['Acme Corp'])
+        self.assertEqual(results['vendors'], [])
+        self.assertEqual([r['code'] for r in search.global_search('101', conn=self.conn)['accounts']], ['101'])
+
+        rows = search.search_journal_entries('acme', date_from='2025-01-03', conn=self.conn)
+        self.assertEqual([r['id'] for r in rows], [self.rent_id])
+        self.assertEqual([r['code'] for r in search.search_accounts('rent', conn=self.conn)], ['403'])
+
+    def test_unrequested_kinds_do_not_crowd_out_requested_ones(self):
+        self.conn.execute("UPDATE accounts SET name = 'Acme Clearing' WHERE id = ?", (self.rent,))
+        self.conn.execute("INSERT INTO vendors(name, code) VALUES ('Acme Supplies', 'V-002')")
+        self.conn.executemany("INSERT INTO customers(name, code) VALUES (?, ?)",
+                              [(f'Acme Branch {i}', f'C-1{i:02d}') for i in range(40)])
+        self.conn.commit()
+        hits = search.search_index('acme', kinds=['account', 'vendor'], limit=2, conn=self.conn)
+        self.assertEqual([(h['kind'], h['id']) for h in hits],
+                         [('account', self.rent), ('vendor', self.conn.execute(
+                             "SELECT id FROM vendors WHERE code = 'V-002'").fetchone()[0])])
+
+
+if __name__ == '__main__':
+    unittest.main()
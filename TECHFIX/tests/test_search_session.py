@@ -0,0 +1,98 @@
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db, search
+from techfix.accounting import AccountingEngine, JournalLine
+
+
+class FakeRoot:
+    """Stands in for Tk: ``after`` callbacks run when the test fires them."""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, ms, fn):
+        self.next_id += 1
+        self.pending[self.next_id] = fn
+        return self.next_id
+
+    def after_cancel(self, handle):
+        self.pending.pop(handle, None)
+
+    def fire(self):
+        pending, self.pending = self.pending, {}
+        for fn in pending.values():
+            fn()
+
+
+class SearchSessionTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        self.cash = db.get_account_by_name('Cash', self.conn)['id']
+        self.svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        for i, desc in enumerate(['Laptop repair Acme', 'Laptop sale Café Luna', 'Lamp repair', 'Network install Acme']):
+            self.eng.record_entry(f'2025-01-{i + 2:02d}', desc, [JournalLine(self.cash, debit=10.0 + i), JournalLine(self.svc, credit=10.0 + i)],
+                                  document_ref=f'INV-{i}')
+        self.conn.execute("INSERT INTO customers(name, code, email) VALUES ('Lakeside Cafe', 'C-1', 'hi@lakeside.test')")
+        self.conn.commit()
+        self.root = FakeRoot()
+        self.delivered = []
+        self.session = search.SearchSession(self.root, lambda q, r: self.delivered.append((q, r)), limit=10)
+
+    def tearDown(self):
+        self.session.close()
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _summary(results):
+        return {k: [(r['id'], r.get('match', '')) for r in v] for k, v in results.items()}
+
+    def test_extending_a_query_narrows_in_memory_like_the_index(self):
+        self.session.search('la')
+        self.assertEqual(self.session.misses, 1)
+        for query in ('lap', 'Lapt', 'laptop re', 'laptop cafe', 'lak', 'la 101', 'la inv 1'):
+            narrowed = self.session.search(query)
+            self.assertEqual(self._summary(narrowed), self._summary(search.global_search(query, limit=10, conn=self.conn)), query)
+        self.assertEqual((self.session.misses, self.session.narrowed), (1, 7))
+        self.session.search('laptop re')
+        self.assertEqual(self.session.hits, 1)
+
+    def test_debounce_delivers_latest_and_instant_hits_skip_it(self):
+        for partial in ('ne', 'net', 'netw'):
+            self.session.schedule(partial)
+        # 'ne' is not cached yet, so everything waits for the pause.
+        self.assertEqual(self.delivered, [])
+        self.assertEqual(len(self.root.pending), 1)
+        self.root.fire()
+        self.assertEqual([q for q, _ in self.delivered], ['netw'])
+        self.session.schedule('netwo')  # narrowed from 'netw': no wait, no query
+        self.assertEqual([q for q, _ in self.delivered], ['netw', 'netwo'])
+        self.assertEqual(self.root.pending, {})
+
+    def test_commits_elsewhere_invalidate_the_cache(self):
+        self.assertEqual(len(self.session.search('acme')['journal_entries']), 2)
+        self.eng.record_entry('2025-01-09', 'Acme retainer', [JournalLine(self.cash, debit=5.0), JournalLine(self.svc, credit=5.0)])
+        self.assertFalse(self.session.is_instant('acme'))
+        self.assertEqual(len(self.session.search('acme')['journal_entries']), 3)
+        self.assertEqual(len(self.session.search('acme ret')['journal_entries']), 1)
+
+    def test_history_suggestions(self):
+        self.session.record('laptop')
+        self.session.record('Lamp')
+        self.session.record('laptop')
+        self.assertEqual(self.session.suggestions('la'), ['laptop', 'Lamp'])
+        other = search.SearchSession(conn=self.conn)
+        self.assertEqual(other.suggestions('LAM'), ['Lamp'])
+        self.assertEqual(other.suggestions(), ['laptop', 'Lamp'])
+
+
+if __name__ == '__main__':
+    unittest.main()
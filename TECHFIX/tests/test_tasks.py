@@ -0,0 +1,113 @@
+import unittest
+import os, sys
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db
+from techfix.accounting import AccountingEngine
+from techfix.tasks import TaskExecutor
+
+
+class FakeRoot:
+    """Stands in for Tk: ``after`` callbacks run when the test pumps them."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, fn):
+        self.callbacks.append(fn)
+
+    def pump(self, until, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not until():
+            if time.monotonic() > deadline:
+                raise AssertionError("timed out waiting for task delivery")
+            callbacks, self.callbacks = self.callbacks, []
+            for fn in callbacks:
+                fn()
+            time.sleep(0.005)
+
+
+class TaskExecutorTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.root = FakeRoot()
+        self.tasks = TaskExecutor(self.root, max_workers=2)
+
+    def tearDown(self):
+        self.tasks.shutdown()
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def test_results_arrive_through_after_on_the_calling_thread(self):
+        seen = []
+        self.tasks.submit(
+            "accounts",
+            lambda ctx: ctx.conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0],
+            lambda n: seen.append((n, threading.current_thread() is threading.main_thread())),
+        )
+        self.assertEqual(seen, [])
+        self.root.pump(lambda: seen)
+        count = self.eng.conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+        self.assertEqual(seen, [(count, True)])
+        self.assertFalse(self.tasks.pending())
+
+    def test_newer_request_supersedes_older_one(self):
+        release = threading.Event()
+        delivered = []
+
+        def slow(ctx):
+            release.wait(5)
+            ctx.check()
+            return "old"
+
+        self.tasks.submit("view", slow, delivered.append)
+        for i in range(5):
+            self.tasks.submit("view", lambda ctx, i=i: f"new{i}", delivered.append)
+        release.set()
+        self.root.pump(lambda: not self.tasks.pending())
+        self.assertEqual(delivered, ["new4"])
+
+    def test_errors_go_to_on_error(self):
+        errors = []
+        self.tasks.submit("bad", lambda ctx: 1 / 0, lambda r: self.fail("should not succeed"), errors.append)
+        self.root.pump(lambda: errors)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+    def test_progress_reports_arrive_before_the_result(self):
+        events = []
+
+        def work(ctx):
+            for n in (1, 2, 3):
+                ctx.progress(n)
+            return "done"
+
+        self.tasks.submit("export", work, lambda r: events.append(r), on_progress=events.append)
+        self.root.pump(lambda: "done" in events)
+        self.assertEqual(events, [1, 2, 3, "done"])
+
+    def test_engine_reports_run_on_worker_connection(self):
+        cash = db.get_account_by_name('Cash', self.eng.conn)['id']
+        svc = db.get_account_by_name('Service Revenue', self.eng.conn)['id']
+        db.insert_journal_entry('2025-01-05', 'Sale', [(cash, 250.0, 0.0), (svc, 0.0, 250.0)], conn=self.eng.conn)
+        results = []
+
+        def work(ctx):
+            engine = self.eng.with_connection(ctx.conn)
+            self.assertIs(engine.conn, ctx.conn)
+            return engine.generate_income_statement('2025-01-01', '2025-01-31')['net_income']
+
+        self.tasks.submit("report", work, results.append)
+        self.root.pump(lambda: results)
+        self.assertAlmostEqual(results[0], 250.0)
+        # The engine keeps its own connection and it is still usable.
+        self.assertIsNotNone(self.eng.conn.execute("SELECT 1").fetchone())
+
+
+if __name__ == '__main__':
+    unittest.main()
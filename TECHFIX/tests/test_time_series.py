@@ -0,0 +1,91 @@
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db, analytics
+from techfix.accounting import AccountingEngine
+
+
+class TimeSeriesTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        acc = lambda name: db.get_account_by_name(name, self.conn)['id']
+        cash, svc, rent, cap = acc('Cash'), acc('Service Revenue'), acc('Rent Expense'), acc("Owner's Capital")
+        summary = acc('Income Summary')
+        entries = [
+            ('2024-12-30', [(cash, 1000, 0), (cap, 0, 1000)], 0),
+            ('2025-01-06', [(cash, 200, 0), (svc, 0, 200)], 0),
+            ('2025-01-12', [(rent, 80, 0), (cash, 0, 80)], 0),
+            ('2025-01-13', [(cash, 50, 0), (svc, 0, 50)], 0),
+            ('2025-03-31', [(cash, 70, 0), (svc, 0, 70)], 0),
+            ('2025-04-01', [(rent, 40, 0), (cash, 0, 40)], 0),
+            ('2025-04-01', [(svc, 320, 0), (summary, 0, 320)], 1),
+        ]
+        db.insert_journal_entries_bulk(
+            [{'date': d, 'description': f'E{i}', 'lines': lines, 'is_closing': closing}
+             for i, (d, lines, closing) in enumerate(entries)],
+            conn=self.conn)
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def test_buckets_at_every_granularity(self):
+        weekly = analytics.get_time_series('2025-01-01', '2025-01-19', granularity='week', conn=self.conn)
+        self.assertEqual(weekly['buckets'], ['2024-12-30', '2025-01-06', '2025-01-13'])
+        self.assertEqual(weekly['revenue'], [0.0, 200.0, 50.0])
+        self.assertEqual(weekly['expense'], [0.0, 80.0, 0.0])
+        self.assertEqual(weekly['net_income'], [0.0, 120.0, 50.0])
+        self.assertEqual(weekly['opening_cash'], 1000.0)
+        self.assertEqual(weekly['cash_balance'], [1000.0, 1120.0, 1170.0])
+
+        monthly = analytics.get_time_series('2025-01-01', '2025-04-30', granularity='month', conn=self.conn)
+        self.assertEqual(monthly['buckets'], ['2025-01-01', '2025-02-01', '2025-03-01', '2025-04-01'])
+        # The closing entry on 2025-04-01 is not a revenue swing.
+        self.assertEqual(monthly['revenue'], [250.0, 0.0, 70.0, 0.0])
+        with_closing = analytics.get_time_series('2025-04-01', '2025-04-30', granularity='month',
+                                                 exclude_closing=False, conn=self.conn)
+        self.assertEqual(with_closing['revenue'], [-320.0])
+
+        quarterly = analytics.get_time_series('2024-11-15', '2025-06-30', granularity='quarter', conn=self.conn)
+        self.assertEqual(quarterly['buckets'], ['2024-10-01', '2025-01-01', '2025-04-01'])
+        self.assertEqual(quarterly['revenue'], [0.0, 320.0, 0.0])
+        self.assertEqual(quarterly['cash'], [1000.0, 240.0, -40.0])
+        self.assertEqual(quarterly['cash_balance'][-1], 1200.0)
+
+        daily = analytics.get_time_series('2025-01-05', '2025-01-07', conn=self.conn)
+        self.assertEqual(daily['buckets'], ['2025-01-05', '2025-01-06', '2025-01-07'])
+        self.assertEqual(daily['revenue'], [0.0, 200.0, 0.0])
+        with self.assertRaises(ValueError):
+            analytics.get_time_series('2025-01-01', '2025-01-31', granularity='year', conn=self.conn)
+
+    def test_long_ranges_cost_one_grouped_query(self):
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            analytics.get_time_series('2015-01-01', '2025-12-31', granularity='quarter', conn=self.conn)
+        finally:
+            self.conn.set_trace_callback(None)
+        # Cash account lookup, the series and the opening cash balance.
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(analytics.pick_granularity('2025-01-01', '2025-01-30'), 'day')
+        self.assertEqual(analytics.pick_granularity('2025-01-01', '2025-06-30'), 'week')
+        self.assertEqual(analytics.pick_granularity('2023-01-01', '2025-12-31'), 'month')
+        self.assertEqual(analytics.pick_granularity('2010-01-01', '2025-12-31'), 'quarter')
+
+    def test_rolling_and_cumulative_windows(self):
+        values = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.assertEqual(analytics.cumulative(values), [1.0, 3.0, 6.0, 10.0, 15.0])
+        self.assertEqual(analytics.cumulative(values, 10.0), [11.0, 13.0, 16.0, 20.0, 25.0])
+        self.assertEqual(analytics.rolling_sum(values, 3), [1.0, 3.0, 6.0, 9.0, 12.0])
+        self.assertEqual(analytics.rolling_mean(values, 2), [1.0, 1.5, 2.5, 3.5, 4.5])
+        self.assertEqual(analytics.rolling_sum([0.1] * 4, 2), [0.1, 0.2, 0.2, 0.2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from techfix import db
+from techfix.accounting import AccountingEngine
+from techfix.virtual_tree import LedgerRowProvider, SequenceRowProvider
+
+
+class RowProviderTests(unittest.TestCase):
+    def setUp(self):
+        db.init_db(reset=True)
+        self.eng = AccountingEngine()
+        db.seed_chart_of_accounts(self.eng.conn)
+        self.conn = self.eng.conn
+        cash = db.get_account_by_name('Cash', self.conn)['id']
+        svc = db.get_account_by_name('Service Revenue', self.conn)['id']
+        entries = [
+            {'date': f"2025-01-{1 + i % 6:02d}", 'description': f"E{i}",
+             'lines': [(cash, 5.0 + i, 0.0), (svc, 0.0, 5.0 + i)],
+             'status': 'draft' if i % 5 == 0 else 'posted'}
+            for i in range(25)
+        ]
+        db.insert_journal_entries_bulk(entries, conn=self.conn)
+
+    def tearDown(self):
+        try:
+            self.eng.close()
+        except Exception:
+            pass
+
+    def test_ledger_cursor_at_starts_pages_at_any_position(self):
+        for status in ('posted', None):
+            full = [r['line_id'] for r in db.iter_ledger_rows(status=status, conn=self.conn)]
+            self.assertEqual(db.ledger_totals(status=status, conn=self.conn)['line_count'], len(full))
+            for position in range(len(full)):
+                after = db.ledger_cursor_at(position, status=status, conn=self.conn)
+                rows, _ = db.fetch_ledger_page(after=after, status=status, page_size=1, conn=self.conn)
+                self.assertEqual(rows[0]['line_id'], full[position])
+
+    def test_ledger_provider_slices_in_both_orders(self):
+        provider = LedgerRowProvider(self.conn, format_row=lambda r: (r['line_id'],))
+        full = [(r['line_id'],) for r in db.iter_ledger_rows(conn=self.conn)]
+        self.assertEqual(provider.row_count(), len(full))
+        # Sequential reads reuse the cursor the previous slice ended on.
+        walked = provider.rows(0, 7) + provider.rows(7, 7) + provider.rows(14, 100)
+        self.assertEqual(walked, full)
+        self.assertEqual(provider.rows(13, 4), full[13:17])
+        self.assertFalse(provider.sort('debit', False))
+        self.assertTrue(provider.sort('account', True))
+        self.assertEqual(provider.rows(0, 100), full[::-1])
+        self.assertEqual(provider.rows(3, 5), full[::-1][3:8])
+
+    def test_sequence_provider_sorts_formatted_amounts(self):
+        provider = SequenceRowProvider([('b', '1,200.00 Dr'), ('a', '95.50 Cr'), ('c', '')], ('name', 'amount'))
+        self.assertTrue(provider.sort('amount', False))
+        self.assertEqual([r[0] for r in provider.rows(0, 3)], ['a', 'b', 'c'])
+        self.assertTrue(provider.sort('name', True))
+        self.assertEqual(provider.rows(1, 1), [('b', '1,200.00 Dr')])
+        self.assertFalse(provider.sort('missing', False))
+
+
+if __name__ == '__main__':
+    unittest.main()